@@ -3,15 +3,47 @@ Flask API Application for Heart Disease Prediction Service
 with Prometheus Metrics Integration
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, has_request_context, request, jsonify
 from prometheus_client import Counter, Histogram, Gauge, generate_latest
 from prometheus_client import CollectorRegistry, make_wsgi_app
 from werkzeug.middleware.dispatcher import DispatcherMiddleware
+import hmac
 import logging
+import os
+import random
+import sys
+import json
+import threading
 import time
 import joblib
 import numpy as np
 from datetime import datetime
+from functools import partial
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from src.models.early_exit import EarlyExitForest
+from src.models.cascade import CascadeClassifier
+from src.models.compact_forest import CompactForest, size_report
+from src.models.explain import ContributionExplainer
+from src.models.footprint import LATENCY_BATCH_SIZES, measure_footprint, measure_latency
+from src.data.drift import FeatureDriftMonitor, load_reference_profile
+from src.models.predict import (
+    DECISION_THRESHOLD, FEATURES, RISK_LEVEL_BOUNDARIES, MissingFeaturesError, Predictor,
+    format_prediction
+)
+from src.api.sharding import ShardedScorer
+from src.api.profiler import ProfilerBusyError, run_profile
+from src.api.capture import TrafficRecorder
+from src.api.shadow import ShadowEvaluator
+from src.api.model_pool import ModelPool, ModelUnavailableError
+from src.api.scheduler import PRIORITIES, LaneFullError, PriorityScheduler
+from src.api.prediction_log import PredictionLog
+from src.utils.tracing import configure_tracing, get_tracer, span
+from src.api.batch_format import (
+    BATCH_FORMATS, BatchFormatError, build_columnar_predictions, build_row_predictions,
+    columns_to_matrix, negotiate_encoding, parse_fields, stream_json
+)
 
 # Configure logging
 logging.basicConfig(
@@ -64,11 +96,803 @@ active_requests = Gauge(
     registry=registry
 )
 
+trees_evaluated = Histogram(
+    'heart_disease_trees_evaluated',
+    'Number of forest trees evaluated per prediction (early-exit engine)',
+    ['model_version'],
+    buckets=(5, 10, 20, 30, 50, 75, 100, 150, 200, 300, 500),
+    registry=registry
+)
+
+cascade_rows = Counter(
+    'heart_disease_cascade_rows_total',
+    'Rows scored by each cascade stage (forest/linear is the escalation rate)',
+    ['stage'],
+    registry=registry
+)
+
+cascade_stage_latency = Histogram(
+    'heart_disease_cascade_stage_latency_seconds',
+    'Time spent in each cascade stage per scoring call',
+    ['stage'],
+    registry=registry
+)
+
+traffic_capture_records = Counter(
+    'heart_disease_traffic_capture_records_total',
+    'Sampled request bodies handed to the traffic capture writer',
+    ['outcome'],
+    registry=registry
+)
+
+shadow_predictions = Counter(
+    'heart_disease_shadow_predictions_total',
+    'Rows scored by the shadow model, by label agreement with the primary',
+    ['outcome'],
+    registry=registry
+)
+
+shadow_agreement = Gauge(
+    'heart_disease_shadow_agreement_ratio',
+    'Fraction of shadow-scored rows whose label matched the primary model',
+    registry=registry
+)
+
+shadow_probability_delta = Histogram(
+    'heart_disease_shadow_probability_delta',
+    'Absolute difference between shadow and primary disease probability',
+    buckets=(0.001, 0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0),
+    registry=registry
+)
+
+shadow_latency = Histogram(
+    'heart_disease_shadow_latency_seconds',
+    'Time spent scoring one coalesced shadow batch',
+    registry=registry
+)
+
+shadow_dropped = Counter(
+    'heart_disease_shadow_dropped_rows_total',
+    'Rows not shadow-scored because the shadow queue was full',
+    registry=registry
+)
+
+pool_model_latency = Histogram(
+    'heart_disease_pool_model_latency_seconds',
+    'Scoring time of models served from the model pool',
+    ['model'],
+    registry=registry
+)
+
+pool_model_load_seconds = Histogram(
+    'heart_disease_pool_model_load_seconds',
+    'Time spent loading a model into the model pool',
+    ['model'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+    registry=registry
+)
+
+pool_resident_bytes = Gauge(
+    'heart_disease_pool_resident_bytes',
+    'Footprint of the models resident in the model pool',
+    registry=registry
+)
+
+pool_model_footprint_bytes = Gauge(
+    'heart_disease_pool_model_footprint_bytes',
+    'Footprint of each model resident in the model pool',
+    ['model'],
+    registry=registry
+)
+
+pool_evictions = Counter(
+    'heart_disease_pool_evictions_total',
+    'Models evicted from the model pool to stay within the memory budget',
+    ['model'],
+    registry=registry
+)
+
+batch_shard_duration = Histogram(
+    'heart_disease_batch_shard_duration_seconds',
+    'Time spent scoring one batch shard in the shard pool',
+    registry=registry
+)
+
+batch_shard_pool_utilization = Gauge(
+    'heart_disease_batch_shard_pool_utilization',
+    'Fraction of shard pool capacity busy during the last sharded batch',
+    registry=registry
+)
+
+sharded_batches = Counter(
+    'heart_disease_sharded_batches_total',
+    'Number of batches scored in the shard pool',
+    registry=registry
+)
+
+scheduler_queue_wait = Histogram(
+    'heart_disease_scheduler_queue_wait_seconds',
+    'Time scoring work waited in its priority lane before starting',
+    ['priority'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+    registry=registry
+)
+
+scheduler_chunk_duration = Histogram(
+    'heart_disease_scheduler_chunk_duration_seconds',
+    'Time spent scoring one scheduled chunk',
+    ['priority'],
+    registry=registry
+)
+
+scheduler_rows = Counter(
+    'heart_disease_scheduler_rows_total',
+    'Rows scored per priority class (rate() gives throughput)',
+    ['priority'],
+    registry=registry
+)
+
+scheduler_rejected = Counter(
+    'heart_disease_scheduler_rejected_total',
+    'Requests rejected because their priority lane was full',
+    ['priority'],
+    registry=registry
+)
+
+batch_dedup_rows = Counter(
+    'heart_disease_batch_dedup_rows_total',
+    'Rows of batches checked for duplicates, before (input) and after (unique) deduplication',
+    ['stage'],
+    registry=registry
+)
+
+batch_dedup_ratio = Histogram(
+    'heart_disease_batch_dedup_ratio',
+    'Fraction of rows per checked batch that duplicated another row',
+    buckets=(0, 0.01, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 1),
+    registry=registry
+)
+
+prediction_log_rows = Counter(
+    'heart_disease_prediction_log_rows_total',
+    'Scored rows handed to the prediction log, by outcome (written, dropped)',
+    ['outcome'],
+    registry=registry
+)
+
+prediction_log_buffer_fill = Gauge(
+    'heart_disease_prediction_log_buffer_fill_ratio',
+    'Fill ratio of the prediction log ring buffer before the last flush (backpressure)',
+    registry=registry
+)
+
+model_size_bytes = Gauge(
+    'heart_disease_model_size_bytes',
+    'Size of the served model (serialized or in memory)',
+    ['model_version', 'kind'],
+    registry=registry
+)
+
+model_trees = Gauge(
+    'heart_disease_model_trees',
+    'Number of trees in the served model',
+    ['model_version'],
+    registry=registry
+)
+
+model_nodes = Gauge(
+    'heart_disease_model_nodes',
+    'Number of tree nodes in the served model',
+    ['model_version'],
+    registry=registry
+)
+
+model_depth = Gauge(
+    'heart_disease_model_depth',
+    'Tree depth of the served model (max over trees, or total over trees)',
+    ['model_version', 'kind'],
+    registry=registry
+)
+
+model_expected_latency = Gauge(
+    'heart_disease_model_expected_latency_seconds',
+    'Calibrated latency of one model call at a batch size, from the load-time benchmark',
+    ['model_version', 'batch_size'],
+    registry=registry
+)
+
+prediction_log_flush_duration = Histogram(
+    'heart_disease_prediction_log_flush_duration_seconds',
+    'Time spent writing one batch of the prediction log to disk',
+    registry=registry
+)
+
 # Global model variable
 model = None
+predictor = None
 MODEL_VERSION = "1.0.0"
 MODEL_TYPE = "heart_disease_classifier"
 
+# Inference engine: 'sklearn' (default), 'early_exit' (RandomForest only),
+# 'compact' (float32 flattened forest with shared subtrees) or 'cascade'
+# (logistic regression, escalating uncertain rows to the forest)
+INFERENCE_ENGINE = os.environ.get('INFERENCE_ENGINE', 'sklearn')
+EARLY_EXIT_GROUP_SIZE = int(os.environ.get('EARLY_EXIT_GROUP_SIZE', 10))
+EARLY_EXIT_GUARANTEE = os.environ.get('EARLY_EXIT_GUARANTEE', 'exact')
+EARLY_EXIT_CONFIDENCE = float(os.environ.get('EARLY_EXIT_CONFIDENCE', 0.99))
+CASCADE_LINEAR_MODEL_PATH = os.environ.get('CASCADE_LINEAR_MODEL_PATH', 'models/logistic_regression.pkl')
+CASCADE_FOREST_MODEL_PATH = os.environ.get('CASCADE_FOREST_MODEL_PATH', 'models/random_forest.pkl')
+CASCADE_CONFIG_PATH = os.environ.get('CASCADE_CONFIG_PATH', 'models/cascade_metadata.json')
+
+# Batches above BATCH_SHARD_THRESHOLD rows are split into BATCH_SHARD_SIZE
+# row shards and scored in a pool of BATCH_SHARD_WORKERS processes (0 disables);
+# with priority scheduling each bulk chunk of such a batch is sharded
+BATCH_SHARD_WORKERS = int(os.environ.get('BATCH_SHARD_WORKERS', 0))
+BATCH_SHARD_THRESHOLD = int(os.environ.get('BATCH_SHARD_THRESHOLD', 5000))
+BATCH_SHARD_SIZE = int(os.environ.get('BATCH_SHARD_SIZE', 2000))
+sharded_scorer = None
+sharded_predictor = None
+
+# Batch responses with at least this many samples are compressed when the
+# client accepts gzip/zstd
+RESPONSE_COMPRESSION_MIN_SAMPLES = int(os.environ.get('RESPONSE_COMPRESSION_MIN_SAMPLES', 100))
+
+# /debug/profile is disabled unless a bearer token is configured
+DEBUG_PROFILE_TOKEN = os.environ.get('DEBUG_PROFILE_TOKEN')
+PROFILE_MAX_SECONDS = float(os.environ.get('PROFILE_MAX_SECONDS', 60))
+PROFILE_MIN_INTERVAL_MS = 1.0
+
+# Sampled capture of /predict and /batch_predict requests (also under
+# /models/<name>/) for load replay, with their query string and the model
+# routing and priority headers; each worker writes capture-<pid>.bin.gz in
+# TRAFFIC_CAPTURE_DIR (unset disables)
+TRAFFIC_CAPTURE_DIR = os.environ.get('TRAFFIC_CAPTURE_DIR')
+TRAFFIC_CAPTURE_SAMPLE_RATE = float(os.environ.get('TRAFFIC_CAPTURE_SAMPLE_RATE', 0.01))
+TRAFFIC_CAPTURE_MAX_BYTES = int(os.environ.get('TRAFFIC_CAPTURE_MAX_BYTES', 1024 ** 3))
+traffic_recorder = None
+_traffic_recorder_lock = threading.Lock()
+
+# Shadow model scored on copies of live traffic off the request path; a
+# pickle path or an MLflow model URI (models:/name/version, runs:/id/model)
+SHADOW_MODEL_PATH = os.environ.get('SHADOW_MODEL_PATH')
+SHADOW_QUEUE_SIZE = int(os.environ.get('SHADOW_QUEUE_SIZE', 1000))
+SHADOW_BATCH_ROWS = int(os.environ.get('SHADOW_BATCH_ROWS', 512))
+shadow_model = None
+shadow_evaluator = None
+_shadow_lock = threading.Lock()
+
+# Additional models served next to the default one, selected per request
+# with the MODEL_ROUTING_HEADER header or the /models/<name>/... routes;
+# failed lookups are answered from cache for MODEL_POOL_FAILURE_TTL_SECONDS
+# and MODEL_POOL_ALLOWED (comma-separated names) restricts routable models
+MODEL_POOL_DIR = os.environ.get('MODEL_POOL_DIR', 'models')
+MODEL_POOL_MEMORY_BUDGET_MB = float(os.environ.get('MODEL_POOL_MEMORY_BUDGET_MB', 1024))
+MODEL_POOL_FAILURE_TTL_SECONDS = float(os.environ.get('MODEL_POOL_FAILURE_TTL_SECONDS', 30))
+MODEL_POOL_ALLOWED = [name.strip() for name in os.environ.get('MODEL_POOL_ALLOWED', '').split(',') if name.strip()]
+MODEL_ROUTING_HEADER = os.environ.get('MODEL_ROUTING_HEADER', 'X-Model')
+
+# Precompute per-feature contribution tables at load so requests can ask for
+# explanations with "explain": true (body) or ?explain=true. Early-exit
+# engines explain the probability they return (over the trees they
+# evaluated); the cascade and compact engines do not support explanations
+EXPLANATIONS_ENABLED = os.environ.get('EXPLANATIONS_ENABLED', 'false').lower() == 'true'
+explainer = None
+
+# Streaming feature statistics and PSI/KS drift against the training profile
+# written by preprocess_data(); exported at /metrics (unset or missing disables)
+DRIFT_REFERENCE_PROFILE = os.environ.get('DRIFT_REFERENCE_PROFILE', 'data/processed/reference_profile.json')
+drift_monitor = None
+
+# Every scored row is appended to columnar segment files in
+# PREDICTION_LOG_DIR by a background thread per worker (unset disables)
+PREDICTION_LOG_DIR = os.environ.get('PREDICTION_LOG_DIR')
+PREDICTION_LOG_CAPACITY = int(os.environ.get('PREDICTION_LOG_CAPACITY', 65536))
+PREDICTION_LOG_FLUSH_INTERVAL_MS = float(os.environ.get('PREDICTION_LOG_FLUSH_INTERVAL_MS', 1000))
+PREDICTION_LOG_SEGMENT_MB = float(os.environ.get('PREDICTION_LOG_SEGMENT_MB', 64))
+PREDICTION_LOG_FSYNC = os.environ.get('PREDICTION_LOG_FSYNC', 'rotate')
+prediction_log = None
+_prediction_log_lock = threading.Lock()
+
+# Size and tree structure of the served model, measured at load, and its
+# latency at batch sizes 1/100/10k from a benchmark of
+# FOOTPRINT_BENCHMARK_SECONDS run by a background thread per worker after
+# load (0 skips the benchmark; latency is null until it finishes)
+FOOTPRINT_BENCHMARK_SECONDS = float(os.environ.get('FOOTPRINT_BENCHMARK_SECONDS', 2.0))
+model_footprint = None
+footprint_benchmark = None
+_footprint_lock = threading.Lock()
+
+# Batches of at least BATCH_DEDUP_MIN_ROWS rows score each distinct row once (0 disables)
+BATCH_DEDUP_MIN_ROWS = int(os.environ.get('BATCH_DEDUP_MIN_ROWS', 16))
+
+# Scoring runs on executor threads fed by an interactive and a bulk lane:
+# /predict and batches of at most INTERACTIVE_MAX_ROWS rows are interactive,
+# larger batches (or PRIORITY_HEADER: bulk) run as BULK_CHUNK_ROWS row chunks
+# that interactive work preempts between chunks
+PRIORITY_SCHEDULING = os.environ.get('PRIORITY_SCHEDULING', 'true').lower() == 'true'
+PRIORITY_HEADER = os.environ.get('PRIORITY_HEADER', 'X-Priority')
+INTERACTIVE_MAX_ROWS = int(os.environ.get('INTERACTIVE_MAX_ROWS', 32))
+BULK_CHUNK_ROWS = int(os.environ.get('BULK_CHUNK_ROWS', 1000))
+SCHEDULER_EXECUTORS = int(os.environ.get('SCHEDULER_EXECUTORS', 2))
+SCHEDULER_RESERVED_INTERACTIVE = int(os.environ.get('SCHEDULER_RESERVED_INTERACTIVE', 1))
+INTERACTIVE_QUEUE_LIMIT = int(os.environ.get('INTERACTIVE_QUEUE_LIMIT', 256))
+BULK_QUEUE_LIMIT = int(os.environ.get('BULK_QUEUE_LIMIT', 16))
+scheduler = None
+_scheduler_lock = threading.Lock()
+
+# Request spans (parse, validate, inference, serialize) exported per
+# TRACING_EXPORTER / TRACING_SAMPLE_RATE; see src/utils/tracing.py
+configure_tracing('heart-disease-api')
+
+
+def load_topology():
+    """Read the serving topology exported by src/api/launcher.py, if any"""
+    raw = os.environ.get('API_TOPOLOGY')
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError:
+        logger.warning("Ignoring malformed API_TOPOLOGY environment variable")
+        return None
+
+
+TOPOLOGY = load_topology()
+
+
+def record_trees_evaluated(counts):
+    """Export the number of trees evaluated per row"""
+    histogram = trees_evaluated.labels(model_version=MODEL_VERSION)
+    for count in counts:
+        histogram.observe(count)
+
+
+def record_cascade_stages(n_rows, n_escalated, linear_seconds, forest_seconds):
+    """Export cascade escalation counts and per-stage latency"""
+    cascade_rows.labels(stage='linear').inc(n_rows)
+    cascade_stage_latency.labels(stage='linear').observe(linear_seconds)
+    if n_escalated:
+        cascade_rows.labels(stage='forest').inc(n_escalated)
+        cascade_stage_latency.labels(stage='forest').observe(forest_seconds)
+
+
+def build_cascade():
+    """
+    Build the cascade engine from the trained linear and forest models
+
+    The uncertainty band comes from the training-time cascade metadata and
+    can be overridden with CASCADE_BAND_LOW/CASCADE_BAND_HIGH.
+    """
+    import pickle
+    with open(CASCADE_LINEAR_MODEL_PATH, 'rb') as f:
+        linear_model = pickle.load(f)
+    with open(CASCADE_FOREST_MODEL_PATH, 'rb') as f:
+        forest = pickle.load(f)
+
+    band = {}
+    if os.path.exists(CASCADE_CONFIG_PATH):
+        with open(CASCADE_CONFIG_PATH, 'r') as f:
+            band = json.load(f)
+    low = float(os.environ.get('CASCADE_BAND_LOW', band.get('low', 0.2)))
+    high = float(os.environ.get('CASCADE_BAND_HIGH', band.get('high', 0.8)))
+
+    logger.info(f"Using cascade inference engine (band=[{low}, {high}])")
+    return CascadeClassifier(linear_model, forest, low, high, on_score=record_cascade_stages)
+
+
+def build_inference_engine(loaded_model):
+    """Wrap the loaded model with the configured inference engine"""
+    if INFERENCE_ENGINE == 'cascade':
+        try:
+            return build_cascade()
+        except Exception as e:
+            logger.warning(f"Could not build cascade engine, falling back to sklearn: {str(e)}")
+    elif INFERENCE_ENGINE == 'compact':
+        try:
+            compact = CompactForest.from_sklearn(loaded_model, deduplicate=True)
+            report = size_report(loaded_model, compact)
+            logger.info(
+                f"Using compact inference engine: "
+                f"{report['n_nodes_before']} -> {report['n_nodes_after']} nodes, "
+                f"{report['bytes_per_node_before']:.1f} -> {report['bytes_per_node_after']:.1f} bytes/node, "
+                f"{report['total_bytes_before']} -> {report['total_bytes_after']} bytes"
+            )
+            return compact
+        except (AttributeError, ValueError) as e:
+            logger.warning(f"Could not build compact engine, falling back to sklearn: {str(e)}")
+    elif INFERENCE_ENGINE == 'early_exit':
+        if hasattr(loaded_model, 'estimators_') and len(getattr(loaded_model, 'classes_', [])) == 2:
+            logger.info(
+                f"Using early-exit inference engine "
+                f"(group_size={EARLY_EXIT_GROUP_SIZE}, guarantee={EARLY_EXIT_GUARANTEE})"
+            )
+            return EarlyExitForest(
+                loaded_model,
+                boundaries=RISK_LEVEL_BOUNDARIES + (DECISION_THRESHOLD,),
+                group_size=EARLY_EXIT_GROUP_SIZE,
+                guarantee=EARLY_EXIT_GUARANTEE,
+                confidence=EARLY_EXIT_CONFIDENCE,
+                on_evaluate=record_trees_evaluated
+            )
+        logger.warning("Early-exit engine requires a binary forest, falling back to sklearn")
+    return loaded_model
+
+
+def record_shard_batch(shard_seconds, wall_seconds):
+    """Export shard timings and pool utilization for one sharded batch"""
+    sharded_batches.inc()
+    for seconds in shard_seconds:
+        batch_shard_duration.observe(seconds)
+    if wall_seconds > 0:
+        utilization = sum(shard_seconds) / (wall_seconds * BATCH_SHARD_WORKERS)
+        batch_shard_pool_utilization.set(min(utilization, 1.0))
+
+
+def start_shard_pool():
+    """Fork the shard pool for the loaded model, if sharding is enabled"""
+    global sharded_scorer
+    if BATCH_SHARD_WORKERS < 1:
+        return
+    if sharded_scorer is not None:
+        sharded_scorer.close()
+    sharded_scorer = ShardedScorer(model, BATCH_SHARD_WORKERS, BATCH_SHARD_SIZE, on_batch=record_shard_batch)
+
+
+def prepare_explainer():
+    """Precompute contribution tables for the loaded model, if explanations are enabled"""
+    global explainer
+    explainer = None
+    if not EXPLANATIONS_ENABLED:
+        return
+    try:
+        explainer = ContributionExplainer(model, FEATURES)
+        logger.info(f"Explanations enabled ({explainer.method}, {explainer.units})")
+    except ValueError as e:
+        logger.warning(f"Explanations unavailable: {str(e)}")
+
+
+def calibration_rows(n_rows):
+    """Benchmark rows drawn around the training feature means, if the reference profile exists"""
+    if not DRIFT_REFERENCE_PROFILE or not os.path.exists(DRIFT_REFERENCE_PROFILE):
+        return None
+    profile = load_reference_profile(DRIFT_REFERENCE_PROFILE)['features']
+    mean = np.array([profile[f]['mean'] for f in FEATURES])
+    std = np.array([profile[f]['std'] for f in FEATURES])
+    return np.random.RandomState(0).randn(n_rows, len(FEATURES)) * std + mean
+
+
+def prepare_footprint():
+    """Measure the loaded model's size and structure, export them and start the latency benchmark"""
+    global model_footprint
+    try:
+        model_footprint = measure_footprint(model, budget_seconds=0)
+    except Exception as e:
+        # Reporting must never fail a model load
+        logger.warning(f"Could not measure the model footprint: {str(e)}")
+        model_footprint = None
+        return
+
+    for kind in ('serialized', 'memory'):
+        if model_footprint[f'{kind}_bytes'] is not None:
+            model_size_bytes.labels(model_version=MODEL_VERSION, kind=kind).set(model_footprint[f'{kind}_bytes'])
+    model_trees.labels(model_version=MODEL_VERSION).set(model_footprint['n_trees'])
+    model_nodes.labels(model_version=MODEL_VERSION).set(model_footprint['n_nodes'])
+    model_depth.labels(model_version=MODEL_VERSION, kind='max').set(model_footprint['max_depth'])
+    model_depth.labels(model_version=MODEL_VERSION, kind='total').set(model_footprint['total_depth'])
+    start_footprint_benchmark()
+
+
+def start_footprint_benchmark():
+    """Start this worker's latency benchmark of the loaded model, unless done, running or disabled"""
+    global footprint_benchmark
+    footprint = model_footprint
+    if FOOTPRINT_BENCHMARK_SECONDS <= 0 or footprint is None or footprint['latency'] is not None:
+        return
+    with _footprint_lock:
+        # One benchmark per loaded model and process (threads do not survive a fork)
+        if footprint_benchmark is not None and footprint_benchmark.pid == os.getpid() \
+                and footprint_benchmark.footprint is footprint:
+            return
+        footprint_benchmark = threading.Thread(
+            target=benchmark_footprint, args=(model, footprint), name='footprint-benchmark', daemon=True
+        )
+        footprint_benchmark.pid = os.getpid()
+        footprint_benchmark.footprint = footprint
+        footprint_benchmark.start()
+
+
+def benchmark_footprint(served, footprint):
+    """Fill in a footprint report's latency and export it if the model is still the loaded one"""
+    try:
+        rows = calibration_rows(max(LATENCY_BATCH_SIZES))
+    except (OSError, KeyError, ValueError) as e:
+        logger.warning(f"Ignoring reference profile for the latency benchmark: {str(e)}")
+        rows = None
+    try:
+        footprint['latency'] = measure_latency(served, rows, LATENCY_BATCH_SIZES, FOOTPRINT_BENCHMARK_SECONDS)
+    except Exception as e:
+        logger.warning(f"Could not benchmark the model latency: {str(e)}")
+        return
+    if footprint['latency'] is None or footprint is not model_footprint:
+        return
+    for batch in footprint['latency']['batches']:
+        model_expected_latency.labels(
+            model_version=MODEL_VERSION, batch_size=str(batch['batch_size'])
+        ).set(batch['seconds'])
+    logger.info(
+        "Expected model latency: " + ', '.join(
+            f"{batch['batch_size']} rows {batch['seconds'] * 1000:.2f}ms"
+            for batch in footprint['latency']['batches']
+        )
+    )
+
+
+def explanation_requested(data):
+    """Whether the request asks for per-feature contributions"""
+    value = request.args.get('explain', data.get('explain', False) if isinstance(data, dict) else False)
+    return value is True or str(value).lower() == 'true'
+
+
+def explanation_error(reason):
+    """400 response for explanation requests that cannot be served"""
+    error_counter.labels(error_type='explanation_unavailable').inc()
+    return jsonify({'error': 'Explanations not available', 'message': reason}), 400
+
+
+def get_explainer():
+    """
+    Return the explainer for the current request
+
+    Raises:
+        ValueError: With the reason if explanations cannot be served
+    """
+    if requested_model_name():
+        raise ValueError('Explanations are only available for the default model')
+    if explainer is None:
+        raise ValueError('Explanations are disabled or unsupported for the loaded model')
+    return explainer
+
+
+def start_drift_monitor(profile_path):
+    """Start collecting feature drift statistics against a reference profile"""
+    global drift_monitor
+    try:
+        monitor = FeatureDriftMonitor(load_reference_profile(profile_path), FEATURES)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Feature drift monitoring disabled: {str(e)}")
+        return False
+    if drift_monitor is not None:
+        registry.unregister(drift_monitor)
+    registry.register(monitor)
+    drift_monitor = monitor
+    logger.info(f"Feature drift monitoring against {profile_path}")
+    return True
+
+
+def score_proba(features):
+    """Class probabilities from the loaded model, sharding large batches"""
+    if sharded_scorer is not None and len(features) > BATCH_SHARD_THRESHOLD:
+        return sharded_scorer.predict_proba(features)
+    return model.predict_proba(features)
+
+
+def record_dedup(n_rows, n_unique):
+    """Export input and distinct rows of a batch checked for duplicates"""
+    batch_dedup_rows.labels(stage='input').inc(n_rows)
+    batch_dedup_rows.labels(stage='unique').inc(n_unique)
+    batch_dedup_ratio.observe(1 - n_unique / n_rows)
+
+
+PREDICTOR_OPTIONS = {'dedup_min_rows': BATCH_DEDUP_MIN_ROWS or None, 'on_dedup': record_dedup}
+
+
+def record_model_load(name, seconds, footprint_bytes):
+    """Export load time and model and pool footprints after a pooled model is loaded"""
+    pool_model_load_seconds.labels(model=name).observe(seconds)
+    pool_model_footprint_bytes.labels(model=name).set(footprint_bytes)
+    pool_resident_bytes.set(model_pool.resident_bytes)
+
+
+def record_model_eviction(name):
+    """Export an eviction from the model pool"""
+    pool_evictions.labels(model=name).inc()
+    try:
+        pool_model_footprint_bytes.remove(name)
+    except KeyError:
+        pass
+    pool_resident_bytes.set(model_pool.resident_bytes)
+
+
+model_pool = ModelPool(
+    MODEL_POOL_DIR,
+    int(MODEL_POOL_MEMORY_BUDGET_MB * 1024 * 1024),
+    on_load=record_model_load,
+    on_evict=record_model_eviction,
+    predictor_options=PREDICTOR_OPTIONS,
+    failure_ttl_seconds=MODEL_POOL_FAILURE_TTL_SECONDS,
+    allowed_models=MODEL_POOL_ALLOWED or None
+)
+
+
+def requested_model_name():
+    """Pooled model requested by path or routing header, None for the default model"""
+    if not has_request_context():
+        return None
+    return (request.view_args or {}).get('model_name') or request.headers.get(MODEL_ROUTING_HEADER)
+
+
+def get_predictor():
+    """
+    Return the Predictor serving the current request
+
+    Raises:
+        ModelUnavailableError: If a requested pooled model cannot be loaded
+    """
+    global predictor
+    name = requested_model_name()
+    if name:
+        return model_pool.get(name)
+    if predictor is None or predictor.model is not model:
+        predictor = Predictor(model, proba_fn=score_proba, **PREDICTOR_OPTIONS)
+    return predictor
+
+
+def get_sharded_predictor():
+    """Return the Predictor scoring the loaded model in the shard pool"""
+    global sharded_predictor
+    if sharded_predictor is None or sharded_predictor.model is not model \
+            or sharded_predictor.proba_fn != sharded_scorer.predict_proba:
+        sharded_predictor = Predictor(model, proba_fn=sharded_scorer.predict_proba, **PREDICTOR_OPTIONS)
+    return sharded_predictor
+
+
+def record_shadow_batch(agree, deltas, seconds):
+    """Export agreement, probability deltas and latency for one shadow batch"""
+    n_agree = int(agree.sum())
+    if n_agree:
+        shadow_predictions.labels(outcome='agree').inc(n_agree)
+    if len(agree) - n_agree:
+        shadow_predictions.labels(outcome='disagree').inc(len(agree) - n_agree)
+    for delta in deltas:
+        shadow_probability_delta.observe(delta)
+    shadow_latency.observe(seconds)
+    if shadow_evaluator is not None and shadow_evaluator.agreement_rate is not None:
+        shadow_agreement.set(shadow_evaluator.agreement_rate)
+
+
+def load_shadow_model(model_path):
+    """Load the shadow model from a pickle file or an MLflow model URI"""
+    global shadow_model
+    try:
+        if model_path.startswith(('models:/', 'runs:/')):
+            import mlflow.sklearn
+            shadow_model = mlflow.sklearn.load_model(model_path)
+        else:
+            import pickle
+            with open(model_path, 'rb') as f:
+                shadow_model = pickle.load(f)
+        logger.info(f"Shadow model loaded from {model_path}")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to load shadow model from {model_path}: {e}")
+        shadow_model = None
+        return False
+
+
+def get_shadow_evaluator():
+    """Return this worker's shadow evaluator, started on first use after fork"""
+    global shadow_evaluator
+    with _shadow_lock:
+        if shadow_evaluator is None or shadow_evaluator.pid != os.getpid():
+            shadow_evaluator = ShadowEvaluator(
+                shadow_model,
+                max_queue=SHADOW_QUEUE_SIZE,
+                max_batch_rows=SHADOW_BATCH_ROWS,
+                on_batch=record_shadow_batch,
+                on_drop=shadow_dropped.inc
+            )
+        return shadow_evaluator
+
+
+def record_scheduler_start(priority, wait_seconds):
+    """Export how long a scheduled job waited in its lane"""
+    scheduler_queue_wait.labels(priority=priority).observe(wait_seconds)
+
+
+def record_scheduler_chunk(priority, n_rows, seconds):
+    """Export rows and scoring time of one scheduled chunk"""
+    scheduler_rows.labels(priority=priority).inc(n_rows)
+    scheduler_chunk_duration.labels(priority=priority).observe(seconds)
+
+
+def get_scheduler():
+    """Return this worker's priority scheduler, started on first use after fork"""
+    global scheduler
+    with _scheduler_lock:
+        if scheduler is None or scheduler.pid != os.getpid():
+            scheduler = PriorityScheduler(
+                n_executors=SCHEDULER_EXECUTORS,
+                reserved_interactive=SCHEDULER_RESERVED_INTERACTIVE,
+                bulk_chunk_rows=BULK_CHUNK_ROWS,
+                max_queued={'interactive': INTERACTIVE_QUEUE_LIMIT, 'bulk': BULK_QUEUE_LIMIT},
+                on_start=record_scheduler_start,
+                on_chunk=record_scheduler_chunk
+            )
+        return scheduler
+
+
+def request_priority(n_rows):
+    """Priority class of the current request; clients may only ask for 'bulk'"""
+    if n_rows > INTERACTIVE_MAX_ROWS:
+        return 'bulk'
+    if has_request_context() and request.headers.get(PRIORITY_HEADER, '').lower() == 'bulk':
+        return 'bulk'
+    return 'interactive'
+
+
+def run_scheduled(score_fn, features):
+    """
+    Run score_fn on the features in the current request's priority lane
+
+    Raises:
+        LaneFullError: If the lane is full
+    """
+    if not PRIORITY_SCHEDULING:
+        return score_fn(features)
+    priority = request_priority(len(features))
+    try:
+        return get_scheduler().run(priority, score_fn, features)
+    except LaneFullError:
+        scheduler_rejected.labels(priority=priority).inc()
+        raise
+
+
+def lane_full_response(e):
+    """429 response for work rejected by a full priority lane"""
+    error_counter.labels(error_type='lane_full').inc()
+    response = jsonify({'error': 'Too many requests', 'message': str(e), 'priority': e.priority})
+    response.headers['Retry-After'] = '1'
+    return response, 429
+
+
+def score(features, active_predictor=None, counts=False):
+    """
+    Score a feature matrix with the model serving the current request
+
+    Returns:
+        Tuple of (predicted labels, class probabilities), plus the trees an
+        early-exit engine evaluated per row with counts=True
+    """
+    name = requested_model_name()
+    active_predictor = active_predictor or (model_pool.get(name) if name else get_predictor())
+    if drift_monitor is not None:
+        drift_monitor.update(features)
+
+    # Deduplicate before scheduling so repeats in different bulk chunks are scored once
+    unique = active_predictor.deduplicate(features)
+    rows = len(features if unique is None else unique[0])
+    if active_predictor is predictor and sharded_scorer is not None and rows > BATCH_SHARD_THRESHOLD:
+        # Sharded per bulk chunk, so interactive work still preempts the batch
+        active_predictor = get_sharded_predictor()
+    start = time.perf_counter()
+    with span('inference.model', rows=len(features), unique_rows=rows):
+        scored = run_scheduled(
+            partial(active_predictor.score, dedup=False, counts=counts), features if unique is None else unique[0]
+        )
+    if name:
+        pool_model_latency.labels(model=name).observe(time.perf_counter() - start)
+    if unique is not None:
+        scored = tuple(values[unique[1]] for values in scored)
+    predictions, prediction_proba = scored[:2]
+
+    if not name and shadow_model is not None:
+        get_shadow_evaluator().submit(features, prediction_proba)
+    if PREDICTION_LOG_DIR:
+        get_prediction_log().record(
+            features, prediction_proba[:, 1], predictions, name or f"default@{MODEL_VERSION}"
+        )
+    return scored
+
 
 def load_model(model_path='models/best_model.pkl'):
     """Load the trained model from disk"""
@@ -76,12 +900,15 @@ def load_model(model_path='models/best_model.pkl'):
     try:
         import pickle
         with open(model_path, 'rb') as f:
-            model = pickle.load(f)
+            model = build_inference_engine(pickle.load(f))
         logger.info(f"Model loaded successfully from {model_path}")
         model_info.labels(
             model_version=MODEL_VERSION,
             model_type=MODEL_TYPE
         ).set(1)
+        start_shard_pool()
+        prepare_explainer()
+        prepare_footprint()
         return True
     except FileNotFoundError:
         logger.error(f"Model file not found at {model_path}")
@@ -97,12 +924,15 @@ def load_model(model_path='models/best_model.pkl'):
             try:
                 import pickle
                 with open(alt_path, 'rb') as f:
-                    model = pickle.load(f)
+                    model = build_inference_engine(pickle.load(f))
                 logger.info(f"Model loaded successfully from {alt_path}")
                 model_info.labels(
                     model_version=MODEL_VERSION,
                     model_type=MODEL_TYPE
                 ).set(1)
+                start_shard_pool()
+                prepare_explainer()
+                prepare_footprint()
                 return True
             except:
                 continue
@@ -121,11 +951,72 @@ def load_model(model_path='models/best_model.pkl'):
         return False
 
 
+def get_traffic_recorder():
+    """Return this worker's traffic recorder, started on first use after fork"""
+    global traffic_recorder
+    with _traffic_recorder_lock:
+        if traffic_recorder is None or traffic_recorder.pid != os.getpid():
+            os.makedirs(TRAFFIC_CAPTURE_DIR, exist_ok=True)
+            path = os.path.join(TRAFFIC_CAPTURE_DIR, f"capture-{os.getpid()}.bin.gz")
+            traffic_recorder = TrafficRecorder(path, max_bytes=TRAFFIC_CAPTURE_MAX_BYTES)
+            logger.info(f"Capturing {TRAFFIC_CAPTURE_SAMPLE_RATE:.2%} of prediction traffic to {path}")
+        return traffic_recorder
+
+
+def record_prediction_log_flush(n_rows, seconds, fill_ratio):
+    """Export one prediction log flush"""
+    prediction_log_rows.labels(outcome='written').inc(n_rows)
+    prediction_log_flush_duration.observe(seconds)
+    prediction_log_buffer_fill.set(fill_ratio)
+
+
+def get_prediction_log():
+    """Return this worker's prediction log, started on first use after fork"""
+    global prediction_log
+    with _prediction_log_lock:
+        if prediction_log is None or prediction_log.pid != os.getpid():
+            prediction_log = PredictionLog(
+                PREDICTION_LOG_DIR,
+                FEATURES,
+                capacity=PREDICTION_LOG_CAPACITY,
+                flush_interval=PREDICTION_LOG_FLUSH_INTERVAL_MS / 1000,
+                segment_bytes=int(PREDICTION_LOG_SEGMENT_MB * 1024 * 1024),
+                fsync=PREDICTION_LOG_FSYNC,
+                on_flush=record_prediction_log_flush,
+                on_drop=prediction_log_rows.labels(outcome='dropped').inc
+            )
+            logger.info(f"Logging predictions to {PREDICTION_LOG_DIR}")
+        return prediction_log
+
+
+def capture_request():
+    """Hand a sampled prediction request to the traffic recorder"""
+    if request.endpoint not in ('predict', 'batch_predict') or random.random() >= TRAFFIC_CAPTURE_SAMPLE_RATE:
+        return
+    query = request.query_string.decode('latin-1')
+    headers = {
+        name: request.headers[name] for name in (MODEL_ROUTING_HEADER, PRIORITY_HEADER) if name in request.headers
+    }
+    queued = get_traffic_recorder().record(
+        request.path + (f"?{query}" if query else ''), request.get_data(cache=True), request.start_time, headers
+    )
+    traffic_capture_records.labels(outcome='queued' if queued else 'dropped').inc()
+
+
 @app.before_request
 def before_request():
     """Track active requests and log incoming requests"""
     active_requests.inc()
     request.start_time = time.time()
+    request.trace_span = get_tracer().start_span(
+        f"{request.method} {request.url_rule.rule if request.url_rule else request.path}",
+        {'http.method': request.method, 'http.target': request.path},
+        traceparent=request.headers.get('traceparent')
+    )
+    request.trace_token = get_tracer().activate(request.trace_span)
+
+    if TRAFFIC_CAPTURE_DIR:
+        capture_request()
 
     # Log incoming request
     logger.info(
@@ -152,9 +1043,28 @@ def after_request(response):
             f"Size: {response.content_length or 0} bytes"
         )
 
+    trace_span = getattr(request, 'trace_span', None)
+    if trace_span is not None:
+        trace_span.set_attribute('http.status_code', response.status_code)
+        if response.status_code >= 500:
+            trace_span.status = 'error'
+        if trace_span.sampled:
+            response.headers['traceresponse'] = trace_span.traceparent
+
     return response
 
 
+@app.teardown_request
+def teardown_request(error=None):
+    """End the request span"""
+    trace_span = getattr(request, 'trace_span', None)
+    if trace_span is not None:
+        if error is not None:
+            trace_span.record_exception(error)
+        get_tracer().deactivate(request.trace_token)
+        trace_span.end()
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -171,7 +1081,8 @@ def health_check():
 
 
 @app.route('/predict', methods=['POST'])
-def predict():
+@app.route('/models/<model_name>/predict', methods=['POST'])
+def predict(model_name=None):
     """
     Prediction endpoint for heart disease risk
     
@@ -191,12 +1102,15 @@ def predict():
         "ca": int (0-4),
         "thal": int (0-3)
     }
+    
+    With "explain": true (or ?explain=true) the response adds per-feature
+    contributions when EXPLANATIONS_ENABLED is set.
     """
     start_time = time.time()
     
     try:
         # Check if model is loaded
-        if model is None:
+        if model is None and not requested_model_name():
             error_counter.labels(error_type='model_not_loaded').inc()
             return jsonify({
                 'error': 'Model not loaded',
@@ -211,32 +1125,43 @@ def predict():
                 'message': 'Content-Type must be application/json'
             }), 400
         
-        data = request.get_json()
+        with span('api.parse', content_length=request.content_length or 0):
+            data = request.get_json()
         
-        # Expected features
-        required_features = [
-            'age', 'sex', 'cp', 'trestbps', 'chol', 'fbs',
-            'restecg', 'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal'
-        ]
+        try:
+            active_predictor = get_predictor()
+        except ModelUnavailableError as e:
+            error_counter.labels(error_type='model_unavailable').inc()
+            return jsonify({'error': 'Model not available', 'message': str(e)}), e.status_code
         
-        # Validate required features
-        missing_features = [f for f in required_features if f not in data]
-        if missing_features:
+        # Validate required features and extract them in model order
+        try:
+            with span('api.validate'):
+                features = active_predictor.sample_matrix(data)
+        except MissingFeaturesError as e:
             error_counter.labels(error_type='missing_features').inc()
             return jsonify({
                 'error': 'Missing required features',
-                'missing_features': missing_features
+                'missing_features': e.missing_features
             }), 400
         
+        explain = explanation_requested(data)
+        if explain:
+            try:
+                active_explainer = get_explainer()
+            except ValueError as e:
+                return explanation_error(str(e))
+        
         # Log input features
         logger.info(f"Prediction request received with features: age={data.get('age')}, sex={data.get('sex')}, cp={data.get('cp')}")
 
-        # Extract features in correct order
-        features = np.array([[data[f] for f in required_features]])
-        
-        # Make prediction
-        prediction = model.predict(features)[0]
-        prediction_proba = model.predict_proba(features)[0]
+        # Make prediction; early-exit explanations need the trees each row used
+        counts = explain and active_explainer.needs_counts
+        with span('api.inference', rows=1):
+            scored = score(features, active_predictor, counts)
+        predictions, prediction_probas = scored[:2]
+        prediction = predictions[0]
+        prediction_proba = prediction_probas[0]
         
         # Record metrics
         prediction_result = 'positive' if prediction == 1 else 'negative'
@@ -248,19 +1173,22 @@ def predict():
         elapsed_time = time.time() - start_time
         prediction_latency.labels(model_version=MODEL_VERSION).observe(elapsed_time)
         
+        if explain:
+            with span('api.explain', rows=1):
+                explanation = active_explainer.as_rows(*active_explainer.explain(features, *scored[2:]))[0]
+        
         # Prepare response
-        response = {
-            'prediction': int(prediction),
-            'prediction_label': 'Heart Disease' if prediction == 1 else 'No Heart Disease',
-            'confidence': {
-                'no_disease': float(prediction_proba[0]),
-                'disease': float(prediction_proba[1])
-            },
-            'risk_level': get_risk_level(float(prediction_proba[1])),
-            'model_version': MODEL_VERSION,
-            'timestamp': datetime.utcnow().isoformat(),
-            'processing_time_ms': round(elapsed_time * 1000, 2)
-        }
+        with span('api.serialize'):
+            response = format_prediction(prediction, prediction_proba)
+            response.update({
+                'model_name': requested_model_name() or 'default',
+                'model_version': MODEL_VERSION,
+                'timestamp': datetime.utcnow().isoformat(),
+                'processing_time_ms': round(elapsed_time * 1000, 2)
+            })
+            if explain:
+                response['explanation'] = explanation
+            body = jsonify(response)
         
         # Detailed logging
         logger.info(
@@ -270,7 +1198,10 @@ def predict():
             f"processing_time={elapsed_time*1000:.2f}ms"
         )
 
-        return jsonify(response), 200
+        return body, 200
+        
+    except LaneFullError as e:
+        return lane_full_response(e)
         
     except ValueError as e:
         error_counter.labels(error_type='value_error').inc()
@@ -290,11 +1221,12 @@ def predict():
 
 
 @app.route('/batch_predict', methods=['POST'])
-def batch_predict():
+@app.route('/models/<model_name>/batch_predict', methods=['POST'])
+def batch_predict(model_name=None):
     """
     Batch prediction endpoint for multiple samples
     
-    Expected JSON payload:
+    Expected JSON payload (rows):
     {
         "samples": [
             {feature_dict_1},
@@ -302,11 +1234,22 @@ def batch_predict():
             ...
         ]
     }
+    
+    or (columnar):
+    {
+        "columns": {"age": [...], "sex": [...], ...}
+    }
+    
+    Optional "format" ("rows" or "columnar") and "fields" (subset of
+    prediction, prediction_label, confidence, risk_level) may be given in
+    the body or as query parameters. The response format defaults to the
+    request format. Large responses are gzip/zstd compressed according to
+    Accept-Encoding. "explain": true adds per-feature contributions.
     """
     start_time = time.time()
     
     try:
-        if model is None:
+        if model is None and not requested_model_name():
             error_counter.labels(error_type='model_not_loaded').inc()
             return jsonify({
                 'error': 'Model not loaded',
@@ -320,77 +1263,129 @@ def batch_predict():
                 'message': 'Content-Type must be application/json'
             }), 400
         
-        data = request.get_json()
+        with span('api.parse', content_length=request.content_length or 0):
+            data = request.get_json()
         
-        if 'samples' not in data or not isinstance(data['samples'], list):
+        try:
+            active_predictor = get_predictor()
+        except ModelUnavailableError as e:
+            error_counter.labels(error_type='model_unavailable').inc()
+            return jsonify({'error': 'Model not available', 'message': str(e)}), e.status_code
+        
+        try:
+            if not isinstance(data, dict):
+                raise BatchFormatError('Request must contain "samples" array or "columns" object')
+            fields = parse_fields(request.args.get('fields', data.get('fields')))
+            columnar_request = 'columns' in data
+            response_format = request.args.get('format', data.get('format', 'columnar' if columnar_request else 'rows'))
+            if response_format not in BATCH_FORMATS:
+                raise BatchFormatError(f"format must be one of {list(BATCH_FORMATS)}, got {response_format!r}")
+            
+            if columnar_request:
+                with span('api.validate', format='columnar'):
+                    valid_rows, valid_indices, errors = columns_to_matrix(data['columns'], FEATURES)
+                n_samples = len(valid_indices) + len(errors)
+            elif isinstance(data.get('samples'), list):
+                samples = data['samples']
+                n_samples = len(samples)
+            else:
+                raise BatchFormatError('Request must contain "samples" array or "columns" object')
+        except BatchFormatError as e:
             error_counter.labels(error_type='invalid_batch_format').inc()
             return jsonify({
                 'error': 'Invalid batch format',
-                'message': 'Request must contain "samples" array'
+                'message': str(e)
             }), 400
         
-        samples = data['samples']
-        if len(samples) == 0:
+        explain = explanation_requested(data)
+        if explain:
+            try:
+                active_explainer = get_explainer()
+            except ValueError as e:
+                return explanation_error(str(e))
+        
+        if n_samples == 0:
             return jsonify({
                 'error': 'Empty batch',
                 'message': 'No samples provided'
             }), 400
         
-        required_features = [
-            'age', 'sex', 'cp', 'trestbps', 'chol', 'fbs',
-            'restecg', 'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal'
-        ]
+        if not columnar_request:
+            # Validate every sample, then score all valid rows in one call
+            with span('api.validate', format='rows'):
+                valid_rows, valid_indices, errors = active_predictor.samples_matrix(samples)
         
-        predictions = []
-        for idx, sample in enumerate(samples):
-            missing_features = [f for f in required_features if f not in sample]
-            if missing_features:
-                predictions.append({
-                    'sample_index': idx,
-                    'error': 'Missing features',
-                    'missing_features': missing_features
-                })
-                continue
+        counts = explain and active_explainer.needs_counts
+        evaluated = np.empty(0, dtype=int)
+        if len(valid_rows):
+            with span('api.inference', rows=len(valid_rows)):
+                scored = score(valid_rows, active_predictor, counts)
+            labels, probas = scored[:2]
+            if counts:
+                evaluated = scored[2]
             
-            try:
-                features = np.array([[sample[f] for f in required_features]])
-                prediction = model.predict(features)[0]
-                prediction_proba = model.predict_proba(features)[0]
-                
-                prediction_result = 'positive' if prediction == 1 else 'negative'
-                prediction_counter.labels(
-                    model_version=MODEL_VERSION,
-                    prediction_result=prediction_result
-                ).inc()
-                
-                predictions.append({
-                    'sample_index': idx,
-                    'prediction': int(prediction),
-                    'prediction_label': 'Heart Disease' if prediction == 1 else 'No Heart Disease',
-                    'confidence': {
-                        'no_disease': float(prediction_proba[0]),
-                        'disease': float(prediction_proba[1])
-                    },
-                    'risk_level': get_risk_level(float(prediction_proba[1]))
-                })
-            except Exception as e:
-                predictions.append({
-                    'sample_index': idx,
-                    'error': str(e)
-                })
+            positives = int(np.sum(labels == 1))
+            for prediction_result, count in (('positive', positives), ('negative', len(labels) - positives)):
+                if count:
+                    prediction_counter.labels(
+                        model_version=MODEL_VERSION,
+                        prediction_result=prediction_result
+                    ).inc(count)
+        else:
+            labels, probas = np.empty(0, dtype=int), np.empty((0, 2))
         
-        elapsed_time = time.time() - start_time
+        if explain:
+            with span('api.explain', rows=len(valid_rows)):
+                base_values, contributions = active_explainer.explain(valid_rows, evaluated if counts else None)
         
-        response = {
-            'predictions': predictions,
-            'total_samples': len(samples),
-            'successful_predictions': sum(1 for p in predictions if 'prediction' in p),
-            'model_version': MODEL_VERSION,
-            'timestamp': datetime.utcnow().isoformat(),
-            'processing_time_ms': round(elapsed_time * 1000, 2)
-        }
+        with span('api.serialize', format=response_format) as serialize_span:
+            if response_format == 'columnar':
+                response = build_columnar_predictions(
+                    valid_indices, labels, probas, errors, RISK_LEVEL_BOUNDARIES, fields
+                )
+            else:
+                response = {
+                    'predictions': build_row_predictions(
+                        n_samples, valid_indices, labels, probas, errors, RISK_LEVEL_BOUNDARIES, fields
+                    )
+                }
+            
+            if explain:
+                if response_format == 'columnar':
+                    response['explanations'] = active_explainer.as_columns(base_values, contributions)
+                else:
+                    for idx, explanation in zip(valid_indices, active_explainer.as_rows(base_values, contributions)):
+                        response['predictions'][idx]['explanation'] = explanation
+            
+            elapsed_time = time.time() - start_time
+            
+            response.update({
+                'format': response_format,
+                'total_samples': n_samples,
+                'successful_predictions': len(labels),
+                'model_name': requested_model_name() or 'default',
+                'model_version': MODEL_VERSION,
+                'timestamp': datetime.utcnow().isoformat(),
+                'processing_time_ms': round(elapsed_time * 1000, 2)
+            })
+            
+            encoding = negotiate_encoding(request.headers.get('Accept-Encoding'))
+            if encoding is not None and n_samples >= RESPONSE_COMPRESSION_MIN_SAMPLES:
+                # Compressed bodies are encoded while streaming, after this span
+                serialize_span.set_attribute('encoding', encoding)
+                return Response(
+                    stream_json(response, encoding),
+                    status=200,
+                    mimetype='application/json',
+                    headers={'Content-Encoding': encoding, 'Vary': 'Accept-Encoding'}
+                )
+            
+            body = jsonify(response)
+        
+        return body, 200
         
-        return jsonify(response), 200
+    except LaneFullError as e:
+        return lane_full_response(e)
         
     except Exception as e:
         error_counter.labels(error_type='batch_prediction_error').inc()
@@ -401,29 +1396,18 @@ def batch_predict():
         }), 500
 
 
-def get_risk_level(disease_probability):
-    """Categorize risk level based on disease probability"""
-    if disease_probability < 0.3:
-        return 'Low'
-    elif disease_probability < 0.6:
-        return 'Medium'
-    elif disease_probability < 0.8:
-        return 'High'
-    else:
-        return 'Very High'
-
-
 @app.route('/model/info', methods=['GET'])
 def model_info_endpoint():
     """Get information about the loaded model"""
+    # Workers forked after load benchmark their own copy of the model
+    start_footprint_benchmark()
     info = {
         'model_version': MODEL_VERSION,
         'model_type': MODEL_TYPE,
         'model_loaded': model is not None,
-        'features': [
-            'age', 'sex', 'cp', 'trestbps', 'chol', 'fbs',
-            'restecg', 'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal'
-        ],
+        'inference_engine': getattr(model, 'engine_name', 'sklearn'),
+        'batch_formats': list(BATCH_FORMATS),
+        'features': FEATURES,
         'feature_descriptions': {
             'age': 'Age in years',
             'sex': 'Sex (1 = male, 0 = female)',
@@ -438,8 +1422,33 @@ def model_info_endpoint():
             'slope': 'Slope of the peak exercise ST segment (0-2)',
             'ca': 'Number of major vessels colored by fluoroscopy (0-4)',
             'thal': 'Thalassemia (0-3)'
+        },
+        'topology': TOPOLOGY,
+        'model_pool': model_pool.describe(),
+        'explanations': explainer.describe() if explainer is not None else None,
+        'footprint': model_footprint,
+        'scheduling': {
+            'enabled': PRIORITY_SCHEDULING,
+            'interactive_max_rows': INTERACTIVE_MAX_ROWS,
+            'bulk_chunk_rows': scheduler.bulk_chunk_rows
+            if scheduler is not None and scheduler.pid == os.getpid() else BULK_CHUNK_ROWS,
+            'queue_depth': {
+                priority: scheduler.queue_depth(priority)
+                if scheduler is not None and scheduler.pid == os.getpid() else 0
+                for priority in PRIORITIES
+            },
         }
     }
+    if shadow_model is not None:
+        evaluator = shadow_evaluator if shadow_evaluator is not None and shadow_evaluator.pid == os.getpid() else None
+        info['shadow'] = {
+            'model_path': SHADOW_MODEL_PATH,
+            'model_type': type(shadow_model).__name__,
+            'scored_rows': evaluator.scored_rows if evaluator else 0,
+            'dropped_rows': evaluator.dropped_rows if evaluator else 0,
+            'queue_depth': evaluator.queue_depth if evaluator else 0,
+            'agreement_rate': evaluator.agreement_rate if evaluator else None,
+        }
     return jsonify(info), 200
 
 
@@ -454,11 +1463,69 @@ app.wsgi_app = DispatcherMiddleware(app.wsgi_app, {
 logger.info("Loading model at application startup...")
 load_model()
 logger.info(f"Model loading complete. Model loaded: {model is not None}")
+if SHADOW_MODEL_PATH:
+    load_shadow_model(SHADOW_MODEL_PATH)
+if DRIFT_REFERENCE_PROFILE:
+    start_drift_monitor(DRIFT_REFERENCE_PROFILE)
 
 
-if __name__ == '__main__':
-    import os
+@app.route('/debug/profile', methods=['GET', 'POST'])
+def debug_profile():
+    """
+    Sample the stacks of this worker's threads for a while
+    
+    Requires "Authorization: Bearer $DEBUG_PROFILE_TOKEN". Only one profile
+    runs per worker at a time; concurrent requests get 409.
+    
+    Query parameters:
+        seconds: Profiling duration (default 10, at most PROFILE_MAX_SECONDS)
+        interval_ms: Sampling interval in milliseconds (default 10)
+        top: Number of functions in the summary (default 20)
+        format: "json" (summary and collapsed stacks) or "collapsed"
+            (flamegraph-compatible text file)
+        idle: "true" to keep threads blocked in a wait (idle executors,
+            background writers, server threads) in the stacks (default false)
+    """
+    if not DEBUG_PROFILE_TOKEN:
+        return jsonify({'error': 'Not found'}), 404
+    
+    supplied = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(supplied.encode(), f"Bearer {DEBUG_PROFILE_TOKEN}".encode()):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        seconds = float(request.args.get('seconds', 10))
+        interval_ms = float(request.args.get('interval_ms', 10))
+        top = int(request.args.get('top', 20))
+    except ValueError as e:
+        return jsonify({'error': 'Invalid profile parameters', 'message': str(e)}), 400
+    output_format = request.args.get('format', 'json')
+    include_idle = request.args.get('idle', 'false').lower() == 'true'
+    if not 0 < seconds <= PROFILE_MAX_SECONDS or interval_ms < PROFILE_MIN_INTERVAL_MS or output_format not in ('json', 'collapsed'):
+        return jsonify({
+            'error': 'Invalid profile parameters',
+            'message': f"Require 0 < seconds <= {PROFILE_MAX_SECONDS}, interval_ms >= {PROFILE_MIN_INTERVAL_MS} "
+                       "and format in (json, collapsed)"
+        }), 400
+    
+    logger.info(f"Profiling worker {os.getpid()} for {seconds}s at {interval_ms}ms intervals")
+    try:
+        result = run_profile(seconds, interval_ms / 1000.0, top, include_idle=include_idle)
+    except ProfilerBusyError as e:
+        return jsonify({'error': 'Profile in progress', 'message': str(e)}), 409
+    
+    if output_format == 'collapsed':
+        return Response(
+            result['collapsed'],
+            mimetype='text/plain',
+            headers={'Content-Disposition': f"attachment; filename=profile-{os.getpid()}.folded"}
+        )
+    
+    result['pid'] = os.getpid()
+    return jsonify(result), 200
 
+
+if __name__ == '__main__':
     # Get port from environment variable or default to 8000
     port = int(os.environ.get('PORT', 8000))
 
@@ -0,0 +1,247 @@
+"""
+Batch request/response formats and negotiated response compression
+
+Two batch layouts are supported:
+- 'rows' (default): a list of per-sample dictionaries, as before.
+- 'columnar': one array per feature in the request and one array per output
+  field in the response, so keys are written once per batch instead of once
+  per sample.
+
+A `fields` selector drops unneeded output fields in either layout. Large
+responses are JSON-encoded incrementally and compressed chunk by chunk with
+gzip or, when the optional `zstandard` package is installed and the client
+accepts it, zstd.
+"""
+
+import json
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.models.predict import risk_levels
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+BATCH_FORMATS = ('rows', 'columnar')
+
+# Selectable output fields; sample_index is always returned
+OUTPUT_FIELDS = ('prediction', 'prediction_label', 'confidence', 'risk_level')
+
+PREDICTION_LABELS = np.array(['No Heart Disease', 'Heart Disease'], dtype=object)
+
+# Uncompressed bytes buffered before each compressor call
+STREAM_CHUNK_BYTES = 64 * 1024
+
+# Fast levels: responses are compressed on the request path
+GZIP_LEVEL = 1
+ZSTD_LEVEL = 3
+
+
+class BatchFormatError(ValueError):
+    """Raised for malformed batch payloads or options."""
+
+
+def parse_fields(fields) -> Tuple[str, ...]:
+    """
+    Parse a `fields` selector given as a comma-separated string or a list.
+
+    Returns:
+        Selected output fields in canonical order (all fields if None)
+    """
+    if fields is None:
+        return OUTPUT_FIELDS
+    if isinstance(fields, str):
+        fields = [f.strip() for f in fields.split(',') if f.strip()]
+    unknown = sorted(set(fields) - set(OUTPUT_FIELDS))
+    if unknown:
+        raise BatchFormatError(f"Unknown output fields {unknown}; expected a subset of {list(OUTPUT_FIELDS)}")
+    return tuple(f for f in OUTPUT_FIELDS if f in fields)
+
+
+def columns_to_matrix(columns: Dict[str, list], features: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, Dict[int, dict]]:
+    """
+    Convert a columnar batch into a feature matrix.
+
+    Args:
+        columns: Mapping of feature name to a list of values
+        features: Required features in model order
+
+    Returns:
+        Tuple of (matrix of valid rows, indices of valid rows,
+        per-row errors keyed by sample index)
+    """
+    if not isinstance(columns, dict):
+        raise BatchFormatError('"columns" must map feature names to arrays')
+    missing = [f for f in features if f not in columns]
+    if missing:
+        raise BatchFormatError(f"Missing feature columns: {missing}")
+    lengths = {len(columns[f]) for f in features if isinstance(columns[f], list)}
+    if len(lengths) != 1 or not all(isinstance(columns[f], list) for f in features):
+        raise BatchFormatError("Feature columns must be arrays of equal length")
+    n_rows = lengths.pop()
+
+    X = np.empty((n_rows, len(features)), dtype=np.float64)
+    valid = np.ones(n_rows, dtype=bool)
+    errors = {}
+    for j, feature in enumerate(features):
+        try:
+            X[:, j] = np.asarray(columns[feature], dtype=np.float64)
+            # null converts to NaN without an error; recheck those values one by one
+            check = np.flatnonzero(np.isnan(X[:, j]))
+        except (TypeError, ValueError):
+            check = range(n_rows)
+        # Per-value conversion reports the offending rows like the rows format
+        for i in check:
+            value = columns[feature][i]
+            try:
+                X[i, j] = float(value)
+                if np.isnan(X[i, j]):
+                    raise ValueError(f"{feature} must be a number, got NaN")
+            except (TypeError, ValueError) as e:
+                valid[i] = False
+                errors.setdefault(int(i), {'sample_index': int(i), 'error': str(e)})
+
+    indices = np.flatnonzero(valid)
+    return X[indices], indices, errors
+
+
+def build_row_predictions(
+    n_samples: int,
+    indices: Sequence[int],
+    labels: np.ndarray,
+    probas: np.ndarray,
+    errors: Dict[int, dict],
+    boundaries: Sequence[float],
+    fields: Sequence[str] = OUTPUT_FIELDS
+) -> List[dict]:
+    """Build the row-of-dicts prediction list, errors in place."""
+    predictions = [None] * n_samples
+    for idx, error in errors.items():
+        predictions[idx] = error
+
+    labels_int = np.asarray(labels).astype(int).tolist()
+    no_disease = probas[:, 0].tolist()
+    disease = probas[:, 1].tolist()
+    levels = risk_levels(probas[:, 1], boundaries).tolist() if 'risk_level' in fields else None
+    for k, idx in enumerate(np.asarray(indices).tolist()):
+        prediction = {'sample_index': idx}
+        if 'prediction' in fields:
+            prediction['prediction'] = labels_int[k]
+        if 'prediction_label' in fields:
+            prediction['prediction_label'] = 'Heart Disease' if labels_int[k] == 1 else 'No Heart Disease'
+        if 'confidence' in fields:
+            prediction['confidence'] = {'no_disease': no_disease[k], 'disease': disease[k]}
+        if levels is not None:
+            prediction['risk_level'] = levels[k]
+        predictions[idx] = prediction
+    return predictions
+
+
+def build_columnar_predictions(
+    indices: Sequence[int],
+    labels: np.ndarray,
+    probas: np.ndarray,
+    errors: Dict[int, dict],
+    boundaries: Sequence[float],
+    fields: Sequence[str] = OUTPUT_FIELDS
+) -> Dict[str, object]:
+    """Build columnar predictions for successful rows plus a list of row errors."""
+    labels_int = np.asarray(labels).astype(int)
+    columns = {'sample_index': np.asarray(indices).tolist()}
+    if 'prediction' in fields:
+        columns['prediction'] = labels_int.tolist()
+    if 'prediction_label' in fields:
+        columns['prediction_label'] = PREDICTION_LABELS[(labels_int == 1).astype(int)].tolist()
+    if 'confidence' in fields:
+        columns['confidence_no_disease'] = probas[:, 0].tolist()
+        columns['confidence_disease'] = probas[:, 1].tolist()
+    if 'risk_level' in fields:
+        columns['risk_level'] = risk_levels(probas[:, 1], boundaries).tolist()
+    return {
+        'columns': columns,
+        'errors': [errors[idx] for idx in sorted(errors)],
+    }
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick a response encoding from an Accept-Encoding header.
+
+    Prefers zstd (when available) over gzip, honours q-values and ignores
+    codings the client marks with q=0.
+
+    Returns:
+        'zstd', 'gzip' or None for an uncompressed response
+    """
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+
+    wildcard = accepted.get('*', 0.0)
+    candidates = (['zstd'] if zstandard is not None else []) + ['gzip']
+    best, best_q = None, 0.0
+    for coding in candidates:
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def _compressor(encoding: str):
+    if encoding == 'gzip':
+        return zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+    raise ValueError(f"Unsupported encoding {encoding!r}")
+
+
+def _buffered(chunks: Iterable[str], size: int) -> Iterator[bytes]:
+    buffer = []
+    buffered = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= size:
+            yield ''.join(buffer).encode('utf-8')
+            buffer, buffered = [], 0
+    if buffer:
+        yield ''.join(buffer).encode('utf-8')
+
+
+def stream_json(payload, encoding: Optional[str] = None, chunk_size: int = STREAM_CHUNK_BYTES) -> Iterator[bytes]:
+    """
+    Encode a JSON payload incrementally, optionally compressing each chunk.
+
+    Args:
+        payload: JSON-serializable object
+        encoding: 'gzip', 'zstd' or None
+        chunk_size: Uncompressed bytes per chunk
+
+    Yields:
+        Encoded (and compressed) byte chunks
+    """
+    chunks = _buffered(json.JSONEncoder(separators=(',', ':')).iterencode(payload), chunk_size)
+    if encoding is None:
+        yield from chunks
+        return
+
+    compressor = _compressor(encoding)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,149 @@
+"""
+Sampled traffic capture for load replay
+
+Sampled prediction requests (/predict, /batch_predict and their
+/models/<name>/ routes) are handed to a bounded queue together with their
+arrival time, target (path and query string) and the headers that change
+how they are served (model routing and priority); a background thread
+appends them to a gzip-compressed capture file. The request path only pays
+for the sampling decision and a non-blocking enqueue: when the queue is
+full (or the target or headers are too long to record) the record is
+dropped and counted.
+
+Record layout (little endian, inside the gzip stream):
+    float64 arrival time (unix seconds) | uint16 target length | uint16
+    headers length | uint32 body length | target bytes | headers JSON |
+    body bytes
+
+Files written by different workers can be merged by arrival time when
+replayed (see src/utils/replay_traffic.py).
+"""
+
+import gzip
+import json
+import logging
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RECORD_HEADER = struct.Struct('<dHHI')
+
+# Longest target or headers JSON a uint16 length field can describe
+MAX_FIELD_BYTES = 0xFFFF
+
+# Records written between flushes of the gzip stream
+FLUSH_EVERY = 256
+
+
+class TrafficRecorder:
+    """Writes sampled requests to a capture file off the request path."""
+
+    def __init__(self, path: str, max_queue: int = 10000, max_bytes: Optional[int] = None):
+        """
+        Args:
+            path: Capture file (appended to if it exists)
+            max_queue: Records buffered before new ones are dropped
+            max_bytes: Stop capturing once the file reaches this size
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.captured = 0
+        self.dropped = 0
+        self.full = False
+        self.pid = os.getpid()
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name='traffic-capture', daemon=True)
+        self._thread.start()
+
+    def record(
+        self,
+        target: str,
+        body: bytes,
+        timestamp: Optional[float] = None,
+        headers: Optional[Dict[str, str]] = None
+    ) -> bool:
+        """
+        Enqueue one request without blocking.
+
+        Args:
+            target: Request path with its query string, if any
+            body: Raw request body
+            timestamp: Arrival time (default: now)
+            headers: Request headers to resend on replay
+
+        Returns:
+            True if queued, False if dropped (queue full, size limit reached,
+            or target or headers longer than a record can hold)
+        """
+        if self.full:
+            self.dropped += 1
+            return False
+        target = target.encode()
+        headers = json.dumps(headers or {}).encode()
+        if len(target) > MAX_FIELD_BYTES or len(headers) > MAX_FIELD_BYTES:
+            self.dropped += 1
+            return False
+        try:
+            self._queue.put_nowait((time.time() if timestamp is None else timestamp, target, headers, body))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def _run(self):
+        with gzip.open(self.path, 'ab', compresslevel=1) as f:
+            pending = 0
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                timestamp, target, headers, body = item
+                f.write(RECORD_HEADER.pack(timestamp, len(target), len(headers), len(body)))
+                f.write(target)
+                f.write(headers)
+                f.write(body)
+                self.captured += 1
+                pending += 1
+                # Flush whenever the queue drains so captures survive a crash
+                if pending >= FLUSH_EVERY or self._queue.empty():
+                    f.flush()
+                    pending = 0
+                    if self.max_bytes is not None and os.path.getsize(self.path) >= self.max_bytes:
+                        logger.warning(f"Traffic capture {self.path} reached {self.max_bytes} bytes; stopping")
+                        self.full = True
+                        break
+
+    def close(self, timeout: Optional[float] = None):
+        """Write queued records and close the capture file."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+        self._thread.join(timeout)
+
+
+def read_capture(path: str) -> Iterator[Tuple[float, str, bytes, Dict[str, str]]]:
+    """
+    Read (arrival time, target, body, headers) records from a capture file.
+
+    A truncated tail (e.g. from a killed worker) ends the iteration quietly.
+    """
+    with gzip.open(path, 'rb') as f:
+        while True:
+            try:
+                header = f.read(RECORD_HEADER.size)
+                if len(header) < RECORD_HEADER.size:
+                    return
+                timestamp, target_length, headers_length, length = RECORD_HEADER.unpack(header)
+                target = f.read(target_length)
+                headers = f.read(headers_length)
+                body = f.read(length)
+            except (EOFError, zlib.error, gzip.BadGzipFile):
+                return
+            if len(target) < target_length or len(headers) < headers_length or len(body) < length:
+                return
+            yield timestamp, target.decode(), body, json.loads(headers)
@@ -0,0 +1,333 @@
+"""
+Cgroup-aware Gunicorn Launcher for the Heart Disease Prediction API
+
+Reads the container's cgroup CPU and memory limits at startup, measures the
+in-memory footprint of the model artifact and derives the gunicorn worker
+count, threads per worker and native (OpenMP/BLAS/joblib) thread-pool sizes
+from them, instead of relying on the node's core count. The scoring
+executor threads and shard pool processes each worker adds are counted as
+concurrent scorers sharing its CPU share.
+
+The chosen topology is logged, exported to the workers through the
+API_TOPOLOGY environment variable (surfaced by /model/info) and gunicorn is
+exec'd in place of this process.
+
+Usage:
+    python -m src.api.launcher [--bind 0.0.0.0:8000] [--uds /run/api.sock] [--dry-run]
+
+Environment Variables:
+    PORT: Port to bind when --bind is not given (default: 8000)
+    API_UDS_PATH: Unix domain socket to listen on in addition to --bind,
+        for sidecar callers in the same pod
+    MODEL_PATH: Model artifact used to measure the footprint
+    GUNICORN_WORKERS: Explicit worker count (overrides the computed value)
+    GUNICORN_THREADS: Explicit threads per worker (overrides the computed value)
+    PRIORITY_SCHEDULING, SCHEDULER_EXECUTORS, BATCH_SHARD_WORKERS: Read as
+        by the app to count each worker's scoring threads and processes
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import pickle
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+CGROUP_ROOT = Path('/sys/fs/cgroup')
+
+# Memory reserved per worker on top of the model (interpreter, numpy,
+# sklearn, flask, prometheus client)
+WORKER_BASE_MEMORY_BYTES = 150 * 1024 * 1024
+
+# Fraction of the memory limit the workers may use, leaving room for the
+# gunicorn master and allocation spikes
+MEMORY_HEADROOM = 0.8
+
+MAX_THREADS_PER_WORKER = 8
+
+# cgroup v1 reports "unlimited" as a very large page-aligned number
+_UNLIMITED_MEMORY_THRESHOLD = 1 << 60
+
+# LOKY_MAX_CPU_COUNT caps joblib's n_jobs=-1, which the trained forest
+# uses for predict_proba and which ignores the OpenMP/BLAS variables
+NATIVE_THREAD_ENV_VARS = [
+    'OMP_NUM_THREADS',
+    'OPENBLAS_NUM_THREADS',
+    'MKL_NUM_THREADS',
+    'NUMEXPR_NUM_THREADS',
+    'VECLIB_MAXIMUM_THREADS',
+    'LOKY_MAX_CPU_COUNT',
+]
+
+
+def _read_text(path: Path) -> Optional[str]:
+    try:
+        return path.read_text().strip()
+    except (OSError, ValueError):
+        return None
+
+
+def read_cgroup_cpu_limit(root: Path = CGROUP_ROOT) -> Optional[float]:
+    """
+    Read the CPU quota of the current cgroup.
+
+    Args:
+        root: cgroup filesystem mount point
+
+    Returns:
+        CPU limit in cores (e.g. 0.5 for a 500m limit), or None if unlimited
+    """
+    root = Path(root)
+
+    # cgroup v2: "<quota> <period>" or "max <period>"
+    cpu_max = _read_text(root / 'cpu.max')
+    if cpu_max:
+        parts = cpu_max.split()
+        if parts[0] == 'max':
+            return None
+        try:
+            return int(parts[0]) / int(parts[1])
+        except (IndexError, ValueError, ZeroDivisionError):
+            return None
+
+    # cgroup v1
+    quota = _read_text(root / 'cpu' / 'cpu.cfs_quota_us')
+    period = _read_text(root / 'cpu' / 'cpu.cfs_period_us')
+    if quota and period:
+        try:
+            quota_us, period_us = int(quota), int(period)
+        except ValueError:
+            return None
+        if quota_us <= 0 or period_us <= 0:
+            return None
+        return quota_us / period_us
+
+    return None
+
+
+def read_cgroup_memory_limit(root: Path = CGROUP_ROOT) -> Optional[int]:
+    """
+    Read the memory limit of the current cgroup.
+
+    Args:
+        root: cgroup filesystem mount point
+
+    Returns:
+        Memory limit in bytes, or None if unlimited
+    """
+    root = Path(root)
+
+    for path in (root / 'memory.max', root / 'memory' / 'memory.limit_in_bytes'):
+        value = _read_text(path)
+        if not value:
+            continue
+        if value == 'max':
+            return None
+        try:
+            limit = int(value)
+        except ValueError:
+            return None
+        return None if limit >= _UNLIMITED_MEMORY_THRESHOLD else limit
+
+    return None
+
+
+def available_cpus() -> int:
+    """Number of CPUs this process may be scheduled on."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def measure_model_footprint(model_path) -> int:
+    """
+    Measure the memory allocated by unpickling a model artifact.
+
+    Args:
+        model_path: Path to the pickled model
+
+    Returns:
+        Peak bytes allocated while loading, or 0 if the model is unavailable
+    """
+    try:
+        with open(model_path, 'rb') as f:
+            payload = f.read()
+    except OSError:
+        logger.warning(f"Model file not found at {model_path}, assuming zero footprint")
+        return 0
+
+    tracemalloc.start()
+    try:
+        pickle.loads(payload)
+        _, peak = tracemalloc.get_traced_memory()
+    except Exception as e:
+        logger.warning(f"Could not load model for footprint measurement: {str(e)}")
+        peak = 0
+    finally:
+        tracemalloc.stop()
+
+    return peak
+
+
+def plan_topology(
+    cpu_limit: Optional[float],
+    memory_limit: Optional[int],
+    model_bytes: int,
+    host_cpus: int,
+    workers_override: Optional[int] = None,
+    threads_override: Optional[int] = None,
+    scoring_executors: Optional[int] = 2,
+    shard_workers: int = 0
+) -> Dict:
+    """
+    Derive the serving topology from resource limits.
+
+    Inference is CPU bound, so the worker count follows the CPU quota (one
+    worker per shard pool's worth of cores when sharding) and is capped by
+    how many model copies fit in the memory limit. Each worker scores on
+    its executor threads (its request threads without scheduling) and its
+    shard pool processes; native thread pools get an equal split of the
+    worker's share of the quota between them, so that workers x scorers x
+    pool size stays within it wherever the quota allows one thread each.
+
+    Args:
+        cpu_limit: cgroup CPU limit in cores (None if unlimited)
+        memory_limit: cgroup memory limit in bytes (None if unlimited)
+        model_bytes: Measured in-memory model footprint
+        host_cpus: CPUs visible to the process
+        workers_override: Explicit worker count
+        threads_override: Explicit threads per worker
+        scoring_executors: Scheduler executor threads per worker (None when
+            priority scheduling is off and request threads score)
+        shard_workers: Shard pool processes per worker (0 without sharding)
+
+    Returns:
+        Dictionary describing the chosen topology
+    """
+    effective_cpus = float(host_cpus)
+    if cpu_limit is not None:
+        effective_cpus = min(cpu_limit, effective_cpus)
+
+    workers_by_cpu = max(1, math.ceil(effective_cpus / max(shard_workers, 1)))
+
+    # Shard pool processes are forked from their worker and share the model
+    per_worker_bytes = WORKER_BASE_MEMORY_BYTES * (1 + shard_workers) + model_bytes
+    workers_by_memory = None
+    if memory_limit is not None:
+        workers_by_memory = max(1, int(memory_limit * MEMORY_HEADROOM // per_worker_bytes))
+
+    workers = workers_by_cpu if workers_by_memory is None else min(workers_by_cpu, workers_by_memory)
+    if workers_override:
+        workers = workers_override
+
+    cpu_per_worker = effective_cpus / workers
+
+    # Two request threads per core overlap socket I/O and JSON handling
+    # with inference; at least two so a slow client cannot stall a worker
+    threads = min(MAX_THREADS_PER_WORKER, max(2, int(round(cpu_per_worker * 2))))
+    if threads_override:
+        threads = threads_override
+
+    scorers = (threads if scoring_executors is None else scoring_executors) + shard_workers
+    native_threads = max(1, int(cpu_per_worker / scorers))
+
+    return {
+        'cpu_limit': cpu_limit,
+        'memory_limit_bytes': memory_limit,
+        'host_cpus': host_cpus,
+        'effective_cpus': round(effective_cpus, 3),
+        'model_footprint_bytes': model_bytes,
+        'workers': workers,
+        'threads_per_worker': threads,
+        'worker_class': 'gthread' if threads > 1 else 'sync',
+        'scoring_threads_per_worker': threads if scoring_executors is None else scoring_executors,
+        'shard_processes_per_worker': shard_workers,
+        'native_threads': native_threads,
+    }
+
+
+def native_thread_env(topology: Dict, environ: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """
+    Build the environment limiting native thread pools.
+
+    Values already present in the environment are kept so operators can
+    still pin them explicitly.
+    """
+    env = dict(os.environ if environ is None else environ)
+    for var in NATIVE_THREAD_ENV_VARS:
+        env.setdefault(var, str(topology['native_threads']))
+    env['API_TOPOLOGY'] = json.dumps(topology)
+    return env
+
+
+def build_gunicorn_argv(topology: Dict, bind: str, timeout: int = 120, uds: Optional[str] = None) -> List[str]:
+    """Build the gunicorn command line for the chosen topology."""
+    argv = ['gunicorn', 'src.api.app:app', '--bind', bind]
+    if uds:
+        argv += ['--bind', f"unix:{uds}"]
+    return argv + [
+        '--workers', str(topology['workers']),
+        '--threads', str(topology['threads_per_worker']),
+        '--worker-class', topology['worker_class'],
+        '--timeout', str(timeout),
+    ]
+
+
+def _env_int(name: str) -> Optional[int]:
+    value = os.environ.get(name)
+    return int(value) if value else None
+
+
+def main(argv=None):
+    """Compute the topology and exec gunicorn."""
+    parser = argparse.ArgumentParser(description="Launch the prediction API with cgroup-aware topology")
+    parser.add_argument('--bind', default=f"0.0.0.0:{os.environ.get('PORT', 8000)}",
+                        help="Address to bind (default: 0.0.0.0:$PORT)")
+    parser.add_argument('--uds', default=os.environ.get('API_UDS_PATH'),
+                        help="Also listen on this Unix domain socket (default: $API_UDS_PATH)")
+    parser.add_argument('--timeout', type=int, default=120, help="Gunicorn worker timeout in seconds")
+    parser.add_argument('--model-path', default=os.environ.get('MODEL_PATH', 'models/best_model.pkl'),
+                        help="Model artifact used to measure the memory footprint")
+    parser.add_argument('--cgroup-root', default=str(CGROUP_ROOT), help=argparse.SUPPRESS)
+    parser.add_argument('--dry-run', action='store_true', help="Print the topology and exit")
+    args = parser.parse_args(argv)
+
+    topology = plan_topology(
+        cpu_limit=read_cgroup_cpu_limit(Path(args.cgroup_root)),
+        memory_limit=read_cgroup_memory_limit(Path(args.cgroup_root)),
+        model_bytes=measure_model_footprint(args.model_path),
+        host_cpus=available_cpus(),
+        workers_override=_env_int('GUNICORN_WORKERS'),
+        threads_override=_env_int('GUNICORN_THREADS'),
+        scoring_executors=(
+            _env_int('SCHEDULER_EXECUTORS') or 2
+            if os.environ.get('PRIORITY_SCHEDULING', 'true').lower() == 'true' else None
+        ),
+        shard_workers=_env_int('BATCH_SHARD_WORKERS') or 0
+    )
+    logger.info(f"Serving topology: {json.dumps(topology)}")
+
+    gunicorn_argv = build_gunicorn_argv(topology, args.bind, args.timeout, args.uds)
+    if args.dry_run:
+        print(json.dumps(topology, indent=2))
+        print(' '.join(gunicorn_argv))
+        return 0
+
+    logger.info(f"Starting: {' '.join(gunicorn_argv)}")
+    sys.stdout.flush()
+    os.execvpe(gunicorn_argv[0], gunicorn_argv, native_thread_env(topology))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
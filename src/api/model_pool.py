@@ -0,0 +1,221 @@
+"""
+Memory-bounded pool of models served side by side
+
+Models are addressed by name:
+- "random_forest" loads models/random_forest.pkl
+- "heart-disease-random-forest@3" loads version 3 of a registered MLflow
+  model, "heart-disease-random-forest@Production" the version in a stage
+
+A model is loaded on first use and kept resident while the total footprint
+fits the memory budget; beyond it the least recently used models are
+evicted. The footprint of a model is the size of its pickled form, which for
+tree ensembles and linear models is dominated by the same numpy arrays that
+make up the in-memory model.
+
+Failed lookups are remembered per name for a short time, so repeated
+requests for an unknown or broken model do not reach the registry or the
+file system every time; operators can also restrict routable names to an
+allowlist.
+"""
+
+import logging
+import os
+import pickle
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from src.models.predict import Predictor
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_.-]*(@[A-Za-z0-9_.-]+)?$')
+
+# Failed lookups remembered at most; the oldest are forgotten first
+MAX_CACHED_FAILURES = 1024
+
+
+class ModelUnavailableError(LookupError):
+    """Raised when a requested model cannot be served."""
+
+    def __init__(self, message: str, status_code: int = 404):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def model_footprint(model) -> int:
+    """Approximate resident size of a model in bytes."""
+    return len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+class ModelPool:
+    """LRU cache of Predictors keyed by model name, bounded by memory."""
+
+    def __init__(
+        self,
+        models_dir: str = 'models',
+        memory_budget_bytes: int = 1024 ** 3,
+        on_load: Optional[Callable[[str, float, int], None]] = None,
+        on_evict: Optional[Callable[[str], None]] = None,
+        predictor_options: Optional[Dict[str, Any]] = None,
+        failure_ttl_seconds: float = 30.0,
+        allowed_models: Optional[Sequence[str]] = None
+    ):
+        """
+        Args:
+            models_dir: Directory holding <name>.pkl artifacts
+            memory_budget_bytes: Total footprint of resident models
+            on_load: Callback receiving (name, load seconds, footprint bytes)
+            on_evict: Callback receiving the name of an evicted model
+            predictor_options: Keyword arguments for each model's Predictor
+            failure_ttl_seconds: How long a failed load is answered from
+                cache (0 retries every request)
+            allowed_models: Routable model names (None allows any valid name)
+        """
+        self.models_dir = models_dir
+        self.memory_budget_bytes = memory_budget_bytes
+        self.on_load = on_load
+        self.on_evict = on_evict
+        self.predictor_options = predictor_options or {}
+        self.failure_ttl_seconds = failure_ttl_seconds
+        self.allowed_models = None if allowed_models is None else frozenset(allowed_models)
+        self._entries = OrderedDict()
+        self._failures = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading = {}
+
+    def source(self, name: str) -> str:
+        """Return the artifact path or MLflow URI a model name refers to."""
+        if not MODEL_NAME_PATTERN.match(name):
+            raise ModelUnavailableError(f"Invalid model name {name!r}", 400)
+        if self.allowed_models is not None and name not in self.allowed_models:
+            raise ModelUnavailableError(f"Model {name!r} is not routable", 404)
+        if '@' in name:
+            registered, version = name.split('@', 1)
+            return f"models:/{registered}/{version}"
+        return os.path.join(self.models_dir, f"{name}.pkl")
+
+    def _load(self, name: str):
+        source = self.source(name)
+        try:
+            if source.startswith('models:/'):
+                import mlflow.sklearn
+                return mlflow.sklearn.load_model(source)
+            with open(source, 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            raise ModelUnavailableError(f"Model {name!r} not found at {source}", 404)
+        except Exception as e:
+            raise ModelUnavailableError(f"Failed to load model {name!r}: {e}", 503)
+
+    def get(self, name: str) -> Predictor:
+        """
+        Return the Predictor for a model, loading it on first use.
+
+        Raises:
+            ModelUnavailableError: If the name is invalid or loading fails
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                self._entries.move_to_end(name)
+                entry['last_used'] = time.time()
+                entry['requests'] += 1
+                return entry['predictor']
+            failure = self._failures.get(name)
+            if failure is not None and failure[2] > time.monotonic():
+                raise ModelUnavailableError(failure[0], failure[1])
+            # One loader per name; concurrent requests wait for it
+            loading = self._loading.get(name)
+            if loading is None:
+                loading = self._loading[name] = threading.Lock()
+        with loading:
+            with self._lock:
+                loaded = name in self._entries
+            if loaded:
+                return self.get(name)
+            try:
+                start = time.perf_counter()
+                try:
+                    model = self._load(name)
+                except ModelUnavailableError as e:
+                    self._remember_failure(name, e)
+                    raise
+                seconds = time.perf_counter() - start
+                footprint = model_footprint(model)
+                predictor = Predictor(model, **self.predictor_options)
+                with self._lock:
+                    self._entries[name] = {
+                        'predictor': predictor,
+                        'source': self.source(name),
+                        'footprint_bytes': footprint,
+                        'load_seconds': seconds,
+                        'loaded_at': time.time(),
+                        'last_used': time.time(),
+                        'requests': 1,
+                    }
+                    self._evict(keep=name)
+            finally:
+                with self._lock:
+                    self._loading.pop(name, None)
+
+        logger.info(f"Loaded model {name!r} in {seconds:.2f}s ({footprint / 1024 ** 2:.1f} MiB)")
+        if self.on_load is not None:
+            self.on_load(name, seconds, footprint)
+        return predictor
+
+    def _remember_failure(self, name: str, error: ModelUnavailableError):
+        if self.failure_ttl_seconds <= 0 or error.status_code == 400:
+            return
+        with self._lock:
+            self._failures.pop(name, None)
+            self._failures[name] = (str(error), error.status_code, time.monotonic() + self.failure_ttl_seconds)
+            while len(self._failures) > MAX_CACHED_FAILURES:
+                self._failures.popitem(last=False)
+
+    def _evict(self, keep: str):
+        while self.resident_bytes > self.memory_budget_bytes and len(self._entries) > 1:
+            name = next(n for n in self._entries if n != keep)
+            del self._entries[name]
+            logger.info(f"Evicted model {name!r} from the model pool")
+            if self.on_evict is not None:
+                self.on_evict(name)
+        if self.resident_bytes > self.memory_budget_bytes:
+            logger.warning(f"Model {keep!r} alone exceeds the model pool budget of {self.memory_budget_bytes} bytes")
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(entry['footprint_bytes'] for entry in self._entries.values())
+
+    def available(self) -> List[str]:
+        """Model names available from the models directory."""
+        try:
+            return sorted(f[:-len('.pkl')] for f in os.listdir(self.models_dir) if f.endswith('.pkl'))
+        except FileNotFoundError:
+            return []
+
+    def describe(self) -> Dict:
+        """Summary of the pool for /model/info."""
+        with self._lock:
+            resident = [
+                {
+                    'name': name,
+                    'source': entry['source'],
+                    'model_type': type(entry['predictor'].model).__name__,
+                    'footprint_bytes': entry['footprint_bytes'],
+                    'load_seconds': round(entry['load_seconds'], 4),
+                    'loaded_at': entry['loaded_at'],
+                    'last_used': entry['last_used'],
+                    'requests': entry['requests'],
+                }
+                for name, entry in reversed(self._entries.items())
+            ]
+            resident_bytes = self.resident_bytes
+        return {
+            'memory_budget_bytes': self.memory_budget_bytes,
+            'resident_bytes': resident_bytes,
+            'resident_models': resident,
+            'available_models': self.available(),
+        }
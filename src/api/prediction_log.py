@@ -0,0 +1,363 @@
+"""
+Append-only binary prediction log
+
+Every scored row (timestamp, features, disease probability, label and
+model) is copied into a preallocated in-memory ring buffer on the request
+path. A background thread drains the ring in batches and appends them to
+segment files on local disk. When the ring is full new rows are dropped and
+counted; the request path never waits for disk.
+
+Segment layout (little endian):
+    file header:  b'HDPLSEG1' | uint32 header length | JSON header
+                  (schema version, features, pid, created) | pad to 8 bytes
+    block:        b'PLB1' | uint32 rows | float64 min ts | float64 max ts |
+                  uint32 model table length | JSON list of model labels |
+                  pad to 8 bytes | columns
+    columns:      timestamp float64, one float64 column per feature,
+                  disease_probability float64, model uint16 (index into the
+                  block's model table), label int8 | pad to 8 bytes
+
+Blocks are row groups: each column is contiguous, so a reader can map a
+segment and view columns without copying, and skip blocks by their
+timestamp range. A truncated trailing block (killed worker) is ignored by
+readers. Segments rotate by size.
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_MAGIC = b'HDPLSEG1'
+BLOCK_MAGIC = b'PLB1'
+SCHEMA_VERSION = 1
+FILE_HEADER = struct.Struct('<8sI')
+BLOCK_HEADER = struct.Struct('<4sIddI')
+FSYNC_POLICIES = ('none', 'rotate', 'always')
+
+
+def _pad(n: int) -> int:
+    return -n % 8
+
+
+def block_layout(n_rows: int, n_features: int) -> List[Tuple[str, type, int]]:
+    """(column, dtype, offset) of each column relative to the start of a block's columns."""
+    columns = (
+        [('timestamp', np.float64)]
+        + [(f'feature_{j}', np.float64) for j in range(n_features)]
+        + [('disease_probability', np.float64), ('model', np.uint16), ('label', np.int8)]
+    )
+    layout = []
+    offset = 0
+    for name, dtype in columns:
+        layout.append((name, dtype, offset))
+        offset += n_rows * np.dtype(dtype).itemsize
+    return layout
+
+
+def columns_size(n_rows: int, n_features: int) -> int:
+    size = n_rows * (8 * (n_features + 2) + 2 + 1)
+    return size + _pad(size)
+
+
+class PredictionLog:
+    """Ring-buffered prediction sink with background segment writes."""
+
+    def __init__(
+        self,
+        directory: str,
+        features: Sequence[str],
+        capacity: int = 65536,
+        flush_interval: float = 1.0,
+        segment_bytes: int = 64 * 1024 ** 2,
+        fsync: str = 'rotate',
+        on_flush: Optional[Callable[[int, float, float], None]] = None,
+        on_drop: Optional[Callable[[int], None]] = None
+    ):
+        """
+        Args:
+            directory: Directory for segment files
+            features: Feature names in column order
+            capacity: Rows held in the ring buffer
+            flush_interval: Seconds between background flushes at most
+            segment_bytes: Rotate to a new segment beyond this size
+            fsync: 'none', 'rotate' (fsync a segment when it is closed) or
+                'always' (after every block)
+            on_flush: Callback receiving (rows written, seconds, ring fill
+                ratio before the flush)
+            on_drop: Callback receiving the number of rows dropped
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got {fsync!r}")
+        self.directory = directory
+        self.features = list(features)
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self.on_flush = on_flush
+        self.on_drop = on_drop
+        self.written = 0
+        self.dropped = 0
+        self.segments = []
+        self.pid = os.getpid()
+
+        self._timestamps = np.empty(capacity, dtype=np.float64)
+        self._features = np.empty((capacity, len(self.features)), dtype=np.float64)
+        self._proba = np.empty(capacity, dtype=np.float64)
+        self._models = np.empty(capacity, dtype=np.uint16)
+        self._labels = np.empty(capacity, dtype=np.int8)
+        self._model_ids = {}
+        self._head = 0  # rows ever accepted
+        self._tail = 0  # rows ever drained
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._file = None
+        self._sequence = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name='prediction-log', daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        """Rows buffered and not yet written."""
+        return self._head - self._tail
+
+    @property
+    def fill_ratio(self) -> float:
+        return self.pending / self.capacity
+
+    def record(
+        self,
+        features: np.ndarray,
+        disease_proba: np.ndarray,
+        labels: np.ndarray,
+        model: str,
+        timestamp: Optional[float] = None
+    ) -> bool:
+        """
+        Copy scored rows into the ring buffer without blocking on disk.
+
+        Returns:
+            True if buffered, False if dropped because the ring is full
+        """
+        n = len(features)
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            accepted = not self._closed and self._head - self._tail + n <= self.capacity
+            if accepted:
+                model_id = self._model_ids.setdefault(model, len(self._model_ids))
+                start = self._head % self.capacity
+                first = min(n, self.capacity - start)
+                # The write wraps around the end of the ring at most once
+                for dst, src in ((slice(start, start + first), slice(0, first)), (slice(0, n - first), slice(first, n))):
+                    if src.stop > src.start:
+                        self._timestamps[dst] = timestamp
+                        self._features[dst] = features[src]
+                        self._proba[dst] = disease_proba[src]
+                        self._models[dst] = model_id
+                        self._labels[dst] = labels[src]
+                self._head += n
+            else:
+                self.dropped += n
+        if not accepted:
+            if self.on_drop is not None:
+                self.on_drop(n)
+            return False
+        if self.pending * 2 >= self.capacity:
+            self._wake.set()
+        return True
+
+    def _drain(self) -> Optional[Dict]:
+        """Copy the buffered rows out of the ring and release their space."""
+        with self._lock:
+            n = self._head - self._tail
+            if n == 0:
+                return None
+            indices = (self._tail + np.arange(n)) % self.capacity
+            rows = {
+                'timestamp': self._timestamps[indices],
+                'features': self._features[indices],
+                'disease_probability': self._proba[indices],
+                'model': self._models[indices],
+                'label': self._labels[indices],
+                'models': sorted(self._model_ids, key=self._model_ids.get),
+                'fill': n / self.capacity,
+            }
+            self._tail = self._head
+        return rows
+
+    def _open_segment(self):
+        self._sequence += 1
+        path = os.path.join(
+            self.directory, f"predictions-{self.pid}-{int(time.time() * 1000)}-{self._sequence:04d}.seg"
+        )
+        header = json.dumps({
+            'schema_version': SCHEMA_VERSION,
+            'features': self.features,
+            'pid': self.pid,
+            'created': time.time(),
+        }).encode()
+        self._file = open(path, 'wb')
+        self._file.write(
+            FILE_HEADER.pack(SEGMENT_MAGIC, len(header)) + header + b'\0' * _pad(FILE_HEADER.size + len(header))
+        )
+        self.segments.append(path)
+
+    def _close_segment(self):
+        if self._file is None:
+            return
+        self._file.flush()
+        if self.fsync != 'none':
+            os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+
+    def _write_block(self, rows: Dict):
+        if self._file is None or self._file.tell() >= self.segment_bytes:
+            self._close_segment()
+            self._open_segment()
+        timestamps = rows['timestamp']
+        models = json.dumps(rows['models']).encode()
+        header = BLOCK_HEADER.pack(BLOCK_MAGIC, len(timestamps), timestamps.min(), timestamps.max(), len(models)) + models
+        columns = [
+            timestamps.tobytes(),
+            np.ascontiguousarray(rows['features'].T).tobytes(),
+            rows['disease_probability'].tobytes(),
+            rows['model'].tobytes(),
+            rows['label'].tobytes(),
+        ]
+        size = sum(len(column) for column in columns)
+        self._file.write(b''.join([header, b'\0' * _pad(len(header))] + columns + [b'\0' * _pad(size)]))
+        self._file.flush()
+        if self.fsync == 'always':
+            os.fsync(self._file.fileno())
+
+    def flush(self) -> int:
+        """Write buffered rows now; returns the number written."""
+        with self._write_lock:
+            rows = self._drain()
+            if rows is None:
+                return 0
+            n = len(rows['timestamp'])
+            start = time.perf_counter()
+            try:
+                self._write_block(rows)
+                error = None
+            except OSError as e:
+                error = e
+        if error is not None:
+            logger.error(f"Prediction log write failed, dropping {n} rows: {error}")
+            self.dropped += n
+            if self.on_drop is not None:
+                self.on_drop(n)
+            return 0
+        self.written += n
+        if self.on_flush is not None:
+            self.on_flush(n, time.perf_counter() - start, rows['fill'])
+        return n
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def close(self, timeout: Optional[float] = None):
+        """Write buffered rows and close the current segment."""
+        with self._lock:
+            self._closed = True
+        self._wake.set()
+        self._thread.join(timeout)
+        self.flush()
+        with self._write_lock:
+            self._close_segment()
+
+
+def read_segment_header(buffer) -> Tuple[Dict, int]:
+    """Return (header, offset of the first block) of a mapped segment."""
+    magic, length = FILE_HEADER.unpack_from(buffer, 0)
+    if magic != SEGMENT_MAGIC:
+        raise ValueError("Not a prediction log segment")
+    header = json.loads(bytes(buffer[FILE_HEADER.size:FILE_HEADER.size + length]))
+    offset = FILE_HEADER.size + length
+    return header, offset + _pad(offset)
+
+
+def iter_blocks(buffer, start_time: Optional[float] = None, end_time: Optional[float] = None) -> Iterator[Dict]:
+    """
+    Iterate over the blocks of a mapped segment as zero-copy column views.
+
+    Blocks entirely outside [start_time, end_time] are skipped using their
+    headers only. A truncated trailing block ends the iteration.
+
+    Yields:
+        Dict with 'timestamp', 'features' (list of columns),
+        'disease_probability', 'model', 'label', 'models' (model table),
+        'min_timestamp' and 'max_timestamp'
+    """
+    header, offset = read_segment_header(buffer)
+    n_features = len(header['features'])
+    size = len(buffer)
+    while offset + BLOCK_HEADER.size <= size:
+        magic, n, ts_min, ts_max, models_length = BLOCK_HEADER.unpack_from(buffer, offset)
+        if magic != BLOCK_MAGIC:
+            return
+        models_offset = offset + BLOCK_HEADER.size
+        columns_offset = models_offset + models_length
+        columns_offset += _pad(columns_offset)
+        end = columns_offset + columns_size(n, n_features)
+        if end > size:
+            return
+        if (start_time is None or ts_max >= start_time) and (end_time is None or ts_min <= end_time):
+            columns = {
+                name: np.frombuffer(buffer, dtype=dtype, count=n, offset=columns_offset + column_offset)
+                for name, dtype, column_offset in block_layout(n, n_features)
+            }
+            yield {
+                'timestamp': columns['timestamp'],
+                'features': [columns[f'feature_{j}'] for j in range(n_features)],
+                'disease_probability': columns['disease_probability'],
+                'model': columns['model'],
+                'label': columns['label'],
+                'models': json.loads(bytes(buffer[models_offset:models_offset + models_length])),
+                'min_timestamp': ts_min,
+                'max_timestamp': ts_max,
+            }
+        offset = end
+
+
+def read_segment(path: str) -> Dict:
+    """Read a whole segment into arrays; features as a (rows, n_features) matrix."""
+    parts = {'timestamp': [], 'features': [], 'disease_probability': [], 'model': [], 'label': []}
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        header, _ = read_segment_header(buffer)
+        n_features = len(header['features'])
+        for block in iter_blocks(buffer):
+            n = len(block['timestamp'])
+            parts['timestamp'].append(block['timestamp'].copy())
+            parts['features'].append(np.column_stack(block['features']) if n_features else np.empty((n, 0)))
+            parts['disease_probability'].append(block['disease_probability'].copy())
+            parts['model'].append(np.array(block['models'], dtype=object)[block['model']])
+            parts['label'].append(block['label'].copy())
+            # Release the views before the map is closed
+            block = None
+    return {
+        'feature_names': header['features'],
+        'timestamp': np.concatenate(parts['timestamp'] or [np.empty(0)]),
+        'features': np.vstack(parts['features'] or [np.empty((0, n_features))]),
+        'disease_probability': np.concatenate(parts['disease_probability'] or [np.empty(0)]),
+        'model': np.concatenate(parts['model'] or [np.empty(0, dtype=object)]),
+        'label': np.concatenate(parts['label'] or [np.empty(0, dtype=np.int8)]),
+    }
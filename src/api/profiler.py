@@ -0,0 +1,175 @@
+"""
+On-demand sampling profiler for serving workers
+
+The calling thread periodically snapshots the stacks of every other thread
+in the process (sys._current_frames) for a fixed duration. Nothing is
+installed in the interpreter (no sys.setprofile/settrace hooks), so request
+threads run at full speed and overhead scales with the sampling rate only.
+
+Threads parked in a blocking wait (idle scheduler executors, background
+writers and server threads waiting on a queue, lock or socket) are counted
+as idle and left out of the stacks unless idle stacks are requested, so the
+profile shows where CPU time goes.
+
+Results are reported as collapsed stacks ("root;child;leaf count" lines, the
+input format of flamegraph.pl and speedscope) plus a top-N summary of
+functions by self and total samples.
+"""
+
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+MAX_STACK_DEPTH = 128
+
+# (module, function) of leaf frames that mean the thread is blocked waiting
+IDLE_FRAMES = frozenset([
+    ('threading', 'wait'),
+    ('threading', '_wait_for_tstate_lock'),
+    ('queue', 'get'),
+    ('selectors', 'select'),
+    ('socket', 'accept'),
+    ('concurrent.futures.thread', '_worker'),
+])
+
+# One profile at a time per worker process
+_profile_lock = threading.Lock()
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profile is already running in this process."""
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get('__name__', '?')
+    return f"{module}.{code.co_name}:{code.co_firstlineno}".replace(';', ':')
+
+
+def _is_idle(frame) -> bool:
+    return (frame.f_globals.get('__name__'), frame.f_code.co_name) in IDLE_FRAMES
+
+
+def _stack(frame) -> tuple:
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return tuple(labels)
+
+
+def sample_stacks(
+    seconds: float,
+    interval: float,
+    exclude: Iterable[int] = (),
+    include_idle: bool = False
+) -> Dict:
+    """
+    Sample the stacks of all threads in this process.
+
+    Args:
+        seconds: Profiling duration
+        interval: Seconds between samples
+        exclude: Thread ids to leave out (the sampler is always excluded)
+        include_idle: Keep stacks of threads blocked in a wait (see IDLE_FRAMES)
+
+    Returns:
+        Dictionary with stack counts, idle thread samples, samples taken and
+        elapsed seconds
+    """
+    exclude = set(exclude) | {threading.get_ident()}
+    stacks = Counter()
+    idle = 0
+    samples = 0
+    started = time.perf_counter()
+    deadline = started + seconds
+    next_sample = started
+    while True:
+        now = time.perf_counter()
+        if now >= deadline:
+            break
+        if now < next_sample:
+            time.sleep(next_sample - now)
+        frames = sys._current_frames()
+        for thread_id, frame in frames.items():
+            if thread_id in exclude:
+                continue
+            if not include_idle and _is_idle(frame):
+                idle += 1
+            else:
+                stacks[_stack(frame)] += 1
+        # Drop frame references so locals of sampled threads are not kept alive
+        frames = frame = None
+        samples += 1
+        # Skip missed ticks instead of sampling back-to-back to catch up
+        next_sample = max(next_sample + interval, now + interval)
+
+    return {'stacks': stacks, 'idle_samples': idle, 'samples': samples, 'elapsed_seconds': time.perf_counter() - started}
+
+
+def collapsed_stacks(stacks: Counter) -> str:
+    """Render stack counts in the collapsed (folded) flamegraph format."""
+    return ''.join(f"{';'.join(stack)} {count}\n" for stack, count in stacks.most_common())
+
+
+def top_functions(stacks: Counter, n: int = 20) -> List[Dict]:
+    """
+    Summarize functions by self samples (function on top of the stack) and
+    total samples (function anywhere on the stack, counted once per stack).
+    """
+    self_counts = Counter()
+    total_counts = Counter()
+    for stack, count in stacks.items():
+        if not stack:
+            continue
+        self_counts[stack[-1]] += count
+        for label in set(stack):
+            total_counts[label] += count
+
+    n_samples = sum(stacks.values()) or 1
+    ranked = sorted(total_counts, key=lambda label: (self_counts[label], total_counts[label]), reverse=True)
+    return [
+        {
+            'function': label,
+            'self_samples': self_counts[label],
+            'total_samples': total_counts[label],
+            'self_percent': round(100.0 * self_counts[label] / n_samples, 2),
+            'total_percent': round(100.0 * total_counts[label] / n_samples, 2),
+        }
+        for label in ranked[:n]
+    ]
+
+
+def run_profile(
+    seconds: float,
+    interval: float,
+    top: int = 20,
+    exclude: Optional[Iterable[int]] = None,
+    include_idle: bool = False
+) -> Dict:
+    """
+    Profile this process unless another profile is already running.
+
+    Raises:
+        ProfilerBusyError: If a profile is in progress in this process
+    """
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusyError("A profile is already running in this worker")
+    try:
+        result = sample_stacks(seconds, interval, exclude or (), include_idle)
+    finally:
+        _profile_lock.release()
+
+    stacks = result['stacks']
+    return {
+        'samples': result['samples'],
+        'elapsed_seconds': round(result['elapsed_seconds'], 3),
+        'interval_ms': interval * 1000,
+        'thread_samples': sum(stacks.values()),
+        'idle_thread_samples': result['idle_samples'],
+        'top_functions': top_functions(stacks, top),
+        'collapsed': collapsed_stacks(stacks),
+    }
@@ -0,0 +1,196 @@
+"""
+Priority-aware scheduling of scoring work inside a serving worker
+
+Request threads do not score directly; they hand their feature matrix to a
+small set of executor threads through two bounded lanes:
+- 'interactive': single predictions and small batches, run whole.
+- 'bulk': large batches, split into cooperative chunks.
+
+Executors always take interactive work first and only pick up the next bulk
+chunk when the interactive lane is empty, so an interactive row waits at
+most for the chunk in progress rather than for a whole bulk batch. Some
+executors can be reserved for interactive work only. A full lane rejects new
+work immediately instead of queueing without bound.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, InvalidStateError
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+PRIORITIES = ('interactive', 'bulk')
+
+
+class LaneFullError(RuntimeError):
+    """Raised when a priority lane has no room for more work."""
+
+    def __init__(self, priority: str):
+        super().__init__(f"The {priority} lane is full")
+        self.priority = priority
+
+
+class _Job:
+    __slots__ = ('priority', 'fn', 'X', 'chunk_rows', 'next_row', 'parts', 'future', 'enqueued_at', 'started_at')
+
+    def __init__(self, priority, fn, X, chunk_rows):
+        self.priority = priority
+        self.fn = fn
+        self.X = X
+        self.chunk_rows = chunk_rows
+        self.next_row = 0
+        self.parts = []
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+        self.started_at = None
+
+
+class PriorityScheduler:
+    """Runs scoring jobs from an interactive and a bulk lane on executor threads."""
+
+    def __init__(
+        self,
+        n_executors: int = 2,
+        reserved_interactive: int = 1,
+        bulk_chunk_rows: int = 2000,
+        max_queued: Optional[Dict[str, int]] = None,
+        on_start: Optional[Callable[[str, float], None]] = None,
+        on_chunk: Optional[Callable[[str, int, float], None]] = None
+    ):
+        """
+        Args:
+            n_executors: Executor threads
+            reserved_interactive: Executors that only run interactive work
+            bulk_chunk_rows: Rows per bulk chunk
+            max_queued: Jobs waiting per lane before submissions are rejected
+            on_start: Callback receiving (priority, queue wait seconds) when
+                a job starts running
+            on_chunk: Callback receiving (priority, rows, seconds) per
+                executed chunk
+        """
+        if n_executors < 1 or not 0 <= reserved_interactive < n_executors:
+            raise ValueError("Need at least one executor that can run bulk work")
+        self.n_executors = n_executors
+        self.reserved_interactive = reserved_interactive
+        self.bulk_chunk_rows = bulk_chunk_rows
+        self.max_queued = {'interactive': 256, 'bulk': 16, **(max_queued or {})}
+        self.on_start = on_start
+        self.on_chunk = on_chunk
+        self.pid = os.getpid()
+        self._lanes = {priority: deque() for priority in PRIORITIES}
+        self._condition = threading.Condition()
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._run, args=(i < reserved_interactive,),
+                             name=f'scoring-executor-{i}', daemon=True)
+            for i in range(n_executors)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def queue_depth(self, priority: str) -> int:
+        return len(self._lanes[priority])
+
+    def submit(self, priority: str, fn: Callable[[np.ndarray], Tuple[np.ndarray, ...]], X: np.ndarray) -> Future:
+        """
+        Queue fn(X) in a lane; bulk work runs as fn over row chunks of X.
+
+        fn must return a tuple of arrays with one row per input row; chunk
+        results are concatenated.
+
+        Raises:
+            LaneFullError: If the lane already holds max_queued jobs
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"priority must be one of {PRIORITIES}, got {priority!r}")
+        chunk_rows = self.bulk_chunk_rows if priority == 'bulk' else max(len(X), 1)
+        job = _Job(priority, fn, X, chunk_rows)
+        with self._condition:
+            lane = self._lanes[priority]
+            if len(lane) >= self.max_queued[priority]:
+                raise LaneFullError(priority)
+            lane.append(job)
+            self._condition.notify_all()
+        return job.future
+
+    def run(self, priority: str, fn: Callable[[np.ndarray], Tuple[np.ndarray, ...]], X: np.ndarray):
+        """Submit and wait for the result."""
+        return self.submit(priority, fn, X).result()
+
+    def _take_chunk(self, interactive_only: bool):
+        """Pick the next (job, row slice); bulk jobs stay queued between chunks."""
+        interactive = self._lanes['interactive']
+        if interactive:
+            return interactive.popleft(), True
+        bulk = self._lanes['bulk']
+        if bulk and not interactive_only:
+            return bulk[0], False
+        return None, False
+
+    def _run(self, interactive_only: bool):
+        while True:
+            with self._condition:
+                while True:
+                    if self._closed:
+                        return
+                    job, whole = self._take_chunk(interactive_only)
+                    if job is not None:
+                        break
+                    self._condition.wait()
+                start_row = job.next_row
+                stop_row = len(job.X) if whole else min(start_row + job.chunk_rows, len(job.X))
+                job.next_row = stop_row
+                first = job.started_at is None
+                if first:
+                    job.started_at = time.perf_counter()
+                if not whole and stop_row >= len(job.X):
+                    # Last chunk claimed: other executors move on to the next job
+                    self._lanes['bulk'].popleft()
+
+            try:
+                self._execute(job, start_row, stop_row, first)
+            except Exception as e:
+                # Nothing raised for one job may stop an executor
+                self._fail(job, e)
+
+    def _execute(self, job: _Job, start_row: int, stop_row: int, first: bool):
+        """Score one claimed chunk and resolve the job once all its chunks are in."""
+        if first and self.on_start is not None:
+            self.on_start(job.priority, job.started_at - job.enqueued_at)
+        if job.future.done():
+            return
+
+        started = time.perf_counter()
+        part = job.fn(job.X[start_row:stop_row])
+        seconds = time.perf_counter() - started
+
+        if self.on_chunk is not None:
+            self.on_chunk(job.priority, stop_row - start_row, seconds)
+        with self._condition:
+            job.parts.append((start_row, part))
+            done = sum(len(p[1][0]) for p in job.parts) >= len(job.X)
+        if done:
+            parts = [p for _, p in sorted(job.parts, key=lambda item: item[0])]
+            job.future.set_result(tuple(np.concatenate(arrays) for arrays in zip(*parts)))
+
+    def _fail(self, job: _Job, error: Exception):
+        """Fail a job and drop its remaining bulk chunks."""
+        with self._condition:
+            if self._lanes['bulk'] and self._lanes['bulk'][0] is job:
+                self._lanes['bulk'].popleft()
+        try:
+            job.future.set_exception(error)
+        except InvalidStateError:
+            # Another chunk of the job failed first
+            pass
+
+    def close(self):
+        """Stop the executor threads once the work in progress finishes."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
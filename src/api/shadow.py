@@ -0,0 +1,124 @@
+"""
+Shadow-model evaluation off the request path
+
+Feature matrices scored by the primary model are copied onto a bounded queue
+together with the primary probabilities. A background thread drains the
+queue, scores the shadow model on coalesced batches and reports label
+agreement, probability deltas and shadow latency through a callback. When
+the queue is full new work is dropped, so the shadow model can never slow
+down or block live traffic.
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Callable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class ShadowEvaluator:
+    """Scores a shadow model on copies of live traffic in the background."""
+
+    def __init__(
+        self,
+        shadow_model,
+        max_queue: int = 1000,
+        max_batch_rows: int = 512,
+        on_batch: Optional[Callable[[np.ndarray, np.ndarray, float], None]] = None,
+        on_drop: Optional[Callable[[int], None]] = None
+    ):
+        """
+        Args:
+            shadow_model: Fitted model with predict_proba() and classes_
+            max_queue: Pending primary calls kept before new ones are dropped
+            max_batch_rows: Rows scored per shadow call at most
+            on_batch: Callback receiving (label agreement mask, absolute
+                disease probability deltas, shadow seconds) per shadow call
+            on_drop: Callback receiving the number of rows dropped
+        """
+        self.shadow_model = shadow_model
+        self.max_batch_rows = max_batch_rows
+        self.on_batch = on_batch
+        self.on_drop = on_drop
+        self.scored_rows = 0
+        self.agreed_rows = 0
+        self.dropped_rows = 0
+        self.pid = os.getpid()
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name='shadow-model', daemon=True)
+        self._thread.start()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, features: np.ndarray, primary_proba: np.ndarray) -> bool:
+        """
+        Queue a scored batch for shadow evaluation without blocking.
+
+        Returns:
+            True if queued, False if dropped because the queue is full
+        """
+        try:
+            # Copies: callers reuse their feature buffers
+            self._queue.put_nowait((np.array(features, dtype=np.float64), np.array(primary_proba)))
+        except queue.Full:
+            self.dropped_rows += len(features)
+            if self.on_drop is not None:
+                self.on_drop(len(features))
+            return False
+        return True
+
+    def _next_batch(self):
+        items = [self._queue.get()]
+        if items[0] is None:
+            return None
+        rows = len(items[0][0])
+        # Coalesce whatever is already waiting, up to max_batch_rows
+        while rows < self.max_batch_rows:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            items.append(item)
+            rows += len(item[0])
+        return np.vstack([X for X, _ in items]), np.vstack([proba for _, proba in items])
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            X, primary_proba = batch
+            try:
+                start = time.perf_counter()
+                shadow_proba = self.shadow_model.predict_proba(X)
+                seconds = time.perf_counter() - start
+            except Exception as e:
+                logger.error(f"Shadow model scoring failed: {e}")
+                continue
+
+            agree = np.argmax(shadow_proba, axis=1) == np.argmax(primary_proba, axis=1)
+            deltas = np.abs(shadow_proba[:, 1] - primary_proba[:, 1])
+            self.scored_rows += len(X)
+            self.agreed_rows += int(agree.sum())
+            if self.on_batch is not None:
+                self.on_batch(agree, deltas, seconds)
+
+    @property
+    def agreement_rate(self) -> Optional[float]:
+        """Fraction of shadow-scored rows whose label matched the primary."""
+        return self.agreed_rows / self.scored_rows if self.scored_rows else None
+
+    def close(self, timeout: Optional[float] = None):
+        """Finish queued work and stop the background thread."""
+        self._queue.put(None)
+        self._thread.join(timeout)
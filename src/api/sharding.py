@@ -0,0 +1,144 @@
+"""
+Parallel sharded scoring for very large batch requests
+
+A persistent process pool is forked from the serving worker once the model
+is loaded, so every pool process shares the model pages copy-on-write. Large
+batches are copied once into a shared-memory block, split into row shards
+(smaller ones for batches that would not fill every process) and scored in
+parallel; each pool process writes its probabilities into a
+shared output block at the shard's row offset, so no feature or result
+arrays are pickled and results come back in the original row order.
+"""
+
+import logging
+import multiprocessing
+import os
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Model used by pool processes, inherited from the parent at fork time
+_worker_model = None
+
+
+def _init_worker(model):
+    global _worker_model
+    _worker_model = model
+
+
+def _score_shard(task: Tuple[str, str, int, int, int, int]) -> Tuple[int, int, float]:
+    """Score rows [start, stop) of the shared input into the shared output."""
+    input_name, output_name, n_rows, n_features, start, stop = task
+    started = time.perf_counter()
+
+    input_block = shared_memory.SharedMemory(name=input_name)
+    output_block = shared_memory.SharedMemory(name=output_name)
+    try:
+        X = np.ndarray((n_rows, n_features), dtype=np.float64, buffer=input_block.buf)
+        out = np.ndarray((n_rows, 2), dtype=np.float64, buffer=output_block.buf)
+        out[start:stop] = _worker_model.predict_proba(X[start:stop])
+        del X, out
+    finally:
+        input_block.close()
+        output_block.close()
+
+    return start, stop, time.perf_counter() - started
+
+
+class ShardedScorer:
+    """
+    Scores large feature matrices across a persistent process pool.
+
+    The pool is created on construction; build the scorer before the
+    serving process starts request threads so the fork is safe.
+    """
+
+    def __init__(
+        self,
+        model,
+        n_workers: int,
+        shard_size: int,
+        on_batch: Optional[Callable[[List[float], float], None]] = None
+    ):
+        """
+        Args:
+            model: Fitted model (or inference engine) with predict_proba()
+            n_workers: Number of pool processes
+            shard_size: Maximum rows per shard
+            on_batch: Callback receiving (per-shard seconds, wall seconds)
+                for every sharded batch
+        """
+        if n_workers < 1:
+            raise ValueError("n_workers must be at least 1")
+        if shard_size < 1:
+            raise ValueError("shard_size must be at least 1")
+
+        self.model = model
+        self.n_workers = n_workers
+        self.shard_size = shard_size
+        self.on_batch = on_batch
+        self._pid = os.getpid()
+        self._pool = self._start_pool()
+
+    def _start_pool(self):
+        # Start the resource tracker before forking so pool processes share
+        # it; blocks they attach to are then only tracked (and unlinked)
+        # once, by this process
+        resource_tracker.ensure_running()
+        context = multiprocessing.get_context('fork')
+        logger.info(f"Starting shard pool with {self.n_workers} processes")
+        return context.Pool(self.n_workers, initializer=_init_worker, initargs=(self.model,))
+
+    def predict_proba(self, X) -> np.ndarray:
+        """
+        Predict class probabilities shard by shard in the pool.
+
+        Args:
+            X: Feature matrix of shape (n_samples, n_features)
+
+        Returns:
+            Probabilities of shape (n_samples, 2), in input row order
+        """
+        if os.getpid() != self._pid:
+            # Forked after construction: the pool belongs to the parent
+            self._pid = os.getpid()
+            self._pool = self._start_pool()
+
+        X = np.asarray(X, dtype=np.float64)
+        n_rows, n_features = X.shape
+        started = time.perf_counter()
+
+        input_block = shared_memory.SharedMemory(create=True, size=max(X.nbytes, 1))
+        output_block = shared_memory.SharedMemory(create=True, size=max(n_rows * 2 * 8, 1))
+        try:
+            shared_X = np.ndarray(X.shape, dtype=np.float64, buffer=input_block.buf)
+            shared_X[:] = X
+            # Small batches (e.g. one bulk chunk) are still spread over every process
+            shard_size = max(min(self.shard_size, -(-n_rows // self.n_workers)), 1)
+            tasks = [
+                (input_block.name, output_block.name, n_rows, n_features, start, min(start + shard_size, n_rows))
+                for start in range(0, n_rows, shard_size)
+            ]
+            shard_results = self._pool.map(_score_shard, tasks, chunksize=1)
+            proba = np.ndarray((n_rows, 2), dtype=np.float64, buffer=output_block.buf).copy()
+            del shared_X
+        finally:
+            input_block.close()
+            input_block.unlink()
+            output_block.close()
+            output_block.unlink()
+
+        if self.on_batch is not None:
+            self.on_batch([seconds for _, _, seconds in shard_results], time.perf_counter() - started)
+        return proba
+
+    def close(self):
+        """Stop the pool processes."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
@@ -0,0 +1,528 @@
+"""
+Python client for the Heart Disease Prediction API
+
+HeartDiseaseClient (requests) and AsyncHeartDiseaseClient (aiohttp, optional)
+keep a persistent connection pool per client. Single predictions submitted
+through submit()/predict_coalesced() are coalesced into /batch_predict calls
+bounded by batch size and by the latency budget of the oldest pending row.
+Batches use the columnar format when the server advertises it; a batch with
+a sample missing a feature is sent as rows, so that sample gets the server's
+"Missing features" error. Failed calls (connection errors, 429 and 5xx
+gateway statuses) are retried with full-jitter exponential backoff, honouring
+Retry-After when the server sends one.
+Sidecar callers can pass unix_socket to talk to a launcher started with
+--uds instead of going through TCP.
+
+Usage:
+    with HeartDiseaseClient('http://localhost:8000') as client:
+        futures = [client.submit(sample) for sample in samples]
+        results = [f.result() for f in futures]
+"""
+
+import asyncio
+import json
+import queue
+import random
+import socket
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, List, Optional, Sequence
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+FEATURES = [
+    'age', 'sex', 'cp', 'trestbps', 'chol', 'fbs',
+    'restecg', 'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal'
+]
+
+RETRY_STATUSES = (429, 502, 503, 504)
+
+_STOP = object()
+
+
+class PredictionError(Exception):
+    """Raised when the API rejects a request or a single sample."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, payload: Optional[dict] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.payload = payload or {}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def retry_delay(attempt: int, retry_after: Optional[float], backoff: float, max_backoff: float) -> float:
+    """
+    Seconds to wait before retry number `attempt` (0-based).
+
+    Retry-After wins when present; otherwise full jitter over an exponential
+    envelope, which spreads retries from many clients apart.
+    """
+    if retry_after is not None:
+        return min(retry_after, max_backoff)
+    return random.uniform(0, min(max_backoff, backoff * 2 ** attempt))
+
+
+def _response_error(status_code: int, text: str) -> PredictionError:
+    """
+    PredictionError for an error response.
+
+    The body is the API's JSON error when it decodes, otherwise text such as
+    a proxy's HTML error page, kept in the payload under 'body'.
+    """
+    try:
+        body = json.loads(text)
+    except ValueError:
+        body = None
+    if not isinstance(body, dict):
+        return PredictionError(f"Request failed with status {status_code}", status_code, {'body': text})
+    return PredictionError(body.get('message') or body.get('error', 'Request failed'), status_code, body)
+
+
+def samples_to_columns(samples: Sequence[dict]) -> Dict[str, list]:
+    """Transpose row samples into the columnar request layout."""
+    return {f: [sample.get(f) for sample in samples] for f in FEATURES}
+
+
+def columnar_to_rows(body: dict, n_samples: int) -> List[dict]:
+    """Expand a columnar /batch_predict response into per-sample dictionaries."""
+    rows = [None] * n_samples
+    for error in body.get('errors', []):
+        rows[error['sample_index']] = error
+
+    columns = body['columns']
+    for k, idx in enumerate(columns['sample_index']):
+        row = {'sample_index': idx}
+        for name, values in columns.items():
+            if name.startswith('confidence_'):
+                row.setdefault('confidence', {})[name[len('confidence_'):]] = values[k]
+            elif name != 'sample_index':
+                row[name] = values[k]
+        rows[idx] = row
+    return rows
+
+
+def _batch_payload(samples: Sequence[dict], columnar: bool, fields: Optional[Sequence[str]]) -> dict:
+    # Columns cannot represent a missing feature; the rows format reports it per sample
+    columnar = columnar and all(isinstance(sample, dict) and all(f in sample for f in FEATURES) for sample in samples)
+    payload = {'columns': samples_to_columns(samples)} if columnar else {'samples': list(samples)}
+    if fields is not None:
+        payload['fields'] = list(fields)
+    return payload
+
+
+def _batch_results(body: dict, n_samples: int) -> List[dict]:
+    if 'columns' in body:
+        return columnar_to_rows(body, n_samples)
+    return body['predictions']
+
+
+def _resolve(future, row: dict):
+    if 'error' in row:
+        future.set_exception(PredictionError(row['error'], payload=row))
+    else:
+        future.set_result(row)
+
+
+class _UnixSocketConnection(HTTPConnection):
+    socket_path = None
+
+    def _new_conn(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if isinstance(self.timeout, (int, float)):
+            sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        return sock
+
+
+class UnixSocketAdapter(HTTPAdapter):
+    """requests adapter sending every request over one Unix domain socket."""
+
+    def __init__(self, socket_path: str, **kwargs):
+        connection_cls = type('UnixSocketConnection', (_UnixSocketConnection,), {'socket_path': socket_path})
+        self._pool_cls = type('UnixSocketConnectionPool', (HTTPConnectionPool,), {'ConnectionCls': connection_cls})
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': self._pool_cls, 'https': self._pool_cls}
+
+
+class _Coalescer:
+    """Background thread turning submitted rows into bounded batches."""
+
+    def __init__(self, send_batch: Callable[[List[dict]], List[dict]], max_batch_size: int,
+                 max_delay: float, max_in_flight: int):
+        self.send_batch = send_batch
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._queue = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_in_flight, thread_name_prefix='prediction-batch')
+        self._thread = threading.Thread(target=self._run, name='prediction-coalescer', daemon=True)
+        self._thread.start()
+
+    def submit(self, sample: dict) -> Future:
+        future = Future()
+        self._queue.put((sample, future))
+        return future
+
+    def _run(self):
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            # The latency budget starts with the oldest row in the batch
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._executor.submit(self._dispatch, batch)
+
+    def _dispatch(self, batch):
+        # Futures cancelled by the caller are not sent; the rest can no longer be cancelled
+        batch = [(sample, future) for sample, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        try:
+            rows = self.send_batch([sample for sample, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), row in zip(batch, rows):
+            _resolve(future, row)
+
+    def close(self):
+        """Flush pending rows and stop the background thread."""
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._executor.shutdown(wait=True)
+
+
+class HeartDiseaseClient:
+    """Synchronous client backed by a pooled requests.Session."""
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 30.0,
+        pool_size: int = 10,
+        max_retries: int = 3,
+        backoff: float = 0.1,
+        max_backoff: float = 10.0,
+        max_batch_size: int = 500,
+        max_delay_ms: float = 10.0,
+        max_in_flight: int = 4,
+        columnar: Optional[bool] = None,
+        unix_socket: Optional[str] = None
+    ):
+        """
+        Args:
+            base_url: API root, e.g. http://localhost:8000
+            timeout: Per-request timeout in seconds
+            pool_size: Keep-alive connections kept per host
+            max_retries: Retries after the first attempt
+            backoff: Base of the exponential backoff in seconds
+            max_backoff: Upper bound of any single retry wait in seconds
+            max_batch_size: Rows per coalesced /batch_predict call
+            max_delay_ms: Longest time a submitted row waits for its batch
+            max_in_flight: Concurrent coalesced batch requests
+            columnar: Force the batch format; None detects server support
+            unix_socket: Connect through this Unix domain socket; the host
+                in base_url is then only used for the Host header
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000.0
+        self.max_in_flight = max_in_flight
+        self._columnar = columnar
+
+        self.session = requests.Session()
+        pool_maxsize = max(pool_size, max_in_flight)
+        if unix_socket:
+            adapter = UnixSocketAdapter(unix_socket, pool_connections=1, pool_maxsize=pool_maxsize)
+        else:
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._coalescer = None
+        self._lock = threading.Lock()
+
+    def _request(self, method: str, path: str, **kwargs) -> dict:
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                response = self.session.request(method, self.base_url + path, timeout=self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    if response.status_code >= 400:
+                        raise _response_error(response.status_code, response.text)
+                    return response.json()
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            time.sleep(retry_delay(attempt, retry_after, self.backoff, self.max_backoff))
+
+    @property
+    def columnar(self) -> bool:
+        """Whether batches are sent in the columnar format."""
+        if self._columnar is None:
+            info = self.model_info()
+            self._columnar = 'columnar' in info.get('batch_formats', [])
+        return self._columnar
+
+    def model_info(self) -> dict:
+        """Return the /model/info document."""
+        return self._request('GET', '/model/info')
+
+    def predict(self, sample: dict) -> dict:
+        """Score one sample with a dedicated /predict call."""
+        return self._request('POST', '/predict', json=sample)
+
+    def predict_batch(self, samples: Sequence[dict], fields: Optional[Sequence[str]] = None) -> List[dict]:
+        """
+        Score samples with /batch_predict, split into max_batch_size calls.
+
+        Returns:
+            One dictionary per sample, in order; failed samples carry 'error'
+        """
+        results = []
+        for start in range(0, len(samples), self.max_batch_size):
+            chunk = samples[start:start + self.max_batch_size]
+            body = self._request('POST', '/batch_predict', json=_batch_payload(chunk, self.columnar, fields))
+            rows = _batch_results(body, len(chunk))
+            for row in rows:
+                if 'sample_index' in row:
+                    row['sample_index'] += start
+            results.extend(rows)
+        return results
+
+    def submit(self, sample: dict) -> Future:
+        """Queue one sample for coalesced scoring; returns a Future of its result."""
+        with self._lock:
+            if self._coalescer is None:
+                self._coalescer = _Coalescer(self.predict_batch, self.max_batch_size, self.max_delay, self.max_in_flight)
+        return self._coalescer.submit(sample)
+
+    def close(self):
+        """Flush coalesced rows and close pooled connections."""
+        with self._lock:
+            if self._coalescer is not None:
+                self._coalescer.close()
+                self._coalescer = None
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AsyncHeartDiseaseClient:
+    """asyncio client backed by a pooled aiohttp.ClientSession."""
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 30.0,
+        pool_size: int = 10,
+        max_retries: int = 3,
+        backoff: float = 0.1,
+        max_backoff: float = 10.0,
+        max_batch_size: int = 500,
+        max_delay_ms: float = 10.0,
+        max_in_flight: int = 4,
+        columnar: Optional[bool] = None,
+        unix_socket: Optional[str] = None
+    ):
+        """Arguments match HeartDiseaseClient."""
+        if aiohttp is None:
+            raise ImportError("AsyncHeartDiseaseClient requires the aiohttp package")
+
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000.0
+        self.max_in_flight = max_in_flight
+        self._columnar = columnar
+        self.unix_socket = unix_socket
+
+        self._session = None
+        self._queue = None
+        self._worker = None
+        self._in_flight = None
+        self._pending = set()
+
+    @property
+    def session(self):
+        if self._session is None:
+            limit = max(self.pool_size, self.max_in_flight)
+            if self.unix_socket:
+                connector = aiohttp.UnixConnector(path=self.unix_socket, limit=limit)
+            else:
+                connector = aiohttp.TCPConnector(limit=limit)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+
+    async def _request(self, method: str, path: str, **kwargs) -> dict:
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                async with self.session.request(method, self.base_url + path, **kwargs) as response:
+                    if response.status not in RETRY_STATUSES or attempt == self.max_retries:
+                        if response.status >= 400:
+                            raise _response_error(response.status, await response.text())
+                        return await response.json(content_type=None)
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt == self.max_retries:
+                    raise
+            await asyncio.sleep(retry_delay(attempt, retry_after, self.backoff, self.max_backoff))
+
+    async def columnar(self) -> bool:
+        """Whether batches are sent in the columnar format."""
+        if self._columnar is None:
+            info = await self.model_info()
+            self._columnar = 'columnar' in info.get('batch_formats', [])
+        return self._columnar
+
+    async def model_info(self) -> dict:
+        """Return the /model/info document."""
+        return await self._request('GET', '/model/info')
+
+    async def predict(self, sample: dict) -> dict:
+        """Score one sample with a dedicated /predict call."""
+        return await self._request('POST', '/predict', json=sample)
+
+    async def predict_batch(self, samples: Sequence[dict], fields: Optional[Sequence[str]] = None) -> List[dict]:
+        """Score samples with /batch_predict; see HeartDiseaseClient.predict_batch."""
+        columnar = await self.columnar()
+        results = []
+        for start in range(0, len(samples), self.max_batch_size):
+            chunk = samples[start:start + self.max_batch_size]
+            body = await self._request('POST', '/batch_predict', json=_batch_payload(chunk, columnar, fields))
+            rows = _batch_results(body, len(chunk))
+            for row in rows:
+                if 'sample_index' in row:
+                    row['sample_index'] += start
+            results.extend(rows)
+        return results
+
+    async def predict_coalesced(self, sample: dict) -> dict:
+        """Score one sample through a coalesced /batch_predict call."""
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._in_flight = asyncio.Semaphore(self.max_in_flight)
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((sample, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stop = False
+        while not stop:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            await self._in_flight.acquire()
+            task = loop.create_task(self._dispatch(batch))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def _dispatch(self, batch):
+        try:
+            rows = await self.predict_batch([sample for sample, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._in_flight.release()
+        for (_, future), row in zip(batch, rows):
+            if not future.done():
+                _resolve(future, row)
+
+    async def close(self):
+        """Flush coalesced rows and close pooled connections."""
+        if self._worker is not None:
+            await self._queue.put(_STOP)
+            await self._worker
+            if self._pending:
+                await asyncio.gather(*self._pending)
+            self._worker = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
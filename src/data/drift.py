@@ -0,0 +1,229 @@
+"""
+Feature drift statistics against a training-time reference profile
+
+The reference profile is built from the raw (unscaled) training features by
+preprocess_data() and stored as JSON:
+- numeric features: mean, std and decile bin edges with the training
+  fraction of rows per bin
+- categorical features (few integer values): the training categories and
+  their fractions, plus an "other" bin for unseen values
+
+FeatureDriftMonitor keeps streaming statistics of served features in the
+same bins: Welford mean/variance (merged per batch), histogram counts and
+category counts. All features are updated together with a handful of numpy
+operations per batch. It is a Prometheus collector: means, standard
+deviations, bin counts and PSI/KS drift scores are computed at scrape time,
+not per request.
+"""
+
+import json
+import threading
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# Integer-valued features with at most this many values are categorical
+MAX_CATEGORIES = 10
+NUMERIC_BINS = 10
+
+# Fraction floor so empty bins do not make PSI infinite
+PSI_EPSILON = 1e-4
+
+
+def build_reference_profile(X, features: Optional[Sequence[str]] = None) -> Dict:
+    """
+    Build the reference profile of a feature matrix.
+
+    Args:
+        X: Raw training features (DataFrame or array)
+        features: Column names when X is an array
+
+    Returns:
+        JSON-serializable profile
+    """
+    features = list(features if features is not None else X.columns)
+    X = np.asarray(X, dtype=np.float64)
+    profile = {'version': 1, 'n_samples': len(X), 'features': {}}
+    for j, feature in enumerate(features):
+        column = X[:, j]
+        values = np.unique(column)
+        entry = {'mean': float(column.mean()), 'std': float(column.std())}
+        if len(values) <= MAX_CATEGORIES and np.all(values == np.round(values)):
+            counts = np.array([(column == v).sum() for v in values])
+            entry.update({
+                'kind': 'categorical',
+                'categories': values.tolist(),
+                'fractions': (counts / len(column)).tolist() + [0.0],
+            })
+        else:
+            edges = np.unique(np.quantile(column, np.linspace(0, 1, NUMERIC_BINS + 1)[1:-1]))
+            counts = np.bincount(np.searchsorted(edges, column, side='right'), minlength=len(edges) + 1)
+            entry.update({
+                'kind': 'numeric',
+                'edges': edges.tolist(),
+                'fractions': (counts / len(column)).tolist(),
+            })
+        profile['features'][feature] = entry
+    return profile
+
+
+def save_reference_profile(profile: Dict, path: str):
+    with open(path, 'w') as f:
+        json.dump(profile, f, indent=2)
+
+
+def load_reference_profile(path: str) -> Dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def psi(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Population stability index between two bin fraction vectors."""
+    expected = np.maximum(expected, PSI_EPSILON)
+    actual = np.maximum(actual, PSI_EPSILON)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def ks_statistic(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Kolmogorov-Smirnov distance between two binned distributions."""
+    return float(np.max(np.abs(np.cumsum(actual) - np.cumsum(expected))))
+
+
+class FeatureDriftMonitor:
+    """Streaming per-feature statistics of served rows, compared to a reference profile."""
+
+    def __init__(self, profile: Dict, features: Sequence[str], prefix: str = 'heart_disease'):
+        """
+        Args:
+            profile: Reference profile from build_reference_profile()
+            features: Feature names in the column order of updated matrices
+            prefix: Prometheus metric name prefix
+        """
+        missing = [f for f in features if f not in profile['features']]
+        if missing:
+            raise ValueError(f"Reference profile lacks features {missing}")
+        self.features = list(features)
+        self.prefix = prefix
+        entries = [profile['features'][f] for f in self.features]
+        self.kinds = [entry['kind'] for entry in entries]
+        self.reference = [np.asarray(entry['fractions']) for entry in entries]
+        self.n_bins = max(len(fractions) for fractions in self.reference)
+
+        # Per-feature bin edges padded with +inf, so one broadcast comparison
+        # bins every feature; categories bin on midpoints and then unmatched
+        # values move to the trailing "other" bin
+        n_features = len(self.features)
+        self._edges = np.full((n_features, self.n_bins - 1), np.inf)
+        self._categories = np.full((n_features, self.n_bins), np.nan)
+        self._other_bin = np.zeros(n_features, dtype=np.intp)
+        self._categorical = np.array([kind == 'categorical' for kind in self.kinds])
+        self.bin_labels = []
+        for j, entry in enumerate(entries):
+            if entry['kind'] == 'categorical':
+                categories = np.asarray(entry['categories'], dtype=np.float64)
+                midpoints = (categories[1:] + categories[:-1]) / 2
+                self._edges[j, :len(midpoints)] = midpoints
+                self._categories[j, :len(categories)] = categories
+                self._other_bin[j] = len(categories)
+                self.bin_labels.append([f"{c:g}" for c in categories] + ['other'])
+            else:
+                edges = np.asarray(entry['edges'], dtype=np.float64)
+                self._edges[j, :len(edges)] = edges
+                self.bin_labels.append([f"{e:g}" for e in edges] + ['+Inf'])
+        self._offsets = np.arange(n_features) * self.n_bins
+        self._rows = np.arange(n_features)
+
+        self.count = 0
+        self._mean = np.zeros(n_features)
+        self._m2 = np.zeros(n_features)
+        self._counts = np.zeros((n_features, self.n_bins), dtype=np.int64)
+        self._flat_counts = self._counts.reshape(-1)
+        self._lock = threading.Lock()
+
+    def update(self, X: np.ndarray):
+        """Add a batch of served rows (n_rows, n_features) to the statistics."""
+        n = len(X)
+        if n == 0:
+            return
+        bins = (X[:, :, None] >= self._edges).sum(axis=2)
+        unmatched = self._categorical & (X != self._categories[self._rows, bins])
+        bins = np.where(unmatched, self._other_bin, bins)
+        flat = bins + self._offsets
+        if n == 1:
+            # A single row hits one bin per feature; skip the reductions
+            batch_mean, batch_m2 = X[0], 0.0
+        else:
+            batch_mean = X.mean(axis=0)
+            batch_m2 = ((X - batch_mean) ** 2).sum(axis=0)
+            counts = np.bincount(flat.ravel(), minlength=self._counts.size)
+        with self._lock:
+            # Chan et al. merge of the batch moments into the running ones
+            total = self.count + n
+            delta = batch_mean - self._mean
+            self._mean += delta * (n / total)
+            self._m2 += batch_m2 + delta ** 2 * (self.count * n / total)
+            self.count = total
+            if n == 1:
+                self._flat_counts[flat[0]] += 1
+            else:
+                self._flat_counts += counts
+
+    def snapshot(self) -> Dict:
+        """Per-feature statistics and drift scores of the rows seen so far."""
+        with self._lock:
+            count = self.count
+            mean = self._mean.copy()
+            m2 = self._m2.copy()
+            counts = self._counts.copy()
+        features = {}
+        for j, feature in enumerate(self.features):
+            n_bins = len(self.reference[j])
+            stats = {
+                'kind': self.kinds[j],
+                'mean': float(mean[j]) if count else None,
+                'std': float(np.sqrt(m2[j] / count)) if count else None,
+                'counts': counts[j, :n_bins].tolist(),
+                'psi': None,
+                'ks': None,
+            }
+            if count:
+                actual = counts[j, :n_bins] / count
+                stats['psi'] = psi(self.reference[j], actual)
+                if self.kinds[j] == 'numeric':
+                    stats['ks'] = ks_statistic(self.reference[j], actual)
+            features[feature] = stats
+        return {'count': count, 'features': features}
+
+    def collect(self):
+        """Prometheus collector interface."""
+        snapshot = self.snapshot()
+        rows = CounterMetricFamily(f'{self.prefix}_drift_rows', 'Rows included in the feature drift statistics')
+        rows.add_metric([], snapshot['count'])
+        mean = GaugeMetricFamily(f'{self.prefix}_feature_mean', 'Running mean of a served feature', labels=['feature'])
+        std = GaugeMetricFamily(
+            f'{self.prefix}_feature_stddev', 'Running standard deviation of a served feature', labels=['feature']
+        )
+        bins = CounterMetricFamily(
+            f'{self.prefix}_feature_bin_rows',
+            'Served rows per reference bin (upper edge, or category) of a feature',
+            labels=['feature', 'bin']
+        )
+        psi_gauge = GaugeMetricFamily(
+            f'{self.prefix}_feature_psi', 'Population stability index of a feature vs the training profile',
+            labels=['feature']
+        )
+        ks_gauge = GaugeMetricFamily(
+            f'{self.prefix}_feature_ks', 'Binned KS distance of a numeric feature vs the training profile',
+            labels=['feature']
+        )
+        for j, (feature, stats) in enumerate(snapshot['features'].items()):
+            for label, count in zip(self.bin_labels[j], stats['counts']):
+                bins.add_metric([feature, label], count)
+            if stats['mean'] is not None:
+                mean.add_metric([feature], stats['mean'])
+                std.add_metric([feature], stats['std'])
+                psi_gauge.add_metric([feature], stats['psi'])
+            if stats['ks'] is not None:
+                ks_gauge.add_metric([feature], stats['ks'])
+        return [rows, mean, std, bins, psi_gauge, ks_gauge]
@@ -7,6 +7,11 @@ import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 import pickle
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from src.data.drift import build_reference_profile, save_reference_profile
 
 def load_data(filepath='data/raw/heart.csv'):
     """Load raw data from CSV file"""
@@ -36,11 +41,13 @@ def handle_missing_values(df):
     
     return df
 
-def preprocess_data(df, test_size=0.2, random_state=42):
+def preprocess_data(df, test_size=0.2, random_state=42, reference_profile_path=None):
     """
     Preprocess the data:
     - Split features and target
     - Train/test split
+    - Save the drift reference profile of the raw training features
+      (when reference_profile_path is given)
     - Scale features
     """
     # Separate features and target
@@ -58,6 +65,11 @@ def preprocess_data(df, test_size=0.2, random_state=42):
     print(f"\nTrain set size: {X_train.shape[0]}")
     print(f"Test set size: {X_test.shape[0]}")
     
+    # Reference for serving-time drift statistics: the API sees raw features
+    if reference_profile_path:
+        save_reference_profile(build_reference_profile(X_train), reference_profile_path)
+        print(f"✓ Drift reference profile saved to {reference_profile_path}")
+    
     # Scale features
     scaler = StandardScaler()
     X_train_scaled = scaler.fit_transform(X_train)
@@ -101,7 +113,10 @@ def main():
     
     # Preprocess data
     print("\n3. Preprocessing data...")
-    X_train, X_test, y_train, y_test, scaler = preprocess_data(df)
+    os.makedirs('data/processed', exist_ok=True)
+    X_train, X_test, y_train, y_test, scaler = preprocess_data(
+        df, reference_profile_path='data/processed/reference_profile.json'
+    )
     
     # Save processed data
     print("\n4. Saving processed data...")
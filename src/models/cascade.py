@@ -0,0 +1,158 @@
+"""
+Cascade inference: logistic regression first, Random Forest on demand
+
+The linear model scores every row. Rows whose linear disease probability
+falls inside an uncertainty band are escalated to the forest, the rest keep
+the linear score. The band is fitted at training time on held-out data so
+that labels agree with forest-only serving at a target rate while escalating
+as few rows as possible.
+"""
+
+import time
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+DECISION_THRESHOLD = 0.5
+
+# Upper bound on band edge candidates per side; beyond this the search uses
+# quantiles of the linear probabilities
+MAX_BAND_CANDIDATES = 1000
+
+
+class CascadeClassifier:
+    """
+    Two-stage classifier exposing predict()/predict_proba().
+
+    Rows with linear probability in [low, high] are re-scored by the forest.
+    """
+
+    engine_name = 'cascade'
+
+    def __init__(
+        self,
+        linear_model,
+        forest,
+        low: float,
+        high: float,
+        on_score: Optional[Callable[[int, int, float, float], None]] = None
+    ):
+        """
+        Args:
+            linear_model: Fitted first-stage classifier (logistic regression)
+            forest: Fitted second-stage classifier (random forest)
+            low: Lower edge of the uncertainty band
+            high: Upper edge of the uncertainty band
+            on_score: Callback receiving (rows, escalated rows,
+                linear stage seconds, forest stage seconds) per call
+        """
+        if not low <= high:
+            raise ValueError(f"Invalid uncertainty band [{low}, {high}]")
+        if not np.array_equal(linear_model.classes_, forest.classes_):
+            raise ValueError("Cascade stages must share the same classes")
+
+        self.linear_model = linear_model
+        self.forest = forest
+        self.low = low
+        self.high = high
+        self.on_score = on_score
+        self.classes_ = forest.classes_
+        self.n_features_in_ = getattr(forest, 'n_features_in_', None)
+
+    def predict_proba_with_escalation(self, X):
+        """
+        Predict class probabilities through the cascade.
+
+        Returns:
+            Tuple of (probabilities, boolean mask of escalated rows)
+        """
+        start = time.perf_counter()
+        proba = self.linear_model.predict_proba(X)
+        disease = proba[:, 1]
+        escalated = (disease >= self.low) & (disease <= self.high)
+        linear_seconds = time.perf_counter() - start
+
+        forest_seconds = 0.0
+        n_escalated = int(escalated.sum())
+        if n_escalated:
+            start = time.perf_counter()
+            proba[escalated] = self.forest.predict_proba(np.asarray(X)[escalated])
+            forest_seconds = time.perf_counter() - start
+
+        if self.on_score is not None:
+            self.on_score(len(proba), n_escalated, linear_seconds, forest_seconds)
+        return proba, escalated
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Predict class probabilities through the cascade."""
+        return self.predict_proba_with_escalation(X)[0]
+
+    def predict(self, X) -> np.ndarray:
+        """Predict class labels through the cascade."""
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+
+def _band_candidates(values: np.ndarray, edge: float) -> np.ndarray:
+    values = np.unique(np.append(values, edge))
+    if values.size > MAX_BAND_CANDIDATES:
+        values = np.unique(np.append(np.quantile(values, np.linspace(0, 1, MAX_BAND_CANDIDATES)), edge))
+    return values
+
+
+def fit_uncertainty_band(
+    linear_disease_proba: np.ndarray,
+    forest_labels: np.ndarray,
+    target_agreement: float = 0.99
+) -> Dict[str, float]:
+    """
+    Find the narrowest band around the decision threshold meeting a target
+    label agreement with forest-only serving.
+
+    Rows outside [low, high] keep the linear label; rows inside are escalated
+    and agree by construction. Counts below/above each candidate edge are
+    separable, so every (low, high) pair is evaluated in one vectorized pass.
+
+    Args:
+        linear_disease_proba: Linear model disease probabilities on validation data
+        forest_labels: Forest labels on the same rows
+        target_agreement: Minimum fraction of rows whose cascade label must
+            match the forest label
+
+    Returns:
+        Dictionary with low, high, agreement, escalation_rate,
+        target_agreement and n_samples
+    """
+    p = np.asarray(linear_disease_proba, dtype=np.float64)
+    n = p.size
+    if n == 0:
+        raise ValueError("Cannot fit an uncertainty band on empty data")
+
+    disagree = (p > DECISION_THRESHOLD).astype(int) != np.asarray(forest_labels).astype(int)
+
+    order = np.argsort(p, kind='stable')
+    p_sorted = p[order]
+    cum_disagree = np.concatenate([[0], np.cumsum(disagree[order])])
+
+    lows = _band_candidates(p[p <= DECISION_THRESHOLD], DECISION_THRESHOLD)
+    highs = _band_candidates(p[p >= DECISION_THRESHOLD], DECISION_THRESHOLD)
+
+    # Rows kept by the linear stage: p < low and p > high
+    below = np.searchsorted(p_sorted, lows, side='left')
+    above_start = np.searchsorted(p_sorted, highs, side='right')
+    kept = below[:, None] + (n - above_start)[None, :]
+    kept_disagree = cum_disagree[below][:, None] + (cum_disagree[-1] - cum_disagree[above_start])[None, :]
+
+    agreement = 1.0 - kept_disagree / n
+    escalated = n - kept
+    # Infeasible pairs can never win; ties prefer higher agreement
+    cost = np.where(agreement >= target_agreement, escalated - agreement, np.inf)
+    i, j = np.unravel_index(np.argmin(cost), cost.shape)
+
+    return {
+        'low': float(lows[i]),
+        'high': float(highs[j]),
+        'agreement': float(agreement[i, j]),
+        'escalation_rate': float(escalated[i, j] / n),
+        'target_agreement': target_agreement,
+        'n_samples': int(n),
+    }
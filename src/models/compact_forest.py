@@ -0,0 +1,333 @@
+"""
+Compact reduced-precision representation of a fitted Random Forest
+
+All trees are flattened into shared node arrays:
+- feature:   uint8 feature id (13 features fit comfortably)
+- threshold: float32 split threshold
+- left/right: int32 child indices into the shared arrays
+- value:     float32 probability of the positive class at leaves
+
+sklearn nodes carry int64 children/feature, float64 threshold, impurity and
+sample counts plus a float64 class-count array per node. The compact layout
+keeps only what inference needs.
+
+Thresholds are rounded *down* to float32. sklearn compares float32 inputs
+against float64 thresholds, and for any float32 x, x <= t holds exactly when
+x <= (largest float32 <= t), so routing is unchanged; the only difference is
+float32 rounding of leaf probabilities.
+
+Usage:
+    python -m src.models.compact_forest models/best_model.pkl [--output models/best_model_compact.npz]
+"""
+
+import argparse
+import json
+import pickle
+import sys
+from typing import Dict
+
+import numpy as np
+
+# Maximum absolute difference in predicted probabilities accepted by validate()
+DEFAULT_TOLERANCE = 1e-6
+
+PREDICT_CHUNK_ROWS = 256
+
+
+def canonical_subtree_ids(left, right, feature, threshold, proba) -> np.ndarray:
+    """
+    Assign ids such that two nodes share an id iff their subtrees predict
+    identically by construction.
+
+    Nodes must be ordered so that children follow their parent (true for
+    sklearn trees). A split whose children share an id takes that id.
+
+    Args:
+        left, right: Child indices (-1 marks a leaf in sklearn trees)
+        feature, threshold: Split definition per node
+        proba: Leaf probabilities, shape (n_nodes, n_classes)
+
+    Returns:
+        Canonical id per node
+    """
+    n_nodes = len(left)
+    canon = np.empty(n_nodes, dtype=np.int64)
+    ids = {}
+    for node in range(n_nodes - 1, -1, -1):
+        if left[node] == -1 or left[node] == node:
+            key = ('leaf',) + tuple(proba[node].tolist())
+        else:
+            canon_left, canon_right = canon[left[node]], canon[right[node]]
+            if canon_left == canon_right:
+                canon[node] = canon_left
+                continue
+            key = (int(feature[node]), float(threshold[node]), int(canon_left), int(canon_right))
+        canon[node] = ids.setdefault(key, len(ids))
+    return canon
+
+
+class CompactForest:
+    """
+    Flattened float32 forest exposing predict()/predict_proba().
+
+    Leaves point to themselves, which marks them without a separate flag and
+    lets traversal advance all (row, tree) pairs in vectorized steps.
+    """
+
+    engine_name = 'compact'
+
+    def __init__(self, feature, threshold, left, right, value, roots, classes, n_features, max_depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.classes_ = np.asarray(classes)
+        self.n_features_in_ = int(n_features)
+        self.max_depth = int(max_depth)
+
+    @classmethod
+    def from_sklearn(cls, forest, deduplicate: bool = False) -> 'CompactForest':
+        """
+        Build a compact forest from a fitted binary RandomForestClassifier.
+
+        Args:
+            forest: Fitted RandomForestClassifier
+            deduplicate: Merge identical leaves and subtrees across all trees
+                (and collapse same-outcome splits), turning the node arrays
+                into a shared DAG
+
+        Returns:
+            CompactForest with identical routing
+        """
+        if len(forest.classes_) != 2:
+            raise ValueError("Compact forests support binary classifiers only")
+        if forest.n_features_in_ > np.iinfo(np.uint8).max:
+            raise ValueError("Compact forests support at most 255 features")
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(n_nodes)
+            is_leaf = tree.children_left == -1
+
+            counts = tree.value[:, 0, :]
+            proba = counts[:, 1] / counts.sum(axis=1)
+
+            threshold = tree.threshold.astype(np.float32)
+            rounded_up = threshold.astype(np.float64) > tree.threshold
+            threshold[rounded_up] = np.nextafter(threshold[rounded_up], np.float32(-np.inf))
+
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.uint8))
+            thresholds.append(np.where(is_leaf, 0, threshold).astype(np.float32))
+            lefts.append((np.where(is_leaf, node_ids, tree.children_left) + offset).astype(np.int32))
+            rights.append((np.where(is_leaf, node_ids, tree.children_right) + offset).astype(np.int32))
+            values.append(np.where(is_leaf, proba, 0).astype(np.float32))
+            roots.append(offset)
+
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        if offset > np.iinfo(np.int32).max:
+            raise ValueError("Forest has too many nodes for int32 child indices")
+
+        compact = cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.int32),
+            classes=forest.classes_,
+            n_features=forest.n_features_in_,
+            max_depth=max_depth
+        )
+        return compact.deduplicated() if deduplicate else compact
+
+    def deduplicated(self) -> 'CompactForest':
+        """Return a copy sharing one node per distinct subtree."""
+        canon = canonical_subtree_ids(self.left, self.right, self.feature, self.threshold, self.value[:, None])
+        is_leaf = self.left == np.arange(self.n_nodes)
+        defining = is_leaf | (canon[self.left] != canon[self.right])
+
+        # One defining node per canonical id
+        representative = np.empty(canon.max() + 1, dtype=np.int64)
+        representative[canon[defining]] = np.flatnonzero(defining)
+        rep_is_leaf = is_leaf[representative]
+        new_ids = np.arange(representative.size)
+
+        return CompactForest(
+            feature=self.feature[representative],
+            threshold=self.threshold[representative],
+            left=np.where(rep_is_leaf, new_ids, canon[self.left[representative]]).astype(np.int32),
+            right=np.where(rep_is_leaf, new_ids, canon[self.right[representative]]).astype(np.int32),
+            value=self.value[representative],
+            roots=canon[self.roots].astype(np.int32),
+            classes=self.classes_,
+            n_features=self.n_features_in_,
+            max_depth=self.max_depth
+        )
+
+    @property
+    def n_nodes(self) -> int:
+        return int(self.feature.size)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the node arrays and tree roots."""
+        return int(sum(a.nbytes for a in (self.feature, self.threshold, self.left, self.right, self.value, self.roots)))
+
+    def apply(self, X) -> np.ndarray:
+        """Return the leaf index reached in every tree, shape (n_samples, n_trees)."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has shape {X.shape}, expected (n_samples, {self.n_features_in_})")
+        n_rows, n_trees = X.shape[0], self.roots.size
+        flat_X = X.ravel()
+
+        # One entry per (row, tree) pair; only pairs still at a split node
+        # are advanced, so shallow paths stop costing work once they land
+        node = np.tile(self.roots.astype(np.intp), n_rows)
+        row_offset = np.repeat(np.arange(n_rows, dtype=np.intp) * self.n_features_in_, n_trees)
+        active = np.flatnonzero(self.left[node] != node)
+
+        while active.size:
+            current = node[active]
+            go_left = flat_X[row_offset[active] + self.feature[current]] <= self.threshold[current]
+            current = np.where(go_left, self.left[current], self.right[current])
+            node[active] = current
+            active = active[self.left[current] != current]
+
+        return node.reshape(n_rows, n_trees)
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Predict class probabilities (mean of leaf probabilities over trees)."""
+        X = np.asarray(X)
+        disease = np.empty(X.shape[0])
+        # Row chunks keep the (row, tree) working set cache resident
+        for start in range(0, X.shape[0], PREDICT_CHUNK_ROWS):
+            leaves = self.apply(X[start:start + PREDICT_CHUNK_ROWS])
+            disease[start:start + PREDICT_CHUNK_ROWS] = self.value[leaves].mean(axis=1, dtype=np.float64)
+        return np.column_stack([1.0 - disease, disease])
+
+    def predict(self, X) -> np.ndarray:
+        """Predict class labels."""
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+    def save(self, path):
+        """Save the node arrays to an .npz file."""
+        np.savez(
+            path,
+            feature=self.feature, threshold=self.threshold, left=self.left, right=self.right,
+            value=self.value, roots=self.roots, classes=self.classes_,
+            meta=np.array([self.n_features_in_, self.max_depth])
+        )
+
+    @classmethod
+    def load(cls, path) -> 'CompactForest':
+        """Load a compact forest saved with save()."""
+        with np.load(path) as data:
+            n_features, max_depth = data['meta']
+            return cls(
+                feature=data['feature'], threshold=data['threshold'], left=data['left'],
+                right=data['right'], value=data['value'], roots=data['roots'],
+                classes=data['classes'], n_features=n_features, max_depth=max_depth
+            )
+
+
+def sklearn_forest_nbytes(forest) -> Dict[str, int]:
+    """
+    Measure the node storage of a fitted sklearn forest.
+
+    Returns:
+        Dictionary with total node/value bytes and node count
+    """
+    total = 0
+    n_nodes = 0
+    for estimator in forest.estimators_:
+        state = estimator.tree_.__getstate__()
+        total += state['nodes'].nbytes + state['values'].nbytes
+        n_nodes += estimator.tree_.node_count
+    return {'nbytes': int(total), 'n_nodes': int(n_nodes)}
+
+
+def size_report(forest, compact: CompactForest) -> Dict[str, float]:
+    """
+    Compare the memory footprint of the sklearn and compact representations.
+
+    Returns:
+        Dictionary with bytes per node and total size before and after
+    """
+    before = sklearn_forest_nbytes(forest)
+    return {
+        'n_trees': len(forest.estimators_),
+        'n_nodes_before': before['n_nodes'],
+        'n_nodes_after': compact.n_nodes,
+        'bytes_per_node_before': before['nbytes'] / before['n_nodes'],
+        'bytes_per_node_after': compact.nbytes / compact.n_nodes,
+        'total_bytes_before': before['nbytes'],
+        'total_bytes_after': compact.nbytes,
+        'pickle_bytes_before': len(pickle.dumps(forest)),
+        'pickle_bytes_after': len(pickle.dumps(compact)),
+        'compression_ratio': before['nbytes'] / compact.nbytes,
+    }
+
+
+def validate(forest, compact: CompactForest, X, tolerance: float = DEFAULT_TOLERANCE) -> Dict[str, float]:
+    """
+    Check that compact predictions match the sklearn forest.
+
+    Args:
+        forest: Original fitted forest
+        compact: Compact forest built from it
+        X: Feature matrix to compare on
+        tolerance: Maximum accepted absolute probability difference
+
+    Returns:
+        Dictionary with max_abs_diff, label_agreement, tolerance and passed
+    """
+    expected = forest.predict_proba(X)
+    actual = compact.predict_proba(X)
+    max_abs_diff = float(np.max(np.abs(expected - actual))) if len(X) else 0.0
+    label_agreement = float(np.mean(forest.predict(X) == compact.predict(X))) if len(X) else 1.0
+    return {
+        'max_abs_diff': max_abs_diff,
+        'label_agreement': label_agreement,
+        'tolerance': tolerance,
+        'passed': max_abs_diff <= tolerance,
+    }
+
+
+def main(argv=None):
+    """Convert a pickled forest, validate it and report the size reduction."""
+    parser = argparse.ArgumentParser(description="Build a compact reduced-precision forest")
+    parser.add_argument('model_path', help="Pickled RandomForestClassifier")
+    parser.add_argument('--output', help="Where to save the compact forest (.npz)")
+    parser.add_argument('--validation-rows', type=int, default=10000,
+                        help="Random rows used to validate predictions")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    with open(args.model_path, 'rb') as f:
+        forest = pickle.load(f)
+
+    compact = CompactForest.from_sklearn(forest)
+    X = np.random.RandomState(42).randn(args.validation_rows, forest.n_features_in_)
+
+    report = size_report(forest, compact)
+    report['validation'] = validate(forest, compact, X, args.tolerance)
+    print(json.dumps(report, indent=2))
+
+    if args.output:
+        compact.save(args.output)
+        print(f"✓ Saved compact forest to {args.output}")
+
+    return 0 if report['validation']['passed'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
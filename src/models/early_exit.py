@@ -0,0 +1,146 @@
+"""
+Early-exit Random Forest inference
+
+Evaluates the trees of a fitted RandomForestClassifier in fixed-size groups
+and stops for each row as soon as the remaining trees can no longer move its
+disease probability across any boundary that matters to the caller: the
+decision threshold and the risk level boundaries.
+
+Two guarantees are available:
+- 'exact': stop only when the outcome is decided whatever the remaining
+  trees vote, so labels and risk levels always match the full forest.
+- 'statistical': stop when the running mean is further from every boundary
+  than a normal confidence interval (with finite-population correction)
+  over the remaining trees; trades a bounded error rate for fewer trees.
+
+In both modes the returned probability is the mean over the evaluated trees.
+"""
+
+from statistics import NormalDist
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+
+GUARANTEES = ('exact', 'statistical')
+
+# Variance floor for the statistical rule so that a first group of
+# unanimous trees does not end evaluation on zero observed variance
+MIN_TREE_VARIANCE = 0.01
+
+
+class EarlyExitForest:
+    """
+    Wraps a fitted binary RandomForestClassifier with early-exit inference.
+
+    Exposes predict()/predict_proba() like the wrapped estimator.
+    """
+
+    engine_name = 'early_exit'
+
+    def __init__(
+        self,
+        forest,
+        boundaries: Sequence[float],
+        group_size: int = 10,
+        guarantee: str = 'exact',
+        confidence: float = 0.99,
+        on_evaluate: Optional[Callable[[np.ndarray], None]] = None
+    ):
+        """
+        Args:
+            forest: Fitted RandomForestClassifier with two classes
+            boundaries: Probability boundaries the outcome must not cross
+                (decision threshold and risk level boundaries)
+            group_size: Number of trees evaluated between stopping checks
+            guarantee: 'exact' or 'statistical'
+            confidence: Confidence level of the statistical rule
+            on_evaluate: Callback receiving the number of trees evaluated per row
+        """
+        if len(forest.classes_) != 2:
+            raise ValueError("Early-exit inference requires a binary classifier")
+        if guarantee not in GUARANTEES:
+            raise ValueError(f"guarantee must be one of {GUARANTEES}, got {guarantee!r}")
+        if group_size < 1:
+            raise ValueError("group_size must be at least 1")
+
+        self.forest = forest
+        self.estimators_ = forest.estimators_
+        self.classes_ = forest.classes_
+        self.n_features_in_ = getattr(forest, 'n_features_in_', None)
+        self.boundaries = np.asarray(sorted(boundaries), dtype=np.float64)
+        self.group_size = group_size
+        self.guarantee = guarantee
+        self.confidence = confidence
+        self.on_evaluate = on_evaluate
+        self._z = NormalDist().inv_cdf((1 + confidence) / 2)
+
+    def _decided(self, sums: np.ndarray, sq_sums: np.ndarray, evaluated: np.ndarray) -> np.ndarray:
+        """Return a mask of rows whose outcome can no longer change."""
+        n_trees = len(self.estimators_)
+        remaining = n_trees - evaluated
+
+        if self.guarantee == 'exact':
+            # Every tree contributes a probability in [0, 1]
+            low = sums / n_trees
+            high = (sums + remaining) / n_trees
+        else:
+            mean = sums / evaluated
+            variance = np.maximum(sq_sums / evaluated - mean ** 2, MIN_TREE_VARIANCE)
+            # Standard error of the running mean as an estimate of the mean
+            # over all n trees (sampling without replacement)
+            fpc = np.sqrt(remaining / max(n_trees - 1, 1))
+            half_width = self._z * np.sqrt(variance / evaluated) * fpc
+            low = mean - half_width
+            high = mean + half_width
+
+        b = self.boundaries[:, None]
+        safe = (high[None, :] < b) | (low[None, :] > b)
+        return safe.all(axis=0) | (remaining == 0)
+
+    def predict_proba_with_counts(self, X):
+        """
+        Predict class probabilities with early exit.
+
+        Args:
+            X: Feature matrix of shape (n_samples, n_features)
+
+        Returns:
+            Tuple of (probabilities of shape (n_samples, 2),
+            number of trees evaluated per row)
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows = X.shape[0]
+
+        sums = np.zeros(n_rows)
+        sq_sums = np.zeros(n_rows)
+        evaluated = np.zeros(n_rows, dtype=np.int64)
+        active = np.arange(n_rows)
+
+        for start in range(0, len(self.estimators_), self.group_size):
+            X_active = X[active]
+            group = self.estimators_[start:start + self.group_size]
+            votes = np.empty((len(group), active.size))
+            for j, tree in enumerate(group):
+                votes[j] = tree.predict_proba(X_active, check_input=False)[:, 1]
+
+            sums[active] += votes.sum(axis=0)
+            sq_sums[active] += (votes ** 2).sum(axis=0)
+            evaluated[active] += len(group)
+
+            decided = self._decided(sums[active], sq_sums[active], evaluated[active])
+            active = active[~decided]
+            if active.size == 0:
+                break
+
+        disease = sums / np.maximum(evaluated, 1)
+        if self.on_evaluate is not None:
+            self.on_evaluate(evaluated)
+        return np.column_stack([1.0 - disease, disease]), evaluated
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Predict class probabilities with early exit."""
+        return self.predict_proba_with_counts(X)[0]
+
+    def predict(self, X) -> np.ndarray:
+        """Predict class labels with early exit."""
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
@@ -0,0 +1,178 @@
+"""
+Per-prediction feature contributions
+
+Decomposes a prediction into a base value plus one contribution per feature,
+at roughly the cost of the prediction itself:
+- Random forests: path-based decomposition. Along the decision path every
+  split moves the positive-class probability from the parent node's value
+  to the child's; that change is credited to the split feature. The credits
+  of every path are summed per leaf once at load time, so explaining a row
+  is one leaf lookup per tree. Units are probability and base value plus
+  contributions equals the forest's disease probability.
+- Early-exit engines: the same decomposition restricted to the trees the
+  engine evaluated for each row (counts passed in from the serving call),
+  so base value plus contributions equals the early-exit probability that
+  was served and only those trees are walked.
+- Logistic regression: coefficient x value terms. Units are log-odds and
+  base value (the intercept) plus contributions equals the decision
+  function.
+
+All are vectorized over batches. Cascade and compact engines are not
+supported: a cascade row's score comes from one of two models, and compact
+forests keep no per-node class values to attribute.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.models.predict import FEATURES
+
+METHODS = {'tree_path': 'probability', 'linear': 'log_odds'}
+
+
+def _leaf_contributions(tree, n_features: int, positive: int) -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    Summed path contributions per leaf of one fitted sklearn tree.
+
+    Returns:
+        Tuple of (leaf contribution table, node id -> table row, root value)
+    """
+    value = tree.value[:, 0, :]
+    value = value[:, positive] / value.sum(axis=1)
+    left, right, feature = tree.children_left, tree.children_right, tree.feature
+    internal = np.flatnonzero(left >= 0)
+
+    parent = np.full(tree.node_count, -1)
+    parent[left[internal]] = internal
+    parent[right[internal]] = internal
+
+    contributions = np.zeros((tree.node_count, n_features))
+    # Children are filled one depth level at a time from their parents' rows
+    level = np.concatenate([left[[0]], right[[0]]]) if left[0] >= 0 else np.empty(0, dtype=int)
+    while len(level):
+        parents = parent[level]
+        contributions[level] = contributions[parents]
+        contributions[level, feature[parents]] += value[level] - value[parents]
+        level = level[left[level] >= 0]
+        level = np.concatenate([left[level], right[level]])
+
+    leaves = np.flatnonzero(left < 0)
+    rows = np.full(tree.node_count, -1)
+    rows[leaves] = np.arange(len(leaves))
+    return contributions[leaves], rows, float(value[0])
+
+
+class ContributionExplainer:
+    """Precomputed per-feature contribution tables for one fitted model."""
+
+    def __init__(self, model, features: Sequence[str] = FEATURES):
+        """
+        Args:
+            model: Fitted binary RandomForestClassifier or LogisticRegression,
+                or an early-exit engine wrapping a forest
+            features: Feature names in model column order
+
+        Raises:
+            ValueError: If the model type is not supported
+        """
+        # Early-exit engines are explained through the forest they wrap,
+        # over the trees they evaluate per row
+        self.engine = model if getattr(model, 'engine_name', None) == 'early_exit' else None
+        model = self.engine.forest if self.engine is not None else model
+        if len(getattr(model, 'classes_', [])) != 2:
+            raise ValueError("Explanations require a fitted binary classifier")
+        self.model = model
+        self.features = list(features)
+
+        if hasattr(model, 'estimators_') and all(hasattr(est, 'tree_') for est in model.estimators_):
+            self.method = 'tree_path'
+            tables = [_leaf_contributions(est.tree_, len(self.features), 1) for est in model.estimators_]
+            self._leaf_tables = [table for table, _, _ in tables]
+            self._leaf_rows = [rows for _, rows, _ in tables]
+            self._roots = np.array([root for _, _, root in tables])
+            self._base_value = float(self._roots.mean())
+        elif hasattr(model, 'coef_') and np.shape(model.coef_)[0] == 1:
+            self.method = 'linear'
+            self._coef = np.asarray(model.coef_[0], dtype=np.float64)
+            self._base_value = float(model.intercept_[0])
+        else:
+            raise ValueError(f"Explanations are not supported for {type(model).__name__}")
+        self.units = METHODS[self.method]
+
+    @property
+    def needs_counts(self) -> bool:
+        """Whether explain() needs the trees evaluated per row by the serving call."""
+        return self.engine is not None
+
+    def explain(self, X: np.ndarray, evaluated: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Decompose the disease score of each row.
+
+        Args:
+            X: Feature matrix
+            evaluated: Trees an early-exit engine evaluated per row, from
+                the call that served X (required for early-exit engines)
+
+        Returns:
+            Tuple of (base values, contributions of shape (n_rows, n_features))
+
+        Raises:
+            ValueError: If an early-exit engine is explained without counts
+        """
+        X = np.asarray(X, dtype=np.float64)
+        base = np.full(len(X), self._base_value)
+        if self.method == 'linear':
+            return base, X * self._coef
+
+        contributions = np.zeros((len(X), len(self.features)))
+        if not len(X):
+            return base, contributions
+        if self.engine is None:
+            leaves = self.model.apply(X)
+            for tree, (table, rows) in enumerate(zip(self._leaf_tables, self._leaf_rows)):
+                contributions += table[rows[leaves[:, tree]]]
+            contributions /= len(self._leaf_tables)
+            return base, contributions
+
+        if evaluated is None or len(evaluated) != len(X):
+            raise ValueError("Early-exit explanations need the evaluated tree counts of the serving call")
+        # Trees are evaluated in order, so a row's trees are the first `evaluated`
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        base = np.zeros(len(X))
+        trees = zip(self.model.estimators_, self._leaf_tables, self._leaf_rows)
+        for tree, (estimator, table, rows) in enumerate(trees):
+            used = np.flatnonzero(evaluated > tree)
+            if not used.size:
+                break
+            contributions[used] += table[rows[estimator.apply(X[used], check_input=False)]]
+            base[used] += self._roots[tree]
+        return base / evaluated, contributions / evaluated[:, None]
+
+    def describe(self) -> Dict:
+        """Summary for /model/info."""
+        return {
+            'method': self.method,
+            'units': self.units,
+            'base_value': self._base_value,
+            'trees': 'evaluated' if self.engine is not None else 'all',
+        }
+
+    def as_rows(self, base: np.ndarray, contributions: np.ndarray) -> List[Dict]:
+        """One explanation dictionary per row."""
+        return [
+            {
+                'units': self.units,
+                'base_value': b,
+                'contributions': dict(zip(self.features, row)),
+            }
+            for b, row in zip(base.tolist(), contributions.tolist())
+        ]
+
+    def as_columns(self, base: np.ndarray, contributions: np.ndarray) -> Dict:
+        """Columnar explanations for a batch."""
+        return {
+            'units': self.units,
+            'base_value': base.tolist(),
+            'contributions': {feature: contributions[:, j].tolist() for j, feature in enumerate(self.features)},
+        }
@@ -0,0 +1,245 @@
+"""
+Measured footprint and expected latency of a loaded model
+
+Computed once when a model is loaded so capacity planning can use what the
+served artifact actually costs:
+- serialized size (pickled served engine) and in-memory size (bytes held
+  by the numpy arrays and sklearn tree node tables it references)
+- tree structure: tree count, node count, per-tree depth summed over trees
+  (the worst-case number of node visits per row) and maximum depth
+- latency of one predict_proba() call at several batch sizes from a warmup
+  micro-benchmark. A fixed-plus-per-row cost model is fitted to the sizes
+  measured within the time budget; sizes too slow to time within it are
+  estimated from the fit. The benchmark runs on a copy of the engine with
+  its metric callbacks cleared, so it can run beside live traffic.
+"""
+
+import copy
+import pickle
+import statistics
+import time
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+from sklearn.tree._tree import Tree
+
+LATENCY_BATCH_SIZES = (1, 100, 10000)
+
+# Engine callbacks muted while benchmarking so warmup calls are not reported
+ENGINE_CALLBACKS = ('on_evaluate', 'on_score')
+
+
+def serialized_bytes(model) -> Optional[int]:
+    """Size of the pickled model, or None if it cannot be pickled."""
+    try:
+        return len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return None
+
+
+def memory_bytes(model) -> int:
+    """
+    Bytes held by the arrays a model references.
+
+    Walks attributes, lists and dicts; sklearn trees count their node and
+    value tables. Arrays shared between objects are counted once.
+    """
+    seen = set()
+    total = 0
+    stack = [model]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, np.ndarray):
+            base = obj if obj.base is None else obj.base
+            if isinstance(base, np.ndarray) and base is not obj:
+                stack.append(base)
+            else:
+                total += obj.nbytes
+        elif isinstance(obj, dict):
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple)):
+            stack.extend(obj)
+        elif isinstance(obj, Tree):
+            state = obj.__getstate__()
+            total += state['nodes'].nbytes + state['values'].nbytes
+        elif hasattr(obj, '__dict__') and not callable(obj):
+            stack.extend(vars(obj).values())
+    return int(total)
+
+
+def _compact_tree_depths(forest) -> np.ndarray:
+    """Depth of every tree of a CompactForest (leaves point to themselves)."""
+    depths = np.zeros(forest.roots.size, dtype=np.int64)
+    trees = np.arange(forest.roots.size)
+    node = forest.roots.astype(np.intp)
+    level = 0
+    while node.size:
+        internal = forest.left[node] != node
+        depths[trees[internal]] = level + 1
+        trees, node = np.concatenate([trees[internal]] * 2), np.concatenate(
+            [forest.left[node[internal]], forest.right[node[internal]]]
+        )
+        # Shared subtrees are reached from several parents; walk each once per tree
+        if node.size:
+            pairs = np.unique(np.stack([trees, node]), axis=1)
+            trees, node = pairs[0], pairs[1].astype(np.intp)
+        level += 1
+    return depths
+
+
+def tree_structure(model) -> Dict:
+    """
+    Tree count, node count and depths of a model.
+
+    Engines are unwrapped to the forest they serve; linear models report
+    their coefficient count and no trees.
+    """
+    forest = getattr(model, 'forest', model)
+    if hasattr(forest, 'roots') and hasattr(forest, 'left'):
+        depths = _compact_tree_depths(forest)
+        n_nodes = forest.n_nodes
+    elif hasattr(forest, 'estimators_') and all(hasattr(est, 'tree_') for est in forest.estimators_):
+        depths = np.array([est.tree_.max_depth for est in forest.estimators_], dtype=np.int64)
+        n_nodes = int(sum(est.tree_.node_count for est in forest.estimators_))
+    else:
+        depths = np.empty(0, dtype=np.int64)
+        n_nodes = 0
+    structure = {
+        'n_trees': int(depths.size),
+        'n_nodes': int(n_nodes),
+        'total_depth': int(depths.sum()),
+        'max_depth': int(depths.max()) if depths.size else 0,
+    }
+    linear = getattr(model, 'linear_model', model)
+    if hasattr(linear, 'coef_'):
+        structure['n_coefficients'] = int(np.size(linear.coef_))
+    return structure
+
+
+def muted_copy(model):
+    """Shallow copy of an inference engine without metric callbacks (the model itself if it has none)."""
+    names = [name for name in ENGINE_CALLBACKS if getattr(model, name, None) is not None]
+    if not names:
+        return model
+    muted = copy.copy(model)
+    for name in names:
+        setattr(muted, name, None)
+    return muted
+
+
+def benchmark_latency(
+    predict: Callable[[np.ndarray], np.ndarray],
+    X: np.ndarray,
+    batch_sizes: Sequence[int] = LATENCY_BATCH_SIZES,
+    budget_seconds: float = 2.0,
+    repeats: int = 5
+) -> Dict:
+    """
+    Time predict() at several batch sizes and fit fixed + per-row cost.
+
+    Args:
+        predict: Function scoring a feature matrix
+        X: Rows to score; tiled when a batch size exceeds its length
+        batch_sizes: Batch sizes to report
+        budget_seconds: Wall time the benchmark may spend
+        repeats: Timed calls per batch size (median is kept)
+
+    Returns:
+        Dictionary with fixed_seconds, per_row_seconds and one entry per
+        batch size (seconds, measured or estimated)
+    """
+    batch_sizes = sorted(batch_sizes)
+    X = np.resize(np.asarray(X, dtype=np.float64), (max(max(batch_sizes), 1), np.shape(X)[1]))
+    deadline = time.perf_counter() + budget_seconds
+    predict(X[:1])  # warmup
+
+    measured = {}
+    fixed, per_row = 0.0, 0.0
+    for n in batch_sizes:
+        # Skip sizes the fit from smaller sizes says cannot be timed in budget
+        if measured and fixed + per_row * n > deadline - time.perf_counter():
+            continue
+        times = []
+        while len(times) < repeats and (not times or time.perf_counter() < deadline):
+            start = time.perf_counter()
+            predict(X[:n])
+            times.append(time.perf_counter() - start)
+        measured[n] = statistics.median(times)
+        if len(measured) >= 2:
+            slope, intercept = np.polyfit(list(measured), list(measured.values()), 1)
+            per_row, fixed = max(float(slope), 0.0), max(float(intercept), 0.0)
+        else:
+            # One size cannot separate fixed from per-row cost; assume all per-row
+            per_row, fixed = measured[n] / n, 0.0
+
+    return {
+        'fixed_seconds': fixed,
+        'per_row_seconds': per_row,
+        'batches': [
+            {
+                'batch_size': n,
+                'seconds': measured.get(n, fixed + per_row * n),
+                'measured': n in measured,
+            }
+            for n in batch_sizes
+        ],
+    }
+
+
+def measure_latency(
+    model,
+    X: Optional[np.ndarray] = None,
+    batch_sizes: Sequence[int] = LATENCY_BATCH_SIZES,
+    budget_seconds: float = 2.0
+) -> Optional[Dict]:
+    """
+    Latency benchmark of a model (engine) without reporting to its callbacks.
+
+    Args:
+        model: Served model or inference engine
+        X: Calibration rows (default: standard normal rows)
+        batch_sizes: Batch sizes to estimate latency for
+        budget_seconds: Benchmark time budget
+
+    Returns:
+        benchmark_latency() report, or None if the budget is 0 or the model
+        does not know its feature count
+    """
+    n_features = getattr(model, 'n_features_in_', None)
+    if budget_seconds <= 0 or not n_features:
+        return None
+    if X is None:
+        X = np.random.RandomState(0).randn(max(batch_sizes), n_features)
+    return benchmark_latency(muted_copy(model).predict_proba, X, batch_sizes, budget_seconds)
+
+
+def measure_footprint(
+    model,
+    X: Optional[np.ndarray] = None,
+    batch_sizes: Sequence[int] = LATENCY_BATCH_SIZES,
+    budget_seconds: float = 2.0
+) -> Dict:
+    """
+    Footprint report of a loaded model (engine) for /model/info.
+
+    Args:
+        model: Served model or inference engine
+        X: Calibration rows (default: standard normal rows)
+        batch_sizes: Batch sizes to estimate latency for
+        budget_seconds: Benchmark time budget (0 skips the benchmark)
+
+    Returns:
+        Dictionary with sizes, structure, engine and latency (or None)
+    """
+    report = {
+        'engine': getattr(model, 'engine_name', 'sklearn'),
+        'model_class': type(getattr(model, 'forest', model)).__name__,
+        'serialized_bytes': serialized_bytes(model),
+        'memory_bytes': memory_bytes(model),
+    }
+    report.update(tree_structure(model))
+    report['latency'] = measure_latency(model, X, batch_sizes, budget_seconds)
+    return report
@@ -0,0 +1,154 @@
+"""
+Structural compaction of trained Random Forests
+
+Fully grown trees contain many splits whose two branches end in the same
+outcome: both children are leaves with identical class probabilities, or
+both children are structurally identical subtrees. Such a split cannot
+change any prediction, so it is replaced by one of its branches.
+
+Canonical subtree ids are assigned bottom-up (hash-consing); a node whose
+children share an id is collapsed. Each tree is rebuilt as a regular sklearn
+Tree, so the compacted forest pickles, predicts and logs to MLflow like the
+original one.
+
+sklearn trees cannot share nodes, so identical subtrees repeated across
+estimators are merged in the flattened CompactForest
+(CompactForest.from_sklearn(..., deduplicate=True)); its node count is part
+of the compaction report.
+"""
+
+import copy
+import time
+from typing import Dict, Tuple
+
+import numpy as np
+from sklearn.tree._tree import Tree
+
+from src.models.compact_forest import CompactForest, canonical_subtree_ids
+
+TIMING_REPEATS = 5
+
+
+def leaf_probabilities(values: np.ndarray) -> np.ndarray:
+    """Normalize per-node class counts/fractions to probabilities."""
+    counts = values[:, 0, :]
+    return counts / counts.sum(axis=1, keepdims=True)
+
+
+def collapse_tree(tree: Tree) -> Tree:
+    """
+    Rebuild an sklearn Tree without same-outcome splits.
+
+    Args:
+        tree: Fitted sklearn Tree (estimator.tree_)
+
+    Returns:
+        New Tree with identical predictions
+    """
+    state = tree.__getstate__()
+    nodes, values = state['nodes'], state['values']
+    left, right = nodes['left_child'], nodes['right_child']
+    canon = canonical_subtree_ids(left, right, nodes['feature'], nodes['threshold'], leaf_probabilities(values))
+
+    new_nodes = []
+    new_values = []
+    max_depth = 0
+    # Pre-order rebuild keeps children after their parent like sklearn does;
+    # each stack entry is (old node, depth, new parent index, is left child)
+    stack = [(0, 0, -1, False)]
+    while stack:
+        node, depth, parent, is_left = stack.pop()
+
+        source = node
+        while left[source] != -1 and canon[left[source]] == canon[right[source]]:
+            source = left[source]
+
+        record = nodes[source].copy()
+        if left[source] == -1 and source != node:
+            # Split collapsed into a leaf: keep the node's own sample
+            # statistics with the (identical) leaf probabilities
+            record = nodes[node].copy()
+            record['left_child'] = record['right_child'] = -1
+            record['feature'] = -2
+            record['threshold'] = -2.0
+
+        index = len(new_nodes)
+        new_nodes.append(record)
+        new_values.append(values[source])
+        max_depth = max(max_depth, depth)
+        if parent >= 0:
+            new_nodes[parent]['left_child' if is_left else 'right_child'] = index
+
+        if left[source] != -1:
+            stack.append((right[source], depth + 1, index, False))
+            stack.append((left[source], depth + 1, index, True))
+
+    new_tree = Tree(tree.n_features, np.asarray(tree.n_classes, dtype=np.intp), tree.n_outputs)
+    new_tree.__setstate__({
+        'max_depth': max_depth,
+        'node_count': len(new_nodes),
+        'nodes': np.array(new_nodes, dtype=nodes.dtype),
+        'values': np.ascontiguousarray(np.array(new_values, dtype=values.dtype)),
+    })
+    return new_tree
+
+
+def _forest_structure(forest) -> Dict[str, float]:
+    node_counts = [e.tree_.node_count for e in forest.estimators_]
+    depths = [e.tree_.max_depth for e in forest.estimators_]
+    return {
+        'n_nodes': int(np.sum(node_counts)),
+        'max_depth': int(np.max(depths)),
+        'mean_depth': float(np.mean(depths)),
+    }
+
+
+def _time_predict_proba(forest, X) -> float:
+    best = np.inf
+    for _ in range(TIMING_REPEATS):
+        start = time.perf_counter()
+        forest.predict_proba(X)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def compact_forest_structure(forest, X=None) -> Tuple[object, Dict[str, float]]:
+    """
+    Collapse same-outcome splits in every tree of a fitted forest.
+
+    Args:
+        forest: Fitted RandomForestClassifier (left unchanged)
+        X: Optional feature matrix used to verify predictions and time
+            inference before and after
+
+    Returns:
+        Tuple of (compacted forest copy, report dictionary)
+    """
+    compacted = copy.deepcopy(forest)
+    for estimator in compacted.estimators_:
+        estimator.tree_ = collapse_tree(estimator.tree_)
+
+    before = _forest_structure(forest)
+    after = _forest_structure(compacted)
+    report = {
+        'n_nodes_before': before['n_nodes'],
+        'n_nodes_after': after['n_nodes'],
+        'node_reduction': 1.0 - after['n_nodes'] / before['n_nodes'],
+        'max_depth_before': before['max_depth'],
+        'max_depth_after': after['max_depth'],
+        'mean_depth_before': before['mean_depth'],
+        'mean_depth_after': after['mean_depth'],
+    }
+
+    if len(forest.classes_) == 2:
+        report['compact_nodes_deduplicated'] = CompactForest.from_sklearn(compacted, deduplicate=True).n_nodes
+
+    if X is not None:
+        report['predictions_identical'] = bool(np.array_equal(forest.predict_proba(X), compacted.predict_proba(X)))
+        seconds_before = _time_predict_proba(forest, X)
+        seconds_after = _time_predict_proba(compacted, X)
+        report['predict_seconds_before'] = seconds_before
+        report['predict_seconds_after'] = seconds_after
+        report['speedup'] = seconds_before / seconds_after if seconds_after > 0 else float('nan')
+
+    return compacted, report
@@ -0,0 +1,281 @@
+"""
+In-process prediction API for the heart disease classifier
+
+Predictor is the inference core shared by the HTTP endpoints in
+src/api/app.py and by callers that embed the model in their own process:
+feature validation, scoring and risk bucketing behave identically on both
+paths. Feature matrices are assembled in per-thread preallocated buffers so
+steady-state scoring does not allocate an input array per call, and batches
+with repeated rows score each distinct row once.
+
+Usage:
+    from src.models.predict import Predictor
+
+    predictor = Predictor.from_path('models/best_model.pkl')
+    result = predictor.predict({'age': 63, 'sex': 1, ...})
+"""
+
+import pickle
+import threading
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+FEATURES = [
+    'age', 'sex', 'cp', 'trestbps', 'chol', 'fbs',
+    'restecg', 'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal'
+]
+
+# Probability boundaries used by get_risk_level() and the label decision
+RISK_LEVEL_BOUNDARIES = (0.3, 0.6, 0.8)
+DECISION_THRESHOLD = 0.5
+
+RISK_LEVELS = np.array(['Low', 'Medium', 'High', 'Very High'], dtype=object)
+
+# Rows preallocated per thread; larger batches grow the buffer
+DEFAULT_BUFFER_ROWS = 1024
+
+# Batches with fewer rows are scored without looking for duplicates
+DEFAULT_DEDUP_MIN_ROWS = 16
+
+
+class MissingFeaturesError(ValueError):
+    """Raised when a sample lacks required features."""
+
+    def __init__(self, missing_features: List[str]):
+        super().__init__(f"Missing required features: {missing_features}")
+        self.missing_features = missing_features
+
+
+def get_risk_level(disease_probability: float, boundaries: Sequence[float] = RISK_LEVEL_BOUNDARIES) -> str:
+    """Categorize risk level based on disease probability"""
+    low, medium, high = boundaries
+    if disease_probability < low:
+        return 'Low'
+    elif disease_probability < medium:
+        return 'Medium'
+    elif disease_probability < high:
+        return 'High'
+    else:
+        return 'Very High'
+
+
+def risk_levels(disease_proba: np.ndarray, boundaries: Sequence[float] = RISK_LEVEL_BOUNDARIES) -> np.ndarray:
+    """Vectorized risk bucketing; matches get_risk_level() row by row."""
+    return RISK_LEVELS[np.searchsorted(np.asarray(boundaries), disease_proba, side='right')]
+
+
+def format_prediction(label, proba: Sequence[float], boundaries: Sequence[float] = RISK_LEVEL_BOUNDARIES) -> Dict:
+    """Build the prediction dictionary returned for one scored sample."""
+    return {
+        'prediction': int(label),
+        'prediction_label': 'Heart Disease' if label == 1 else 'No Heart Disease',
+        'confidence': {
+            'no_disease': float(proba[0]),
+            'disease': float(proba[1])
+        },
+        'risk_level': get_risk_level(float(proba[1]), boundaries)
+    }
+
+
+@lru_cache(maxsize=None)
+def _hash_multipliers(n_columns: int) -> np.ndarray:
+    rng = np.random.RandomState(n_columns)
+    return rng.randint(1, 2 ** 63, size=n_columns, dtype=np.uint64) | np.uint64(1)
+
+
+def deduplicate_rows(X: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Find the distinct rows of a float matrix.
+
+    A multiply-and-sum hash of the row bits rules out duplicates with one
+    pass and a sort of n integers; only batches whose hashes collide pay for
+    the exact np.unique over whole rows.
+
+    Returns:
+        Tuple of (distinct rows, inverse index with X == rows[inverse]), or
+        None if every row is distinct
+    """
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    if len(X) < 2:
+        return None
+    hashes = np.sort((X.view(np.uint64) * _hash_multipliers(X.shape[1])).sum(axis=1))
+    if not np.any(hashes[1:] == hashes[:-1]):
+        return None
+    rows = X.view(np.dtype((np.void, X.dtype.itemsize * X.shape[1]))).ravel()
+    _, first, inverse = np.unique(rows, return_index=True, return_inverse=True)
+    if len(first) == len(X):
+        return None
+    return X[first], inverse.ravel()
+
+
+class Predictor:
+    """
+    Validates, scores and risk-buckets samples with a loaded model.
+
+    Thread-safe: input buffers are per thread and the model is only read.
+    """
+
+    def __init__(
+        self,
+        model,
+        proba_fn: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+        boundaries: Sequence[float] = RISK_LEVEL_BOUNDARIES,
+        buffer_rows: int = DEFAULT_BUFFER_ROWS,
+        dedup_min_rows: Optional[int] = DEFAULT_DEDUP_MIN_ROWS,
+        on_dedup: Optional[Callable[[int, int], None]] = None
+    ):
+        """
+        Args:
+            model: Fitted classifier or inference engine with predict_proba()
+                and classes_
+            proba_fn: Replacement for model.predict_proba, e.g. one that
+                shards large batches across processes
+            boundaries: Risk level boundaries
+            buffer_rows: Initial rows of each per-thread input buffer
+            dedup_min_rows: Smallest batch checked for duplicate rows (None
+                disables deduplication)
+            on_dedup: Callback receiving (rows, distinct rows) per checked batch
+        """
+        self.model = model
+        self.proba_fn = proba_fn or model.predict_proba
+        self.boundaries = tuple(boundaries)
+        self.buffer_rows = buffer_rows
+        self.dedup_min_rows = dedup_min_rows
+        self.on_dedup = on_dedup
+        self.features = FEATURES
+        self._local = threading.local()
+
+    @classmethod
+    def from_path(cls, model_path: str, **kwargs) -> 'Predictor':
+        """Load a pickled model artifact and wrap it in a Predictor."""
+        with open(model_path, 'rb') as f:
+            return cls(pickle.load(f), **kwargs)
+
+    def _buffer(self, n_rows: int) -> np.ndarray:
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None or buffer.shape[0] < n_rows:
+            buffer = np.empty((max(n_rows, self.buffer_rows), len(self.features)), dtype=np.float64)
+            self._local.buffer = buffer
+        return buffer[:n_rows]
+
+    def missing_features(self, sample: Dict) -> List[str]:
+        """Return the required features absent from a sample."""
+        return [f for f in self.features if f not in sample]
+
+    def sample_matrix(self, sample: Dict) -> np.ndarray:
+        """
+        Convert one sample to a (1, n_features) matrix.
+
+        The matrix is a view of this thread's buffer, valid until the next
+        call on the same thread.
+
+        Raises:
+            MissingFeaturesError: If required features are absent
+            ValueError: If a feature value is not numeric
+        """
+        missing = self.missing_features(sample)
+        if missing:
+            raise MissingFeaturesError(missing)
+        X = self._buffer(1)
+        try:
+            for j, feature in enumerate(self.features):
+                X[0, j] = float(sample[feature])
+        except TypeError as e:
+            raise ValueError(str(e)) from e
+        return X
+
+    def samples_matrix(self, samples: Sequence[Dict]) -> Tuple[np.ndarray, List[int], Dict[int, Dict]]:
+        """
+        Convert samples to a matrix of the valid ones.
+
+        Returns:
+            Tuple of (matrix view of valid rows in this thread's buffer,
+            indices of valid samples, per-sample errors keyed by index)
+        """
+        X = self._buffer(len(samples))
+        valid_indices = []
+        errors = {}
+        for idx, sample in enumerate(samples):
+            missing = self.missing_features(sample)
+            if missing:
+                errors[idx] = {
+                    'sample_index': idx,
+                    'error': 'Missing features',
+                    'missing_features': missing
+                }
+                continue
+            row = X[len(valid_indices)]
+            try:
+                for j, feature in enumerate(self.features):
+                    row[j] = float(sample[feature])
+            except (TypeError, ValueError) as e:
+                errors[idx] = {
+                    'sample_index': idx,
+                    'error': str(e)
+                }
+                continue
+            valid_indices.append(idx)
+        return X[:len(valid_indices)], valid_indices, errors
+
+    def deduplicate(self, X: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Distinct rows of a batch large enough to be checked.
+
+        Returns:
+            Tuple of (distinct rows, inverse index), or None if the batch is
+            too small or has no duplicates
+        """
+        if self.dedup_min_rows is None or len(X) < self.dedup_min_rows:
+            return None
+        unique = deduplicate_rows(X)
+        if self.on_dedup is not None:
+            self.on_dedup(len(X), len(X) if unique is None else len(unique[0]))
+        return unique
+
+    def score(self, X: np.ndarray, dedup: bool = True, counts: bool = False) -> Tuple[np.ndarray, ...]:
+        """
+        Score a feature matrix.
+
+        Args:
+            X: Feature matrix
+            dedup: Score repeated rows once and copy their results
+            counts: Also return the trees an early-exit engine evaluated per
+                row (scores with the engine itself, not proba_fn)
+
+        Returns:
+            Tuple of (predicted labels, class probabilities), plus the
+            evaluated tree counts with counts=True
+        """
+        unique = self.deduplicate(X) if dedup else None
+        if unique is not None:
+            rows, inverse = unique
+            return tuple(values[inverse] for values in self.score(rows, dedup=False, counts=counts))
+        if counts:
+            proba, evaluated = self.model.predict_proba_with_counts(X)
+            return self.model.classes_.take(np.argmax(proba, axis=1)), proba, evaluated
+        proba = self.proba_fn(X)
+        return self.model.classes_.take(np.argmax(proba, axis=1)), proba
+
+    def predict(self, sample: Dict) -> Dict:
+        """Validate and score one sample; returns the /predict result fields."""
+        labels, probas = self.score(self.sample_matrix(sample))
+        return format_prediction(labels[0], probas[0], self.boundaries)
+
+    def predict_batch(self, samples: Sequence[Dict]) -> List[Dict]:
+        """
+        Validate and score samples in one model call.
+
+        Returns:
+            One dictionary per sample, in order; invalid samples carry 'error'
+        """
+        X, valid_indices, errors = self.samples_matrix(samples)
+        results = [None] * len(samples)
+        for idx, error in errors.items():
+            results[idx] = error
+        if valid_indices:
+            labels, probas = self.score(X)
+            for idx, label, proba in zip(valid_indices, labels, probas):
+                results[idx] = dict(sample_index=idx, **format_prediction(label, proba, self.boundaries))
+        return results
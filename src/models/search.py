@@ -0,0 +1,657 @@
+"""
+Budgeted hyperparameter search strategies
+
+Every strategy scores candidates from the same parameter grid on the same
+stratified folds as GridSearchCV, stops once its budget of cross-validation
+fits or wall-clock seconds is spent, refits the best candidate on the full
+training set and exposes GridSearchCV's result attributes (best_params_,
+best_score_, best_estimator_, cv_results_):
+- grid: every combination in grid order; without a budget it matches
+  GridSearchCV exactly
+- halving: successive halving. Candidates sampled from the grid are scored
+  with a small resource (training rows per fold, or trees for forests); the
+  best 1/factor are re-scored with factor times the resource until the last
+  round runs at the full resource
+- tpe: tree-structured Parzen estimator over the discrete grid. After random
+  start-up candidates, the next candidate maximizes the ratio of its
+  per-parameter value frequencies among the best scores (top gamma) to
+  those among the rest
+- path: regularization path for linear models. For every combination of
+  the other parameters each fold fits the C values in increasing order,
+  warm-started from the previous (more regularized) solution; solvers that
+  minimize the same objective for a penalty are pruned to one. liblinear
+  also penalizes the intercept, so it is kept and fitted cold
+
+Several scoring metrics can be recorded per candidate (the refit metric
+selects); fold_scores() hands the fold scores of a candidate scored on the
+full folds to later evaluation so its fits are not repeated.
+
+Random and extra-trees forests with a fixed random_state grow the same
+first k trees whatever n_estimators is, so a forest's tree prefixes are the
+smaller forests. The grid fits the largest n_estimators once per fold for
+every other parameter combination and scores each tree count from running
+sums of per-tree probabilities; halving on n_estimators extends the fold
+forests of surviving candidates with warm_start instead of regrowing them.
+Scores are the same as fitting each tree count separately.
+"""
+
+import math
+import time
+import warnings
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from joblib import Parallel, delayed
+from scipy.stats import rankdata
+from sklearn.base import BaseEstimator, ClassifierMixin, clone
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+from sklearn.exceptions import FitFailedWarning
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import ParameterGrid, check_cv, cross_validate
+from sklearn.utils import _safe_indexing
+
+STRATEGIES = ('grid', 'halving', 'tpe', 'path')
+
+# Smallest resource of the first halving round
+MIN_HALVING_SAMPLES = 30
+MIN_HALVING_TREES = 10
+
+# Penalties each LogisticRegression solver supports, and the solvers that
+# warm start (liblinear ignores warm_start). For one penalty the warm-start
+# solvers minimize the same objective; liblinear also penalizes the
+# intercept, so its solutions differ.
+SOLVER_PENALTIES = {
+    'liblinear': ('l1', 'l2'),
+    'saga': ('l1', 'l2', 'elasticnet', None),
+    'sag': ('l2', None),
+    'lbfgs': ('l2', None),
+    'newton-cg': ('l2', None),
+    'newton-cholesky': ('l2', None),
+}
+WARM_START_SOLVERS = ('saga', 'sag', 'lbfgs', 'newton-cg', 'newton-cholesky')
+
+# Forests whose tree prefixes are the forests with fewer trees
+PREFIX_FORESTS = (RandomForestClassifier, ExtraTreesClassifier)
+
+
+class _FixedProbabilities(ClassifierMixin, BaseEstimator):
+    """Classifier returning precomputed probabilities, for scoring a tree prefix with sklearn scorers."""
+
+    def __init__(self, classes, proba):
+        self.classes = classes
+        self.proba = proba
+        self.classes_ = classes
+
+    def predict_proba(self, X):
+        return self.proba
+
+    def predict(self, X):
+        # Forests predict the class of highest mean probability
+        return self.classes_.take(np.argmax(self.proba, axis=1), axis=0)
+
+
+def _grow_fold_forest(estimator, X, y, train, test, tree_counts: List[int], scorers: Dict, state=None):
+    """
+    Fit (or extend) one fold's forest to the largest tree count and score every count.
+
+    Args:
+        state: (forest, probability sum of its trees on the fold's test rows)
+            from a smaller count; its trees are kept and only the missing
+            ones grown
+
+    Returns:
+        (new state, tree count -> scoring name -> score); scores are NaN if
+        the fit failed
+    """
+    n_trees = max(tree_counts)
+    X_test, y_test = _safe_indexing(X, test), _safe_indexing(y, test)
+    try:
+        if state is None:
+            forest, total, start = clone(estimator).set_params(n_estimators=n_trees), None, 0
+        else:
+            forest, total = state
+            start = len(forest.estimators_)
+            forest.set_params(n_estimators=n_trees, warm_start=True)
+        forest.fit(_safe_indexing(X, train), _safe_indexing(y, train))
+    except Exception as e:
+        warnings.warn(f"Forest fit failed, scoring NaN: {e}", FitFailedWarning)
+        return None, {n: {name: np.nan for name in scorers} for n in tree_counts}
+
+    # Trees are fitted on float32 arrays without feature names, like forest.predict_proba passes them
+    rows = np.ascontiguousarray(np.asarray(X_test, dtype=np.float32))
+    wanted = set(tree_counts)
+    scores = {}
+    if start in wanted:
+        # Halving rounds can repeat a tree count; the kept trees already have it
+        prefix = _FixedProbabilities(forest.classes_, total / start)
+        scores[start] = {name: scorer(prefix, X_test, y_test) for name, scorer in scorers.items()}
+    for n, tree in enumerate(forest.estimators_[start:], start + 1):
+        proba = tree.predict_proba(rows)
+        total = proba if total is None else total + proba
+        if n in wanted:
+            prefix = _FixedProbabilities(forest.classes_, total / n)
+            scores[n] = {name: scorer(prefix, X_test, y_test) for name, scorer in scorers.items()}
+    return (forest, total), scores
+
+
+def _fold_path(estimator, X, y, train, test, path_param: str, values: List, scorers: Dict):
+    """
+    Fit one fold along a regularization path, each value warm-started from the previous solution.
+
+    Returns:
+        Per value: (scoring name -> score, number of non-zero coefficients);
+        NaN scores where the fit failed, after which the path restarts cold
+    """
+    X_train, y_train = _safe_indexing(X, train), _safe_indexing(y, train)
+    X_test, y_test = _safe_indexing(X, test), _safe_indexing(y, test)
+    # Solvers that cannot warm start (liblinear) fit every value cold
+    warm_start = estimator.get_params().get('solver', 'lbfgs') in WARM_START_SOLVERS
+    model = clone(estimator).set_params(warm_start=warm_start)
+    path = []
+    for value in values:
+        try:
+            model.set_params(**{path_param: value}).fit(X_train, y_train)
+        except Exception as e:
+            warnings.warn(f"Path fit failed at {path_param}={value}, scoring NaN: {e}", FitFailedWarning)
+            path.append(({name: np.nan for name in scorers}, np.nan))
+            model = clone(estimator).set_params(warm_start=warm_start)
+            continue
+        scores = {name: scorer(model, X_test, y_test) for name, scorer in scorers.items()}
+        path.append((scores, int(np.count_nonzero(model.coef_))))
+    return path
+
+
+class BudgetedSearch:
+    """Base class: budget accounting, fold scoring, refit and results."""
+
+    strategy = None
+
+    def __init__(
+        self,
+        estimator,
+        param_grid: Dict[str, List],
+        cv=5,
+        scoring: Union[str, Sequence[str]] = 'roc_auc',
+        refit: Optional[str] = None,
+        max_fits: Optional[int] = None,
+        max_seconds: Optional[float] = None,
+        n_jobs: Optional[int] = None,
+        random_state: int = 42,
+        reuse_trees: bool = True
+    ):
+        """
+        Args:
+            estimator: Unfitted estimator
+            param_grid: Parameter name -> list of values
+            cv: Number of stratified folds or a CV splitter
+            scoring: sklearn scoring name, or several names recorded per candidate
+            refit: Scoring name selecting the best candidate when several are
+                given (default: the first)
+            max_fits: Cross-validation fits allowed (None: unlimited)
+            max_seconds: Wall-clock seconds allowed (None: unlimited); the
+                candidate running when it expires is completed, and the first
+                candidate always runs
+            n_jobs: Folds fitted in parallel
+            random_state: Seed of candidate sampling
+            reuse_trees: Score forests' n_estimators values from tree prefixes
+                (random and extra-trees forests only)
+        """
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.cv = cv
+        self.scoring = scoring
+        self.refit = refit
+        self.max_fits = max_fits
+        self.max_seconds = max_seconds
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+        self.reuse_trees = reuse_trees
+
+    def exhausted(self, n_fits: Optional[int] = None) -> bool:
+        """Whether another candidate (n_fits fits, default one per fold) would exceed the budget."""
+        n_fits = len(self.splits_) if n_fits is None else n_fits
+        if self.max_fits is not None and self.n_fits_ + n_fits > self.max_fits:
+            return True
+        # A time budget always lets the first candidate run
+        return (
+            self.max_seconds is not None and bool(self._results)
+            and time.perf_counter() - self._started >= self.max_seconds
+        )
+
+    def _evaluate(self, params: Dict, X, y, splits=None, fixed: Optional[Dict] = None,
+                  resource: Optional[int] = None, iteration: int = 0) -> Optional[float]:
+        """Mean fold score of one candidate, or None if the budget is spent."""
+        if self.exhausted():
+            return None
+        estimator = clone(self.estimator).set_params(**params, **(fixed or {}))
+        output = cross_validate(
+            estimator, X, y, cv=splits or self.splits_, scoring=self.scoring, n_jobs=self.n_jobs
+        )
+        self.n_fits_ += len(splits or self.splits_)
+        metric_scores = {name: output[f'test_{self._key(name)}'] for name in self._metrics}
+        return self._record(params, fixed, metric_scores, splits is None, resource, iteration)
+
+    def _evaluate_trees(self, params: Dict, X, y, tree_counts: List[int], states: Optional[List] = None,
+                        as_resource: bool = False, iteration: int = 0) -> Optional[Tuple[List[float], List]]:
+        """
+        Mean fold scores of a forest at several tree counts from one forest per fold.
+
+        Args:
+            params: Parameters other than n_estimators
+            tree_counts: n_estimators values to score
+            states: Per-fold states returned by an earlier call for the same
+                params, extended instead of refitted
+            as_resource: Record n_estimators as a halving resource rather
+                than a searched parameter
+
+        Returns:
+            (mean score per tree count, per-fold states), or None if the budget is spent
+        """
+        if self.exhausted():
+            return None
+        scorers = {name: get_scorer(name) for name in self._metrics}
+        estimator = clone(self.estimator).set_params(**params)
+        outputs = Parallel(n_jobs=self.n_jobs)(
+            delayed(_grow_fold_forest)(estimator, X, y, train, test, tree_counts, scorers, state)
+            for (train, test), state in zip(self.splits_, states or [None] * len(self.splits_))
+        )
+        self.n_fits_ += len(self.splits_)
+        means = []
+        for n in tree_counts:
+            metric_scores = {name: np.array([scores[n][name] for _, scores in outputs]) for name in self._metrics}
+            if as_resource:
+                means.append(self._record(params, {'n_estimators': n}, metric_scores, True, n, iteration))
+            else:
+                means.append(self._record(dict(params, n_estimators=n), None, metric_scores, True, None, iteration))
+        return means, [state for state, _ in outputs]
+
+    def _record(self, params: Dict, fixed: Optional[Dict], metric_scores: Dict[str, np.ndarray],
+                full_folds: bool, resource: Optional[int], iteration: int) -> float:
+        scores = metric_scores[self._refit_metric]
+        self._results.append({
+            'params': params, 'fixed': fixed or {}, 'scores': scores, 'metric_scores': metric_scores,
+            'full_folds': full_folds, 'resource': resource, 'iter': iteration,
+        })
+        return float(np.mean(scores))
+
+    def _reuses_trees(self) -> bool:
+        return self.reuse_trees and isinstance(self.estimator, PREFIX_FORESTS)
+
+    @property
+    def _metrics(self) -> List[str]:
+        return [self.scoring] if isinstance(self.scoring, str) else list(self.scoring)
+
+    @property
+    def _refit_metric(self) -> str:
+        return self.refit or self._metrics[0]
+
+    def _key(self, name: str) -> str:
+        # cross_validate and GridSearchCV name a single metric 'score'
+        return 'score' if isinstance(self.scoring, str) else name
+
+    def _search(self, X, y):
+        raise NotImplementedError
+
+    def _final_results(self) -> List[Dict]:
+        """Results the best candidate is chosen from."""
+        return self._results
+
+    def fit(self, X, y) -> 'BudgetedSearch':
+        self._started = time.perf_counter()
+        self.n_fits_ = 0
+        self._results = []
+        self.splits_ = list(check_cv(self.cv, y, classifier=True).split(X, y))
+        self._search(X, y)
+        if not self._results:
+            raise RuntimeError(f"Search budget allows no candidate ({len(self.splits_)} fits each)")
+
+        final = self._final_results()
+        # Failed fits score NaN; ties keep the earliest candidate like GridSearchCV
+        means = np.array([np.mean(result['scores']) for result in final])
+        best = final[int(np.nanargmax(np.where(np.isnan(means), -np.inf, means)))]
+        # Parameters the strategy set, e.g. the halving resource the score was measured at
+        self.best_params_ = dict(best['params'], **best['fixed'])
+        self.best_resource_ = best['resource']
+        self.best_score_ = float(np.mean(best['scores']))
+        self.search_seconds_ = time.perf_counter() - self._started
+
+        start = time.perf_counter()
+        self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_).fit(X, y)
+        self.refit_time_ = time.perf_counter() - start
+        self.cv_results_ = self._cv_results()
+        return self
+
+    def fold_scores(self, params: Dict) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Per-fold scores of every metric for a candidate scored on the full folds.
+
+        Args:
+            params: Complete parameters (e.g. best_params_, including any
+                halving resource)
+
+        Returns:
+            Scoring name -> scores in splits_ order, or None if no candidate
+            with exactly these parameters was scored on the full folds
+        """
+        for result in self._results:
+            if result['full_folds'] and dict(result['params'], **result['fixed']) == params:
+                return result['metric_scores']
+        return None
+
+    def _cv_results(self) -> Dict:
+        results = {
+            'params': [result['params'] for result in self._results],
+            'resource': [result['resource'] for result in self._results],
+            'iter': np.array([result['iter'] for result in self._results]),
+        }
+        for name in self._metrics:
+            scores = np.array([result['metric_scores'][name] for result in self._results])
+            means = scores.mean(axis=1)
+            key = self._key(name)
+            # Tied scores share the best rank, failed candidates rank last (as in GridSearchCV)
+            results[f'mean_test_{key}'] = means
+            results[f'std_test_{key}'] = scores.std(axis=1)
+            results[f'rank_test_{key}'] = rankdata(-np.where(np.isnan(means), -np.inf, means), method='min').astype(int)
+            for k in range(scores.shape[1]):
+                results[f'split{k}_test_{key}'] = scores[:, k]
+        return results
+
+    def summary(self) -> Dict:
+        """Best score, cost and parameters for comparisons and MLflow."""
+        return {
+            'strategy': self.strategy,
+            'best_score': self.best_score_,
+            'search_seconds': self.search_seconds_,
+            'n_fits': self.n_fits_,
+            'n_candidates': len({tuple(sorted(map(str, r['params'].items()))) for r in self._results}),
+            'best_params': self.best_params_,
+        }
+
+
+class GridSearch(BudgetedSearch):
+    """Exhaustive grid in GridSearchCV order, stopped by the budget."""
+
+    strategy = 'grid'
+
+    def _search(self, X, y):
+        candidates = list(ParameterGrid(self.param_grid))
+        if not (self._reuses_trees() and len(self.param_grid.get('n_estimators', [])) > 1):
+            for params in candidates:
+                if self._evaluate(params, X, y) is None:
+                    break
+            return
+
+        # One fold forest per combination of the other parameters
+        groups = {}
+        for params in candidates:
+            others = {key: value for key, value in params.items() if key != 'n_estimators'}
+            groups.setdefault(repr(sorted(others.items())), (others, []))[1].append(params['n_estimators'])
+        for others, tree_counts in groups.values():
+            if self._evaluate_trees(others, X, y, tree_counts) is None:
+                break
+        # Grid order, so ties resolve like GridSearchCV
+        order = {repr(sorted(params.items())): i for i, params in enumerate(candidates)}
+        self._results.sort(key=lambda result: order[repr(sorted(result['params'].items()))])
+
+
+class SuccessiveHalvingSearch(BudgetedSearch):
+    """Successive halving on training rows or on an estimator parameter such as n_estimators."""
+
+    strategy = 'halving'
+
+    def __init__(self, estimator, param_grid, resource: str = 'n_samples', factor: int = 3,
+                 n_candidates: Optional[int] = None, **kwargs):
+        """
+        Args:
+            resource: 'n_samples' (training rows per fold) or an integer
+                estimator parameter; a grid entry for it sets its maximum
+            factor: Candidates kept per round are 1/factor; resource grows by factor
+            n_candidates: Candidates of the first round (default: as many as
+                the fit budget allows, at most the whole grid)
+        """
+        super().__init__(estimator, param_grid, **kwargs)
+        self.resource = resource
+        self.factor = factor
+        self.n_candidates = n_candidates
+
+    def _rounds(self, n_candidates: int) -> List[int]:
+        """Candidates per round, ending with one candidate."""
+        rounds = [n_candidates]
+        while rounds[-1] > 1:
+            rounds.append(math.ceil(rounds[-1] / self.factor))
+        return rounds
+
+    def _max_candidates(self, n_grid: int) -> int:
+        if self.n_candidates is not None:
+            return min(self.n_candidates, n_grid)
+        if self.max_fits is None:
+            return n_grid
+        n = n_grid
+        while n > 1 and sum(self._rounds(n)) * len(self.splits_) > self.max_fits:
+            n -= 1
+        return n
+
+    def _resources(self, n_rounds: int, max_resource: int, min_resource: int) -> List[int]:
+        return [
+            max(min(int(max_resource / self.factor ** (n_rounds - 1 - i)), max_resource), min(min_resource, max_resource))
+            for i in range(n_rounds)
+        ]
+
+    def fit(self, X, y) -> 'SuccessiveHalvingSearch':
+        super().fit(X, y)
+        if self.best_resource_ < self._max_resource:
+            warnings.warn(
+                f"Search budget ended before the final round; best score is at {self.resource}="
+                f"{self.best_resource_}, not {self._max_resource}"
+            )
+        return self
+
+    def _final_results(self) -> List[Dict]:
+        # Only scores at the highest resource reached are comparable
+        top = max(result['resource'] for result in self._results)
+        return [result for result in self._results if result['resource'] == top]
+
+    def _search(self, X, y):
+        rng = np.random.RandomState(self.random_state)
+        grid = dict(self.param_grid)
+        if self.resource == 'n_samples':
+            self._max_resource = min(len(train) for train, _ in self.splits_)
+            min_resource = MIN_HALVING_SAMPLES
+            # Fixed random order per fold so each round's rows extend the previous ones
+            orders = [train[rng.permutation(len(train))] for train, _ in self.splits_]
+        else:
+            values = grid.pop(self.resource, [self.estimator.get_params()[self.resource]])
+            self._max_resource = max(values)
+            min_resource = MIN_HALVING_TREES
+
+        candidates = list(ParameterGrid(grid))
+        candidates = [candidates[i] for i in rng.permutation(len(candidates))[:self._max_candidates(len(candidates))]]
+        rounds = self._rounds(len(candidates))
+        resources = self._resources(len(rounds), self._max_resource, min_resource)
+        # Survivors' fold forests are extended to the next round's tree count
+        grow_trees = self.resource == 'n_estimators' and self._reuses_trees()
+        states = [None] * len(candidates)
+
+        for iteration, resource in enumerate(resources):
+            if self.resource == 'n_samples':
+                splits = [(order[:resource], test) for order, (_, test) in zip(orders, self.splits_)]
+                fixed = None
+            else:
+                splits, fixed = None, {self.resource: resource}
+            scored = []
+            for i, params in enumerate(candidates):
+                if grow_trees:
+                    outcome = self._evaluate_trees(params, X, y, [resource], states[i], True, iteration)
+                    if outcome is None:
+                        return
+                    (score,), states[i] = outcome
+                else:
+                    score = self._evaluate(params, X, y, splits, fixed, resource, iteration)
+                    if score is None:
+                        return
+                scored.append(-np.inf if np.isnan(score) else score)
+            if iteration + 1 < len(rounds):
+                keep = np.argsort(-np.asarray(scored), kind='stable')[:rounds[iteration + 1]]
+                candidates = [candidates[i] for i in keep]
+                states = [states[i] for i in keep]
+
+
+class TPESearch(BudgetedSearch):
+    """Tree-structured Parzen estimator over a discrete parameter grid."""
+
+    strategy = 'tpe'
+
+    def __init__(self, estimator, param_grid, n_candidates: Optional[int] = None, n_startup: int = 10,
+                 gamma: float = 0.25, n_samples: int = 24, **kwargs):
+        """
+        Args:
+            n_candidates: Candidates to score (default: as many as the fit
+                budget allows, at most the whole grid)
+            n_startup: Random candidates before the model is used
+            gamma: Fraction of scores counted as good
+            n_samples: Draws from the good density per step
+        """
+        super().__init__(estimator, param_grid, **kwargs)
+        self.n_candidates = n_candidates
+        self.n_startup = n_startup
+        self.gamma = gamma
+        self.n_samples = n_samples
+
+    def _search(self, X, y):
+        rng = np.random.RandomState(self.random_state)
+        keys = sorted(self.param_grid)
+        sizes = [len(self.param_grid[key]) for key in keys]
+        n_grid = int(np.prod(sizes))
+        n_total = n_grid if self.n_candidates is None else min(self.n_candidates, n_grid)
+        if self.max_fits is not None:
+            n_total = min(n_total, self.max_fits // len(self.splits_))
+
+        seen = set()
+        chosen = []  # value indices per key of each scored candidate
+        scores = []
+        while len(chosen) < n_total:
+            candidate = None
+            if len(chosen) >= self.n_startup:
+                candidate = self._propose(rng, sizes, np.array(chosen), np.array(scores), seen)
+            while candidate is None or candidate in seen:
+                candidate = tuple(int(rng.randint(size)) for size in sizes)
+            seen.add(candidate)
+            params = {key: self.param_grid[key][i] for key, i in zip(keys, candidate)}
+            score = self._evaluate(params, X, y)
+            if score is None:
+                return
+            chosen.append(candidate)
+            scores.append(-np.inf if np.isnan(score) else score)
+
+    def _propose(self, rng, sizes, chosen: np.ndarray, scores: np.ndarray, seen) -> Optional[tuple]:
+        """Unseen candidate with the best good/bad density ratio among draws from the good density."""
+        n_good = max(1, int(math.ceil(self.gamma * len(scores))))
+        order = np.argsort(-scores, kind='stable')
+        good, bad = chosen[order[:n_good]], chosen[order[n_good:]]
+        draws = np.empty((self.n_samples, len(sizes)), dtype=int)
+        log_ratio = np.zeros(self.n_samples)
+        for j, size in enumerate(sizes):
+            # Categorical Parzen densities with a uniform prior of one count per value
+            l_density = np.bincount(good[:, j], minlength=size) + 1.0
+            g_density = np.bincount(bad[:, j], minlength=size) + 1.0 if len(bad) else np.ones(size)
+            l_density /= l_density.sum()
+            g_density /= g_density.sum()
+            draws[:, j] = rng.choice(size, size=self.n_samples, p=l_density)
+            log_ratio += np.log(l_density[draws[:, j]] / g_density[draws[:, j]])
+        for i in np.argsort(-log_ratio, kind='stable'):
+            candidate = tuple(int(v) for v in draws[i])
+            if candidate not in seen:
+                return candidate
+        return None
+
+
+class RegularizationPathSearch(BudgetedSearch):
+    """Warm-started regularization path per fold for each combination of the other parameters."""
+
+    strategy = 'path'
+
+    def __init__(self, estimator, param_grid, path_param: str = 'C', prune_solvers: bool = True, **kwargs):
+        """
+        Args:
+            path_param: Inverse regularization strength solved along (grid
+                values are fitted in increasing order)
+            prune_solvers: Keep one of the solvers sharing an objective for
+                each penalty (liblinear and unknown solvers are kept)
+        """
+        super().__init__(estimator, param_grid, **kwargs)
+        self.path_param = path_param
+        self.prune_solvers = prune_solvers
+
+    def settings(self) -> List[Dict]:
+        """Combinations of the parameters other than the path parameter, after solver pruning."""
+        grid = {key: values for key, values in self.param_grid.items() if key != self.path_param}
+        combinations = list(ParameterGrid(grid))
+        if not (self.prune_solvers and 'solver' in grid and 'penalty' in grid):
+            return combinations
+        kept = set()
+        for penalty in grid['penalty']:
+            solvers = [solver for solver in grid['solver'] if penalty in SOLVER_PENALTIES.get(solver, (penalty,))]
+            shared = [solver for solver in solvers if solver in WARM_START_SOLVERS]
+            kept.update((penalty, solver) for solver in solvers if solver not in WARM_START_SOLVERS)
+            if shared:
+                kept.add((penalty, shared[0]))
+        return [params for params in combinations if (params['penalty'], params['solver']) in kept]
+
+    def _search(self, X, y):
+        if self.path_param not in self.estimator.get_params():
+            raise ValueError(f"{type(self.estimator).__name__} has no parameter {self.path_param!r}")
+        values = sorted(self.param_grid.get(self.path_param, [self.estimator.get_params()[self.path_param]]))
+        scorers = {name: get_scorer(name) for name in self._metrics}
+        n_splits = len(self.splits_)
+        self.path_ = []
+        for params in self.settings():
+            # A fit budget too small for the whole path truncates it at the weakest regularization
+            n_values = len(values)
+            if self.max_fits is not None:
+                n_values = min(n_values, (self.max_fits - self.n_fits_) // n_splits)
+            if n_values == 0 or self.exhausted(n_values * n_splits):
+                return
+            estimator = clone(self.estimator).set_params(**params)
+            folds = Parallel(n_jobs=self.n_jobs)(
+                delayed(_fold_path)(estimator, X, y, train, test, self.path_param, values[:n_values], scorers)
+                for train, test in self.splits_
+            )
+            self.n_fits_ += n_values * n_splits
+            for i, value in enumerate(values[:n_values]):
+                metric_scores = {name: np.array([fold[i][0][name] for fold in folds]) for name in self._metrics}
+                score = self._record(dict(params, **{self.path_param: value}), None, metric_scores, True, None, 0)
+                self.path_.append(dict(
+                    params, **{self.path_param: value},
+                    mean_test_score=score, mean_nonzero_coefs=float(np.mean([fold[i][1] for fold in folds]))
+                ))
+
+
+SEARCHES = {
+    'grid': GridSearch, 'halving': SuccessiveHalvingSearch, 'tpe': TPESearch, 'path': RegularizationPathSearch
+}
+
+
+def make_search(strategy: str, estimator, param_grid: Dict[str, List], **options) -> BudgetedSearch:
+    """
+    Build a search by strategy name.
+
+    Raises:
+        ValueError: If the strategy is unknown
+    """
+    if strategy not in SEARCHES:
+        raise ValueError(f"strategy must be one of {STRATEGIES}, got {strategy!r}")
+    return SEARCHES[strategy](estimator, param_grid, **options)
+
+
+def compare_searches(searches: Dict[str, BudgetedSearch], X, y) -> List[Dict]:
+    """
+    Fit several searches on the same data and summarize best score vs. cost.
+
+    Returns:
+        One summary per search (see BudgetedSearch.summary), labelled by its key
+    """
+    rows = []
+    for label, search in searches.items():
+        search.fit(X, y)
+        rows.append(dict(search.summary(), label=label))
+    return rows
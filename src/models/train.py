@@ -6,18 +6,21 @@ with comprehensive hyperparameter tuning, cross-validation, and MLflow experimen
 
 Features:
 - Loads preprocessed data from data/processed/
-- Hyperparameter tuning using GridSearchCV
+- Budgeted hyperparameter search (grid, successive halving or TPE; see src/models/search.py)
 - Cross-validation for robust model evaluation
 - MLflow tracking for experiments, parameters, and metrics
 - Comprehensive evaluation metrics (accuracy, precision, recall, F1, ROC-AUC)
 - Model comparison and selection
 - Saves best model to models/ directory
+- Tracing spans per stage (TRACING_EXPORTER, see src/utils/tracing.py)
 
 Author: sanepr
 Date: 2025-12-24
 """
 
+import os
 import sys
+import argparse
 import pickle
 import json
 import warnings
@@ -32,7 +35,7 @@ import mlflow.data
 from mlflow.data.pandas_dataset import PandasDataset
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import GridSearchCV, cross_val_score, StratifiedKFold
+from sklearn.model_selection import StratifiedKFold, cross_val_predict, cross_validate
 from sklearn.metrics import (
     accuracy_score,
     precision_score,
@@ -44,6 +47,10 @@ from sklearn.metrics import (
 # Import MLflow configuration
 sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 from src.config.mlflow_config import get_mlflow_config, print_config
+from src.models.cascade import fit_uncertainty_band
+from src.models.forest_compaction import compact_forest_structure
+from src.models.search import STRATEGIES, compare_searches, make_search
+from src.utils.tracing import configure_tracing, get_tracer, span, traced
 
 warnings.filterwarnings('ignore')
 
@@ -53,6 +60,41 @@ DATA_DIR = PROJECT_ROOT / "data" / "processed"
 MODEL_DIR = PROJECT_ROOT / "models"
 MODEL_DIR.mkdir(parents=True, exist_ok=True)
 
+# Minimum label agreement between cascade serving and forest-only serving
+CASCADE_TARGET_AGREEMENT = 0.99
+
+# Hyperparameter search per model family. Budgets count cross-validation
+# fits and/or seconds (None: unlimited); 'grid' without a budget reproduces
+# the exhaustive GridSearchCV. Overridable with LR_SEARCH_STRATEGY,
+# LR_SEARCH_MAX_FITS, LR_SEARCH_MAX_SECONDS and the RF_ equivalents.
+# Logistic regression solves the whole warm-started regularization path
+# (a warm fit costs a fraction of a cold one), so it has no fit budget.
+SEARCH_CONFIG = {
+    'logistic_regression': {'prefix': 'LR', 'strategy': 'path', 'max_fits': None, 'max_seconds': None},
+    'random_forest': {
+        'prefix': 'RF', 'strategy': 'halving', 'resource': 'n_estimators', 'max_fits': 300, 'max_seconds': None
+    },
+}
+SEARCH_CV_FOLDS = 5
+
+# Families whose estimator has a regularization path ('path' strategy)
+PATH_SEARCH_FAMILIES = ('logistic_regression',)
+
+# Cross-validation metrics (metric name -> sklearn scoring). The search scores
+# all of them on the same shuffled folds as cross_validate_model(), so the
+# winner's fold scores are reused instead of refitting it per metric.
+CV_SCORING = {
+    'cv_accuracy': 'accuracy',
+    'cv_precision': 'precision_weighted',
+    'cv_recall': 'recall_weighted',
+    'cv_f1': 'f1_weighted',
+    'cv_roc_auc': 'roc_auc',
+}
+
+
+def cv_folds(n_splits: int = SEARCH_CV_FOLDS) -> StratifiedKFold:
+    return StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42)
+
 
 def setup_mlflow():
     """Initialize MLflow tracking with environment-aware configuration."""
@@ -64,6 +106,7 @@ def setup_mlflow():
     print_config()
 
 
+@traced('train.load')
 def load_data() -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, pd.DataFrame, pd.DataFrame]:
     """
     Load preprocessed training and testing data.
@@ -129,6 +172,119 @@ def get_random_forest_params() -> Dict:
     }
 
 
+def get_search_config(family: str, strategy: str = None) -> Dict[str, Any]:
+    """
+    Search strategy and budget of a model family, with environment overrides.
+
+    Args:
+        family: Key of SEARCH_CONFIG
+        strategy: Strategy overriding configuration and environment
+
+    Returns:
+        Dictionary with strategy, max_fits, max_seconds (and halving resource)
+    """
+    config = dict(SEARCH_CONFIG[family])
+    prefix = config.pop('prefix')
+    config['strategy'] = strategy or os.environ.get(f'{prefix}_SEARCH_STRATEGY', config['strategy'])
+    if config['strategy'] not in STRATEGIES:
+        raise ValueError(f"Search strategy must be one of {STRATEGIES}, got {config['strategy']!r}")
+    if config['strategy'] == 'path' and family not in PATH_SEARCH_FAMILIES:
+        raise ValueError(f"The 'path' search strategy needs a linear model, not {family}")
+    for key, cast in (('max_fits', int), ('max_seconds', float)):
+        value = os.environ.get(f'{prefix}_SEARCH_{key.upper()}')
+        if value is not None:
+            config[key] = cast(value) if value.lower() != 'none' else None
+    if config['strategy'] != 'halving':
+        config.pop('resource', None)
+    return config
+
+
+def build_search(estimator, param_grid: Dict, config: Dict[str, Any]):
+    """Create the configured search over a parameter grid."""
+    options = {key: value for key, value in config.items() if key != 'strategy'}
+    return make_search(
+        config['strategy'], estimator, param_grid, cv=cv_folds(), scoring=list(CV_SCORING.values()),
+        refit='roc_auc', n_jobs=-1, **options
+    )
+
+
+def log_search(search, config: Dict[str, Any]):
+    """Log the search strategy, budget, cost and best parameters to MLflow."""
+    mlflow.log_param("search_strategy", config['strategy'])
+    mlflow.log_param("search_max_fits", config.get('max_fits'))
+    mlflow.log_param("search_max_seconds", config.get('max_seconds'))
+    for param, value in search.best_params_.items():
+        mlflow.log_param(f"best_{param}", value)
+    mlflow.log_metric("best_cv_score", search.best_score_)
+    if search.best_resource_ is not None:
+        # Halving: the resource (trees or training rows) best_cv_score was measured at
+        mlflow.log_param("search_best_resource", search.best_resource_)
+    mlflow.log_metric("search_fits", search.n_fits_)
+    mlflow.log_metric("search_seconds", search.search_seconds_)
+    if hasattr(search, 'path_'):
+        log_regularization_path(search)
+
+
+def log_regularization_path(search) -> pd.DataFrame:
+    """
+    Log a regularization path search to MLflow.
+
+    The path of the winning setting is logged as one curve (CV ROC-AUC per
+    step of increasing C, with C logged alongside); every setting's path
+    goes to regularization_path.json.
+
+    Returns:
+        Path table (one row per setting and C)
+    """
+    table = pd.DataFrame(search.path_)
+    setting = {key: value for key, value in search.best_params_.items() if key != search.path_param}
+    on_best = np.ones(len(table), dtype=bool)
+    for key, value in setting.items():
+        on_best &= (table[key].astype(str) == str(value)).to_numpy()
+    for step, row in enumerate(table[on_best].itertuples(index=False)):
+        mlflow.log_metric("path_cv_roc_auc", row.mean_test_score, step=step)
+        mlflow.log_metric("path_C", getattr(row, search.path_param), step=step)
+        mlflow.log_metric("path_nonzero_coefs", row.mean_nonzero_coefs, step=step)
+    try:
+        mlflow.log_table(data=table.astype({key: str for key in setting}), artifact_file="regularization_path.json")
+    except Exception as e:
+        print(f"⚠️  Could not log regularization path table: {e}")
+    return table
+
+
+@traced('train.search_comparison')
+def compare_with_grid(search, estimator, param_grid: Dict, X: np.ndarray, y: np.ndarray) -> pd.DataFrame:
+    """
+    Run the exhaustive grid on the same data and log best score vs. time for both.
+
+    Returns:
+        Comparison table (one row per strategy)
+    """
+    print("\nRunning the exhaustive grid for comparison...")
+    grid = build_search(estimator, param_grid, {'strategy': 'grid', 'max_fits': None, 'max_seconds': None})
+    rows = [dict(search.summary(), label=search.strategy)] + compare_searches({'grid': grid}, X, y)
+    table = pd.DataFrame([
+        {
+            'Strategy': row['label'],
+            'Best CV ROC-AUC': row['best_score'],
+            'Search Seconds': row['search_seconds'],
+            'CV Fits': row['n_fits'],
+            'Candidates': row['n_candidates'],
+            'Best Params': json.dumps(row['best_params'], default=str),
+        }
+        for row in rows
+    ])
+    print(table.drop(columns='Best Params').to_string(index=False))
+    mlflow.log_metric("grid_best_cv_score", grid.best_score_)
+    mlflow.log_metric("grid_search_seconds", grid.search_seconds_)
+    try:
+        mlflow.log_table(data=table, artifact_file="search_comparison.json")
+    except Exception as e:
+        print(f"⚠️  Could not log search comparison table: {e}")
+    return table
+
+
+@traced('train.evaluate')
 def evaluate_model(
     model,
     X_train: np.ndarray,
@@ -177,44 +333,59 @@ def evaluate_model(
     return metrics
 
 
+@traced('train.cv')
 def cross_validate_model(
     model,
     X: np.ndarray,
     y: np.ndarray,
-    cv: int = 5
+    cv: int = 5,
+    search=None
 ) -> Dict[str, float]:
     """
     Perform cross-validation and return mean scores.
     
+    All metrics come from one fit per fold. When the search that produced
+    the model scored it on the same folds, its fold scores are used and
+    nothing is refitted.
+    
     Args:
         model: Model to evaluate
         X: Features
         y: Labels
         cv: Number of cross-validation folds
+        search: Fitted search over the same X and y whose best parameters
+            the model has (optional)
     
     Returns:
         Dictionary of cross-validation metrics
     """
-    skf = StratifiedKFold(n_splits=cv, shuffle=True, random_state=42)
-    
-    cv_metrics = {
-        'cv_accuracy': cross_val_score(model, X, y, cv=skf, scoring='accuracy').mean(),
-        'cv_precision': cross_val_score(model, X, y, cv=skf, scoring='precision_weighted').mean(),
-        'cv_recall': cross_val_score(model, X, y, cv=skf, scoring='recall_weighted').mean(),
-        'cv_f1': cross_val_score(model, X, y, cv=skf, scoring='f1_weighted').mean(),
-        'cv_roc_auc': cross_val_score(model, X, y, cv=skf, scoring='roc_auc').mean()
-    }
+    splits = list(cv_folds(cv).split(X, y))
+    
+    fold_scores = None
+    if search is not None and len(search.splits_) == len(splits) and all(
+        np.array_equal(train, search_train) and np.array_equal(test, search_test)
+        for (train, test), (search_train, search_test) in zip(splits, search.splits_)
+    ):
+        fold_scores = search.fold_scores(search.best_params_)
+    if fold_scores is None or not all(scoring in fold_scores for scoring in CV_SCORING.values()):
+        output = cross_validate(model, X, y, cv=splits, scoring=list(CV_SCORING.values()))
+        fold_scores = {scoring: output[f'test_{scoring}'] for scoring in CV_SCORING.values()}
+    else:
+        print("✓ Cross-validation metrics taken from the search's fold scores")
     
-    return cv_metrics
+    return {metric: float(np.mean(fold_scores[scoring])) for metric, scoring in CV_SCORING.items()}
 
 
+@traced('train.logistic_regression')
 def train_logistic_regression(
     X_train: np.ndarray,
     X_test: np.ndarray,
     y_train: np.ndarray,
     y_test: np.ndarray,
     X_train_df: pd.DataFrame = None,
-    X_test_df: pd.DataFrame = None
+    X_test_df: pd.DataFrame = None,
+    search_strategy: str = None,
+    compare_search: bool = False
 ) -> Tuple[Any, Dict[str, float], Dict[str, Any]]:
     """
     Train Logistic Regression with hyperparameter tuning.
@@ -226,6 +397,8 @@ def train_logistic_regression(
         y_test: Test labels
         X_train_df: Training features as DataFrame (for dataset logging)
         X_test_df: Test features as DataFrame (for dataset logging)
+        search_strategy: Search strategy overriding SEARCH_CONFIG
+        compare_search: Also run the exhaustive grid and log the comparison
 
     Returns:
         Tuple of (best_model, metrics, best_params)
@@ -239,72 +412,72 @@ def train_logistic_regression(
         mlflow.log_param("model_type", "LogisticRegression")
         
         # Log dataset information
-        if X_train_df is not None:
-            try:
-                # Create training dataset
-                train_df = X_train_df.copy()
-                train_df['target'] = y_train
-                train_dataset = mlflow.data.from_pandas(
-                    train_df,
-                    source="data/processed/X_train.pkl",
-                    name="heart_disease_training_data",
-                    targets="target"
-                )
-                mlflow.log_input(train_dataset, context="training")
-                print(f"✓ Training dataset logged to MLflow")
-
-                # Create test dataset
-                test_df = X_test_df.copy()
-                test_df['target'] = y_test
-                test_dataset = mlflow.data.from_pandas(
-                    test_df,
-                    source="data/processed/X_test.pkl",
-                    name="heart_disease_test_data",
-                    targets="target"
-                )
-                mlflow.log_input(test_dataset, context="testing")
-                print(f"✓ Test dataset logged to MLflow")
-            except Exception as e:
-                print(f"⚠️  Could not log datasets: {e}")
+        with span('train.mlflow.log_datasets'):
+            if X_train_df is not None:
+                try:
+                    # Create training dataset
+                    train_df = X_train_df.copy()
+                    train_df['target'] = y_train
+                    train_dataset = mlflow.data.from_pandas(
+                        train_df,
+                        source="data/processed/X_train.pkl",
+                        name="heart_disease_training_data",
+                        targets="target"
+                    )
+                    mlflow.log_input(train_dataset, context="training")
+                    print(f"✓ Training dataset logged to MLflow")
+
+                    # Create test dataset
+                    test_df = X_test_df.copy()
+                    test_df['target'] = y_test
+                    test_dataset = mlflow.data.from_pandas(
+                        test_df,
+                        source="data/processed/X_test.pkl",
+                        name="heart_disease_test_data",
+                        targets="target"
+                    )
+                    mlflow.log_input(test_dataset, context="testing")
+                    print(f"✓ Test dataset logged to MLflow")
+                except Exception as e:
+                    print(f"⚠️  Could not log datasets: {e}")
 
         # Initialize model
         lr = LogisticRegression(random_state=42)
         
         # Hyperparameter tuning
-        print("Performing GridSearchCV for hyperparameter tuning...")
+        search_config = get_search_config('logistic_regression', search_strategy)
+        print(f"Performing {search_config['strategy']} search for hyperparameter tuning "
+              f"(max fits: {search_config['max_fits']}, max seconds: {search_config['max_seconds']})...")
         param_grid = get_logistic_regression_params()
+        search = build_search(lr, param_grid, search_config)
         
-        grid_search = GridSearchCV(
-            lr,
-            param_grid,
-            cv=5,
-            scoring='roc_auc',
-            n_jobs=-1,
-            verbose=1
-        )
+        with span('train.search', strategy=search_config['strategy'], folds=SEARCH_CV_FOLDS) as search_span:
+            search.fit(X_train, y_train)
+            search_span.set_attribute('fits', search.n_fits_)
+        best_model = search.best_estimator_
         
-        grid_search.fit(X_train, y_train)
-        best_model = grid_search.best_estimator_
-        
-        print(f"\n✓ Best parameters: {grid_search.best_params_}")
-        print(f"✓ Best CV ROC-AUC score: {grid_search.best_score_:.4f}")
+        print(f"\n✓ Best parameters: {search.best_params_}")
+        print(f"✓ Best CV ROC-AUC score: {search.best_score_:.4f} "
+              f"({search.n_fits_} fits in {search.search_seconds_:.1f}s)")
         
         # Log best parameters
-        for param, value in grid_search.best_params_.items():
-            mlflow.log_param(f"best_{param}", value)
-        mlflow.log_metric("best_cv_score", grid_search.best_score_)
+        with span('train.mlflow.log_params'):
+            log_search(search, search_config)
+        if compare_search:
+            compare_with_grid(search, lr, param_grid, X_train, y_train)
         
         # Evaluate model
         print("\nEvaluating model...")
         metrics = evaluate_model(best_model, X_train, X_test, y_train, y_test)
         
         # Cross-validation
-        cv_metrics = cross_validate_model(best_model, X_train, y_train)
+        cv_metrics = cross_validate_model(best_model, X_train, y_train, search=search)
         metrics.update(cv_metrics)
         
         # Log all metrics
-        for metric_name, metric_value in metrics.items():
-            mlflow.log_metric(metric_name, metric_value)
+        with span('train.mlflow.log_metrics'):
+            for metric_name, metric_value in metrics.items():
+                mlflow.log_metric(metric_name, metric_value)
         
         # Log evaluation metrics as table
         eval_table = pd.DataFrame([{
@@ -353,18 +526,22 @@ def train_logistic_regression(
         print(f"CV ROC-AUC:     {metrics['cv_roc_auc']:.4f}")
         
         # Log model
-        mlflow.sklearn.log_model(best_model, "model")
+        with span('train.mlflow.log_model'):
+            mlflow.sklearn.log_model(best_model, "model")
         
-        return best_model, metrics, grid_search.best_params_
+        return best_model, metrics, search.best_params_
 
 
+@traced('train.random_forest')
 def train_random_forest(
     X_train: np.ndarray,
     X_test: np.ndarray,
     y_train: np.ndarray,
     y_test: np.ndarray,
     X_train_df: pd.DataFrame = None,
-    X_test_df: pd.DataFrame = None
+    X_test_df: pd.DataFrame = None,
+    search_strategy: str = None,
+    compare_search: bool = False
 ) -> Tuple[Any, Dict[str, float], Dict[str, Any]]:
     """
     Train Random Forest with hyperparameter tuning.
@@ -376,6 +553,8 @@ def train_random_forest(
         y_test: Test labels
         X_train_df: Training features as DataFrame (for dataset logging)
         X_test_df: Test features as DataFrame (for dataset logging)
+        search_strategy: Search strategy overriding SEARCH_CONFIG
+        compare_search: Also run the exhaustive grid and log the comparison
 
     Returns:
         Tuple of (best_model, metrics, best_params)
@@ -389,72 +568,72 @@ def train_random_forest(
         mlflow.log_param("model_type", "RandomForest")
         
         # Log dataset information
-        if X_train_df is not None:
-            try:
-                # Create training dataset
-                train_df = X_train_df.copy()
-                train_df['target'] = y_train
-                train_dataset = mlflow.data.from_pandas(
-                    train_df,
-                    source="data/processed/X_train.pkl",
-                    name="heart_disease_training_data",
-                    targets="target"
-                )
-                mlflow.log_input(train_dataset, context="training")
-                print(f"✓ Training dataset logged to MLflow")
-
-                # Create test dataset
-                test_df = X_test_df.copy()
-                test_df['target'] = y_test
-                test_dataset = mlflow.data.from_pandas(
-                    test_df,
-                    source="data/processed/X_test.pkl",
-                    name="heart_disease_test_data",
-                    targets="target"
-                )
-                mlflow.log_input(test_dataset, context="testing")
-                print(f"✓ Test dataset logged to MLflow")
-            except Exception as e:
-                print(f"⚠️  Could not log datasets: {e}")
+        with span('train.mlflow.log_datasets'):
+            if X_train_df is not None:
+                try:
+                    # Create training dataset
+                    train_df = X_train_df.copy()
+                    train_df['target'] = y_train
+                    train_dataset = mlflow.data.from_pandas(
+                        train_df,
+                        source="data/processed/X_train.pkl",
+                        name="heart_disease_training_data",
+                        targets="target"
+                    )
+                    mlflow.log_input(train_dataset, context="training")
+                    print(f"✓ Training dataset logged to MLflow")
+
+                    # Create test dataset
+                    test_df = X_test_df.copy()
+                    test_df['target'] = y_test
+                    test_dataset = mlflow.data.from_pandas(
+                        test_df,
+                        source="data/processed/X_test.pkl",
+                        name="heart_disease_test_data",
+                        targets="target"
+                    )
+                    mlflow.log_input(test_dataset, context="testing")
+                    print(f"✓ Test dataset logged to MLflow")
+                except Exception as e:
+                    print(f"⚠️  Could not log datasets: {e}")
 
         # Initialize model
         rf = RandomForestClassifier(random_state=42, n_jobs=-1)
         
         # Hyperparameter tuning
-        print("Performing GridSearchCV for hyperparameter tuning...")
+        search_config = get_search_config('random_forest', search_strategy)
+        print(f"Performing {search_config['strategy']} search for hyperparameter tuning "
+              f"(max fits: {search_config['max_fits']}, max seconds: {search_config['max_seconds']})...")
         param_grid = get_random_forest_params()
+        search = build_search(rf, param_grid, search_config)
         
-        grid_search = GridSearchCV(
-            rf,
-            param_grid,
-            cv=5,
-            scoring='roc_auc',
-            n_jobs=-1,
-            verbose=1
-        )
+        with span('train.search', strategy=search_config['strategy'], folds=SEARCH_CV_FOLDS) as search_span:
+            search.fit(X_train, y_train)
+            search_span.set_attribute('fits', search.n_fits_)
+        best_model = search.best_estimator_
         
-        grid_search.fit(X_train, y_train)
-        best_model = grid_search.best_estimator_
-        
-        print(f"\n✓ Best parameters: {grid_search.best_params_}")
-        print(f"✓ Best CV ROC-AUC score: {grid_search.best_score_:.4f}")
+        print(f"\n✓ Best parameters: {search.best_params_}")
+        print(f"✓ Best CV ROC-AUC score: {search.best_score_:.4f} "
+              f"({search.n_fits_} fits in {search.search_seconds_:.1f}s)")
         
         # Log best parameters
-        for param, value in grid_search.best_params_.items():
-            mlflow.log_param(f"best_{param}", value)
-        mlflow.log_metric("best_cv_score", grid_search.best_score_)
+        with span('train.mlflow.log_params'):
+            log_search(search, search_config)
+        if compare_search:
+            compare_with_grid(search, rf, param_grid, X_train, y_train)
         
         # Evaluate model
         print("\nEvaluating model...")
         metrics = evaluate_model(best_model, X_train, X_test, y_train, y_test)
         
         # Cross-validation
-        cv_metrics = cross_validate_model(best_model, X_train, y_train)
+        cv_metrics = cross_validate_model(best_model, X_train, y_train, search=search)
         metrics.update(cv_metrics)
         
         # Log all metrics
-        for metric_name, metric_value in metrics.items():
-            mlflow.log_metric(metric_name, metric_value)
+        with span('train.mlflow.log_metrics'):
+            for metric_name, metric_value in metrics.items():
+                mlflow.log_metric(metric_name, metric_value)
         
         # Log evaluation metrics as table
         eval_table = pd.DataFrame([{
@@ -521,16 +700,51 @@ def train_random_forest(
         print(f"CV ROC-AUC:     {metrics['cv_roc_auc']:.4f}")
         
         # Log model
-        mlflow.sklearn.log_model(best_model, "model")
+        with span('train.mlflow.log_model'):
+            mlflow.sklearn.log_model(best_model, "model")
         
-        return best_model, metrics, grid_search.best_params_
+        return best_model, metrics, search.best_params_
+
 
+@traced('train.compact')
+def compact_random_forest(rf_model, X_val: np.ndarray) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Collapse same-outcome splits in the trained forest before it is saved.
+
+    Args:
+        rf_model: Trained Random Forest
+        X_val: Features used to verify predictions and time inference
+
+    Returns:
+        Tuple of (forest to save, compaction report)
+    """
+    print("\n" + "="*80)
+    print("COMPACTING RANDOM FOREST")
+    print("="*80)
+
+    compacted, report = compact_forest_structure(rf_model, X_val)
+
+    print(f"✓ Nodes: {report['n_nodes_before']} -> {report['n_nodes_after']} "
+          f"({report['node_reduction']:.1%} fewer)")
+    print(f"✓ Max depth: {report['max_depth_before']} -> {report['max_depth_after']}")
+    print(f"✓ Mean depth: {report['mean_depth_before']:.2f} -> {report['mean_depth_after']:.2f}")
+    print(f"✓ Deduplicated compact nodes: {report['compact_nodes_deduplicated']}")
+    print(f"✓ Inference speedup: {report['speedup']:.2f}x")
 
+    if not report['predictions_identical']:
+        print("⚠️  Compacted forest changed predictions, keeping the original")
+        return rf_model, report
+
+    return compacted, report
+
+
+@traced('train.save')
 def save_best_model(
     model,
     model_name: str,
     metrics: Dict[str, float],
-    params: Dict[str, Any]
+    params: Dict[str, Any],
+    compaction: Dict[str, Any] = None
 ):
     """
     Save the best model and its metadata.
@@ -540,6 +754,7 @@ def save_best_model(
         model_name: Name for the model file
         metrics: Model metrics
         params: Model parameters
+        compaction: Forest compaction report, if compaction ran
     """
     print(f"\n✓ Saving model to {MODEL_DIR}/{model_name}.pkl")
     
@@ -555,6 +770,8 @@ def save_best_model(
         'parameters': params,
         'timestamp': '2025-12-24 08:49:33'
     }
+    if compaction is not None:
+        metadata['compaction'] = compaction
     
     metadata_path = MODEL_DIR / f"{model_name}_metadata.json"
     with open(metadata_path, 'w') as f:
@@ -563,6 +780,55 @@ def save_best_model(
     print(f"✓ Saved metadata to {metadata_path}")
 
 
+@traced('train.cascade_band')
+def fit_cascade_band(
+    lr_model,
+    rf_model,
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    target_agreement: float = CASCADE_TARGET_AGREEMENT
+) -> Dict[str, float]:
+    """
+    Fit the cascade uncertainty band and save it for serving.
+
+    The band is tuned on out-of-fold predictions over the training split
+    (both stages refitted with their parameters on the cross-validation
+    folds), so the test split stays unseen for compare_models().
+
+    Args:
+        lr_model: Trained Logistic Regression (first stage)
+        rf_model: Trained Random Forest (second stage)
+        X_train: Training features
+        y_train: Training labels
+        target_agreement: Minimum label agreement with forest-only serving
+
+    Returns:
+        Band dictionary (low, high, agreement, escalation_rate, ...)
+    """
+    print("\n" + "="*80)
+    print("FITTING CASCADE UNCERTAINTY BAND")
+    print("="*80)
+
+    folds = list(cv_folds().split(X_train, y_train))
+    band = fit_uncertainty_band(
+        cross_val_predict(lr_model, X_train, y_train, cv=folds, method='predict_proba')[:, 1],
+        cross_val_predict(rf_model, X_train, y_train, cv=folds),
+        target_agreement=target_agreement
+    )
+
+    print(f"✓ Band: [{band['low']:.4f}, {band['high']:.4f}]")
+    print(f"✓ Agreement with forest: {band['agreement']:.4f} (target {target_agreement})")
+    print(f"✓ Escalation rate: {band['escalation_rate']:.4f}")
+
+    band_path = MODEL_DIR / "cascade_metadata.json"
+    with open(band_path, 'w') as f:
+        json.dump(band, f, indent=4)
+    print(f"✓ Saved cascade band to {band_path}")
+
+    return band
+
+
+@traced('train.compare')
 def compare_models(
     lr_metrics: Dict[str, float],
     rf_metrics: Dict[str, float]
@@ -638,8 +904,20 @@ def compare_models(
     return best_model_name
 
 
-def main():
-    """Main training pipeline."""
+@traced('train.pipeline')
+def main(compact_forest: bool = False, search_strategy: str = None, compare_search: bool = False):
+    """
+    Main training pipeline.
+
+    Args:
+        compact_forest: Collapse same-outcome splits in the Random Forest
+            before it is saved
+        search_strategy: Search strategy for both model families (default:
+            SEARCH_CONFIG and environment); 'path' applies to logistic
+            regression only
+        compare_search: Also run the exhaustive grid per family and log
+            best score vs. time of both
+    """
     print("\n" + "="*80)
     print("MODEL TRAINING PIPELINE")
     print("="*80)
@@ -654,24 +932,34 @@ def main():
 
     # Train Logistic Regression (with dataset logging)
     lr_model, lr_metrics, lr_params = train_logistic_regression(
-        X_train, X_test, y_train, y_test, X_train_df, X_test_df
+        X_train, X_test, y_train, y_test, X_train_df, X_test_df,
+        search_strategy=search_strategy, compare_search=compare_search
     )
     
-    # Train Random Forest (with dataset logging)
+    # Train Random Forest (with dataset logging); the path strategy is linear-only
     rf_model, rf_metrics, rf_params = train_random_forest(
-        X_train, X_test, y_train, y_test, X_train_df, X_test_df
+        X_train, X_test, y_train, y_test, X_train_df, X_test_df,
+        search_strategy=None if search_strategy == 'path' else search_strategy, compare_search=compare_search
     )
     
     # Compare models
     best_model_name = compare_models(lr_metrics, rf_metrics)
+
+    # Fit the uncertainty band for cascade serving on the training split
+    fit_cascade_band(lr_model, rf_model, X_train, y_train)
+
+    # Optional structural compaction before the forest is saved
+    rf_compaction = None
+    if compact_forest:
+        rf_model, rf_compaction = compact_random_forest(rf_model, X_test)
     
     # Save both models
     save_best_model(lr_model, "logistic_regression", lr_metrics, lr_params)
-    save_best_model(rf_model, "random_forest", rf_metrics, rf_params)
+    save_best_model(rf_model, "random_forest", rf_metrics, rf_params, rf_compaction)
     
     # Save the best model with a special name
     if best_model_name == "random_forest":
-        save_best_model(rf_model, "best_model", rf_metrics, rf_params)
+        save_best_model(rf_model, "best_model", rf_metrics, rf_params, rf_compaction)
     else:
         save_best_model(lr_model, "best_model", lr_metrics, lr_params)
     
@@ -687,4 +975,17 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Train heart disease prediction models")
+    parser.add_argument('--compact-forest', action='store_true',
+                        help="Collapse same-outcome splits in the Random Forest before saving")
+    parser.add_argument('--search', choices=STRATEGIES,
+                        help="Hyperparameter search strategy for both model families (default: per family; "
+                             "'path' applies to logistic regression only); budgets still apply, "
+                             "set LR_/RF_SEARCH_MAX_FITS=none for the full grid")
+    parser.add_argument('--compare-search', action='store_true',
+                        help="Also run the exhaustive grid and log best score vs. time against it")
+    args = parser.parse_args()
+
+    configure_tracing('heart-disease-training')
+    main(compact_forest=args.compact_forest, search_strategy=args.search, compare_search=args.compare_search)
+    get_tracer().flush()
@@ -0,0 +1,80 @@
+"""
+Benchmark /batch_predict Response Formats
+
+Compares the row-of-dicts and columnar batch response layouts, with and
+without output field selection, for payload size and serialization time,
+uncompressed and with each available compression.
+
+Usage:
+    python src/utils/benchmark_batch_formats.py --rows 50000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from src.api.batch_format import (
+    OUTPUT_FIELDS, build_columnar_predictions, build_row_predictions, stream_json, zstandard
+)
+from src.models.predict import RISK_LEVEL_BOUNDARIES
+
+
+def synthetic_predictions(n_rows, seed=0):
+    """Random labels and probabilities shaped like model output."""
+    rng = np.random.RandomState(seed)
+    disease = rng.rand(n_rows)
+    labels = (disease > 0.5).astype(int)
+    return np.arange(n_rows), labels, np.column_stack([1.0 - disease, disease])
+
+
+def time_format(build, encoding, repeats):
+    """Best-of-N time to build and serialize one response; returns (bytes, seconds)."""
+    best = np.inf
+    size = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        size = sum(len(chunk) for chunk in stream_json(build(), encoding))
+        best = min(best, time.perf_counter() - start)
+    return size, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batch response formats")
+    parser.add_argument('--rows', type=int, default=50000, help='Rows per batch')
+    parser.add_argument('--repeats', type=int, default=3, help='Timing repeats (best is reported)')
+    args = parser.parse_args()
+
+    indices, labels, probas = synthetic_predictions(args.rows)
+    layouts = {
+        'rows': lambda fields: lambda: {'predictions': build_row_predictions(
+            args.rows, indices, labels, probas, {}, RISK_LEVEL_BOUNDARIES, fields)},
+        'columnar': lambda fields: lambda: build_columnar_predictions(
+            indices, labels, probas, {}, RISK_LEVEL_BOUNDARIES, fields),
+    }
+    selections = {'all fields': OUTPUT_FIELDS, 'prediction,confidence': ('prediction', 'confidence')}
+    encodings = [None, 'gzip'] + (['zstd'] if zstandard is not None else [])
+
+    print("=" * 80)
+    print(f"BATCH RESPONSE FORMAT BENCHMARK ({args.rows:,} rows)")
+    print("=" * 80)
+    print(f"{'layout':<10} {'fields':<24} {'encoding':<10} {'size (KB)':>12} {'time (ms)':>12}")
+    print("-" * 80)
+
+    for layout, make_build in layouts.items():
+        for selection, fields in selections.items():
+            for encoding in encodings:
+                size, seconds = time_format(make_build(fields), encoding, args.repeats)
+                print(f"{layout:<10} {selection:<24} {encoding or 'identity':<10} "
+                      f"{size / 1024:>12,.1f} {seconds * 1000:>12,.1f}")
+
+    print("-" * 80)
+    if zstandard is None:
+        print("⚠️  zstandard not installed; zstd results skipped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark the Client SDK Against Naive Per-Row Posting
+
+Sends the same rows to /predict one requests.post per row (no connection
+reuse, the pattern upstream services use today) and through
+HeartDiseaseClient.submit() coalescing, from the same number of caller
+threads, and reports throughput and per-row latency.
+
+Without --url a local server is started in-process with a forest trained on
+synthetic data, so the comparison can run anywhere.
+
+Usage:
+    python src/utils/benchmark_client.py --rows 2000 --threads 8
+    python src/utils/benchmark_client.py --url http://localhost:8000
+"""
+
+import argparse
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from src.client.sdk import FEATURES, HeartDiseaseClient
+
+
+def synthetic_samples(n_rows, seed=0):
+    """Random samples with the API's 13 features."""
+    rng = np.random.RandomState(seed)
+    X = rng.randn(n_rows, len(FEATURES)) * 20 + 100
+    return [dict(zip(FEATURES, row.tolist())) for row in X]
+
+
+def start_local_server():
+    """Serve the API with a synthetic forest on a free local port."""
+    from sklearn.ensemble import RandomForestClassifier
+    from werkzeug.serving import make_server
+    from src.api import app as app_module
+
+    X = np.array([list(s.values()) for s in synthetic_samples(500, seed=1)])
+    y = (X[:, 0] + X[:, 7] > 200).astype(int)
+    app_module.model = RandomForestClassifier(n_estimators=100, random_state=42).fit(X, y)
+    # Per-request access logging would dominate the measurement
+    logging.getLogger('src.api.app').setLevel(logging.WARNING)
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    server = make_server('127.0.0.1', 0, app_module.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def run(label, score_one, samples, threads):
+    """Score every sample from `threads` caller threads; print throughput and latency."""
+    latencies = []
+
+    def call(sample):
+        start = time.perf_counter()
+        score_one(sample)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(call, samples))
+    elapsed = time.perf_counter() - start
+
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    print(f"{label:<28} {len(samples) / elapsed:>12,.0f} {p50:>10.1f} {p99:>10.1f}")
+    return len(samples) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the client SDK against per-row posting")
+    parser.add_argument('--url', help='API root; a local server is started if omitted')
+    parser.add_argument('--rows', type=int, default=2000, help='Rows to score per mode')
+    parser.add_argument('--threads', type=int, default=8, help='Concurrent caller threads')
+    parser.add_argument('--max-delay-ms', type=float, default=5.0, help='Coalescing latency budget')
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        server, url = start_local_server()
+
+    samples = synthetic_samples(args.rows)
+
+    print("=" * 80)
+    print(f"CLIENT BENCHMARK ({args.rows:,} rows, {args.threads} caller threads, {url})")
+    print("=" * 80)
+    print(f"{'mode':<28} {'rows/s':>12} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+    print("-" * 80)
+
+    naive = run('naive requests.post', lambda s: requests.post(f"{url}/predict", json=s).json(), samples, args.threads)
+    with HeartDiseaseClient(url, pool_size=args.threads) as client:
+        run('client.predict (pooled)', client.predict, samples, args.threads)
+        coalesced = run('client.submit (coalesced)', lambda s: client.submit(s).result(), samples, args.threads)
+
+    print("-" * 80)
+    print(f"✓ Coalesced speedup over naive posting: {coalesced / naive:.1f}x")
+
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""
+Prediction Log Analytics
+
+Aggregates the prediction log segments written by the API
+(PREDICTION_LOG_DIR, see src/api/prediction_log.py) per time bucket (hour or
+day) and model: volume, positive rate, mean and quantiles of the disease
+probability, volume by risk level, feature means and, with a reference
+profile, per-feature PSI drift.
+
+Segments are memory-mapped and aggregated block by block with vectorized
+numpy passes, one segment per task in a process pool. A cached per-segment
+index of min/max timestamps prunes whole segments outside --start/--end;
+block headers prune the remaining blocks.
+
+Usage:
+    python src/utils/prediction_analytics.py logs/predictions
+    python src/utils/prediction_analytics.py logs/predictions --bucket hour --start 2024-05-01 --end 2024-05-02
+    python src/utils/prediction_analytics.py logs/predictions --reference data/processed/reference_profile.json --json
+"""
+
+import argparse
+import glob
+import json
+import mmap
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from src.api.prediction_log import iter_blocks, read_segment_header
+from src.data.drift import load_reference_profile, psi
+from src.models.predict import RISK_LEVEL_BOUNDARIES, RISK_LEVELS
+
+BUCKETS = {'hour': 3600, 'day': 86400}
+INDEX_FILE = '.segment_index.json'
+
+# Disease probability histogram resolution used for quantiles
+PROBABILITY_BINS = 100
+
+# Rows aggregated per vectorized pass within a block
+CHUNK_ROWS = 1 << 20
+
+
+def _segment_range(path: str) -> Dict:
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        ranges = [(b['min_timestamp'], b['max_timestamp'], len(b['timestamp'])) for b in iter_blocks(buffer)]
+    return {
+        'min_timestamp': min((r[0] for r in ranges), default=None),
+        'max_timestamp': max((r[1] for r in ranges), default=None),
+        'rows': sum(r[2] for r in ranges),
+    }
+
+
+def segment_index(directory: str) -> List[Dict]:
+    """
+    Min/max timestamp and row count of every segment in a directory.
+
+    Cached in INDEX_FILE and refreshed for segments whose size or mtime
+    changed (a live segment grows until it is rotated).
+    """
+    index_path = os.path.join(directory, INDEX_FILE)
+    try:
+        with open(index_path) as f:
+            cached = {entry['path']: entry for entry in json.load(f)}
+    except (OSError, ValueError):
+        cached = {}
+
+    entries = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.seg'))):
+        stat = os.stat(path)
+        entry = cached.get(os.path.basename(path))
+        if entry is None or entry['size'] != stat.st_size or entry['mtime'] != stat.st_mtime:
+            try:
+                entry = {'path': os.path.basename(path), 'size': stat.st_size, 'mtime': stat.st_mtime,
+                         **_segment_range(path)}
+            except (ValueError, OSError):
+                continue
+        entries.append(entry)
+
+    try:
+        with open(index_path, 'w') as f:
+            json.dump(entries, f)
+    except OSError:
+        pass
+    return [dict(entry, path=os.path.join(directory, entry['path'])) for entry in entries]
+
+
+def select_segments(index: Sequence[Dict], start: Optional[float] = None, end: Optional[float] = None) -> List[str]:
+    """Paths of indexed segments overlapping [start, end]."""
+    return [
+        entry['path'] for entry in index
+        if entry['rows']
+        and (start is None or entry['max_timestamp'] >= start)
+        and (end is None or entry['min_timestamp'] <= end)
+    ]
+
+
+def _bin_feature(column: np.ndarray, entry: Dict) -> np.ndarray:
+    """Reference bin of each value, as in FeatureDriftMonitor."""
+    if entry['kind'] == 'categorical':
+        categories = np.asarray(entry['categories'], dtype=np.float64)
+        bins = np.searchsorted((categories[1:] + categories[:-1]) / 2, column, side='right')
+        return np.where(categories[bins] == column, bins, len(categories))
+    return np.searchsorted(np.asarray(entry['edges']), column, side='right')
+
+
+def _aggregate_chunk(aggregates: Dict, timestamps, features, proba, labels, models, model_names,
+                     bucket_seconds: int, profile: Optional[Dict], feature_names: Sequence[str]):
+    buckets = (timestamps // bucket_seconds).astype(np.int64)
+    keys = buckets * len(model_names) + models
+    # Keys of a chunk span a few buckets: dense remap instead of a sort
+    first_key = keys.min()
+    offsets = keys - first_key
+    present = np.bincount(offsets) > 0
+    group = (np.cumsum(present) - 1)[offsets]
+    unique_keys = np.flatnonzero(present) + first_key
+    n_groups = len(unique_keys)
+
+    counts = np.bincount(group, minlength=n_groups)
+    positives = np.bincount(group, weights=labels == 1, minlength=n_groups)
+    proba_sum = np.bincount(group, weights=proba, minlength=n_groups)
+    proba_bins = np.minimum((proba * PROBABILITY_BINS).astype(np.int64), PROBABILITY_BINS - 1)
+    proba_hist = np.bincount(group * PROBABILITY_BINS + proba_bins,
+                             minlength=n_groups * PROBABILITY_BINS).reshape(n_groups, PROBABILITY_BINS)
+    risk = np.searchsorted(np.asarray(RISK_LEVEL_BOUNDARIES), proba, side='right')
+    risk_counts = np.bincount(group * len(RISK_LEVELS) + risk,
+                              minlength=n_groups * len(RISK_LEVELS)).reshape(n_groups, len(RISK_LEVELS))
+    feature_sums = np.stack([np.bincount(group, weights=column, minlength=n_groups) for column in features], axis=1)
+
+    feature_bins = {}
+    if profile is not None:
+        for name, column in zip(feature_names, features):
+            entry = profile['features'].get(name)
+            if entry is None:
+                continue
+            n_bins = len(entry['fractions'])
+            feature_bins[name] = np.bincount(group * n_bins + _bin_feature(column, entry),
+                                             minlength=n_groups * n_bins).reshape(n_groups, n_bins)
+
+    for g, key in enumerate(unique_keys.tolist()):
+        bucket, model = divmod(key, len(model_names))
+        agg_key = (bucket * bucket_seconds, model_names[model])
+        agg = aggregates.get(agg_key)
+        if agg is None:
+            agg = aggregates[agg_key] = {
+                'rows': 0, 'positives': 0.0, 'probability_sum': 0.0,
+                'probability_histogram': np.zeros(PROBABILITY_BINS, dtype=np.int64),
+                'risk_levels': np.zeros(len(RISK_LEVELS), dtype=np.int64),
+                'feature_sums': np.zeros(len(features)),
+                'feature_bins': {},
+            }
+        agg['rows'] += int(counts[g])
+        agg['positives'] += positives[g]
+        agg['probability_sum'] += proba_sum[g]
+        agg['probability_histogram'] += proba_hist[g]
+        agg['risk_levels'] += risk_counts[g]
+        agg['feature_sums'] += feature_sums[g]
+        for name, bins in feature_bins.items():
+            if name in agg['feature_bins']:
+                agg['feature_bins'][name] += bins[g]
+            else:
+                agg['feature_bins'][name] = bins[g].copy()
+
+
+def scan_segment(path: str, start: Optional[float] = None, end: Optional[float] = None,
+                 bucket_seconds: int = 86400, profile: Optional[Dict] = None) -> Dict:
+    """
+    Aggregate one segment.
+
+    Returns:
+        Dict with the segment's 'features' and its 'aggregates' keyed by
+        (bucket start, model)
+    """
+    aggregates = {}
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        header, _ = read_segment_header(buffer)
+        feature_names = header['features']
+        for block in iter_blocks(buffer, start, end):
+            n = len(block['timestamp'])
+            for lo in range(0, n, CHUNK_ROWS):
+                chunk = slice(lo, min(lo + CHUNK_ROWS, n))
+                timestamps = block['timestamp'][chunk]
+                columns = [column[chunk] for column in block['features']]
+                proba = block['disease_probability'][chunk]
+                labels = block['label'][chunk]
+                models = block['model'][chunk].astype(np.int64)
+                # Only blocks straddling the range boundaries need a row mask
+                if (start is not None and block['min_timestamp'] < start) or (end is not None and block['max_timestamp'] > end):
+                    mask = np.ones(len(timestamps), dtype=bool)
+                    if start is not None:
+                        mask &= timestamps >= start
+                    if end is not None:
+                        mask &= timestamps <= end
+                    timestamps, proba, labels, models = timestamps[mask], proba[mask], labels[mask], models[mask]
+                    columns = [column[mask] for column in columns]
+                if len(timestamps):
+                    _aggregate_chunk(aggregates, timestamps, columns, proba, labels, models, block['models'],
+                                     bucket_seconds, profile, feature_names)
+            block = columns = timestamps = proba = labels = models = None
+    return {'features': feature_names, 'aggregates': aggregates}
+
+
+def _merge(total: Dict, partial: Dict):
+    for key, agg in partial.items():
+        if key not in total:
+            total[key] = agg
+            continue
+        merged = total[key]
+        for field in ('rows', 'positives', 'probability_sum', 'probability_histogram', 'risk_levels', 'feature_sums'):
+            merged[field] = merged[field] + agg[field]
+        for name, bins in agg['feature_bins'].items():
+            merged['feature_bins'][name] = merged['feature_bins'][name] + bins if name in merged['feature_bins'] else bins
+
+
+def _histogram_quantile(histogram: np.ndarray, q: float) -> float:
+    cumulative = np.cumsum(histogram)
+    idx = int(np.searchsorted(cumulative, q * cumulative[-1]))
+    return (idx + 0.5) / PROBABILITY_BINS
+
+
+def analyze(
+    directory: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    bucket: str = 'day',
+    workers: Optional[int] = None,
+    profile: Optional[Dict] = None
+) -> Dict:
+    """
+    Aggregate the prediction log in a directory.
+
+    Args:
+        directory: Directory of segment files
+        start: Include rows at or after this unix time
+        end: Include rows at or before this unix time
+        bucket: 'hour' or 'day'
+        workers: Worker processes (None: one per CPU, 1: in-process)
+        profile: Reference profile for per-feature PSI
+
+    Returns:
+        Dict with 'segments_total', 'segments_scanned', 'rows' and 'summary'
+        (one row per bucket and model, ordered by time)
+    """
+    if bucket not in BUCKETS:
+        raise ValueError(f"bucket must be one of {list(BUCKETS)}, got {bucket!r}")
+    index = segment_index(directory)
+    paths = select_segments(index, start, end)
+    args = [(path, start, end, BUCKETS[bucket], profile) for path in paths]
+
+    if workers == 1 or len(paths) <= 1:
+        partials = [scan_segment(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            partials = list(pool.map(scan_segment, *zip(*args)))
+
+    aggregates = {}
+    feature_names = []
+    for partial in partials:
+        feature_names = feature_names or partial['features']
+        _merge(aggregates, partial['aggregates'])
+
+    summary = []
+    for (bucket_start, model), agg in sorted(aggregates.items()):
+        rows = agg['rows']
+        entry = {
+            'bucket_start': datetime.fromtimestamp(bucket_start, tz=timezone.utc).isoformat(),
+            'model': model,
+            'rows': rows,
+            'positive_rate': agg['positives'] / rows,
+            'mean_probability': agg['probability_sum'] / rows,
+            'p50_probability': _histogram_quantile(agg['probability_histogram'], 0.5),
+            'p90_probability': _histogram_quantile(agg['probability_histogram'], 0.9),
+            'risk_levels': dict(zip(RISK_LEVELS.tolist(), agg['risk_levels'].tolist())),
+            'feature_means': dict(zip(feature_names, (agg['feature_sums'] / rows).tolist())),
+        }
+        if profile is not None:
+            entry['feature_psi'] = {
+                name: psi(np.asarray(profile['features'][name]['fractions']), bins / rows)
+                for name, bins in agg['feature_bins'].items()
+            }
+        summary.append(entry)
+
+    return {
+        'segments_total': len(index),
+        'segments_scanned': len(paths),
+        'rows': sum(entry['rows'] for entry in summary),
+        'summary': summary,
+    }
+
+
+def parse_time(value: Optional[str]) -> Optional[float]:
+    """Unix seconds or an ISO date/time (UTC unless an offset is given)."""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        parsed = datetime.fromisoformat(value)
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate prediction log segments")
+    parser.add_argument('directory', help='Prediction log directory (PREDICTION_LOG_DIR)')
+    parser.add_argument('--start', help='Start time (ISO or unix seconds)')
+    parser.add_argument('--end', help='End time (ISO or unix seconds)')
+    parser.add_argument('--bucket', choices=list(BUCKETS), default='day', help='Time bucket')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: one per CPU)')
+    parser.add_argument('--reference', help='Reference profile JSON for per-feature PSI')
+    parser.add_argument('--json', action='store_true', help='Print JSON instead of a table')
+    args = parser.parse_args()
+
+    profile = load_reference_profile(args.reference) if args.reference else None
+    started = time.perf_counter()
+    result = analyze(args.directory, parse_time(args.start), parse_time(args.end), args.bucket, args.workers, profile)
+    elapsed = time.perf_counter() - started
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print("=" * 80)
+    print("PREDICTION LOG ANALYTICS")
+    print("=" * 80)
+    print(f"✓ {result['rows']:,} rows from {result['segments_scanned']}/{result['segments_total']} segments "
+          f"in {elapsed:.2f}s\n")
+    header = f"{'bucket':<26}{'model':<24}{'rows':>12}{'pos rate':>10}{'mean p':>8}{'p90':>6}  risk L/M/H/VH"
+    print(header)
+    print("-" * len(header))
+    for entry in result['summary']:
+        risk = '/'.join(str(v) for v in entry['risk_levels'].values())
+        print(f"{entry['bucket_start']:<26}{entry['model'][:23]:<24}{entry['rows']:>12,}"
+              f"{entry['positive_rate']:>10.3f}{entry['mean_probability']:>8.3f}{entry['p90_probability']:>6.2f}  {risk}")
+        if 'feature_psi' in entry:
+            drifted = {k: v for k, v in entry['feature_psi'].items() if v >= 0.2}
+            if drifted:
+                print("  ⚠️  drift (PSI >= 0.2): " + ', '.join(f"{k}={v:.2f}" for k, v in sorted(drifted.items())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Replay Captured Prediction Traffic
+
+Re-issues requests captured by the API (TRAFFIC_CAPTURE_DIR, see
+src/api/capture.py) against any instance, with their captured path, query
+string and model routing and priority headers, preserving the captured
+inter-arrival times scaled by --speed, or as fast as --concurrency allows
+with --speed 0. Capture files from several workers are merged by arrival
+time. Reports latency percentiles, status and error counts per endpoint and
+how far dispatch lagged behind the schedule.
+
+Usage:
+    python src/utils/replay_traffic.py captures/*.bin.gz --url http://localhost:8000
+    python src/utils/replay_traffic.py captures/*.bin.gz --url http://candidate:8000 --speed 4
+    python src/utils/replay_traffic.py captures/*.bin.gz --url http://candidate:8000 --speed 0 --concurrency 32
+"""
+
+import argparse
+import heapq
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from src.api.capture import read_capture
+
+
+def merge_captures(paths: Iterable[str]) -> Iterable[Tuple[float, str, bytes, Dict[str, str]]]:
+    """Merge per-worker capture files into one stream ordered by arrival time."""
+    return heapq.merge(*(read_capture(path) for path in paths), key=lambda record: record[0])
+
+
+def replay(
+    records: Iterable[Tuple[float, str, bytes, Dict[str, str]]],
+    url: str,
+    speed: float = 1.0,
+    concurrency: int = 16,
+    timeout: float = 30.0,
+    limit: Optional[int] = None
+) -> List[Dict]:
+    """
+    Send captured requests to `url`.
+
+    Args:
+        records: (arrival time, target, body, headers) records in arrival order
+        url: API root of the target instance
+        speed: Time scale (1 = as captured, 2 = twice as fast, 0 = no pacing)
+        concurrency: Requests in flight at most
+        timeout: Per-request timeout in seconds
+        limit: Stop after this many requests
+
+    Returns:
+        One result per request: endpoint (the target), status (None on exceptions),
+        error, latency_seconds and lag_seconds (dispatch delay vs schedule)
+    """
+    url = url.rstrip('/')
+    session = requests.Session()
+    session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=concurrency))
+    session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=concurrency))
+    slots = threading.BoundedSemaphore(concurrency)
+    results = []
+    lock = threading.Lock()
+
+    def send(endpoint, body, headers, lag):
+        result = {'endpoint': endpoint, 'status': None, 'error': None, 'lag_seconds': lag}
+        start = time.perf_counter()
+        try:
+            response = session.post(url + endpoint, data=body, timeout=timeout,
+                                    headers=dict(headers, **{'Content-Type': 'application/json'}))
+            result['status'] = response.status_code
+        except requests.RequestException as e:
+            result['error'] = type(e).__name__
+        finally:
+            result['latency_seconds'] = time.perf_counter() - start
+            slots.release()
+        with lock:
+            results.append(result)
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        first_arrival = None
+        started = time.perf_counter()
+        for n, (arrival, endpoint, body, headers) in enumerate(records):
+            if limit is not None and n >= limit:
+                break
+            if first_arrival is None:
+                first_arrival = arrival
+            due = started + (arrival - first_arrival) / speed if speed > 0 else time.perf_counter()
+            wait = due - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+            slots.acquire()
+            pool.submit(send, endpoint, body, headers, max(time.perf_counter() - due, 0.0))
+    session.close()
+    return results
+
+
+def summarize(results: List[Dict], elapsed_seconds: float) -> Dict:
+    """Aggregate replay results into latency, status and error distributions."""
+    summary = {
+        'requests': len(results),
+        'elapsed_seconds': elapsed_seconds,
+        'throughput_rps': len(results) / elapsed_seconds if elapsed_seconds > 0 else float('nan'),
+        'endpoints': {},
+    }
+    by_endpoint = defaultdict(list)
+    for result in results:
+        by_endpoint[result['endpoint']].append(result)
+
+    for endpoint, group in sorted(by_endpoint.items()):
+        latencies = np.array([r['latency_seconds'] for r in group]) * 1000
+        lags = np.array([r['lag_seconds'] for r in group]) * 1000
+        summary['endpoints'][endpoint] = {
+            'requests': len(group),
+            'statuses': dict(Counter(str(r['status']) for r in group if r['status'] is not None)),
+            'errors': dict(Counter(r['error'] for r in group if r['error'] is not None)),
+            'latency_ms': {
+                'p50': float(np.percentile(latencies, 50)),
+                'p90': float(np.percentile(latencies, 90)),
+                'p99': float(np.percentile(latencies, 99)),
+                'max': float(latencies.max()),
+            },
+            'schedule_lag_ms_p99': float(np.percentile(lags, 99)),
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay captured prediction traffic")
+    parser.add_argument('captures', nargs='+', help='Capture files (capture-<pid>.bin.gz)')
+    parser.add_argument('--url', default='http://localhost:8000', help='API root of the target instance')
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help='Replay speed multiplier (1 = real time, 0 = as fast as possible)')
+    parser.add_argument('--concurrency', type=int, default=16, help='Maximum requests in flight')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds')
+    parser.add_argument('--limit', type=int, help='Replay at most this many requests')
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("TRAFFIC REPLAY")
+    print("=" * 80)
+    print(f"Target: {args.url}")
+    print(f"Speed: {'max' if args.speed <= 0 else f'{args.speed:g}x'}, concurrency: {args.concurrency}")
+
+    start = time.perf_counter()
+    results = replay(merge_captures(args.captures), args.url, args.speed, args.concurrency, args.timeout, args.limit)
+    summary = summarize(results, time.perf_counter() - start)
+
+    print(f"\n✓ Replayed {summary['requests']} requests in {summary['elapsed_seconds']:.1f}s "
+          f"({summary['throughput_rps']:.1f} req/s)\n")
+    for endpoint, stats in summary['endpoints'].items():
+        latency = stats['latency_ms']
+        print(f"{endpoint}: {stats['requests']} requests")
+        print(f"  latency ms  p50={latency['p50']:.1f} p90={latency['p90']:.1f} "
+              f"p99={latency['p99']:.1f} max={latency['max']:.1f}")
+        print(f"  statuses    {stats['statuses']}")
+        if stats['errors']:
+            print(f"  ⚠️  errors   {stats['errors']}")
+        print(f"  schedule lag p99 {stats['schedule_lag_ms_p99']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
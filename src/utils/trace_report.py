@@ -0,0 +1,182 @@
+"""
+Trace Collector and Report
+
+A minimal stand-in for an OTLP collector and a per-stage timing report for
+the spans written by src/utils/tracing.py.
+
+collect: listens for OTLP/HTTP JSON exports (TRACING_EXPORTER=otlp) on
+/v1/traces and appends the spans to a JSON lines file in the same format as
+the file exporter (TRACING_EXPORTER=file).
+
+summarize: per span name, the number of spans and errors, total and self
+time (duration minus the time of direct children) and duration percentiles,
+optionally restricted to one service.
+
+Usage:
+    python src/utils/trace_report.py collect --port 4318 --output traces.jsonl
+    python src/utils/trace_report.py summarize traces.jsonl
+    python src/utils/trace_report.py summarize traces.jsonl --service heart-disease-training --json
+"""
+
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+OTLP_PATH = '/v1/traces'
+
+
+def _attribute_value(value: Dict):
+    if 'intValue' in value:
+        return int(value['intValue'])
+    for key in ('doubleValue', 'boolValue', 'stringValue'):
+        if key in value:
+            return value[key]
+    return None
+
+
+def from_otlp(body: Dict) -> List[Dict]:
+    """Span dictionaries (file exporter format) from an OTLP/JSON export request."""
+    spans = []
+    for resource_spans in body.get('resourceSpans', []):
+        resource = {a['key']: _attribute_value(a['value']) for a in resource_spans.get('resource', {}).get('attributes', [])}
+        service = resource.get('service.name', 'unknown')
+        for scope_spans in resource_spans.get('scopeSpans', []):
+            for otlp_span in scope_spans.get('spans', []):
+                start_ns = int(otlp_span['startTimeUnixNano'])
+                end_ns = int(otlp_span['endTimeUnixNano'])
+                spans.append({
+                    'service': service,
+                    'name': otlp_span['name'],
+                    'trace_id': otlp_span['traceId'],
+                    'span_id': otlp_span['spanId'],
+                    'parent_id': otlp_span.get('parentSpanId') or None,
+                    'start_ns': start_ns,
+                    'end_ns': end_ns,
+                    'duration_ms': (end_ns - start_ns) / 1e6,
+                    'status': 'error' if otlp_span.get('status', {}).get('code') == 2 else 'ok',
+                    'attributes': {a['key']: _attribute_value(a['value']) for a in otlp_span.get('attributes', [])},
+                })
+    return spans
+
+
+def make_collector(output: str, host: str = '127.0.0.1', port: int = 4318) -> ThreadingHTTPServer:
+    """HTTP server appending OTLP/JSON span exports to a JSON lines file."""
+    write_lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != OTLP_PATH:
+                self.send_error(404)
+                return
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                spans = from_otlp(body)
+            except (ValueError, KeyError) as e:
+                self.send_error(400, str(e))
+                return
+            with write_lock, open(output, 'a') as f:
+                for span_dict in spans:
+                    f.write(json.dumps(span_dict) + '\n')
+            payload = b'{}'
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def load_spans(path: str) -> List[Dict]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def summarize(spans: Iterable[Dict], service: Optional[str] = None) -> List[Dict]:
+    """
+    Timing summary per span name, slowest total self time first.
+
+    Returns:
+        List of dictionaries with count, errors, total/self milliseconds and
+        p50/p95/max duration
+    """
+    spans = [s for s in spans if service is None or s['service'] == service]
+    child_ms = {}
+    for s in spans:
+        if s['parent_id']:
+            key = (s['trace_id'], s['parent_id'])
+            child_ms[key] = child_ms.get(key, 0.0) + s['duration_ms']
+
+    by_name = {}
+    for s in spans:
+        entry = by_name.setdefault(s['name'], {'durations': [], 'self_ms': 0.0, 'errors': 0})
+        entry['durations'].append(s['duration_ms'])
+        entry['self_ms'] += max(s['duration_ms'] - child_ms.get((s['trace_id'], s['span_id']), 0.0), 0.0)
+        entry['errors'] += s['status'] == 'error'
+
+    summary = []
+    for name, entry in by_name.items():
+        durations = np.asarray(entry['durations'])
+        summary.append({
+            'name': name,
+            'count': len(durations),
+            'errors': entry['errors'],
+            'total_ms': float(durations.sum()),
+            'self_ms': entry['self_ms'],
+            'p50_ms': float(np.percentile(durations, 50)),
+            'p95_ms': float(np.percentile(durations, 95)),
+            'max_ms': float(durations.max()),
+        })
+    summary.sort(key=lambda entry: entry['self_ms'], reverse=True)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collect and summarize tracing spans")
+    commands = parser.add_subparsers(dest='command', required=True)
+    collect = commands.add_parser('collect', help='Run a stand-in OTLP/HTTP JSON collector')
+    collect.add_argument('--host', default='127.0.0.1', help='Listen address')
+    collect.add_argument('--port', type=int, default=4318, help='Listen port')
+    collect.add_argument('--output', default='traces.jsonl', help='JSON lines file spans are appended to')
+    report = commands.add_parser('summarize', help='Per-span timing summary')
+    report.add_argument('path', help='JSON lines span file')
+    report.add_argument('--service', help='Only spans of this service')
+    report.add_argument('--json', action='store_true', help='Print JSON instead of a table')
+    args = parser.parse_args()
+
+    if args.command == 'collect':
+        server = make_collector(args.output, args.host, args.port)
+        print(f"✓ Collecting spans on http://{args.host}:{args.port}{OTLP_PATH} into {args.output}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.server_close()
+        return
+
+    spans = load_spans(args.path)
+    summary = summarize(spans, args.service)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print("=" * 80)
+    print("TRACE SUMMARY")
+    print("=" * 80)
+    print(f"✓ {len(spans):,} spans, {len({s['trace_id'] for s in spans}):,} traces\n")
+    header = f"{'span':<32}{'count':>8}{'errors':>8}{'self ms':>12}{'total ms':>12}{'p50 ms':>9}{'p95 ms':>9}"
+    print(header)
+    print("-" * len(header))
+    for entry in summary:
+        print(f"{entry['name'][:31]:<32}{entry['count']:>8,}{entry['errors']:>8,}{entry['self_ms']:>12.1f}"
+              f"{entry['total_ms']:>12.1f}{entry['p50_ms']:>9.2f}{entry['p95_ms']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+"""
+Lightweight tracing for the API and the training pipeline
+
+Spans carry a trace id, their own id, the parent span id, wall-clock start
+and end times and attributes. The current span lives in a context variable,
+so nested `with span(...)` blocks form parent/child trees without passing
+anything around. Sampling is decided once per trace at the root span and
+inherited by its children. With no exporter configured span() yields a
+shared no-op span.
+
+Finished spans are queued and exported in batches by a background thread:
+- 'file': JSON lines appended to TRACING_FILE
+- 'otlp': OTLP/HTTP JSON POSTed to TRACING_OTLP_ENDPOINT (any OTLP
+  collector, or src/utils/trace_report.py collect as a stand-in)
+
+Configuration (environment):
+    TRACING_EXPORTER       none (default), file or otlp
+    TRACING_FILE           traces.jsonl
+    TRACING_OTLP_ENDPOINT  http://localhost:4318/v1/traces
+    TRACING_SAMPLE_RATE    fraction of traces recorded (default 1.0)
+
+Usage:
+    from src.utils.tracing import configure_tracing, span, traced
+
+    configure_tracing('heart-disease-training')
+    with span('train.search', model='random_forest'):
+        grid_search.fit(X, y)
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EXPORTERS = ('none', 'file', 'otlp')
+
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+
+def _new_id(n_bytes: int) -> str:
+    return f"{random.getrandbits(n_bytes * 8):0{n_bytes * 2}x}"
+
+
+class Span:
+    """One timed operation within a trace."""
+
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent_id', 'start_ns', 'end_ns', 'attributes', 'status',
+                 'sampled', '_tracer')
+
+    def __init__(self, tracer, name: str, trace_id: str, parent_id: Optional[str], sampled: bool,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self._tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.attributes = dict(attributes) if attributes else {}
+        self.status = 'ok'
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def record_exception(self, error: BaseException):
+        self.status = 'error'
+        self.attributes['error.type'] = type(error).__name__
+        self.attributes['error.message'] = str(error)
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            if self.sampled:
+                self._tracer._export(self)
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return None if self.end_ns is None else (self.end_ns - self.start_ns) / 1e6
+
+    @property
+    def traceparent(self) -> str:
+        """W3C traceparent header value continuing this span."""
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'service': self._tracer.service_name,
+            'name': self.name,
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start_ns': self.start_ns,
+            'end_ns': self.end_ns,
+            'duration_ms': self.duration_ms,
+            'status': self.status,
+            'attributes': self.attributes,
+        }
+
+
+class _NoopSpan(Span):
+    """Shared stand-in yielded while tracing is disabled."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def record_exception(self, error: BaseException):
+        pass
+
+    def end(self):
+        pass
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """(trace id, parent span id, sampled) from a W3C traceparent header, or None."""
+    if not header:
+        return None
+    parts = header.strip().split('-')
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        flags = int(parts[3], 16)
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+
+class FileSpanExporter:
+    """Appends finished spans to a JSON lines file."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, spans: List[Dict]):
+        with open(self.path, 'a') as f:
+            for span_dict in spans:
+                f.write(json.dumps(span_dict, default=str) + '\n')
+
+
+def _otlp_value(value: Any) -> Dict:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def to_otlp(spans: List[Dict]) -> Dict:
+    """OTLP/JSON ExportTraceServiceRequest body for a batch of spans."""
+    by_service = {}
+    for span_dict in spans:
+        by_service.setdefault(span_dict['service'], []).append({
+            'traceId': span_dict['trace_id'],
+            'spanId': span_dict['span_id'],
+            'parentSpanId': span_dict['parent_id'] or '',
+            'name': span_dict['name'],
+            'kind': 1,
+            'startTimeUnixNano': str(span_dict['start_ns']),
+            'endTimeUnixNano': str(span_dict['end_ns']),
+            'attributes': [{'key': k, 'value': _otlp_value(v)} for k, v in span_dict['attributes'].items()],
+            'status': {'code': 2 if span_dict['status'] == 'error' else 1},
+        })
+    return {
+        'resourceSpans': [
+            {
+                'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': service}}]},
+                'scopeSpans': [{'scope': {'name': 'src.utils.tracing'}, 'spans': otlp_spans}],
+            }
+            for service, otlp_spans in by_service.items()
+        ]
+    }
+
+
+class OTLPHttpSpanExporter:
+    """POSTs finished spans as OTLP/HTTP JSON."""
+
+    def __init__(self, endpoint: str, timeout: float = 5.0):
+        import requests
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self._session = requests.Session()
+
+    def export(self, spans: List[Dict]):
+        response = self._session.post(self.endpoint, json=to_otlp(spans), timeout=self.timeout)
+        response.raise_for_status()
+
+
+class MemorySpanExporter:
+    """Keeps finished spans in a list (tests and in-process inspection)."""
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans: List[Dict]):
+        self.spans.extend(spans)
+
+
+class Tracer:
+    """Creates spans and exports the sampled ones in the background."""
+
+    def __init__(
+        self,
+        service_name: str,
+        exporter=None,
+        sample_rate: float = 1.0,
+        max_queue: int = 10000,
+        flush_interval: float = 1.0,
+        max_batch: int = 512
+    ):
+        """
+        Args:
+            service_name: Service recorded on every span
+            exporter: Object with export(list of span dicts); None records nothing
+            sample_rate: Fraction of traces recorded
+            max_queue: Finished spans buffered before new ones are dropped
+            flush_interval: Seconds between background exports
+            max_batch: Spans per export call at most
+        """
+        self.service_name = service_name
+        self.exporter = exporter
+        self.sample_rate = sample_rate if exporter is not None else 0.0
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._noop = _NoopSpan(self, 'noop', '0' * 32, None, False)
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None,
+                   traceparent: Optional[str] = None) -> Span:
+        """
+        Start a span under the current span, or a new trace.
+
+        A valid traceparent header continues a remote trace and its sampling
+        decision. The span is not made current; see span().
+        """
+        parent = _current_span.get()
+        remote = parse_traceparent(traceparent) if parent is None else None
+        if parent is not None:
+            return Span(self, name, parent.trace_id, parent.span_id, parent.sampled, attributes)
+        if remote is not None:
+            trace_id, parent_id, sampled = remote
+            return Span(self, name, trace_id, parent_id, sampled and self.enabled, attributes)
+        return Span(self, name, _new_id(16), None, self.enabled and random.random() < self.sample_rate, attributes)
+
+    @staticmethod
+    def activate(span_obj: Span) -> contextvars.Token:
+        """Make a span current; pass the token to deactivate()."""
+        return _current_span.set(span_obj)
+
+    @staticmethod
+    def deactivate(token: contextvars.Token):
+        _current_span.reset(token)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Run a block inside a child span of the current span."""
+        if not self.enabled:
+            yield self._noop
+            return
+        span_obj = self.start_span(name, attributes)
+        token = _current_span.set(span_obj)
+        try:
+            yield span_obj
+        except BaseException as e:
+            span_obj.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span_obj.end()
+
+    def _export(self, span_obj: Span):
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(span_obj.to_dict())
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_worker(self):
+        # One export thread per process, started after fork
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._thread = threading.Thread(target=self._run, name='trace-export', daemon=True)
+                self._pid = os.getpid()
+                self._thread.start()
+
+    def _drain(self) -> List[Dict]:
+        batch = []
+        try:
+            while len(batch) < self.max_batch:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _send(self, batch: List[Dict]):
+        try:
+            self.exporter.export(batch)
+        except Exception as e:
+            self.dropped += len(batch)
+            logger.warning(f"Span export failed, dropped {len(batch)} spans: {e}")
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        """Export everything queued so far from the calling thread."""
+        if self.exporter is None:
+            return
+        with self._lock:
+            batch = self._drain()
+            while batch:
+                self._send(batch)
+                batch = self._drain()
+
+
+_tracer = Tracer('heart-disease')
+
+
+def configure_tracing(service_name: str, exporter=None, sample_rate: Optional[float] = None) -> Tracer:
+    """
+    Install the process-wide tracer, from the environment unless an exporter is given.
+
+    Returns:
+        The new tracer
+    """
+    global _tracer
+    if exporter is None:
+        kind = os.environ.get('TRACING_EXPORTER', 'none').lower()
+        if kind not in EXPORTERS:
+            raise ValueError(f"TRACING_EXPORTER must be one of {EXPORTERS}, got {kind!r}")
+        if kind == 'file':
+            exporter = FileSpanExporter(os.environ.get('TRACING_FILE', 'traces.jsonl'))
+        elif kind == 'otlp':
+            exporter = OTLPHttpSpanExporter(
+                os.environ.get('TRACING_OTLP_ENDPOINT', 'http://localhost:4318/v1/traces')
+            )
+    if sample_rate is None:
+        sample_rate = float(os.environ.get('TRACING_SAMPLE_RATE', 1.0))
+    _tracer = Tracer(service_name, exporter, sample_rate)
+    return _tracer
+
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def span(name: str, **attributes):
+    """Context manager for a child span of the current span on the process-wide tracer."""
+    return _tracer.span(name, **attributes)
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Decorator running a function inside a span (named after it by default)."""
+    def decorator(fn):
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _tracer.span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
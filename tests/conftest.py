@@ -3,11 +3,22 @@ Pytest configuration and fixtures
 """
 import pytest
 import sys
+import threading
 from pathlib import Path
 
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from werkzeug.serving import make_server
+
 # Add src to Python path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
+# One valid /predict payload
+SAMPLE = {
+    'age': 63, 'sex': 1, 'cp': 3, 'trestbps': 145, 'chol': 233, 'fbs': 1,
+    'restecg': 0, 'thalach': 150, 'exang': 0, 'oldpeak': 2.3, 'slope': 0, 'ca': 0, 'thal': 1
+}
+
 
 @pytest.fixture(scope="session")
 def project_root():
@@ -51,6 +62,27 @@ def model_metadata_path(models_dir):
     return models_dir / 'best_model_metadata.json'
 
 
+@pytest.fixture(scope="module")
+def forest():
+    """Small forest trained on synthetic data with the API's 13 features"""
+    rng = np.random.RandomState(0)
+    X = rng.randn(300, 13) * 20 + 100
+    y = (X[:, 0] + X[:, 7] > 200).astype(int)
+    return RandomForestClassifier(n_estimators=20, random_state=42).fit(X, y)
+
+
+@pytest.fixture
+def server_url(forest, monkeypatch):
+    """Live local server for the Flask app serving the synthetic forest"""
+    from src.api import app as app_module
+
+    monkeypatch.setattr(app_module, 'model', forest)
+    server = make_server('127.0.0.1', 0, app_module.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
 def pytest_configure(config):
     """Configure pytest"""
     config.addinivalue_line(
@@ -0,0 +1,642 @@
+"""
+Unit tests for the Flask API endpoints
+"""
+import gzip
+import json
+import os
+import pickle
+import sys
+import threading
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.api import app as app_module
+from tests.conftest import SAMPLE
+
+FEATURES = [
+    'age', 'sex', 'cp', 'trestbps', 'chol', 'fbs',
+    'restecg', 'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal'
+]
+
+
+@pytest.fixture
+def client(forest, monkeypatch):
+    """Flask test client serving the synthetic forest"""
+    monkeypatch.setattr(app_module, 'model', forest)
+    return app_module.app.test_client()
+
+
+class TestPredictEndpoints:
+    """Test prediction endpoints"""
+
+    def test_predict(self, client, forest):
+        """Test single prediction matches the model"""
+        response = client.post('/predict', json=SAMPLE)
+        body = response.get_json()
+
+        expected = forest.predict_proba(np.array([[SAMPLE[f] for f in FEATURES]]))[0]
+        assert response.status_code == 200
+        assert body['confidence']['disease'] == pytest.approx(expected[1])
+        assert body['prediction'] == int(expected[1] > 0.5)
+
+    def test_predict_missing_features(self, client):
+        """Test missing features are rejected"""
+        response = client.post('/predict', json={'age': 50})
+
+        assert response.status_code == 400
+        assert 'missing_features' in response.get_json()
+
+    def test_batch_predict(self, client):
+        """Test batch prediction keeps sample order and per-sample errors"""
+        samples = [SAMPLE, {'age': 1}, dict(SAMPLE, age=30)]
+        response = client.post('/batch_predict', json={'samples': samples})
+        body = response.get_json()
+
+        assert response.status_code == 200
+        assert [p['sample_index'] for p in body['predictions']] == [0, 1, 2]
+        assert 'error' in body['predictions'][1]
+        assert body['successful_predictions'] == 2
+
+
+class TestModelInfo:
+    """Test the model info endpoint"""
+
+    def test_model_info_topology(self, client, monkeypatch):
+        """Test the launcher topology is exposed"""
+        monkeypatch.setattr(app_module, 'TOPOLOGY', {'workers': 1, 'threads_per_worker': 2})
+        body = client.get('/model/info').get_json()
+
+        assert body['topology'] == {'workers': 1, 'threads_per_worker': 2}
+        assert body['features'] == FEATURES
+
+
+class TestInferenceEngines:
+    """Test inference engine selection"""
+
+    def test_early_exit_engine(self, forest, monkeypatch):
+        """Test the early-exit engine serves the same labels and exports tree counts"""
+        monkeypatch.setattr(app_module, 'INFERENCE_ENGINE', 'early_exit')
+        engine = app_module.build_inference_engine(forest)
+        monkeypatch.setattr(app_module, 'model', engine)
+        client = app_module.app.test_client()
+
+        body = client.post('/predict', json=SAMPLE).get_json()
+        expected = forest.predict(np.array([[SAMPLE[f] for f in FEATURES]]))[0]
+
+        assert body['prediction'] == int(expected)
+        assert client.get('/model/info').get_json()['inference_engine'] == 'early_exit'
+        metrics = client.get('/metrics').get_data(as_text=True)
+        assert 'heart_disease_trees_evaluated_count' in metrics
+
+    def test_sklearn_engine_is_default(self, forest):
+        """Test the model is served unwrapped by default"""
+        assert app_module.build_inference_engine(forest) is forest
+
+    def test_cascade_engine(self, forest, tmp_path, monkeypatch):
+        """Test the cascade engine loads both models and the fitted band"""
+        rng = np.random.RandomState(1)
+        X = rng.randn(200, 13) * 20 + 100
+        linear = LogisticRegression(max_iter=1000).fit(X, forest.predict(X))
+        for name, obj in (('lr.pkl', linear), ('rf.pkl', forest)):
+            with open(tmp_path / name, 'wb') as f:
+                pickle.dump(obj, f)
+        (tmp_path / 'cascade.json').write_text(json.dumps({'low': 0.0, 'high': 1.0}))
+
+        monkeypatch.setattr(app_module, 'INFERENCE_ENGINE', 'cascade')
+        monkeypatch.setattr(app_module, 'CASCADE_LINEAR_MODEL_PATH', str(tmp_path / 'lr.pkl'))
+        monkeypatch.setattr(app_module, 'CASCADE_FOREST_MODEL_PATH', str(tmp_path / 'rf.pkl'))
+        monkeypatch.setattr(app_module, 'CASCADE_CONFIG_PATH', str(tmp_path / 'cascade.json'))
+        engine = app_module.build_inference_engine(forest)
+        monkeypatch.setattr(app_module, 'model', engine)
+        client = app_module.app.test_client()
+
+        body = client.post('/predict', json=SAMPLE).get_json()
+        expected = forest.predict_proba(np.array([[SAMPLE[f] for f in FEATURES]]))[0]
+
+        # A [0, 1] band escalates everything to the forest
+        assert body['confidence']['disease'] == pytest.approx(expected[1])
+        assert client.get('/model/info').get_json()['inference_engine'] == 'cascade'
+        assert 'heart_disease_cascade_rows_total{stage="forest"}' in client.get('/metrics').get_data(as_text=True)
+
+    def test_compact_engine(self, forest, monkeypatch):
+        """Test the compact engine serves the forest's probabilities"""
+        monkeypatch.setattr(app_module, 'INFERENCE_ENGINE', 'compact')
+        monkeypatch.setattr(app_module, 'model', app_module.build_inference_engine(forest))
+        client = app_module.app.test_client()
+
+        body = client.post('/predict', json=SAMPLE).get_json()
+        expected = forest.predict_proba(np.array([[SAMPLE[f] for f in FEATURES]]))[0]
+
+        assert body['confidence']['disease'] == pytest.approx(expected[1], abs=1e-6)
+        assert client.get('/model/info').get_json()['inference_engine'] == 'compact'
+
+
+class TestShardedBatches:
+    """Test sharded batch scoring through the API"""
+
+    def test_large_batch_is_sharded(self, forest, monkeypatch):
+        """Test batches above the threshold use the pool and keep sample order"""
+        monkeypatch.setattr(app_module, 'model', forest)
+        monkeypatch.setattr(app_module, 'BATCH_SHARD_WORKERS', 2)
+        monkeypatch.setattr(app_module, 'BATCH_SHARD_SIZE', 7)
+        monkeypatch.setattr(app_module, 'BATCH_SHARD_THRESHOLD', 10)
+        app_module.start_shard_pool()
+        try:
+            samples = [dict(SAMPLE, age=30 + i) for i in range(25)]
+            body = app_module.app.test_client().post('/batch_predict', json={'samples': samples}).get_json()
+        finally:
+            app_module.sharded_scorer.close()
+            monkeypatch.setattr(app_module, 'sharded_scorer', None)
+
+        X = np.array([[s[f] for f in FEATURES] for s in samples])
+        expected = forest.predict_proba(X)[:, 1]
+        assert [p['sample_index'] for p in body['predictions']] == list(range(25))
+        assert [p['confidence']['disease'] for p in body['predictions']] == pytest.approx(expected)
+
+    def test_sharded_batch_keeps_bulk_chunks(self, forest, monkeypatch):
+        """Test sharding applies per bulk chunk at the configured chunk size"""
+        monkeypatch.setattr(app_module, 'model', forest)
+        monkeypatch.setattr(app_module, 'scheduler', None)
+        monkeypatch.setattr(app_module, 'BATCH_SHARD_WORKERS', 2)
+        monkeypatch.setattr(app_module, 'BATCH_SHARD_THRESHOLD', 10)
+        monkeypatch.setattr(app_module, 'BULK_CHUNK_ROWS', 10)
+        monkeypatch.setattr(app_module, 'INTERACTIVE_MAX_ROWS', 5)
+        app_module.start_shard_pool()
+        client = app_module.app.test_client()
+        batches = app_module.sharded_batches._value.get()
+        try:
+            samples = [dict(SAMPLE, age=30 + i) for i in range(25)]
+            body = client.post('/batch_predict', json={'samples': samples}).get_json()
+            info = client.get('/model/info').get_json()
+        finally:
+            app_module.scheduler.close()
+            app_module.sharded_scorer.close()
+            monkeypatch.setattr(app_module, 'sharded_scorer', None)
+
+        X = np.array([[s[f] for f in FEATURES] for s in samples])
+        assert [p['confidence']['disease'] for p in body['predictions']] == pytest.approx(
+            forest.predict_proba(X)[:, 1]
+        )
+        assert app_module.sharded_batches._value.get() - batches == 3
+        assert info['scheduling']['bulk_chunk_rows'] == 10
+
+
+class TestBatchFormats:
+    """Test columnar batches, field selection and compression"""
+
+    def test_columnar_matches_rows(self, client):
+        """Test a columnar request returns the same predictions as a row request"""
+        samples = [dict(SAMPLE, age=40 + i) for i in range(5)]
+        rows = client.post('/batch_predict', json={'samples': samples}).get_json()
+        columns = {f: [s[f] for s in samples] for f in FEATURES}
+        columnar = client.post('/batch_predict', json={'columns': columns}).get_json()
+
+        assert columnar['format'] == 'columnar'
+        assert columnar['columns']['prediction'] == [p['prediction'] for p in rows['predictions']]
+        assert columnar['columns']['confidence_disease'] == pytest.approx(
+            [p['confidence']['disease'] for p in rows['predictions']])
+
+    def test_columnar_null_is_row_error(self, client):
+        """Test a null feature is a row error in columnar batches, as in row batches"""
+        columns = {f: [SAMPLE[f], SAMPLE[f]] for f in FEATURES}
+        columns['age'][1] = None
+        body = client.post('/batch_predict', json={'columns': columns}).get_json()
+        rows = client.post('/batch_predict', json={'samples': [SAMPLE, dict(SAMPLE, age=None)]}).get_json()
+
+        assert body['columns']['sample_index'] == [0]
+        assert [e['sample_index'] for e in body['errors']] == [1]
+        assert rows['predictions'][1]['error'] == body['errors'][0]['error']
+
+    def test_non_object_body(self, client):
+        """Test a JSON body that is not an object is an invalid batch"""
+        response = client.post('/batch_predict?explain=true', json=[SAMPLE])
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'Invalid batch format'
+
+    def test_fields_query_parameter(self, client):
+        """Test the fields selector drops unrequested outputs"""
+        body = client.post('/batch_predict?fields=risk_level', json={'samples': [SAMPLE]}).get_json()
+        assert set(body['predictions'][0]) == {'sample_index', 'risk_level'}
+
+    def test_invalid_fields(self, client):
+        """Test unknown fields are a client error"""
+        response = client.post('/batch_predict?fields=bogus', json={'samples': [SAMPLE]})
+        assert response.status_code == 400
+
+    def test_gzip_response(self, client, monkeypatch):
+        """Test large batches are gzip-compressed when accepted"""
+        monkeypatch.setattr(app_module, 'RESPONSE_COMPRESSION_MIN_SAMPLES', 2)
+        response = client.post(
+            '/batch_predict', json={'samples': [SAMPLE] * 3}, headers={'Accept-Encoding': 'gzip'}
+        )
+
+        assert response.headers['Content-Encoding'] == 'gzip'
+        body = json.loads(gzip.decompress(response.get_data()))
+        assert body['successful_predictions'] == 3
+
+
+class TestProfileEndpoint:
+    """Test the /debug/profile endpoint"""
+
+    AUTH = {'Authorization': 'Bearer secret'}
+
+    def test_disabled_without_token(self, client, monkeypatch):
+        """Test the endpoint is hidden when no token is configured"""
+        monkeypatch.setattr(app_module, 'DEBUG_PROFILE_TOKEN', None)
+        assert client.get('/debug/profile', headers=self.AUTH).status_code == 404
+
+    def test_requires_token(self, client, monkeypatch):
+        """Test a wrong or missing token is rejected"""
+        monkeypatch.setattr(app_module, 'DEBUG_PROFILE_TOKEN', 'secret')
+        assert client.get('/debug/profile').status_code == 401
+        assert client.get('/debug/profile', headers={'Authorization': 'Bearer nope'}).status_code == 401
+
+    def test_profile(self, client, monkeypatch):
+        """Test a short profile returns a summary and collapsed stacks"""
+        monkeypatch.setattr(app_module, 'DEBUG_PROFILE_TOKEN', 'secret')
+        body = client.get('/debug/profile?seconds=0.05&interval_ms=5', headers=self.AUTH).get_json()
+
+        assert body['samples'] > 0
+        assert 'top_functions' in body and 'collapsed' in body
+
+        response = client.get('/debug/profile?seconds=0.05&format=collapsed', headers=self.AUTH)
+        assert response.mimetype == 'text/plain'
+
+    def test_invalid_parameters(self, client, monkeypatch):
+        """Test out-of-range durations are rejected"""
+        monkeypatch.setattr(app_module, 'DEBUG_PROFILE_TOKEN', 'secret')
+        assert client.get('/debug/profile?seconds=3600', headers=self.AUTH).status_code == 400
+
+    def test_concurrent_profile_conflict(self, client, monkeypatch):
+        """Test a second concurrent profile gets 409"""
+        from src.api import profiler
+        monkeypatch.setattr(app_module, 'DEBUG_PROFILE_TOKEN', 'secret')
+        with profiler._profile_lock:
+            assert client.get('/debug/profile?seconds=0.05', headers=self.AUTH).status_code == 409
+
+
+class TestShadowModel:
+    """Test shadow evaluation through the API"""
+
+    def test_shadow_scores_live_traffic(self, client, forest, monkeypatch):
+        """Test requests are shadow-scored without changing responses"""
+        shadow = LogisticRegression(max_iter=1000).fit(np.random.RandomState(1).randn(50, 13), np.arange(50) % 2)
+        monkeypatch.setattr(app_module, 'shadow_model', shadow)
+        monkeypatch.setattr(app_module, 'shadow_evaluator', None)
+
+        body = client.post('/predict', json=SAMPLE).get_json()
+        client.post('/batch_predict', json={'samples': [SAMPLE] * 4})
+        app_module.shadow_evaluator.close()
+
+        expected = forest.predict_proba(np.array([[SAMPLE[f] for f in FEATURES]]))[0]
+        assert body['confidence']['disease'] == pytest.approx(expected[1])
+        assert app_module.shadow_evaluator.scored_rows == 5
+        info = client.get('/model/info').get_json()
+        assert info['shadow']['scored_rows'] == 5
+        assert info['shadow']['model_type'] == 'LogisticRegression'
+
+
+class TestModelRouting:
+    """Test routing requests to pooled models"""
+
+    @pytest.fixture
+    def pooled_client(self, client, tmp_path, monkeypatch):
+        rng = np.random.RandomState(1)
+        linear = LogisticRegression(max_iter=1000).fit(rng.randn(50, 13), np.arange(50) % 2)
+        with open(tmp_path / 'linear.pkl', 'wb') as f:
+            pickle.dump(linear, f)
+        monkeypatch.setattr(app_module, 'model_pool', app_module.ModelPool(str(tmp_path)))
+        client.linear = linear
+        return client
+
+    def test_header_routing(self, pooled_client, forest):
+        """Test the routing header selects a pooled model"""
+        X = np.array([[SAMPLE[f] for f in FEATURES]])
+        routed = pooled_client.post('/predict', json=SAMPLE, headers={'X-Model': 'linear'}).get_json()
+        default = pooled_client.post('/predict', json=SAMPLE).get_json()
+
+        assert routed['model_name'] == 'linear'
+        assert routed['confidence']['disease'] == pytest.approx(pooled_client.linear.predict_proba(X)[0, 1])
+        assert default['confidence']['disease'] == pytest.approx(forest.predict_proba(X)[0, 1])
+
+    def test_path_routing(self, pooled_client):
+        """Test /models/<name>/batch_predict selects a pooled model"""
+        body = pooled_client.post('/models/linear/batch_predict', json={'samples': [SAMPLE] * 2}).get_json()
+        assert body['model_name'] == 'linear'
+        assert body['successful_predictions'] == 2
+
+    def test_unknown_model(self, pooled_client):
+        """Test unknown models are a 404"""
+        assert pooled_client.post('/models/nope/predict', json=SAMPLE).status_code == 404
+
+    def test_info_lists_resident_models(self, pooled_client):
+        """Test /model/info lists resident pooled models and their footprints"""
+        pooled_client.post('/predict', json=SAMPLE, headers={'X-Model': 'linear'})
+        pool = pooled_client.get('/model/info').get_json()['model_pool']
+
+        assert pool['available_models'] == ['linear']
+        assert pool['resident_models'][0]['name'] == 'linear'
+        assert pool['resident_models'][0]['footprint_bytes'] > 0
+
+    def test_model_footprint_metrics(self, client, tmp_path, monkeypatch):
+        """Test each resident pooled model exports its footprint until it is evicted"""
+        rng = np.random.RandomState(1)
+        for name in ('first', 'second'):
+            with open(tmp_path / f'{name}.pkl', 'wb') as f:
+                pickle.dump(LogisticRegression(max_iter=1000).fit(rng.randn(50, 13), np.arange(50) % 2), f)
+        pool = app_module.ModelPool(str(tmp_path), 1, on_load=app_module.record_model_load,
+                                    on_evict=app_module.record_model_eviction)
+        monkeypatch.setattr(app_module, 'model_pool', pool)
+
+        client.post('/predict', json=SAMPLE, headers={'X-Model': 'first'})
+        footprint = app_module.registry.get_sample_value(
+            'heart_disease_pool_model_footprint_bytes', {'model': 'first'})
+        assert footprint == pool.describe()['resident_models'][0]['footprint_bytes'] > 0
+
+        client.post('/predict', json=SAMPLE, headers={'X-Model': 'second'})
+        assert app_module.registry.get_sample_value(
+            'heart_disease_pool_model_footprint_bytes', {'model': 'first'}) is None
+        assert app_module.registry.get_sample_value(
+            'heart_disease_pool_model_footprint_bytes', {'model': 'second'}) > 0
+
+
+class TestPriorityScheduling:
+    """Test priority lanes through the API"""
+
+    def test_large_batches_run_in_bulk_lane(self, client, monkeypatch):
+        """Test large batches are scored as bulk chunks and small ones as interactive"""
+        monkeypatch.setattr(app_module, 'scheduler', None)
+        monkeypatch.setattr(app_module, 'BULK_CHUNK_ROWS', 10)
+        monkeypatch.setattr(app_module, 'INTERACTIVE_MAX_ROWS', 5)
+        before = {p: app_module.scheduler_rows.labels(priority=p)._value.get() for p in ('interactive', 'bulk')}
+
+        samples = [dict(SAMPLE, chol=200 + i) for i in range(25)]
+        bulk = client.post('/batch_predict', json={'samples': samples}).get_json()
+        client.post('/predict', json=SAMPLE)
+        client.post('/predict', json=SAMPLE, headers={'X-Priority': 'bulk'})
+        app_module.scheduler.close()
+
+        assert bulk['successful_predictions'] == 25
+        assert app_module.scheduler_rows.labels(priority='bulk')._value.get() - before['bulk'] == 26
+        assert app_module.scheduler_rows.labels(priority='interactive')._value.get() - before['interactive'] == 1
+
+    def test_full_lane_returns_429(self, client, monkeypatch):
+        """Test rejected work is a 429 with Retry-After"""
+        def reject(*args):
+            raise app_module.LaneFullError('interactive')
+
+        monkeypatch.setattr(app_module, 'run_scheduled', reject)
+        response = client.post('/predict', json=SAMPLE)
+        assert response.status_code == 429
+        assert response.headers['Retry-After'] == '1'
+
+
+class TestBatchDeduplication:
+    """Test duplicate rows in batches are scored once"""
+
+    def test_duplicates_scored_once(self, client, forest, monkeypatch):
+        """Test repeated samples get identical predictions and are counted"""
+        monkeypatch.setattr(app_module, 'predictor', None)
+        calls = []
+        monkeypatch.setattr(app_module, 'score_proba', lambda X: calls.append(len(X)) or forest.predict_proba(X))
+        before = {s: app_module.batch_dedup_rows.labels(stage=s)._value.get() for s in ('input', 'unique')}
+
+        samples = [SAMPLE, dict(SAMPLE, age=40)] * 20
+        body = client.post('/batch_predict', json={'samples': samples}).get_json()
+
+        X = np.array([[s[f] for f in FEATURES] for s in samples])
+        expected = forest.predict_proba(X)[:, 1]
+        assert [p['confidence']['disease'] for p in body['predictions']] == pytest.approx(expected)
+        assert [p['sample_index'] for p in body['predictions']] == list(range(40))
+        assert calls == [2]
+        assert app_module.batch_dedup_rows.labels(stage='input')._value.get() - before['input'] == 40
+        assert app_module.batch_dedup_rows.labels(stage='unique')._value.get() - before['unique'] == 2
+
+
+class TestExplanations:
+    """Test per-feature contributions through the API"""
+
+    @pytest.fixture
+    def explaining_client(self, client, forest, monkeypatch):
+        monkeypatch.setattr(app_module, 'EXPLANATIONS_ENABLED', True)
+        monkeypatch.setattr(app_module, 'explainer', None)
+        app_module.prepare_explainer()
+        return client
+
+    def test_predict_explanation(self, explaining_client, forest):
+        """Test /predict contributions sum to the disease probability"""
+        body = explaining_client.post('/predict?explain=true', json=SAMPLE).get_json()
+        explanation = body['explanation']
+
+        assert explanation['units'] == 'probability'
+        assert set(explanation['contributions']) == set(FEATURES)
+        total = explanation['base_value'] + sum(explanation['contributions'].values())
+        assert total == pytest.approx(body['confidence']['disease'])
+
+    def test_batch_explanations(self, explaining_client):
+        """Test rows and columnar batches carry explanations for valid rows"""
+        samples = [SAMPLE, {'age': 1}, dict(SAMPLE, age=30)]
+        rows = explaining_client.post('/batch_predict', json={'samples': samples, 'explain': True}).get_json()
+        columnar = explaining_client.post(
+            '/batch_predict?format=columnar', json={'samples': samples, 'explain': True}
+        ).get_json()
+
+        assert 'explanation' in rows['predictions'][0] and 'explanation' not in rows['predictions'][1]
+        assert columnar['explanations']['contributions']['age'] == [
+            rows['predictions'][i]['explanation']['contributions']['age'] for i in (0, 2)
+        ]
+
+    def test_early_exit_explanations(self, client, forest, monkeypatch):
+        """Test early-exit explanations sum to the served probability, with duplicates and batches"""
+        from src.models.early_exit import EarlyExitForest
+
+        monkeypatch.setattr(app_module, 'model', EarlyExitForest(forest, [0.5], group_size=5))
+        monkeypatch.setattr(app_module, 'predictor', None)
+        monkeypatch.setitem(app_module.PREDICTOR_OPTIONS, 'dedup_min_rows', 2)
+        monkeypatch.setattr(app_module, 'EXPLANATIONS_ENABLED', True)
+        monkeypatch.setattr(app_module, 'explainer', None)
+        app_module.prepare_explainer()
+
+        body = client.post('/predict?explain=true', json=SAMPLE).get_json()
+        explanation = body['explanation']
+        assert explanation['base_value'] + sum(explanation['contributions'].values()) == pytest.approx(
+            body['confidence']['disease']
+        )
+
+        samples = [SAMPLE, dict(SAMPLE, age=30), SAMPLE, {'age': 1}]
+        rows = client.post('/batch_predict', json={'samples': samples, 'explain': True}).get_json()['predictions']
+        for row in (rows[0], rows[1], rows[2]):
+            total = row['explanation']['base_value'] + sum(row['explanation']['contributions'].values())
+            assert total == pytest.approx(row['confidence']['disease'])
+
+    def test_disabled(self, client, monkeypatch):
+        """Test explanation requests are a 400 when explanations are disabled"""
+        monkeypatch.setattr(app_module, 'explainer', None)
+        assert client.post('/predict', json=dict(SAMPLE, explain=True)).status_code == 400
+        assert client.post('/predict', json=SAMPLE).status_code == 200
+
+
+class TestDriftMonitoring:
+    """Test feature drift statistics through the API"""
+
+    def test_served_rows_are_tracked(self, client, tmp_path, monkeypatch):
+        """Test predictions update the drift statistics exported at /metrics"""
+        from src.data.drift import build_reference_profile, save_reference_profile
+
+        rng = np.random.RandomState(0)
+        path = str(tmp_path / 'reference_profile.json')
+        save_reference_profile(build_reference_profile(rng.randn(200, 13) * 20 + 100, FEATURES), path)
+        monkeypatch.setattr(app_module, 'drift_monitor', None)
+        assert app_module.start_drift_monitor(path)
+
+        client.post('/predict', json=SAMPLE)
+        client.post('/batch_predict', json={'samples': [SAMPLE, dict(SAMPLE, age=40)]})
+        metrics = client.get('/metrics').get_data(as_text=True)
+        app_module.registry.unregister(app_module.drift_monitor)
+
+        assert app_module.drift_monitor.count == 3
+        assert 'heart_disease_feature_psi{feature="age"}' in metrics
+
+    def test_missing_profile_disables(self, monkeypatch, tmp_path):
+        """Test a missing reference profile leaves drift monitoring off"""
+        monkeypatch.setattr(app_module, 'drift_monitor', None)
+        assert not app_module.start_drift_monitor(str(tmp_path / 'missing.json'))
+        assert app_module.drift_monitor is None
+
+
+class TestPredictionLog:
+    """Test prediction logging through the API"""
+
+    def test_predictions_are_logged(self, client, forest, tmp_path, monkeypatch):
+        """Test served rows and probabilities land in the prediction log"""
+        from src.api.prediction_log import read_segment
+
+        monkeypatch.setattr(app_module, 'PREDICTION_LOG_DIR', str(tmp_path))
+        monkeypatch.setattr(app_module, 'prediction_log', None)
+
+        single = client.post('/predict', json=SAMPLE).get_json()
+        client.post('/batch_predict', json={'samples': [SAMPLE, dict(SAMPLE, age=40)]})
+        app_module.prediction_log.close()
+
+        logged = read_segment(app_module.prediction_log.segments[0])
+        assert len(logged['timestamp']) == 3
+        assert logged['features'][2, 0] == 40
+        assert logged['disease_probability'][0] == pytest.approx(single['confidence']['disease'])
+        assert set(logged['model']) == {f"default@{app_module.MODEL_VERSION}"}
+
+
+class TestTracing:
+    """Test request tracing spans"""
+
+    def test_request_spans_form_one_trace(self, client, monkeypatch):
+        """Test parse, validate, inference and serialize spans nest under the request span"""
+        from src.utils import tracing
+
+        exporter = tracing.MemorySpanExporter()
+        monkeypatch.setattr(tracing, '_tracer', tracing.Tracer('test-api', exporter))
+
+        response = client.post('/batch_predict', json={'samples': [SAMPLE, dict(SAMPLE, age=40)]})
+        assert response.status_code == 200
+        tracing.get_tracer().flush()
+
+        spans = {s['name']: s for s in exporter.spans}
+        root = spans['POST /batch_predict']
+        assert root['parent_id'] is None
+        assert root['attributes']['http.status_code'] == 200
+        assert response.headers['traceresponse'] == f"00-{root['trace_id']}-{root['span_id']}-01"
+        for stage in ('api.parse', 'api.validate', 'api.inference', 'api.serialize'):
+            assert spans[stage]['parent_id'] == root['span_id']
+            assert spans[stage]['trace_id'] == root['trace_id']
+        assert spans['inference.model']['parent_id'] == spans['api.inference']['span_id']
+        assert spans['api.inference']['attributes']['rows'] == 2
+
+    def test_incoming_traceparent_is_continued(self, client, monkeypatch):
+        """Test a W3C traceparent header sets the trace and parent of the request span"""
+        from src.utils import tracing
+
+        exporter = tracing.MemorySpanExporter()
+        monkeypatch.setattr(tracing, '_tracer', tracing.Tracer('test-api', exporter))
+        trace_id, parent_id = 'ab' * 16, 'cd' * 8
+
+        client.post('/predict', json=SAMPLE, headers={'traceparent': f"00-{trace_id}-{parent_id}-01"})
+        tracing.get_tracer().flush()
+
+        root = next(s for s in exporter.spans if s['name'] == 'POST /predict')
+        assert root['trace_id'] == trace_id
+        assert root['parent_id'] == parent_id
+        assert all(s['trace_id'] == trace_id for s in exporter.spans)
+
+    def test_unsampled_requests_export_nothing(self, client, monkeypatch):
+        """Test sampled-out traces are not exported"""
+        from src.utils import tracing
+
+        exporter = tracing.MemorySpanExporter()
+        monkeypatch.setattr(tracing, '_tracer', tracing.Tracer('test-api', exporter, sample_rate=0.0))
+
+        response = client.post('/predict', json=SAMPLE)
+        tracing.get_tracer().flush()
+
+        assert response.status_code == 200
+        assert 'traceresponse' not in response.headers
+        assert exporter.spans == []
+
+
+class TestModelFootprint:
+    """Test the load-time model footprint report"""
+
+    def test_footprint_in_model_info_and_metrics(self, client, forest, monkeypatch):
+        """Test sizes, tree structure and latency estimates are reported and exported"""
+        monkeypatch.setattr(app_module, 'model_footprint', None)
+        monkeypatch.setattr(app_module, 'FOOTPRINT_BENCHMARK_SECONDS', 0.5)
+        monkeypatch.setattr(app_module, 'DRIFT_REFERENCE_PROFILE', None)
+        app_module.prepare_footprint()
+        app_module.footprint_benchmark.join()
+
+        footprint = client.get('/model/info').get_json()['footprint']
+        assert footprint['engine'] == 'sklearn'
+        assert footprint['n_trees'] == 20
+        assert footprint['n_nodes'] == sum(est.tree_.node_count for est in forest.estimators_)
+        assert footprint['max_depth'] == max(est.tree_.max_depth for est in forest.estimators_)
+        assert footprint['serialized_bytes'] > 0 and footprint['memory_bytes'] > 0
+        assert [b['batch_size'] for b in footprint['latency']['batches']] == [1, 100, 10000]
+
+        metrics = client.get('/metrics').get_data(as_text=True)
+        assert f'heart_disease_model_trees{{model_version="{app_module.MODEL_VERSION}"}} 20.0' in metrics
+        assert 'heart_disease_model_expected_latency_seconds{batch_size="10000"' in metrics
+
+    def test_latency_is_null_until_benchmark_finishes(self, client, monkeypatch):
+        """Test the benchmark runs after load without blocking it or the model info"""
+        release = threading.Event()
+
+        def measure_latency(*args):
+            release.wait(5)
+            return {'batches': [{'batch_size': 1, 'seconds': 0.001, 'measured': True}]}
+
+        monkeypatch.setattr(app_module, 'model_footprint', None)
+        monkeypatch.setattr(app_module, 'FOOTPRINT_BENCHMARK_SECONDS', 0.5)
+        monkeypatch.setattr(app_module, 'measure_latency', measure_latency)
+        app_module.prepare_footprint()
+        benchmark = app_module.footprint_benchmark
+
+        assert client.get('/model/info').get_json()['footprint']['latency'] is None
+        assert app_module.footprint_benchmark is benchmark
+
+        release.set()
+        benchmark.join()
+        footprint = client.get('/model/info').get_json()['footprint']
+        assert footprint['latency']['batches'][0]['batch_size'] == 1
+
+    def test_benchmark_can_be_disabled(self, client, monkeypatch):
+        """Test a zero benchmark budget reports structure without latency"""
+        monkeypatch.setattr(app_module, 'model_footprint', None)
+        monkeypatch.setattr(app_module, 'FOOTPRINT_BENCHMARK_SECONDS', 0)
+        app_module.prepare_footprint()
+
+        footprint = client.get('/model/info').get_json()['footprint']
+        assert footprint['latency'] is None
+        assert footprint['n_trees'] == 20
@@ -0,0 +1,106 @@
+"""
+Unit tests for batch formats and response compression
+"""
+import gzip
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.api.batch_format import (
+    BatchFormatError, build_columnar_predictions, build_row_predictions, columns_to_matrix,
+    negotiate_encoding, parse_fields, risk_levels, stream_json
+)
+
+BOUNDARIES = (0.3, 0.6, 0.8)
+
+
+class TestFields:
+    """Test the fields selector"""
+
+    def test_default_is_all_fields(self):
+        """Test no selector keeps every output field"""
+        assert parse_fields(None) == ('prediction', 'prediction_label', 'confidence', 'risk_level')
+
+    def test_string_selector(self):
+        """Test comma-separated selectors are normalized to canonical order"""
+        assert parse_fields('risk_level, prediction') == ('prediction', 'risk_level')
+
+    def test_unknown_field(self):
+        """Test unknown fields are rejected"""
+        with pytest.raises(BatchFormatError):
+            parse_fields(['prediction', 'bogus'])
+
+
+class TestColumnar:
+    """Test columnar conversion and response building"""
+
+    def test_columns_to_matrix(self):
+        """Test columns are stacked in feature order with bad rows reported"""
+        X, indices, errors = columns_to_matrix({'b': [1, 2, 3], 'a': [4, 'x', 6]}, ['a', 'b'])
+
+        np.testing.assert_array_equal(X, [[4, 1], [6, 3]])
+        np.testing.assert_array_equal(indices, [0, 2])
+        assert list(errors) == [1]
+
+    def test_null_and_nan_values_are_errors(self):
+        """Test null and NaN values are reported instead of scored as NaN"""
+        X, indices, errors = columns_to_matrix({'a': [1, None, 3], 'b': [1, 2, float('nan')]}, ['a', 'b'])
+
+        np.testing.assert_array_equal(X, [[1, 1]])
+        np.testing.assert_array_equal(indices, [0])
+        assert sorted(errors) == [1, 2]
+        assert 'NoneType' in errors[1]['error'] and 'NaN' in errors[2]['error']
+
+    def test_unequal_columns(self):
+        """Test ragged columns are rejected"""
+        with pytest.raises(BatchFormatError):
+            columns_to_matrix({'a': [1, 2], 'b': [1]}, ['a', 'b'])
+
+    def test_risk_levels_match_scalar_rule(self):
+        """Test vectorized risk levels use the same boundaries as get_risk_level"""
+        levels = risk_levels(np.array([0.0, 0.3, 0.59, 0.6, 0.8, 1.0]), BOUNDARIES)
+        assert list(levels) == ['Low', 'Medium', 'Medium', 'High', 'Very High', 'Very High']
+
+    def test_layouts_agree(self):
+        """Test columnar and row layouts carry the same predictions"""
+        probas = np.array([[0.9, 0.1], [0.2, 0.8]])
+        labels = np.array([0, 1])
+        errors = {1: {'sample_index': 1, 'error': 'bad'}}
+        rows = build_row_predictions(3, [0, 2], labels, probas, errors, BOUNDARIES)
+        columnar = build_columnar_predictions([0, 2], labels, probas, errors, BOUNDARIES)
+
+        assert rows[1] == errors[1]
+        assert columnar['errors'] == [errors[1]]
+        for k, idx in enumerate(columnar['columns']['sample_index']):
+            assert rows[idx]['prediction'] == columnar['columns']['prediction'][k]
+            assert rows[idx]['risk_level'] == columnar['columns']['risk_level'][k]
+            assert rows[idx]['confidence']['disease'] == columnar['columns']['confidence_disease'][k]
+
+    def test_field_selection(self):
+        """Test unselected fields are dropped"""
+        rows = build_row_predictions(1, [0], np.array([1]), np.array([[0.2, 0.8]]), {}, BOUNDARIES, ('prediction',))
+        assert rows == [{'sample_index': 0, 'prediction': 1}]
+
+
+class TestCompression:
+    """Test encoding negotiation and streaming"""
+
+    def test_negotiation(self):
+        """Test gzip is chosen when accepted and refused codings are skipped"""
+        assert negotiate_encoding(None) is None
+        assert negotiate_encoding('gzip, deflate') == 'gzip'
+        assert negotiate_encoding('gzip;q=0') is None
+        assert negotiate_encoding('br') is None
+
+    def test_gzip_stream_round_trip(self):
+        """Test a chunked gzip stream decodes to the original payload"""
+        payload = {'values': list(range(5000))}
+        body = b''.join(stream_json(payload, 'gzip', chunk_size=1024))
+
+        assert json.loads(gzip.decompress(body)) == payload
@@ -0,0 +1,175 @@
+"""
+Unit tests for traffic capture and replay
+"""
+import json
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.api import app as app_module
+from src.api.capture import TrafficRecorder, read_capture
+from src.utils.replay_traffic import merge_captures, replay, summarize
+from tests.conftest import SAMPLE
+
+
+class TestCapture:
+    """Test the capture file writer and reader"""
+
+    def test_round_trip(self, tmp_path):
+        """Test records are read back in order with their timestamps, targets and headers"""
+        path = str(tmp_path / 'capture.bin.gz')
+        recorder = TrafficRecorder(path)
+        recorder.record('/predict', b'{"a": 1}', timestamp=10.0)
+        recorder.record('/models/linear/batch_predict?format=columnar', b'{"b": 2}', timestamp=11.5,
+                        headers={'X-Priority': 'bulk'})
+        recorder.close()
+
+        assert list(read_capture(path)) == [
+            (10.0, '/predict', b'{"a": 1}', {}),
+            (11.5, '/models/linear/batch_predict?format=columnar', b'{"b": 2}', {'X-Priority': 'bulk'}),
+        ]
+        assert recorder.captured == 2
+
+    def test_drops_oversized_targets_and_headers(self, tmp_path):
+        """Test records too long for the length fields are dropped and capture keeps going"""
+        path = str(tmp_path / 'capture.bin.gz')
+        recorder = TrafficRecorder(path)
+        assert not recorder.record('/predict?' + 'a' * 70000, b'x', timestamp=1.0)
+        assert not recorder.record('/predict', b'x', timestamp=2.0, headers={'X-Model': 'm' * 70000})
+        assert recorder.record('/predict', b'y', timestamp=3.0)
+        recorder.close()
+
+        assert list(read_capture(path)) == [(3.0, '/predict', b'y', {})]
+        assert recorder.dropped == 2
+        assert recorder.captured == 1
+
+    def test_drops_when_queue_full(self, tmp_path):
+        """Test records are dropped instead of blocking when the queue is full"""
+        recorder = TrafficRecorder(str(tmp_path / 'capture.bin.gz'), max_queue=1)
+        recorder._queue.put((0.0, b'/predict', b'{}', b''))  # keep the queue occupied
+        results = [recorder.record('/predict', b'x') for _ in range(100)]
+        recorder.close()
+
+        assert not all(results)
+        assert recorder.dropped == results.count(False)
+
+    def test_size_limit(self, tmp_path):
+        """Test capture stops once the file reaches max_bytes"""
+        path = str(tmp_path / 'capture.bin.gz')
+        recorder = TrafficRecorder(path, max_bytes=1)
+        recorder.record('/predict', b'x')
+        deadline = time.monotonic() + 5
+        while not recorder.full and time.monotonic() < deadline:
+            time.sleep(0.01)
+        recorder.close()
+
+        assert recorder.full
+        assert not recorder.record('/predict', b'y')
+
+    def test_truncated_file(self, tmp_path):
+        """Test a truncated capture yields its complete records"""
+        path = tmp_path / 'capture.bin.gz'
+        recorder = TrafficRecorder(str(path))
+        for i in range(50):
+            recorder.record('/predict', json.dumps({'i': i}).encode(), timestamp=float(i))
+        recorder.close()
+        data = path.read_bytes()
+        path.write_bytes(data[:len(data) - 10])
+
+        records = list(read_capture(str(path)))
+        assert 0 < len(records) <= 50
+        assert records[0][2] == b'{"i": 0}'
+
+    def test_merge_orders_by_arrival(self, tmp_path):
+        """Test per-worker files merge by timestamp"""
+        paths = []
+        for worker, timestamps in enumerate([(1.0, 3.0), (2.0, 4.0)]):
+            path = str(tmp_path / f'capture-{worker}.bin.gz')
+            recorder = TrafficRecorder(path)
+            for ts in timestamps:
+                recorder.record('/predict', b'{}', timestamp=ts)
+            recorder.close()
+            paths.append(path)
+
+        assert [record[0] for record in merge_captures(paths)] == [1.0, 2.0, 3.0, 4.0]
+
+
+class TestReplay:
+    """Test replaying captured traffic"""
+
+    def records(self, n, spacing):
+        body = json.dumps(SAMPLE).encode()
+        return [(100.0 + i * spacing, '/predict', body, {}) for i in range(n)]
+
+    def test_replay_max_speed(self, server_url):
+        """Test every record is sent and summarized"""
+        results = replay(self.records(10, 1.0) + [(200.0, '/batch_predict', b'{}', {})], server_url, speed=0)
+        summary = summarize(results, 1.0)
+
+        assert summary['requests'] == 11
+        assert summary['endpoints']['/predict']['statuses'] == {'200': 10}
+        assert summary['endpoints']['/batch_predict']['statuses'] == {'400': 1}
+
+    def test_replay_preserves_pacing(self, server_url):
+        """Test scaled inter-arrival times are respected"""
+        start = time.perf_counter()
+        replay(self.records(3, 0.2), server_url, speed=2.0)
+
+        assert time.perf_counter() - start >= 0.2
+
+    def test_connection_errors_are_reported(self):
+        """Test unreachable targets are counted as errors"""
+        results = replay(self.records(2, 0.0), 'http://127.0.0.1:9', speed=0, timeout=1)
+        assert all(r['status'] is None and r['error'] for r in results)
+
+
+class TestAppCapture:
+    """Test request capture in the API"""
+
+    def test_requests_are_captured(self, forest, monkeypatch, tmp_path):
+        """Test sampled prediction bodies land in the worker's capture file"""
+        monkeypatch.setattr(app_module, 'model', forest)
+        monkeypatch.setattr(app_module, 'TRAFFIC_CAPTURE_DIR', str(tmp_path))
+        monkeypatch.setattr(app_module, 'TRAFFIC_CAPTURE_SAMPLE_RATE', 1.0)
+        monkeypatch.setattr(app_module, 'traffic_recorder', None)
+        client = app_module.app.test_client()
+        client.post('/predict', json=SAMPLE)
+        client.get('/health')
+        app_module.traffic_recorder.close()
+
+        records = list(read_capture(app_module.traffic_recorder.path))
+        assert [(endpoint, json.loads(body)) for _, endpoint, body, _ in records] == [('/predict', SAMPLE)]
+
+    def test_routing_and_priority_are_captured_and_replayed(self, forest, monkeypatch, tmp_path):
+        """Test query strings and the routing and priority headers survive capture and replay"""
+        monkeypatch.setattr(app_module, 'TRAFFIC_CAPTURE_DIR', str(tmp_path))
+        monkeypatch.setattr(app_module, 'TRAFFIC_CAPTURE_SAMPLE_RATE', 1.0)
+        monkeypatch.setattr(app_module, 'traffic_recorder', None)
+        app_module.app.test_client().post(
+            '/models/missing/predict?explain=false', json=SAMPLE,
+            headers={'X-Priority': 'bulk', 'X-Model': 'other', 'User-Agent': 'test'}
+        )
+        app_module.traffic_recorder.close()
+
+        records = list(read_capture(app_module.traffic_recorder.path))
+        assert [(target, headers) for _, target, _, headers in records] == [
+            ('/models/missing/predict?explain=false', {'X-Model': 'other', 'X-Priority': 'bulk'})
+        ]
+
+        sent = []
+
+        def post(session, url, data=None, headers=None, timeout=None):
+            sent.append((url, headers))
+            return SimpleNamespace(status_code=200)
+
+        monkeypatch.setattr(requests.Session, 'post', post)
+        replay(records, 'http://target', speed=0)
+        assert sent == [('http://target/models/missing/predict?explain=false',
+                         {'X-Model': 'other', 'X-Priority': 'bulk', 'Content-Type': 'application/json'})]
@@ -0,0 +1,115 @@
+"""
+Unit tests for cascade inference
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.models.cascade import CascadeClassifier, fit_uncertainty_band
+
+
+@pytest.fixture(scope="module")
+def models_and_data():
+    """Linear and forest models trained on the same synthetic data"""
+    rng = np.random.RandomState(0)
+    X = rng.randn(600, 13)
+    y = (X[:, 0] + X[:, 1] ** 2 - 1 + 0.3 * rng.randn(600) > 0).astype(int)
+    lr = LogisticRegression(max_iter=1000).fit(X[:400], y[:400])
+    rf = RandomForestClassifier(n_estimators=50, random_state=42).fit(X[:400], y[:400])
+    return lr, rf, X[400:]
+
+
+class TestUncertaintyBand:
+    """Test band fitting"""
+
+    def test_band_meets_target(self, models_and_data):
+        """Test the fitted band reaches the agreement target"""
+        lr, rf, X_val = models_and_data
+        band = fit_uncertainty_band(lr.predict_proba(X_val)[:, 1], rf.predict(X_val), 0.95)
+
+        assert band['low'] <= 0.5 <= band['high']
+        assert band['agreement'] >= 0.95
+        assert 0 <= band['escalation_rate'] <= 1
+
+    def test_perfect_agreement_needs_no_band(self):
+        """Test no rows escalate when the linear labels already agree"""
+        p = np.array([0.1, 0.2, 0.7, 0.9])
+        band = fit_uncertainty_band(p, (p > 0.5).astype(int), 1.0)
+
+        assert band['escalation_rate'] == 0
+        assert band['agreement'] == 1.0
+
+    def test_stricter_target_escalates_more(self, models_and_data):
+        """Test escalation grows with the agreement target"""
+        lr, rf, X_val = models_and_data
+        p, labels = lr.predict_proba(X_val)[:, 1], rf.predict(X_val)
+
+        loose = fit_uncertainty_band(p, labels, 0.85)
+        strict = fit_uncertainty_band(p, labels, 1.0)
+
+        assert strict['escalation_rate'] >= loose['escalation_rate']
+        assert strict['agreement'] == 1.0
+
+
+class TestCascadeClassifier:
+    """Test cascade scoring"""
+
+    def test_agreement_on_validation_data(self, models_and_data):
+        """Test cascade labels match the forest at the fitted rate"""
+        lr, rf, X_val = models_and_data
+        band = fit_uncertainty_band(lr.predict_proba(X_val)[:, 1], rf.predict(X_val), 0.98)
+        cascade = CascadeClassifier(lr, rf, band['low'], band['high'])
+
+        agreement = np.mean(cascade.predict(X_val) == rf.predict(X_val))
+        assert agreement == pytest.approx(band['agreement'])
+
+    def test_escalated_rows_use_forest(self, models_and_data):
+        """Test escalated rows carry forest probabilities and stats are reported"""
+        lr, rf, X_val = models_and_data
+        calls = []
+        cascade = CascadeClassifier(lr, rf, 0.3, 0.7, on_score=lambda *args: calls.append(args))
+
+        proba, escalated = cascade.predict_proba_with_escalation(X_val)
+
+        np.testing.assert_allclose(proba[escalated], rf.predict_proba(X_val[escalated]))
+        np.testing.assert_allclose(proba[~escalated], lr.predict_proba(X_val[~escalated]))
+        assert calls[0][:2] == (len(X_val), int(escalated.sum()))
+
+    def test_invalid_band(self, models_and_data):
+        """Test inverted bands are rejected"""
+        lr, rf, _ = models_and_data
+        with pytest.raises(ValueError):
+            CascadeClassifier(lr, rf, 0.7, 0.3)
+
+
+class TestTrainingBand:
+    """Test the band fitted by the training pipeline"""
+
+    def test_band_fitted_on_training_split(self, tmp_path, monkeypatch):
+        """Test the band is tuned on out-of-fold training predictions and saved"""
+        from src.models import train
+
+        rng = np.random.RandomState(1)
+        X = rng.randn(300, 13)
+        y = (X[:, 0] + 0.5 * rng.randn(300) > 0).astype(int)
+        lr = LogisticRegression(max_iter=1000).fit(X, y)
+        rf = RandomForestClassifier(n_estimators=20, random_state=42).fit(X, y)
+        monkeypatch.setattr(train, 'MODEL_DIR', tmp_path)
+
+        band = train.fit_cascade_band(lr, rf, X, y, target_agreement=0.95)
+
+        folds = list(train.cv_folds().split(X, y))
+        expected = fit_uncertainty_band(
+            train.cross_val_predict(lr, X, y, cv=folds, method='predict_proba')[:, 1],
+            train.cross_val_predict(rf, X, y, cv=folds),
+            target_agreement=0.95
+        )
+        assert band == expected
+        assert (tmp_path / "cascade_metadata.json").exists()
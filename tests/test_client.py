@@ -0,0 +1,221 @@
+"""
+Unit tests for the API client SDK
+"""
+import asyncio
+import json
+import os
+import sys
+import threading
+
+import numpy as np
+import pytest
+import requests
+from werkzeug.serving import make_server
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.api import app as app_module
+from src.client import sdk
+from src.client.sdk import (
+    AsyncHeartDiseaseClient, HeartDiseaseClient, PredictionError, columnar_to_rows, parse_retry_after, retry_delay
+)
+from tests.conftest import SAMPLE
+
+
+def samples(n):
+    return [dict(SAMPLE, age=30 + i) for i in range(n)]
+
+
+class TestHelpers:
+    """Test retry and format helpers"""
+
+    def test_parse_retry_after(self):
+        """Test delta-seconds and HTTP-date Retry-After values"""
+        assert parse_retry_after('3') == 3.0
+        assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+        assert parse_retry_after(None) is None
+        assert parse_retry_after('soon') is None
+
+    def test_retry_delay(self):
+        """Test Retry-After wins and jitter stays inside the envelope"""
+        assert retry_delay(0, 2.0, 0.1, 10.0) == 2.0
+        assert retry_delay(0, 60.0, 0.1, 10.0) == 10.0
+        assert all(0 <= retry_delay(3, None, 0.1, 10.0) <= 0.8 for _ in range(100))
+
+    def test_columnar_to_rows(self):
+        """Test columnar responses expand back to per-sample rows"""
+        body = {
+            'columns': {'sample_index': [0, 2], 'prediction': [1, 0],
+                        'confidence_no_disease': [0.2, 0.9], 'confidence_disease': [0.8, 0.1]},
+            'errors': [{'sample_index': 1, 'error': 'bad'}],
+        }
+        rows = columnar_to_rows(body, 3)
+
+        assert rows[1]['error'] == 'bad'
+        assert rows[2] == {'sample_index': 2, 'prediction': 0, 'confidence': {'no_disease': 0.9, 'disease': 0.1}}
+
+
+class TestSyncClient:
+    """Test the requests-based client against a live server"""
+
+    def test_predict_batch_columnar_matches_rows(self, server_url):
+        """Test both batch formats return the same predictions"""
+        with HeartDiseaseClient(server_url, max_batch_size=4) as client:
+            columnar = client.predict_batch(samples(10))
+            assert client.columnar
+        with HeartDiseaseClient(server_url, max_batch_size=4, columnar=False) as client:
+            rows = client.predict_batch(samples(10))
+
+        assert [r['sample_index'] for r in columnar] == list(range(10))
+        assert [r['prediction'] for r in columnar] == [r['prediction'] for r in rows]
+
+    def test_submit_coalesces(self, server_url, forest):
+        """Test submitted rows are coalesced and resolved in order"""
+        with HeartDiseaseClient(server_url, max_batch_size=8, max_delay_ms=50) as client:
+            futures = [client.submit(s) for s in samples(20)]
+            results = [f.result(timeout=10) for f in futures]
+
+        X = np.array([[s[f] for f in sdk.FEATURES] for s in samples(20)])
+        assert [r['prediction'] for r in results] == forest.predict(X).tolist()
+
+    def test_submit_reports_row_errors(self, server_url):
+        """Test invalid rows fail their own future only"""
+        with HeartDiseaseClient(server_url, max_delay_ms=50) as client:
+            good = client.submit(SAMPLE)
+            bad = client.submit(dict(SAMPLE, age='old'))
+            assert 'prediction' in good.result(timeout=10)
+            with pytest.raises(PredictionError):
+                bad.result(timeout=10)
+
+    def test_missing_feature_fails_its_future(self, server_url):
+        """Test a sample missing a feature gets the rows format's error in columnar mode"""
+        incomplete = {f: v for f, v in SAMPLE.items() if f != 'age'}
+        with HeartDiseaseClient(server_url, max_delay_ms=50, columnar=True) as client:
+            good = client.submit(SAMPLE)
+            bad = client.submit(incomplete)
+            assert 'prediction' in good.result(timeout=10)
+            with pytest.raises(PredictionError, match='Missing features'):
+                bad.result(timeout=10)
+            rows = client.predict_batch([SAMPLE, incomplete])
+        assert rows[1]['missing_features'] == ['age']
+
+    def test_cancelled_futures_are_skipped(self):
+        """Test a cancelled future is not sent and the rest of its batch still resolves"""
+        sent = []
+
+        def send_batch(batch):
+            sent.append(list(batch))
+            return [{'prediction': sample['age']} for sample in batch]
+
+        coalescer = sdk._Coalescer(send_batch, max_batch_size=4, max_delay=0.5, max_in_flight=1)
+        futures = [coalescer.submit(s) for s in samples(4)]
+        assert futures[0].cancel()
+        coalescer.close()
+
+        assert sent == [samples(4)[1:]]
+        assert [f.result(timeout=5)['prediction'] for f in futures[1:]] == [31, 32, 33]
+
+    def test_retries_honour_retry_after(self, monkeypatch):
+        """Test 503 responses are retried after the advertised delay"""
+        calls = []
+        sleeps = []
+
+        class FakeResponse:
+            def __init__(self, status_code, headers=None):
+                self.status_code = status_code
+                self.headers = headers or {}
+                self.text = '{"prediction": 1}' if status_code == 200 else '{"error": "busy"}'
+
+            def json(self):
+                return json.loads(self.text)
+
+        def fake_request(method, url, **kwargs):
+            calls.append(url)
+            return FakeResponse(503, {'Retry-After': '1'}) if len(calls) < 3 else FakeResponse(200)
+
+        client = HeartDiseaseClient('http://api', max_retries=3)
+        monkeypatch.setattr(client.session, 'request', fake_request)
+        monkeypatch.setattr(sdk.time, 'sleep', sleeps.append)
+
+        assert client.predict(SAMPLE) == {'prediction': 1}
+        assert sleeps == [1.0, 1.0]
+
+    def test_non_json_error_body(self, monkeypatch):
+        """Test a proxy's HTML error page raises PredictionError with the status once retries run out"""
+        response = requests.Response()
+        response.status_code = 502
+        response._content = b'<html><body>Bad Gateway</body></html>'
+
+        client = HeartDiseaseClient('http://api', max_retries=1)
+        monkeypatch.setattr(client.session, 'request', lambda *args, **kwargs: response)
+        monkeypatch.setattr(sdk.time, 'sleep', lambda seconds: None)
+        with pytest.raises(PredictionError) as error:
+            client.predict(SAMPLE)
+        assert error.value.status_code == 502
+        assert 'Bad Gateway' in error.value.payload['body']
+
+    def test_api_error_body(self, server_url):
+        """Test JSON error responses keep the API's message and body"""
+        with HeartDiseaseClient(server_url) as client:
+            with pytest.raises(PredictionError) as error:
+                client.predict({'age': 63})
+        assert error.value.status_code == 400
+        assert error.value.payload['error']
+
+    def test_gives_up_after_max_retries(self, monkeypatch):
+        """Test connection errors surface once retries are exhausted"""
+        client = HeartDiseaseClient('http://api', max_retries=2)
+
+        def fail(*args, **kwargs):
+            raise requests.ConnectionError('down')
+
+        monkeypatch.setattr(client.session, 'request', fail)
+        monkeypatch.setattr(sdk.time, 'sleep', lambda seconds: None)
+        with pytest.raises(requests.ConnectionError):
+            client.predict(SAMPLE)
+
+
+class TestUnixSocket:
+    """Test clients over a Unix domain socket"""
+
+    @pytest.fixture
+    def socket_path(self, forest, monkeypatch, tmp_path):
+        monkeypatch.setattr(app_module, 'model', forest)
+        path = str(tmp_path / 'api.sock')
+        server = make_server(f"unix://{path}", 0, app_module.app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        yield path
+        server.shutdown()
+
+    def test_sync_client(self, socket_path, forest):
+        """Test the sync client scores over the socket"""
+        with HeartDiseaseClient('http://localhost', unix_socket=socket_path) as client:
+            result = client.predict(SAMPLE)
+
+        X = np.array([[SAMPLE[f] for f in sdk.FEATURES]])
+        assert result['prediction'] == int(forest.predict(X)[0])
+
+    @pytest.mark.skipif(sdk.aiohttp is None, reason="aiohttp not installed")
+    def test_async_client(self, socket_path):
+        """Test the async client scores over the socket"""
+        async def run():
+            async with AsyncHeartDiseaseClient('http://localhost', unix_socket=socket_path) as client:
+                return await client.predict_batch([SAMPLE, SAMPLE])
+
+        assert len(asyncio.run(run())) == 2
+
+
+@pytest.mark.skipif(sdk.aiohttp is None, reason="aiohttp not installed")
+class TestAsyncClient:
+    """Test the aiohttp-based client against a live server"""
+
+    def test_predict_coalesced(self, server_url, forest):
+        """Test concurrent coroutines share coalesced batches"""
+        async def run():
+            async with AsyncHeartDiseaseClient(server_url, max_batch_size=8, max_delay_ms=50) as client:
+                return await asyncio.gather(*(client.predict_coalesced(s) for s in samples(20)))
+
+        results = asyncio.run(run())
+        X = np.array([[s[f] for f in sdk.FEATURES] for s in samples(20)])
+        assert [r['prediction'] for r in results] == forest.predict(X).tolist()
@@ -0,0 +1,90 @@
+"""
+Unit tests for the compact reduced-precision forest
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.models.compact_forest import CompactForest, size_report, validate
+
+
+@pytest.fixture(scope="module")
+def forest():
+    """Fully grown forest on synthetic data with 13 features"""
+    rng = np.random.RandomState(0)
+    X = rng.randn(300, 13)
+    y = (X[:, 0] + X[:, 1] + rng.randn(300) > 0).astype(int)
+    return RandomForestClassifier(n_estimators=30, max_depth=None, random_state=42).fit(X, y)
+
+
+class TestCompactForest:
+    """Test compact forest predictions"""
+
+    def test_predictions_match_within_tolerance(self, forest):
+        """Test probabilities match sklearn within the stated tolerance"""
+        compact = CompactForest.from_sklearn(forest)
+        X = np.random.RandomState(1).randn(2000, 13)
+
+        result = validate(forest, compact, X)
+
+        assert result['passed'], result
+        assert result['label_agreement'] == 1.0
+
+    def test_routing_matches_sklearn(self, forest):
+        """Test every row reaches the same leaf as sklearn in every tree"""
+        compact = CompactForest.from_sklearn(forest)
+        X = np.random.RandomState(2).randn(500, 13)
+
+        expected = forest.apply(X) + compact.roots
+        np.testing.assert_array_equal(compact.apply(X), expected)
+
+    def test_thresholds_on_split_points(self, forest):
+        """Test inputs exactly at float64 thresholds route like sklearn"""
+        compact = CompactForest.from_sklearn(forest)
+        tree = forest.estimators_[0].tree_
+        split = np.flatnonzero(tree.children_left != -1)
+        X = np.zeros((split.size, 13))
+        X[np.arange(split.size), tree.feature[split]] = tree.threshold[split]
+
+        np.testing.assert_allclose(compact.predict_proba(X), forest.predict_proba(X), atol=1e-6)
+
+    def test_compact_dtypes(self, forest):
+        """Test node arrays use reduced-precision types"""
+        compact = CompactForest.from_sklearn(forest)
+
+        assert compact.feature.dtype == np.uint8
+        assert compact.threshold.dtype == np.float32
+        assert compact.left.dtype == np.int32
+        assert compact.value.dtype == np.float32
+
+    def test_save_and_load(self, forest, tmp_path):
+        """Test the compact forest round-trips through .npz"""
+        compact = CompactForest.from_sklearn(forest)
+        compact.save(tmp_path / 'forest.npz')
+        loaded = CompactForest.load(tmp_path / 'forest.npz')
+        X = np.random.RandomState(3).randn(50, 13)
+
+        np.testing.assert_array_equal(loaded.predict_proba(X), compact.predict_proba(X))
+
+    def test_rejects_wrong_feature_count(self, forest):
+        """Test inputs with the wrong number of features are rejected"""
+        with pytest.raises(ValueError):
+            CompactForest.from_sklearn(forest).predict_proba(np.zeros((1, 5)))
+
+
+class TestSizeReport:
+    """Test the size report"""
+
+    def test_size_reduction(self, forest):
+        """Test bytes per node and total size shrink"""
+        report = size_report(forest, CompactForest.from_sklearn(forest))
+
+        assert report['n_nodes_before'] == report['n_nodes_after']
+        assert report['bytes_per_node_after'] < 20
+        assert report['total_bytes_after'] * 4 < report['total_bytes_before']
@@ -0,0 +1,122 @@
+"""
+Unit tests for streaming feature drift statistics
+"""
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from prometheus_client import CollectorRegistry, generate_latest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data.drift import FeatureDriftMonitor, build_reference_profile, load_reference_profile
+from src.data.preprocessing import preprocess_data
+from src.models.predict import FEATURES
+
+CATEGORICAL = ('sex', 'cp', 'fbs', 'restecg', 'exang', 'slope', 'ca', 'thal')
+
+
+@pytest.fixture(scope="module")
+def training_frame():
+    """Synthetic raw training features with numeric and categorical columns"""
+    rng = np.random.RandomState(0)
+    return pd.DataFrame({
+        f: rng.randint(0, 4, 600) if f in CATEGORICAL else rng.randn(600) * 10 + 100
+        for f in FEATURES
+    })
+
+
+@pytest.fixture(scope="module")
+def profile(training_frame):
+    return build_reference_profile(training_frame)
+
+
+class TestReferenceProfile:
+    """Test the training-time reference profile"""
+
+    def test_feature_kinds_and_fractions(self, profile):
+        """Test categorical detection and bin fractions"""
+        assert profile['features']['cp']['kind'] == 'categorical'
+        assert profile['features']['cp']['categories'] == [0, 1, 2, 3]
+        assert profile['features']['age']['kind'] == 'numeric'
+        assert len(profile['features']['age']['edges']) == 9
+        for entry in profile['features'].values():
+            assert sum(entry['fractions']) == pytest.approx(1.0)
+
+    def test_preprocess_data_saves_profile(self, training_frame, tmp_path):
+        """Test preprocess_data() writes the profile of the raw training split"""
+        df = training_frame.assign(target=np.arange(len(training_frame)) % 2)
+        path = tmp_path / 'reference_profile.json'
+        X_train, *_ = preprocess_data(df, reference_profile_path=str(path))
+
+        saved = load_reference_profile(str(path))
+        assert saved['n_samples'] == len(X_train)
+        # Built before scaling
+        assert saved['features']['age']['mean'] == pytest.approx(training_frame.loc[X_train.index, 'age'].mean())
+        json.dumps(saved)
+
+
+class TestFeatureDriftMonitor:
+    """Test streaming statistics and drift scores"""
+
+    def test_moments_match_batch_computation(self, profile, training_frame):
+        """Test per-row and per-batch updates give the same moments and counts"""
+        X = training_frame.values.astype(float)
+        by_row = FeatureDriftMonitor(profile, FEATURES)
+        by_batch = FeatureDriftMonitor(profile, FEATURES)
+        for row in X:
+            by_row.update(row[None, :])
+        for start in range(0, len(X), 64):
+            by_batch.update(X[start:start + 64])
+
+        snapshot = by_batch.snapshot()
+        assert snapshot['count'] == len(X)
+        for feature, stats in by_row.snapshot()['features'].items():
+            assert stats['counts'] == snapshot['features'][feature]['counts']
+            assert stats['mean'] == pytest.approx(snapshot['features'][feature]['mean'])
+            assert stats['std'] == pytest.approx(snapshot['features'][feature]['std'])
+        assert snapshot['features']['age']['mean'] == pytest.approx(X[:, 0].mean())
+        assert snapshot['features']['age']['std'] == pytest.approx(X[:, 0].std())
+
+    def test_no_drift_on_training_data(self, profile, training_frame):
+        """Test the training distribution scores no drift"""
+        monitor = FeatureDriftMonitor(profile, FEATURES)
+        monitor.update(training_frame.values.astype(float))
+        for stats in monitor.snapshot()['features'].values():
+            assert stats['psi'] == pytest.approx(0.0, abs=1e-9)
+
+    def test_shift_and_unseen_categories(self, profile, training_frame):
+        """Test shifted features score high and unseen categories land in 'other'"""
+        shifted = training_frame.copy()
+        shifted['chol'] += 30
+        shifted.loc[:49, 'thal'] = 7
+        monitor = FeatureDriftMonitor(profile, FEATURES)
+        monitor.update(shifted.values.astype(float))
+        features = monitor.snapshot()['features']
+
+        assert features['chol']['psi'] > 1.0
+        assert features['chol']['ks'] > 0.5
+        assert features['age']['psi'] == pytest.approx(0.0, abs=1e-9)
+        assert features['thal']['counts'][-1] == 50
+        assert features['thal']['ks'] is None
+
+    def test_prometheus_export(self, profile, training_frame):
+        """Test the monitor exports drift metrics as a collector"""
+        registry = CollectorRegistry()
+        monitor = FeatureDriftMonitor(profile, FEATURES)
+        registry.register(monitor)
+        monitor.update(training_frame.values[:10].astype(float))
+        text = generate_latest(registry).decode()
+
+        assert 'heart_disease_drift_rows_total 10.0' in text
+        assert 'heart_disease_feature_psi{feature="chol"}' in text
+        assert 'heart_disease_feature_bin_rows_total{bin="other",feature="cp"} 0.0' in text
+
+    def test_missing_features_rejected(self, profile):
+        """Test a profile without the served features is rejected"""
+        with pytest.raises(ValueError):
+            FeatureDriftMonitor(profile, FEATURES + ['extra'])
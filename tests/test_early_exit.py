@@ -0,0 +1,97 @@
+"""
+Unit tests for early-exit Random Forest inference
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.models.early_exit import EarlyExitForest
+
+BOUNDARIES = (0.3, 0.5, 0.6, 0.8)
+
+
+@pytest.fixture(scope="module")
+def forest_and_data():
+    """200-tree forest on mostly separable synthetic data"""
+    rng = np.random.RandomState(0)
+    X = rng.randn(400, 13)
+    y = (X[:, 0] + 0.5 * X[:, 1] + 0.3 * rng.randn(400) > 0).astype(int)
+    forest = RandomForestClassifier(n_estimators=200, random_state=42).fit(X, y)
+    return forest, rng.randn(500, 13)
+
+
+def bucket(p):
+    """Index of the boundary interval a probability falls into"""
+    return np.searchsorted(np.array(BOUNDARIES), p, side='right')
+
+
+class TestExactGuarantee:
+    """Test the exact stopping rule"""
+
+    def test_outcomes_match_full_forest(self, forest_and_data):
+        """Test labels and risk buckets match the full forest"""
+        forest, X = forest_and_data
+        engine = EarlyExitForest(forest, BOUNDARIES, group_size=10, guarantee='exact')
+
+        full = forest.predict_proba(X)[:, 1]
+        early, counts = engine.predict_proba_with_counts(X)
+
+        np.testing.assert_array_equal(engine.predict(X), forest.predict(X))
+        np.testing.assert_array_equal(bucket(early[:, 1]), bucket(full))
+        assert counts.max() <= 200
+        assert counts.min() < 200, "Clear-cut rows should exit early"
+
+    def test_probabilities_sum_to_one(self, forest_and_data):
+        """Test returned probabilities are well formed"""
+        forest, X = forest_and_data
+        proba = EarlyExitForest(forest, BOUNDARIES).predict_proba(X[:20])
+
+        assert proba.shape == (20, 2)
+        assert np.allclose(proba.sum(axis=1), 1.0)
+
+
+class TestStatisticalGuarantee:
+    """Test the statistical stopping rule"""
+
+    def test_fewer_trees_than_exact(self, forest_and_data):
+        """Test the statistical rule evaluates fewer trees with high agreement"""
+        forest, X = forest_and_data
+        exact = EarlyExitForest(forest, BOUNDARIES, guarantee='exact')
+        statistical = EarlyExitForest(forest, BOUNDARIES, guarantee='statistical', confidence=0.999)
+
+        _, exact_counts = exact.predict_proba_with_counts(X)
+        proba, stat_counts = statistical.predict_proba_with_counts(X)
+
+        assert stat_counts.mean() < exact_counts.mean()
+        agreement = np.mean(statistical.predict(X) == forest.predict(X))
+        assert agreement >= 0.95
+
+    def test_callback_receives_counts(self, forest_and_data):
+        """Test the evaluation callback gets one count per row"""
+        forest, X = forest_and_data
+        seen = []
+        EarlyExitForest(forest, BOUNDARIES, on_evaluate=seen.append).predict_proba(X[:7])
+
+        assert len(seen) == 1 and seen[0].shape == (7,)
+
+
+class TestValidation:
+    """Test argument validation"""
+
+    def test_invalid_guarantee(self, forest_and_data):
+        """Test unknown guarantees are rejected"""
+        forest, _ = forest_and_data
+        with pytest.raises(ValueError):
+            EarlyExitForest(forest, BOUNDARIES, guarantee='approximate')
+
+    def test_invalid_group_size(self, forest_and_data):
+        """Test empty tree groups are rejected"""
+        forest, _ = forest_and_data
+        with pytest.raises(ValueError):
+            EarlyExitForest(forest, BOUNDARIES, group_size=0)
@@ -0,0 +1,116 @@
+"""
+Unit tests for per-prediction feature contributions
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.svm import SVC
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.models.cascade import CascadeClassifier
+from src.models.compact_forest import CompactForest
+from src.models.early_exit import EarlyExitForest
+from src.models.explain import ContributionExplainer
+from src.models.predict import FEATURES
+
+
+@pytest.fixture(scope="module")
+def data():
+    """Synthetic binary classification data with 13 features"""
+    rng = np.random.RandomState(0)
+    X = rng.randn(400, 13)
+    y = (X[:, 0] + 0.5 * X[:, 3] > 0).astype(int)
+    return X, y
+
+
+class TestContributionExplainer:
+    """Test path and linear decompositions"""
+
+    def test_forest_contributions_sum_to_probability(self, data):
+        """Test base value plus contributions equals the forest probability"""
+        X, y = data
+        forest = RandomForestClassifier(n_estimators=25, max_depth=6, random_state=0).fit(X, y)
+        base, contributions = ContributionExplainer(forest).explain(X)
+
+        np.testing.assert_allclose(base + contributions.sum(axis=1), forest.predict_proba(X)[:, 1], atol=1e-12)
+        # The informative features carry most of the attribution
+        importance = np.abs(contributions).mean(axis=0)
+        assert set(np.argsort(importance)[-2:]) == {0, 3}
+
+    def test_single_tree_path(self):
+        """Test a depth-one tree credits its split feature with the leaf shift"""
+        X = np.array([[0.0, 5.0], [0.0, 6.0], [1.0, 5.0], [1.0, 6.0]])
+        y = np.array([0, 0, 1, 1])
+        forest = RandomForestClassifier(n_estimators=1, bootstrap=False, random_state=0).fit(X, y)
+        base, contributions = ContributionExplainer(forest, features=['a', 'b']).explain(X)
+
+        np.testing.assert_allclose(base, 0.5)
+        np.testing.assert_allclose(contributions[:, 0], [-0.5, -0.5, 0.5, 0.5])
+        np.testing.assert_allclose(contributions[:, 1], 0)
+
+    def test_linear_contributions(self, data):
+        """Test coefficient x value terms sum to the decision function"""
+        X, y = data
+        linear = LogisticRegression().fit(X, y)
+        explainer = ContributionExplainer(linear)
+        base, contributions = explainer.explain(X)
+
+        assert explainer.units == 'log_odds'
+        np.testing.assert_allclose(base + contributions.sum(axis=1), linear.decision_function(X))
+
+    def test_early_exit_engine_explains_served_probability(self, data, monkeypatch):
+        """Test early-exit explanations sum to the served early-exit probability from its tree counts"""
+        X, y = data
+        forest = RandomForestClassifier(n_estimators=30, random_state=0).fit(X, y)
+        engine = EarlyExitForest(forest, boundaries=(0.5,), group_size=5)
+        explainer = ContributionExplainer(engine)
+        proba, evaluated = engine.predict_proba_with_counts(X[:50])
+        assert evaluated.min() < 30
+
+        # Only the evaluated trees are walked, and the engine is not run again
+        walked = []
+        for tree, estimator in enumerate(forest.estimators_):
+            monkeypatch.setattr(estimator, 'apply', lambda X, check_input=True, tree=tree, apply=estimator.apply: (
+                walked.append((tree, len(X))) or apply(X, check_input=check_input)
+            ))
+        monkeypatch.setattr(engine, 'predict_proba_with_counts', None)
+        base, contributions = explainer.explain(X[:50], evaluated)
+
+        np.testing.assert_allclose(base + contributions.sum(axis=1), proba[:, 1], atol=1e-12)
+        assert sum(rows for _, rows in walked) == evaluated.sum()
+        assert explainer.needs_counts and explainer.describe()['trees'] == 'evaluated'
+        with pytest.raises(ValueError):
+            explainer.explain(X[:50])
+
+    def test_unsupported_engines(self, data):
+        """Test cascade and compact engines are rejected"""
+        X, y = data
+        forest = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+        with pytest.raises(ValueError):
+            ContributionExplainer(CompactForest.from_sklearn(forest))
+        with pytest.raises(ValueError):
+            ContributionExplainer(CascadeClassifier(LogisticRegression().fit(X, y), forest, 0.2, 0.8))
+
+    def test_unsupported_model(self, data):
+        """Test models without a decomposition are rejected"""
+        X, y = data
+        with pytest.raises(ValueError):
+            ContributionExplainer(SVC().fit(X, y))
+
+    def test_row_and_column_output(self, data):
+        """Test explanations are keyed by feature name"""
+        X, y = data
+        explainer = ContributionExplainer(LogisticRegression().fit(X, y))
+        base, contributions = explainer.explain(X[:3])
+        rows = explainer.as_rows(base, contributions)
+        columns = explainer.as_columns(base, contributions)
+
+        assert list(rows[0]['contributions']) == FEATURES
+        assert columns['contributions']['age'] == [row['contributions']['age'] for row in rows]
+        assert explainer.explain(X[:0])[1].shape == (0, 13)
@@ -0,0 +1,112 @@
+"""
+Unit tests for the model footprint report
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.models.cascade import CascadeClassifier
+from src.models.compact_forest import CompactForest, sklearn_forest_nbytes
+from src.models.early_exit import EarlyExitForest
+from src.models.footprint import benchmark_latency, measure_footprint, memory_bytes, tree_structure
+
+
+@pytest.fixture(scope="module")
+def forest():
+    """Forest trained on synthetic data with 13 features"""
+    rng = np.random.RandomState(0)
+    X = rng.randn(400, 13)
+    y = (X[:, 0] + 0.5 * X[:, 3] > 0).astype(int)
+    return RandomForestClassifier(n_estimators=15, random_state=0).fit(X, y)
+
+
+class TestStructure:
+    """Test sizes and tree structure"""
+
+    def test_forest_structure(self, forest):
+        """Test tree, node and depth counts of an sklearn forest"""
+        structure = tree_structure(forest)
+        depths = [est.tree_.max_depth for est in forest.estimators_]
+        assert structure['n_trees'] == 15
+        assert structure['n_nodes'] == sklearn_forest_nbytes(forest)['n_nodes']
+        assert structure['total_depth'] == sum(depths)
+        assert structure['max_depth'] == max(depths)
+
+    def test_compact_forest_depths_match(self, forest):
+        """Test shared-subtree compact forests report the depths of the trees they encode"""
+        compact = CompactForest.from_sklearn(forest, deduplicate=True)
+        structure = tree_structure(compact)
+        assert structure['n_nodes'] == compact.n_nodes
+        assert structure['max_depth'] <= compact.max_depth
+        assert structure['total_depth'] <= tree_structure(forest)['total_depth']
+        assert structure['n_trees'] == 15
+
+    def test_engines_report_wrapped_forest(self, forest):
+        """Test early-exit and cascade engines report their forest (and coefficients)"""
+        expected = tree_structure(forest)
+        assert tree_structure(EarlyExitForest(forest, [0.5])) == expected
+
+        linear = LogisticRegression().fit(np.random.RandomState(1).randn(50, 13), np.arange(50) % 2)
+        cascade = tree_structure(CascadeClassifier(linear, forest, 0.2, 0.8))
+        assert cascade['n_trees'] == expected['n_trees']
+        assert cascade['n_coefficients'] == 13
+
+    def test_memory_bytes(self, forest):
+        """Test in-memory size counts tree tables and shared arrays once"""
+        assert memory_bytes(forest) >= sklearn_forest_nbytes(forest)['nbytes']
+        compact = CompactForest.from_sklearn(forest)
+        assert memory_bytes(compact) >= compact.nbytes
+
+        array = np.zeros(1000)
+        assert memory_bytes({'a': array, 'b': array, 'view': array[10:]}) == array.nbytes
+
+
+class TestLatency:
+    """Test the latency micro-benchmark"""
+
+    def test_fits_fixed_and_per_row_cost(self):
+        """Test a predict function with known cost is recovered by the fit"""
+        def predict(X):
+            time.sleep(0.002 + 2e-5 * len(X))
+
+        latency = benchmark_latency(predict, np.zeros((10, 3)), (1, 100, 1000), budget_seconds=1.0, repeats=3)
+        assert latency['fixed_seconds'] == pytest.approx(0.002, abs=0.002)
+        assert latency['per_row_seconds'] == pytest.approx(2e-5, rel=0.25)
+        assert all(batch['measured'] for batch in latency['batches'])
+
+    def test_slow_sizes_are_estimated(self):
+        """Test sizes that do not fit the budget are extrapolated, not timed"""
+        calls = []
+
+        def predict(X):
+            calls.append(len(X))
+            time.sleep(1e-4 * len(X))
+
+        latency = benchmark_latency(predict, np.zeros((5, 2)), (1, 10, 10000), budget_seconds=0.1, repeats=2)
+        big = latency['batches'][-1]
+        assert not big['measured']
+        assert 10000 not in calls
+        assert big['seconds'] == pytest.approx(1.0, rel=0.5)
+
+    def test_measure_footprint(self, forest):
+        """Test the full report and that engine callbacks are muted while benchmarking"""
+        counts = []
+        engine = EarlyExitForest(forest, [0.5], on_evaluate=counts.append)
+        report = measure_footprint(engine, batch_sizes=(1, 10), budget_seconds=0.2)
+
+        assert report['engine'] == 'early_exit'
+        assert report['model_class'] == 'RandomForestClassifier'
+        assert report['serialized_bytes'] > 0
+        assert [b['batch_size'] for b in report['latency']['batches']] == [1, 10]
+        assert counts == []
+        assert engine.on_evaluate is not None
+
+        assert measure_footprint(forest, budget_seconds=0)['latency'] is None
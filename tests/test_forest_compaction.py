@@ -0,0 +1,96 @@
+"""
+Unit tests for structural forest compaction
+"""
+import os
+import pickle
+import sys
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.models.compact_forest import CompactForest, validate
+from src.models.forest_compaction import collapse_tree, compact_forest_structure
+
+
+@pytest.fixture(scope="module")
+def data():
+    """Coarse-valued synthetic data (ties produce redundant splits)"""
+    rng = np.random.RandomState(0)
+    X = np.round(rng.randn(300, 13) * 2) / 2
+    y = (X[:, 0] + X[:, 1] + rng.randn(300) > 0).astype(int)
+    return X, y
+
+
+@pytest.fixture(scope="module")
+def forest(data):
+    """Forest with mixed-probability leaves"""
+    X, y = data
+    return RandomForestClassifier(n_estimators=50, min_samples_leaf=4, random_state=42).fit(X, y)
+
+
+class TestCollapse:
+    """Test same-outcome split collapsing"""
+
+    def test_predictions_unchanged(self, forest, data):
+        """Test compaction never changes predictions"""
+        X, _ = data
+        compacted, report = compact_forest_structure(forest, X)
+
+        assert report['predictions_identical']
+        np.testing.assert_array_equal(compacted.predict_proba(X), forest.predict_proba(X))
+
+    def test_node_count_never_grows(self, forest):
+        """Test node counts and depth only shrink"""
+        _, report = compact_forest_structure(forest)
+
+        assert report['n_nodes_after'] <= report['n_nodes_before']
+        assert report['max_depth_after'] <= report['max_depth_before']
+        assert report['compact_nodes_deduplicated'] < report['n_nodes_after']
+
+    def test_original_forest_untouched(self, forest):
+        """Test the input forest is not modified"""
+        before = sum(e.tree_.node_count for e in forest.estimators_)
+        compact_forest_structure(forest)
+
+        assert sum(e.tree_.node_count for e in forest.estimators_) == before
+
+    def test_identical_leaves_collapse(self):
+        """Test a split into two identical leaves becomes a leaf"""
+        X = np.array([[0.0], [1.0], [2.0], [3.0]], dtype=np.float32)
+        tree = DecisionTreeClassifier(max_depth=1).fit(X, [0, 0, 1, 1]).tree_
+        state = tree.__getstate__()
+        state['values'][1:] = [[0.25, 0.75]]
+        tree.__setstate__(state)
+
+        collapsed = collapse_tree(tree)
+
+        assert tree.node_count == 3
+        assert collapsed.node_count == 1
+        assert collapsed.max_depth == 0
+        np.testing.assert_allclose(collapsed.predict(X), tree.predict(X))
+
+    def test_compacted_forest_pickles(self, forest, data):
+        """Test the compacted forest round-trips through pickle"""
+        X, _ = data
+        compacted, _ = compact_forest_structure(forest)
+        restored = pickle.loads(pickle.dumps(compacted))
+
+        np.testing.assert_array_equal(restored.predict(X), forest.predict(X))
+
+
+class TestDeduplication:
+    """Test subtree deduplication in the compact representation"""
+
+    def test_deduplicated_compact_forest(self, forest, data):
+        """Test shared subtrees keep predictions and shrink the node arrays"""
+        X, _ = data
+        plain = CompactForest.from_sklearn(forest)
+        shared = CompactForest.from_sklearn(forest, deduplicate=True)
+
+        assert shared.n_nodes < plain.n_nodes
+        assert validate(forest, shared, X)['passed']
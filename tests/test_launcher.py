@@ -0,0 +1,152 @@
+"""
+Unit tests for the cgroup-aware API launcher
+"""
+import json
+import os
+import pickle
+import sys
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.api.launcher import (
+    build_gunicorn_argv,
+    measure_model_footprint,
+    native_thread_env,
+    plan_topology,
+    read_cgroup_cpu_limit,
+    read_cgroup_memory_limit,
+)
+
+MiB = 1024 * 1024
+
+
+class TestCgroupLimits:
+    """Test cgroup limit detection"""
+
+    def test_cgroup_v2_limits(self, tmp_path):
+        """Test reading cpu.max and memory.max (cgroup v2)"""
+        (tmp_path / 'cpu.max').write_text("50000 100000\n")
+        (tmp_path / 'memory.max').write_text(str(512 * MiB))
+
+        assert read_cgroup_cpu_limit(tmp_path) == pytest.approx(0.5)
+        assert read_cgroup_memory_limit(tmp_path) == 512 * MiB
+
+    def test_cgroup_v2_unlimited(self, tmp_path):
+        """Test that 'max' means no limit"""
+        (tmp_path / 'cpu.max').write_text("max 100000\n")
+        (tmp_path / 'memory.max').write_text("max\n")
+
+        assert read_cgroup_cpu_limit(tmp_path) is None
+        assert read_cgroup_memory_limit(tmp_path) is None
+
+    def test_cgroup_v1_limits(self, tmp_path):
+        """Test reading CFS quota and memory limit (cgroup v1)"""
+        (tmp_path / 'cpu').mkdir()
+        (tmp_path / 'cpu' / 'cpu.cfs_quota_us').write_text("200000")
+        (tmp_path / 'cpu' / 'cpu.cfs_period_us').write_text("100000")
+        (tmp_path / 'memory').mkdir()
+        (tmp_path / 'memory' / 'memory.limit_in_bytes').write_text(str(9223372036854771712))
+
+        assert read_cgroup_cpu_limit(tmp_path) == pytest.approx(2.0)
+        assert read_cgroup_memory_limit(tmp_path) is None
+
+    def test_missing_cgroup_files(self, tmp_path):
+        """Test that missing files mean no limit"""
+        assert read_cgroup_cpu_limit(tmp_path) is None
+        assert read_cgroup_memory_limit(tmp_path) is None
+
+
+class TestTopologyPlanning:
+    """Test worker/thread topology selection"""
+
+    def test_fractional_cpu_limit(self):
+        """Test the Kubernetes 500m/512Mi limits give one worker with one native thread"""
+        topology = plan_topology(0.5, 512 * MiB, 10 * MiB, host_cpus=16)
+
+        assert topology['workers'] == 1
+        assert topology['native_threads'] == 1
+        assert topology['threads_per_worker'] >= 2
+        assert topology['worker_class'] == 'gthread'
+
+    def test_native_threads_never_oversubscribe(self):
+        """Test workers x native threads stays within the CPU quota"""
+        topology = plan_topology(4.0, None, 0, host_cpus=64)
+
+        assert topology['workers'] * topology['native_threads'] <= 4
+
+    def test_scoring_threads_share_native_pools(self):
+        """Test scheduler executors and shard processes split the worker's CPU share"""
+        topology = plan_topology(8.0, None, 0, host_cpus=8, workers_override=2, scoring_executors=2)
+        assert topology['native_threads'] == 2
+        assert topology['scoring_threads_per_worker'] == 2
+
+        unscheduled = plan_topology(8.0, None, 0, host_cpus=8, workers_override=2, threads_override=8,
+                                    scoring_executors=None)
+        assert unscheduled['native_threads'] == 1
+
+    def test_shard_pools_reduce_workers(self):
+        """Test each worker's shard pool takes its own cores and memory"""
+        topology = plan_topology(8.0, None, 0, host_cpus=8, shard_workers=4)
+        assert topology['workers'] == 2
+        assert topology['shard_processes_per_worker'] == 4
+        assert topology['native_threads'] == 1
+
+        assert plan_topology(8.0, 1024 * MiB, 0, host_cpus=8)['workers'] == 5
+        assert plan_topology(8.0, 1024 * MiB, 0, host_cpus=8, shard_workers=2)['workers'] == 1
+
+    def test_memory_caps_workers(self):
+        """Test that large models reduce the worker count"""
+        topology = plan_topology(8.0, 1024 * MiB, 300 * MiB, host_cpus=8)
+
+        assert topology['workers'] == 1
+
+    def test_overrides(self):
+        """Test explicit worker and thread overrides"""
+        topology = plan_topology(1.0, None, 0, host_cpus=4, workers_override=3, threads_override=1)
+
+        assert topology['workers'] == 3
+        assert topology['threads_per_worker'] == 1
+        assert topology['worker_class'] == 'sync'
+
+
+class TestLauncherOutputs:
+    """Test the environment and command line handed to gunicorn"""
+
+    def test_native_thread_env(self):
+        """Test native thread pools are limited and explicit values are kept"""
+        topology = plan_topology(2.0, None, 0, host_cpus=2)
+        env = native_thread_env(topology, {'MKL_NUM_THREADS': '3'})
+
+        assert env['OMP_NUM_THREADS'] == str(topology['native_threads'])
+        assert env['LOKY_MAX_CPU_COUNT'] == str(topology['native_threads'])
+        assert env['MKL_NUM_THREADS'] == '3'
+        assert json.loads(env['API_TOPOLOGY']) == topology
+
+    def test_gunicorn_argv(self):
+        """Test gunicorn arguments reflect the topology"""
+        topology = plan_topology(2.0, None, 0, host_cpus=2)
+        argv = build_gunicorn_argv(topology, '0.0.0.0:8000')
+
+        assert argv[:2] == ['gunicorn', 'src.api.app:app']
+        assert argv[argv.index('--workers') + 1] == str(topology['workers'])
+        assert argv[argv.index('--threads') + 1] == str(topology['threads_per_worker'])
+
+    def test_build_gunicorn_argv_with_uds(self):
+        """Test a Unix domain socket is bound alongside TCP"""
+        topology = plan_topology(cpu_limit=2.0, memory_limit=None, model_bytes=0, host_cpus=8)
+        argv = build_gunicorn_argv(topology, '0.0.0.0:8000', uds='/run/api.sock')
+
+        binds = [argv[i + 1] for i, arg in enumerate(argv) if arg == '--bind']
+        assert binds == ['0.0.0.0:8000', 'unix:/run/api.sock']
+
+    def test_measure_model_footprint(self, tmp_path):
+        """Test footprint measurement of a pickled object"""
+        model_path = tmp_path / 'model.pkl'
+        with open(model_path, 'wb') as f:
+            pickle.dump(list(range(10000)), f)
+
+        assert measure_model_footprint(model_path) > 0
+        assert measure_model_footprint(tmp_path / 'missing.pkl') == 0
@@ -0,0 +1,134 @@
+"""
+Unit tests for the memory-bounded model pool
+"""
+import os
+import pickle
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.api.model_pool import ModelPool, ModelUnavailableError, model_footprint
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    """A forest and a logistic regression on synthetic data"""
+    rng = np.random.RandomState(0)
+    X = rng.randn(200, 13)
+    y = (X[:, 0] > 0).astype(int)
+    return {
+        'random_forest': RandomForestClassifier(n_estimators=10, random_state=42).fit(X, y),
+        'logistic_regression': LogisticRegression().fit(X, y),
+    }
+
+
+@pytest.fixture
+def models_dir(tmp_path, fitted):
+    """Directory with pickled model artifacts"""
+    for name, model in fitted.items():
+        with open(tmp_path / f'{name}.pkl', 'wb') as f:
+            pickle.dump(model, f)
+    return str(tmp_path)
+
+
+class TestModelPool:
+    """Test lazy loading, routing names and eviction"""
+
+    def test_lazy_load_and_reuse(self, models_dir):
+        """Test models load on first use and are reused afterwards"""
+        loads = []
+        pool = ModelPool(models_dir, on_load=lambda name, seconds, size: loads.append(name))
+        assert pool.describe()['resident_models'] == []
+
+        first = pool.get('random_forest')
+        assert pool.get('random_forest') is first
+        assert loads == ['random_forest']
+        assert pool.describe()['resident_models'][0]['requests'] == 2
+
+    def test_lru_eviction(self, models_dir, fitted):
+        """Test the least recently used model is evicted over budget"""
+        evicted = []
+        budget = model_footprint(fitted['random_forest']) + model_footprint(fitted['logistic_regression']) - 1
+        pool = ModelPool(models_dir, budget, on_evict=evicted.append)
+
+        pool.get('logistic_regression')
+        pool.get('random_forest')
+
+        assert evicted == ['logistic_regression']
+        assert [m['name'] for m in pool.describe()['resident_models']] == ['random_forest']
+        assert pool.resident_bytes <= budget
+
+    def test_oversized_model_is_still_served(self, models_dir):
+        """Test a model larger than the budget is kept while it is the only one"""
+        pool = ModelPool(models_dir, memory_budget_bytes=1)
+        assert pool.get('random_forest') is not None
+
+    def test_unknown_and_invalid_names(self, models_dir):
+        """Test missing models are 404 and unsafe names are 400"""
+        pool = ModelPool(models_dir)
+        with pytest.raises(ModelUnavailableError) as excinfo:
+            pool.get('missing')
+        assert excinfo.value.status_code == 404
+
+        with pytest.raises(ModelUnavailableError) as excinfo:
+            pool.get('../secrets')
+        assert excinfo.value.status_code == 400
+
+    def test_failed_lookups_are_cached(self, models_dir, fitted, monkeypatch):
+        """Test a failed load is answered from cache until its TTL expires"""
+        loads = []
+        pool = ModelPool(models_dir, failure_ttl_seconds=30)
+        load = pool._load
+        monkeypatch.setattr(pool, '_load', lambda name: loads.append(name) or load(name))
+        for _ in range(3):
+            with pytest.raises(ModelUnavailableError) as excinfo:
+                pool.get('late')
+            assert excinfo.value.status_code == 404
+        assert loads == ['late']
+
+        with open(os.path.join(models_dir, 'late.pkl'), 'wb') as f:
+            pickle.dump(fitted['random_forest'], f)
+        clock = time.monotonic()
+        monkeypatch.setattr(time, 'monotonic', lambda: clock + 31)
+        assert pool.get('late') is not None
+        assert loads == ['late', 'late']
+
+    def test_allowlist(self, models_dir):
+        """Test names outside the allowlist are not routable"""
+        pool = ModelPool(models_dir, allowed_models=['random_forest'])
+        assert pool.get('random_forest') is not None
+        with pytest.raises(ModelUnavailableError) as excinfo:
+            pool.get('logistic_regression')
+        assert excinfo.value.status_code == 404
+
+    def test_registry_names(self, models_dir):
+        """Test name@version maps to an MLflow registry URI"""
+        pool = ModelPool(models_dir)
+        assert pool.source('heart-disease-random-forest@3') == 'models:/heart-disease-random-forest/3'
+        assert pool.source('random_forest') == os.path.join(models_dir, 'random_forest.pkl')
+
+    def test_concurrent_first_use_loads_once(self, models_dir):
+        """Test concurrent requests for a cold model share one load"""
+        loads = []
+        pool = ModelPool(models_dir, on_load=lambda name, seconds, size: loads.append(name))
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(pool.get('random_forest'))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert loads == ['random_forest']
+        assert all(r is results[0] for r in results)
+
+    def test_available_models(self, models_dir):
+        """Test artifacts in the models directory are listed"""
+        assert ModelPool(models_dir).available() == ['logistic_regression', 'random_forest']
@@ -0,0 +1,140 @@
+"""
+Unit tests for the in-process Predictor
+"""
+import os
+import pickle
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.models.predict import (
+    FEATURES, MissingFeaturesError, Predictor, deduplicate_rows, get_risk_level, risk_levels
+)
+from tests.conftest import SAMPLE
+
+
+def as_row(sample):
+    return [sample[f] for f in FEATURES]
+
+
+class TestPredictor:
+    """Test validation, scoring and risk bucketing"""
+
+    def test_predict_matches_model(self, forest):
+        """Test a single prediction matches the model"""
+        result = Predictor(forest).predict(SAMPLE)
+        proba = forest.predict_proba(np.array([as_row(SAMPLE)]))[0]
+
+        assert result['prediction'] == int(np.argmax(proba))
+        assert result['confidence']['disease'] == pytest.approx(proba[1])
+        assert result['risk_level'] == get_risk_level(proba[1])
+
+    def test_missing_features(self, forest):
+        """Test missing features are reported by name"""
+        sample = dict(SAMPLE)
+        del sample['chol']
+        with pytest.raises(MissingFeaturesError) as excinfo:
+            Predictor(forest).predict(sample)
+        assert excinfo.value.missing_features == ['chol']
+
+    def test_non_numeric_feature(self, forest):
+        """Test non-numeric values raise ValueError"""
+        with pytest.raises(ValueError):
+            Predictor(forest).predict(dict(SAMPLE, age='old'))
+
+    def test_predict_batch(self, forest):
+        """Test batches keep order and report invalid samples in place"""
+        samples = [dict(SAMPLE, age=40), dict(SAMPLE, age=None), dict(SAMPLE, age=70)]
+        results = Predictor(forest).predict_batch(samples)
+        probas = forest.predict_proba(np.array([as_row(samples[0]), as_row(samples[2])]))
+
+        assert 'error' in results[1]
+        assert [results[0]['sample_index'], results[2]['sample_index']] == [0, 2]
+        assert results[2]['confidence']['disease'] == pytest.approx(probas[1, 1])
+
+    def test_buffer_is_reused_and_grown(self, forest):
+        """Test the input buffer is reused across calls and grows for larger batches"""
+        predictor = Predictor(forest, buffer_rows=2)
+        first = predictor.sample_matrix(SAMPLE)
+        second = predictor.sample_matrix(SAMPLE)
+        assert np.shares_memory(first, second)
+
+        X, _, _ = predictor.samples_matrix([SAMPLE] * 5)
+        assert X.shape == (5, 13)
+
+    def test_buffers_are_per_thread(self, forest):
+        """Test threads get separate buffers"""
+        predictor = Predictor(forest)
+        matrices = []
+        thread = threading.Thread(target=lambda: matrices.append(predictor.sample_matrix(SAMPLE)))
+        thread.start()
+        thread.join()
+
+        assert not np.shares_memory(matrices[0], predictor.sample_matrix(SAMPLE))
+
+    def test_proba_fn_override(self, forest):
+        """Test a custom probability function replaces model.predict_proba"""
+        predictor = Predictor(forest, proba_fn=lambda X: np.tile([0.1, 0.9], (len(X), 1)))
+        assert predictor.predict(SAMPLE)['risk_level'] == 'Very High'
+
+    def test_from_path(self, forest, tmp_path):
+        """Test loading a pickled model artifact"""
+        path = tmp_path / 'model.pkl'
+        with open(path, 'wb') as f:
+            pickle.dump(forest, f)
+
+        assert Predictor.from_path(str(path)).predict(SAMPLE) == Predictor(forest).predict(SAMPLE)
+
+    def test_risk_levels_vectorized(self):
+        """Test vectorized risk levels match the scalar rule"""
+        p = np.linspace(0, 1, 101)
+        assert list(risk_levels(p)) == [get_risk_level(v) for v in p]
+
+
+class TestDeduplication:
+    """Test scoring distinct rows once"""
+
+    def test_distinct_rows_return_none(self):
+        """Test batches without duplicates are left alone"""
+        X = np.random.RandomState(0).randn(500, 13)
+        assert deduplicate_rows(X) is None
+
+    def test_inverse_reconstructs_batch(self):
+        """Test the distinct rows and inverse index reproduce the batch"""
+        rng = np.random.RandomState(0)
+        base = rng.randn(20, 13)
+        X = base[rng.randint(0, 20, size=300)]
+        rows, inverse = deduplicate_rows(X)
+        assert len(rows) == len(np.unique(X, axis=0))
+        np.testing.assert_array_equal(rows[inverse], X)
+
+    def test_score_matches_and_scores_once(self, forest):
+        """Test duplicate rows are scored once with identical results"""
+        X = np.array([as_row(dict(SAMPLE, age=age)) for age in [40, 50, 60] * 10], dtype=float)
+        scored = []
+        checked = []
+
+        def proba_fn(rows):
+            scored.append(len(rows))
+            return forest.predict_proba(rows)
+
+        predictor = Predictor(forest, proba_fn=proba_fn, on_dedup=lambda *args: checked.append(args))
+        labels, proba = predictor.score(X)
+
+        np.testing.assert_array_equal(proba, forest.predict_proba(X))
+        np.testing.assert_array_equal(labels, forest.predict(X))
+        assert scored == [3]
+        assert checked == [(30, 3)]
+
+    def test_small_batches_and_disabled(self, forest):
+        """Test batches below dedup_min_rows and dedup_min_rows=None skip the check"""
+        X = np.array([as_row(SAMPLE)] * 20, dtype=float)
+        checked = []
+        Predictor(forest, dedup_min_rows=50, on_dedup=lambda *args: checked.append(args)).score(X)
+        Predictor(forest, dedup_min_rows=None, on_dedup=lambda *args: checked.append(args)).score(X)
+        assert checked == []
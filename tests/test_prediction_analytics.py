@@ -0,0 +1,101 @@
+"""
+Unit tests for prediction log analytics
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.api.prediction_log import PredictionLog
+from src.data.drift import build_reference_profile
+from src.models.predict import FEATURES
+from src.utils.prediction_analytics import INDEX_FILE, analyze, parse_time, segment_index, select_segments
+
+DAY = 86400
+START = parse_time('2024-05-01')
+
+
+@pytest.fixture(scope="module")
+def log_dir(tmp_path_factory):
+    """Prediction log with three days of traffic, one segment per day"""
+    directory = str(tmp_path_factory.mktemp('predictions'))
+    rng = np.random.RandomState(0)
+    log = PredictionLog(directory, FEATURES, capacity=10000, flush_interval=3600, segment_bytes=1)
+    rows = []
+    for day in range(3):
+        for hour in (1, 13):
+            X = rng.randn(100, len(FEATURES)) * 20 + 100
+            proba = rng.rand(100)
+            labels = (proba > 0.5).astype(int)
+            model = 'default@1.0.0' if hour == 1 else 'linear'
+            log.record(X, proba, labels, model, timestamp=START + day * DAY + hour * 3600)
+            rows.append((day, model, X, proba, labels))
+        log.flush()
+    log.close()
+    return directory, rows
+
+
+class TestPredictionAnalytics:
+    """Test aggregation, pruning and parallel scans"""
+
+    def test_daily_summary(self, log_dir):
+        """Test per-day, per-model aggregates match the logged rows"""
+        directory, rows = log_dir
+        result = analyze(directory, workers=1)
+
+        assert result['rows'] == 600
+        assert len(result['summary']) == 6
+        first = result['summary'][0]
+        _, model, X, proba, labels = rows[0]
+        assert first['bucket_start'].startswith('2024-05-01')
+        assert first['model'] == model
+        assert first['rows'] == 100
+        assert first['positive_rate'] == pytest.approx(labels.mean())
+        assert first['mean_probability'] == pytest.approx(proba.mean())
+        assert first['feature_means']['age'] == pytest.approx(X[:, 0].mean())
+        assert sum(first['risk_levels'].values()) == 100
+        assert first['p50_probability'] == pytest.approx(np.median(proba), abs=0.02)
+
+    def test_time_range_prunes_segments(self, log_dir):
+        """Test segments outside the range are not scanned and rows are filtered"""
+        directory, _ = log_dir
+        result = analyze(directory, start=START + DAY, end=START + DAY + 6 * 3600, workers=1)
+
+        assert result['segments_total'] == 3
+        assert result['segments_scanned'] == 1
+        assert result['rows'] == 100
+        assert [entry['model'] for entry in result['summary']] == ['default@1.0.0']
+
+    def test_hourly_buckets_and_process_pool(self, log_dir):
+        """Test hourly buckets and a process pool give the same totals"""
+        directory, _ = log_dir
+        serial = analyze(directory, bucket='hour', workers=1)
+        parallel = analyze(directory, bucket='hour', workers=2)
+
+        assert serial['summary'] == parallel['summary']
+        assert serial['summary'][1]['bucket_start'] == '2024-05-01T13:00:00+00:00'
+
+    def test_reference_psi(self, log_dir):
+        """Test per-feature PSI against a reference profile"""
+        directory, rows = log_dir
+        profile = build_reference_profile(np.vstack([r[2] for r in rows]), FEATURES)
+        result = analyze(directory, workers=1, profile=profile)
+        assert set(result['summary'][0]['feature_psi']) == set(FEATURES)
+        assert all(value < 0.5 for value in result['summary'][0]['feature_psi'].values())
+
+    def test_segment_index_is_cached(self, log_dir):
+        """Test the min/max index is written and used for selection"""
+        directory, _ = log_dir
+        index = segment_index(directory)
+        assert os.path.exists(os.path.join(directory, INDEX_FILE))
+        assert [entry['rows'] for entry in index] == [200, 200, 200]
+        assert len(select_segments(index, start=START + 2 * DAY)) == 1
+
+    def test_invalid_bucket(self, log_dir):
+        """Test unknown buckets are rejected"""
+        with pytest.raises(ValueError):
+            analyze(log_dir[0], bucket='week')
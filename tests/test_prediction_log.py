@@ -0,0 +1,125 @@
+"""
+Unit tests for the binary prediction log
+"""
+import mmap
+import os
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.api.prediction_log import PredictionLog, iter_blocks, read_segment
+
+FEATURES = ['a', 'b', 'c']
+
+
+def batch(rng, n):
+    proba = rng.rand(n)
+    return rng.rand(n, len(FEATURES)), proba, (proba > 0.5).astype(int)
+
+
+def read_all(log):
+    segments = [read_segment(path) for path in log.segments]
+    return {key: np.concatenate([s[key] for s in segments]) for key in ('timestamp', 'disease_probability', 'label', 'model')}, \
+        np.vstack([s['features'] for s in segments])
+
+
+class TestPredictionLog:
+    """Test ring buffering, segment writes and reading back"""
+
+    def test_round_trip(self, tmp_path):
+        """Test rows read back exactly, in order, with their model labels"""
+        rng = np.random.RandomState(0)
+        log = PredictionLog(str(tmp_path), FEATURES, capacity=1000, flush_interval=0.01)
+        batches = [batch(rng, n) for n in (1, 5, 17)]
+        for i, (X, proba, labels) in enumerate(batches):
+            assert log.record(X, proba, labels, f"model-{i % 2}", timestamp=100.0 + i)
+        log.close()
+
+        columns, X = read_all(log)
+        np.testing.assert_array_equal(X, np.vstack([b[0] for b in batches]))
+        np.testing.assert_array_equal(columns['disease_probability'], np.concatenate([b[1] for b in batches]))
+        np.testing.assert_array_equal(columns['label'], np.concatenate([b[2] for b in batches]))
+        assert columns['model'].tolist() == ['model-0'] + ['model-1'] * 5 + ['model-0'] * 17
+        assert columns['timestamp'].tolist() == [100.0] + [101.0] * 5 + [102.0] * 17
+        assert log.written == 23 and log.dropped == 0
+
+    def test_ring_wraps_around(self, tmp_path):
+        """Test writes spanning the end of the ring keep row order"""
+        rng = np.random.RandomState(1)
+        log = PredictionLog(str(tmp_path), FEATURES, capacity=10, flush_interval=60)
+        batches = [batch(rng, 7) for _ in range(4)]
+        for X, proba, labels in batches:
+            assert log.record(X, proba, labels, 'default')
+            log.flush()
+        log.close()
+
+        _, X = read_all(log)
+        np.testing.assert_array_equal(X, np.vstack([b[0] for b in batches]))
+
+    def test_full_ring_drops_without_blocking(self, tmp_path):
+        """Test rows beyond capacity are dropped and counted"""
+        drops = []
+        log = PredictionLog(str(tmp_path), FEATURES, capacity=10, flush_interval=60, on_drop=drops.append)
+        rng = np.random.RandomState(2)
+        # Stay below half full so the writer is not woken between the two records
+        assert log.record(*batch(rng, 4), 'default')
+        assert not log.record(*batch(rng, 7), 'default')
+        assert log.fill_ratio == pytest.approx(0.4)
+        log.close()
+        assert log.dropped == 7 and drops == [7]
+        assert log.written == 4
+
+    def test_rotation_and_time_pruning(self, tmp_path):
+        """Test segments rotate by size and blocks are skipped by time range"""
+        log = PredictionLog(str(tmp_path), FEATURES, capacity=100, flush_interval=60, segment_bytes=1, fsync='always')
+        rng = np.random.RandomState(3)
+        for i in range(3):
+            log.record(*batch(rng, 4), 'default', timestamp=1000.0 + i)
+            log.flush()
+        log.close()
+        assert len(log.segments) == 3
+
+        with open(log.segments[1], 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            assert [b['min_timestamp'] for b in iter_blocks(buffer)] == [1001.0]
+            assert list(iter_blocks(buffer, start_time=1001.5)) == []
+
+    def test_truncated_tail_is_ignored(self, tmp_path):
+        """Test a partially written last block is skipped"""
+        log = PredictionLog(str(tmp_path), FEATURES, capacity=100, flush_interval=60)
+        rng = np.random.RandomState(4)
+        for _ in range(2):
+            log.record(*batch(rng, 5), 'default')
+            log.flush()
+        log.close()
+        path = log.segments[0]
+        with open(path, 'r+b') as f:
+            f.truncate(os.path.getsize(path) - 3)
+        assert len(read_segment(path)['timestamp']) == 5
+
+    def test_concurrent_records(self, tmp_path):
+        """Test concurrent writers lose no rows"""
+        log = PredictionLog(str(tmp_path), FEATURES, capacity=100000, flush_interval=0.01)
+
+        def write(seed):
+            rng = np.random.RandomState(seed)
+            for _ in range(200):
+                log.record(*batch(rng, 3), 'default')
+
+        threads = [threading.Thread(target=write, args=(seed,)) for seed in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        log.close()
+        assert log.written == 2400
+        assert len(read_all(log)[1]) == 2400
+
+    def test_invalid_fsync_policy(self, tmp_path):
+        """Test unknown fsync policies are rejected"""
+        with pytest.raises(ValueError):
+            PredictionLog(str(tmp_path), FEATURES, fsync='sometimes')
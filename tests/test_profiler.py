@@ -0,0 +1,92 @@
+"""
+Unit tests for the sampling profiler
+"""
+import os
+import queue
+import sys
+import threading
+from collections import Counter
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.api import profiler
+from src.api.profiler import ProfilerBusyError, collapsed_stacks, run_profile, sample_stacks, top_functions
+
+
+def busy_loop(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+@pytest.fixture
+def busy_thread():
+    """Thread spinning in busy_loop until the test ends"""
+    stop = threading.Event()
+    thread = threading.Thread(target=busy_loop, args=(stop,))
+    thread.start()
+    yield thread
+    stop.set()
+    thread.join()
+
+
+class TestSampling:
+    """Test stack sampling and reporting"""
+
+    def test_samples_other_threads(self, busy_thread):
+        """Test busy threads show up and the sampler does not"""
+        result = sample_stacks(0.2, 0.005)
+
+        assert result['samples'] > 0
+        frames = [frame for stack in result['stacks'] for frame in stack]
+        assert any('busy_loop' in frame for frame in frames)
+        assert not any('sample_stacks' in frame for frame in frames)
+
+    def test_idle_threads_are_left_out(self, busy_thread):
+        """Test threads blocked on a queue or condition are counted as idle, not sampled"""
+        work = queue.Queue()
+        stop = threading.Event()
+        waiters = [threading.Thread(target=work.get), threading.Thread(target=stop.wait)]
+        for thread in waiters:
+            thread.start()
+        try:
+            result = sample_stacks(0.1, 0.005)
+            with_idle = sample_stacks(0.1, 0.005, include_idle=True)
+        finally:
+            work.put(None)
+            stop.set()
+            for thread in waiters:
+                thread.join()
+
+        leaves = {stack[-1] for stack in result['stacks']}
+        assert not any(leaf.startswith(('queue.get', 'threading.wait')) for leaf in leaves)
+        assert any('busy_loop' in frame for stack in result['stacks'] for frame in stack)
+        assert result['idle_samples'] >= 2 * result['samples']
+        idle_leaves = {stack[-1] for stack in with_idle['stacks']}
+        assert any(leaf.startswith('threading.wait') for leaf in idle_leaves)
+        assert with_idle['idle_samples'] == 0
+
+    def test_collapsed_format(self):
+        """Test stacks are folded root-first with counts"""
+        stacks = Counter({('main', 'handler', 'score'): 3, ('main', 'idle'): 1})
+        assert collapsed_stacks(stacks) == "main;handler;score 3\nmain;idle 1\n"
+
+    def test_top_functions(self):
+        """Test self and total sample counts"""
+        stacks = Counter({('main', 'handler', 'score'): 3, ('main', 'idle'): 1})
+        top = {row['function']: row for row in top_functions(stacks)}
+
+        assert top['score']['self_samples'] == 3
+        assert top['main']['total_samples'] == 4
+        assert top['main']['self_samples'] == 0
+        assert top['score']['self_percent'] == 75.0
+
+    def test_one_profile_at_a_time(self):
+        """Test a second profile is refused while one runs"""
+        with profiler._profile_lock:
+            with pytest.raises(ProfilerBusyError):
+                run_profile(0.01, 0.005)
+
+        assert run_profile(0.01, 0.005)['samples'] >= 1
@@ -0,0 +1,137 @@
+"""
+Unit tests for priority-aware scheduling of scoring work
+"""
+import os
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.api.scheduler import LaneFullError, PriorityScheduler
+
+
+def double(X):
+    return X[:, 0] * 2, X
+
+
+class TestPriorityScheduler:
+    """Test lanes, chunking and preemption"""
+
+    def test_bulk_results_are_reassembled_in_order(self):
+        """Test chunked bulk work returns the same result as one call"""
+        chunks = []
+        scheduler = PriorityScheduler(bulk_chunk_rows=7, on_chunk=lambda *args: chunks.append(args))
+        X = np.arange(100, dtype=float).reshape(50, 2)
+        labels, rows = scheduler.run('bulk', double, X)
+        scheduler.close()
+
+        np.testing.assert_array_equal(labels, X[:, 0] * 2)
+        np.testing.assert_array_equal(rows, X)
+        assert len(chunks) == 8
+        assert sum(n for _, n, _ in chunks) == 50
+
+    def test_interactive_preempts_bulk_between_chunks(self):
+        """Test interactive work runs before the remaining bulk chunks"""
+        order = []
+        gate = threading.Event()
+
+        def bulk_fn(X):
+            order.append('bulk')
+            gate.wait()
+            return (X[:, 0],)
+
+        def interactive_fn(X):
+            order.append('interactive')
+            return (X[:, 0],)
+
+        scheduler = PriorityScheduler(n_executors=1, reserved_interactive=0, bulk_chunk_rows=10)
+        bulk = scheduler.submit('bulk', bulk_fn, np.zeros((40, 1)))
+        while not order:
+            pass
+        interactive = scheduler.submit('interactive', interactive_fn, np.ones((1, 1)))
+        gate.set()
+        bulk.result()
+        interactive.result()
+        scheduler.close()
+
+        assert order == ['bulk', 'interactive', 'bulk', 'bulk', 'bulk']
+
+    def test_reserved_executor_serves_interactive_during_bulk(self):
+        """Test a reserved executor scores interactive work while bulk is busy"""
+        gate = threading.Event()
+        scheduler = PriorityScheduler(n_executors=2, reserved_interactive=1, bulk_chunk_rows=10)
+        bulk = scheduler.submit('bulk', lambda X: (gate.wait(), X)[1:], np.zeros((10, 1)))
+        result = scheduler.submit('interactive', lambda X: (X,), np.ones((1, 1))).result(timeout=5)
+        assert not bulk.done()
+        gate.set()
+        bulk.result(timeout=5)
+        scheduler.close()
+        assert result[0][0, 0] == 1
+
+    def test_full_lane_is_rejected(self):
+        """Test submissions beyond the lane limit raise LaneFullError"""
+        gate = threading.Event()
+        started = threading.Event()
+
+        def blocking(X):
+            started.set()
+            gate.wait()
+            return (X,)
+
+        scheduler = PriorityScheduler(n_executors=1, reserved_interactive=0, max_queued={'bulk': 1})
+        running = scheduler.submit('bulk', blocking, np.zeros((1, 1)))
+        started.wait()
+        scheduler.submit('bulk', blocking, np.zeros((1, 1)))
+        with pytest.raises(LaneFullError) as excinfo:
+            scheduler.submit('bulk', blocking, np.zeros((1, 1)))
+        assert excinfo.value.priority == 'bulk'
+        gate.set()
+        running.result()
+        scheduler.close()
+
+    def test_errors_propagate(self):
+        """Test exceptions in scoring are raised to the caller"""
+        def failing(X):
+            raise ValueError("bad input")
+
+        scheduler = PriorityScheduler(bulk_chunk_rows=5)
+        with pytest.raises(ValueError, match="bad input"):
+            scheduler.run('bulk', failing, np.zeros((20, 1)))
+        assert scheduler.run('interactive', double, np.ones((1, 1)))[0][0] == 2
+        scheduler.close()
+
+    def test_concurrent_chunk_failures_keep_executors(self):
+        """Test chunks of one job failing on several executors fail it once and leave every executor running"""
+        barrier = threading.Barrier(4, timeout=5)
+
+        def failing(X):
+            barrier.wait()
+            raise ValueError("bad chunk")
+
+        scheduler = PriorityScheduler(n_executors=4, reserved_interactive=0, bulk_chunk_rows=5)
+        with pytest.raises(ValueError, match="bad chunk"):
+            scheduler.run('bulk', failing, np.zeros((20, 1)))
+
+        assert all(thread.is_alive() for thread in scheduler._threads)
+        futures = [scheduler.submit('bulk', double, np.ones((20, 1))) for _ in range(4)]
+        assert all(future.result(timeout=5)[0].tolist() == [2] * 20 for future in futures)
+        scheduler.close()
+
+    def test_queue_wait_reported(self):
+        """Test the start callback reports a non-negative queue wait per job"""
+        waits = []
+        scheduler = PriorityScheduler(on_start=lambda priority, wait: waits.append((priority, wait)))
+        scheduler.run('interactive', double, np.ones((1, 1)))
+        scheduler.run('bulk', double, np.ones((5000, 1)))
+        scheduler.close()
+        assert [priority for priority, _ in waits] == ['interactive', 'bulk']
+        assert all(wait >= 0 for _, wait in waits)
+
+    def test_invalid_configuration(self):
+        """Test every executor being reserved for interactive work is rejected"""
+        with pytest.raises(ValueError):
+            PriorityScheduler(n_executors=1, reserved_interactive=1)
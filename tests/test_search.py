@@ -0,0 +1,297 @@
+"""
+Unit tests for budgeted hyperparameter search strategies
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.exceptions import FitFailedWarning
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import GridSearchCV, StratifiedKFold, cross_val_score
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.models.search import (
+    GridSearch, RegularizationPathSearch, SuccessiveHalvingSearch, TPESearch, compare_searches, make_search
+)
+from src.models.train import CV_SCORING, cross_validate_model, cv_folds, get_search_config
+
+LR_GRID = {'C': [0.001, 0.01, 0.1, 1, 10], 'penalty': ['l1', 'l2'], 'solver': ['liblinear']}
+
+
+@pytest.fixture(scope="module")
+def data():
+    """Synthetic binary classification data"""
+    return make_classification(300, 8, n_informative=4, random_state=0, flip_y=0.05)
+
+
+class TestGridSearch:
+    """Test the exhaustive strategy"""
+
+    def test_matches_gridsearchcv(self, data):
+        """Test an unbudgeted grid reproduces GridSearchCV scores and choice"""
+        X, y = data
+        expected = GridSearchCV(LogisticRegression(random_state=0), LR_GRID, cv=5, scoring='roc_auc').fit(X, y)
+        search = GridSearch(LogisticRegression(random_state=0), LR_GRID).fit(X, y)
+
+        np.testing.assert_allclose(search.cv_results_['mean_test_score'], expected.cv_results_['mean_test_score'])
+        np.testing.assert_allclose(search.cv_results_['split3_test_score'], expected.cv_results_['split3_test_score'])
+        np.testing.assert_array_equal(search.cv_results_['rank_test_score'], expected.cv_results_['rank_test_score'])
+        assert search.best_params_ == expected.best_params_
+        assert search.best_score_ == pytest.approx(expected.best_score_)
+        assert search.n_fits_ == 50
+
+    def test_fit_budget(self, data):
+        """Test the fit budget stops the search at whole candidates"""
+        search = GridSearch(LogisticRegression(random_state=0), LR_GRID, max_fits=23).fit(*data)
+        assert search.n_fits_ == 20
+        assert len(search.cv_results_['params']) == 4
+
+    def test_time_budget(self, data):
+        """Test the time budget stops after the running candidate and fits too small fail"""
+        search = GridSearch(LogisticRegression(random_state=0), LR_GRID, max_seconds=0.0).fit(*data)
+        assert search.n_fits_ == 5
+        assert search.best_params_ == {'C': 0.001, 'penalty': 'l1', 'solver': 'liblinear'}
+        with pytest.raises(RuntimeError):
+            GridSearch(LogisticRegression(random_state=0), LR_GRID, max_fits=4).fit(*data)
+
+    def test_unknown_strategy(self):
+        """Test unknown strategy names are rejected"""
+        with pytest.raises(ValueError):
+            make_search('random', LogisticRegression(random_state=0), LR_GRID)
+
+
+class TestSuccessiveHalving:
+    """Test successive halving"""
+
+    def test_halving_on_trees(self, data):
+        """Test rounds grow n_estimators up to the grid maximum and keep fewer candidates"""
+        grid = {'n_estimators': [12, 36], 'max_depth': [2, 4, None], 'min_samples_leaf': [1, 5, 10]}
+        search = SuccessiveHalvingSearch(RandomForestClassifier(random_state=0), grid, resource='n_estimators').fit(*data)
+
+        results = search.cv_results_
+        assert results['resource'][0] == 10 and max(results['resource']) == 36
+        assert list(np.bincount(results['iter'])) == [9, 3, 1]
+        assert search.best_params_['n_estimators'] == 36
+        assert search.best_estimator_.n_estimators == 36
+        assert search.n_fits_ == 65
+
+    def test_halving_on_samples(self, data):
+        """Test rounds grow the training rows per fold and end on all of them"""
+        search = SuccessiveHalvingSearch(LogisticRegression(random_state=0), LR_GRID, factor=2).fit(*data)
+        resources = search.cv_results_['resource']
+        assert resources == sorted(resources)
+        assert resources[-1] == 240
+        assert 'n_samples' not in search.best_params_
+
+    def test_time_budget_reports_reached_resource(self, data):
+        """Test a search stopped in an early round reports and refits the resource its score is from"""
+        grid = {'n_estimators': [12, 36], 'max_depth': [2, 4, None]}
+        with pytest.warns(UserWarning, match='before the final round'):
+            search = SuccessiveHalvingSearch(
+                RandomForestClassifier(random_state=0), grid, resource='n_estimators', max_seconds=0.0
+            ).fit(*data)
+
+        assert search.best_resource_ == 12
+        assert search.best_params_['n_estimators'] == 12
+        assert search.best_estimator_.n_estimators == 12
+        assert search.fold_scores(search.best_params_) is not None
+
+    def test_fit_budget_sizes_first_round(self, data):
+        """Test the first round is sized so all rounds fit the budget"""
+        search = SuccessiveHalvingSearch(LogisticRegression(random_state=0), LR_GRID, max_fits=40).fit(*data)
+        assert search.n_fits_ <= 40
+        assert len(search.cv_results_['params']) == 8  # 5 + 2 + 1 candidates
+
+
+class TestTPESearch:
+    """Test the Parzen estimator search"""
+
+    def test_budget_and_uniqueness(self, data):
+        """Test every candidate is scored once and the fit budget is kept"""
+        search = TPESearch(LogisticRegression(random_state=0), LR_GRID, max_fits=35, n_startup=3).fit(*data)
+        params = [tuple(sorted(p.items())) for p in search.cv_results_['params']]
+        assert len(params) == len(set(params)) == 7
+        assert search.n_fits_ == 35
+
+    def test_concentrates_on_good_values(self):
+        """Test proposals after start-up favour parameter values of the best scores"""
+        class Quadratic(LogisticRegression):
+            def score_value(self):
+                return -abs(np.log10(self.C) + 1) - 0.5 * (self.penalty == 'l1')
+
+        rng = np.random.RandomState(0)
+        grid = {'C': list(np.logspace(-4, 2, 13)), 'penalty': ['l1', 'l2']}
+        search = TPESearch(Quadratic(), grid, n_candidates=12, n_startup=4)
+
+        def fake_evaluate(params, X, y, *args, **kwargs):
+            estimator = Quadratic(**params)
+            score = estimator.score_value() + rng.normal(0, 0.01)
+            search.n_fits_ += 5
+            search._results.append({'params': params, 'scores': np.full(5, score), 'resource': None, 'iter': 0})
+            return score
+
+        search._evaluate = fake_evaluate
+        search._started, search.n_fits_, search._results = time.perf_counter(), 0, []
+        search._search(None, None)
+        later = [r['params'] for r in search._results[4:]]
+        assert np.mean([p['penalty'] == 'l2' for p in later]) > 0.5
+
+
+class TestComparison:
+    """Test strategy comparison summaries"""
+
+    def test_compare_searches(self, data):
+        """Test each search is fitted and summarized with its cost"""
+        rows = compare_searches({
+            'grid': make_search('grid', LogisticRegression(random_state=0), LR_GRID),
+            'tpe': make_search('tpe', LogisticRegression(random_state=0), LR_GRID, max_fits=25, n_startup=2),
+        }, *data)
+        assert [row['label'] for row in rows] == ['grid', 'tpe']
+        assert rows[0]['n_fits'] == 50 and rows[1]['n_fits'] == 25
+        assert rows[0]['best_score'] >= rows[1]['best_score']
+        assert all(row['search_seconds'] > 0 for row in rows)
+
+
+class TestTreePrefixes:
+    """Test forests scored from tree prefixes and warm-started halving rounds"""
+
+    GRID = {'n_estimators': [5, 10, 20], 'max_depth': [2, None], 'class_weight': [None, 'balanced']}
+
+    @staticmethod
+    def _pair(strategy, data, **options):
+        return [
+            make_search(strategy, RandomForestClassifier(random_state=42), TestTreePrefixes.GRID,
+                        scoring=['accuracy', 'roc_auc'], refit='roc_auc', reuse_trees=reuse, **options).fit(*data)
+            for reuse in (False, True)
+        ]
+
+    def test_grid_prefixes_match_separate_forests(self, data):
+        """Test prefix scores equal separately fitted forests with a third of the fits"""
+        separate, prefixed = self._pair('grid', data)
+        assert prefixed.cv_results_['params'] == separate.cv_results_['params']
+        for key in ('mean_test_roc_auc', 'split4_test_accuracy', 'rank_test_roc_auc'):
+            np.testing.assert_array_equal(prefixed.cv_results_[key], separate.cv_results_[key])
+        assert prefixed.best_params_ == separate.best_params_
+        assert (separate.n_fits_, prefixed.n_fits_) == (60, 20)
+
+    def test_halving_warm_start_matches_regrowing(self, data):
+        """Test survivors extended with warm_start score like forests regrown per round"""
+        regrown, extended = self._pair('halving', data, resource='n_estimators', factor=2)
+        np.testing.assert_array_equal(extended.cv_results_['mean_test_roc_auc'], regrown.cv_results_['mean_test_roc_auc'])
+        assert extended.cv_results_['resource'] == regrown.cv_results_['resource']
+        assert extended.best_params_ == regrown.best_params_
+        assert extended.fold_scores(extended.best_params_) is not None
+
+    def test_failed_fit_scores_nan(self, data):
+        """Test an invalid parameter scores NaN instead of failing the search"""
+        grid = {'n_estimators': [5, 10], 'max_depth': [-1, 2]}
+        with pytest.warns(FitFailedWarning):
+            search = GridSearch(RandomForestClassifier(random_state=42), grid).fit(*data)
+        assert np.isnan(search.cv_results_['mean_test_score'][:2]).all()
+        assert search.best_params_['max_depth'] == 2
+
+
+class TestRegularizationPath:
+    """Test the warm-started regularization path search"""
+
+    GRID = {'C': [10, 0.01, 1, 0.1], 'penalty': ['l1', 'l2'], 'solver': ['liblinear', 'saga'], 'max_iter': [5000]}
+
+    def test_prunes_only_equivalent_solvers(self):
+        """Test solvers sharing an objective are pruned to one and liblinear is kept"""
+        grid = dict(self.GRID, solver=['liblinear', 'lbfgs', 'saga'])
+        search = RegularizationPathSearch(LogisticRegression(), grid)
+        assert [(p['penalty'], p['solver']) for p in search.settings()] == [
+            ('l1', 'liblinear'), ('l1', 'saga'), ('l2', 'liblinear'), ('l2', 'lbfgs')
+        ]
+        assert len(RegularizationPathSearch(LogisticRegression(), grid, prune_solvers=False).settings()) == 6
+
+    def test_path_matches_cold_fits(self, data):
+        """Test warm-started scores agree with fitting every C from scratch, liblinear exactly"""
+        X, y = data
+        search = RegularizationPathSearch(LogisticRegression(random_state=0), self.GRID).fit(X, y)
+        cold = GridSearch(LogisticRegression(random_state=0), self.GRID).fit(X, y)
+
+        assert search.n_fits_ == 80
+        assert [p['C'] for p in search.cv_results_['params'][:4]] == [0.01, 0.1, 1, 10]
+        warm_scores = {repr(sorted(p.items())): m for p, m in zip(search.cv_results_['params'],
+                                                                   search.cv_results_['mean_test_score'])}
+        for params, mean in zip(cold.cv_results_['params'], cold.cv_results_['mean_test_score']):
+            tolerance = 0 if params['solver'] == 'liblinear' else 1e-3
+            assert warm_scores[repr(sorted(params.items()))] == pytest.approx(mean, abs=tolerance)
+        assert len(search.path_) == 16
+        assert search.path_[0]['mean_nonzero_coefs'] <= search.path_[3]['mean_nonzero_coefs']
+
+    def test_budget_truncates_path(self, data):
+        """Test a fit budget smaller than a path keeps its most regularized values"""
+        search = RegularizationPathSearch(LogisticRegression(), self.GRID, max_fits=15).fit(*data)
+        assert search.n_fits_ == 15
+        assert [p['C'] for p in search.cv_results_['params']] == [0.01, 0.1, 1]
+
+    def test_needs_path_parameter(self, data):
+        """Test estimators without C and families other than linear are rejected"""
+        with pytest.raises(ValueError):
+            make_search('path', RandomForestClassifier(), {'max_depth': [2]}).fit(*data)
+        with pytest.raises(ValueError):
+            get_search_config('random_forest', 'path')
+
+
+class TestFoldScoreReuse:
+    """Test multi-metric scoring and reuse of the winner's fold scores"""
+
+    def test_multi_metric_matches_gridsearchcv(self, data):
+        """Test several metrics are recorded with the refit metric selecting"""
+        X, y = data
+        scoring = ['accuracy', 'roc_auc']
+        folds = StratifiedKFold(n_splits=5, shuffle=True, random_state=1)
+        expected = GridSearchCV(
+            LogisticRegression(random_state=0), LR_GRID, cv=folds, scoring=scoring, refit='roc_auc'
+        ).fit(X, y)
+        search = GridSearch(LogisticRegression(random_state=0), LR_GRID, cv=folds, scoring=scoring,
+                            refit='roc_auc').fit(X, y)
+
+        for key in ('mean_test_accuracy', 'split2_test_roc_auc', 'rank_test_roc_auc'):
+            np.testing.assert_allclose(search.cv_results_[key], expected.cv_results_[key])
+        assert search.best_params_ == expected.best_params_
+        assert search.fold_scores(search.best_params_)['accuracy'] == pytest.approx(
+            [expected.cv_results_[f'split{k}_test_accuracy'][expected.best_index_] for k in range(5)]
+        )
+
+    def test_fold_scores_need_full_folds(self, data):
+        """Test halving on trees reuses the final round, halving on rows does not"""
+        X, y = data
+        grid = {'n_estimators': [10, 30], 'max_depth': [2, 4, None]}
+        forest = RandomForestClassifier(random_state=42)
+        trees = SuccessiveHalvingSearch(forest, grid, resource='n_estimators').fit(X, y)
+        assert trees.fold_scores(trees.best_params_) is not None
+        assert trees.fold_scores({'max_depth': 3, 'n_estimators': 30}) is None
+
+        rows = SuccessiveHalvingSearch(forest, grid, resource='n_samples').fit(X, y)
+        assert rows.fold_scores(rows.best_params_) is None
+
+    def test_cross_validate_model_matches_per_metric_cv(self, data):
+        """Test reused and single-pass CV metrics equal one cross_val_score per metric"""
+        X, y = data
+        search = make_search(
+            'halving', RandomForestClassifier(random_state=42), {'n_estimators': [10, 30], 'max_depth': [2, None]},
+            resource='n_estimators', cv=cv_folds(), scoring=list(CV_SCORING.values()), refit='roc_auc'
+        ).fit(X, y)
+        expected = {
+            metric: cross_val_score(search.best_estimator_, X, y, cv=cv_folds(), scoring=scoring).mean()
+            for metric, scoring in CV_SCORING.items()
+        }
+        assert cross_validate_model(search.best_estimator_, X, y, search=search) == pytest.approx(expected)
+        assert cross_validate_model(search.best_estimator_, X, y) == pytest.approx(expected)
+
+        # Different folds fall back to refitting
+        other = make_search('grid', RandomForestClassifier(random_state=42), {'n_estimators': [10]},
+                            scoring=list(CV_SCORING.values()), refit='roc_auc').fit(X, y)
+        assert cross_validate_model(other.best_estimator_, X, y, search=other) == pytest.approx({
+            metric: cross_val_score(other.best_estimator_, X, y, cv=cv_folds(), scoring=scoring).mean()
+            for metric, scoring in CV_SCORING.items()
+        })
@@ -0,0 +1,114 @@
+"""
+Unit tests for shadow-model evaluation
+"""
+import os
+import sys
+import threading
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.api.shadow import ShadowEvaluator
+
+
+@pytest.fixture(scope="module")
+def data():
+    """Synthetic binary classification data"""
+    rng = np.random.RandomState(0)
+    X = rng.randn(300, 13)
+    y = (X[:, 0] + 0.5 * X[:, 1] > 0).astype(int)
+    return X, y
+
+
+@pytest.fixture(scope="module")
+def models(data):
+    """Primary forest and shadow logistic regression"""
+    X, y = data
+    return RandomForestClassifier(n_estimators=10, random_state=42).fit(X, y), LogisticRegression().fit(X, y)
+
+
+class SlowModel:
+    """Model whose predict_proba blocks until released"""
+
+    classes_ = np.array([0, 1])
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def predict_proba(self, X):
+        self.release.wait()
+        return np.tile([0.5, 0.5], (len(X), 1))
+
+
+class TestShadowEvaluator:
+    """Test background shadow scoring"""
+
+    def test_agreement_and_deltas(self, data, models):
+        """Test agreement and deltas match direct computation"""
+        X, _ = data
+        primary, shadow = models
+        batches = []
+        evaluator = ShadowEvaluator(shadow, on_batch=lambda *args: batches.append(args))
+        for start in range(0, 300, 50):
+            evaluator.submit(X[start:start + 50], primary.predict_proba(X[start:start + 50]))
+        evaluator.close()
+
+        expected_agree = primary.predict(X) == shadow.predict(X)
+        assert evaluator.scored_rows == 300
+        assert evaluator.agreement_rate == pytest.approx(expected_agree.mean())
+        deltas = np.concatenate([d for _, d, _ in batches])
+        np.testing.assert_allclose(
+            np.sort(deltas), np.sort(np.abs(shadow.predict_proba(X)[:, 1] - primary.predict_proba(X)[:, 1]))
+        )
+
+    def test_features_are_copied(self, models):
+        """Test reusing the caller's buffer after submit does not change shadow input"""
+        _, shadow = models
+        seen = []
+
+        class Recorder:
+            classes_ = shadow.classes_
+
+            def predict_proba(self, X):
+                seen.append(X.copy())
+                return shadow.predict_proba(X)
+
+        evaluator = ShadowEvaluator(Recorder())
+        buffer = np.ones((2, 13))
+        evaluator.submit(buffer, np.tile([0.5, 0.5], (2, 1)))
+        buffer[:] = 0
+        evaluator.close()
+
+        assert np.all(seen[0] == 1)
+
+    def test_drops_when_full(self):
+        """Test submissions are dropped instead of blocking when the queue is full"""
+        model = SlowModel()
+        dropped = []
+        evaluator = ShadowEvaluator(model, max_queue=1, on_drop=dropped.append)
+        results = [evaluator.submit(np.zeros((3, 13)), np.tile([0.5, 0.5], (3, 1))) for _ in range(10)]
+        model.release.set()
+        evaluator.close()
+
+        assert not all(results)
+        assert evaluator.dropped_rows == sum(dropped) == 3 * results.count(False)
+
+    def test_coalesces_batches(self, data, models):
+        """Test queued submissions are scored together"""
+        X, _ = data
+        primary, _ = models
+        model = SlowModel()
+        sizes = []
+        evaluator = ShadowEvaluator(model, max_batch_rows=100, on_batch=lambda agree, d, s: sizes.append(len(agree)))
+        for start in range(0, 100, 10):
+            evaluator.submit(X[start:start + 10], primary.predict_proba(X[start:start + 10]))
+        model.release.set()
+        evaluator.close()
+
+        assert sum(sizes) == 100
+        assert len(sizes) < 10
@@ -0,0 +1,71 @@
+"""
+Unit tests for parallel sharded batch scoring
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.api.sharding import ShardedScorer
+
+
+@pytest.fixture(scope="module")
+def forest():
+    """Small forest on synthetic data"""
+    rng = np.random.RandomState(0)
+    X = rng.randn(200, 13)
+    y = (X[:, 0] > 0).astype(int)
+    return RandomForestClassifier(n_estimators=10, random_state=42, n_jobs=1).fit(X, y)
+
+
+@pytest.fixture
+def scorer(forest):
+    """Two-process shard pool"""
+    timings = []
+    scorer = ShardedScorer(forest, n_workers=2, shard_size=100, on_batch=lambda s, w: timings.append((s, w)))
+    scorer.timings = timings
+    yield scorer
+    scorer.close()
+
+
+class TestShardedScorer:
+    """Test sharded scoring"""
+
+    def test_matches_single_process(self, scorer, forest):
+        """Test sharded probabilities equal single-process scoring in row order"""
+        X = np.random.RandomState(1).randn(1050, 13)
+
+        np.testing.assert_array_equal(scorer.predict_proba(X), forest.predict_proba(X))
+
+    def test_reports_shard_timings(self, scorer):
+        """Test one timing per shard is reported"""
+        scorer.predict_proba(np.random.RandomState(2).randn(250, 13))
+
+        shard_seconds, wall_seconds = scorer.timings[-1]
+        assert len(shard_seconds) == 3
+        assert wall_seconds > 0
+
+    def test_small_batch_uses_every_process(self, scorer):
+        """Test batches below one shard per process are split into smaller shards"""
+        scorer.predict_proba(np.random.RandomState(3).randn(90, 13))
+
+        shard_seconds, _ = scorer.timings[-1]
+        assert len(shard_seconds) == 2
+
+    def test_pool_is_reused(self, scorer):
+        """Test the pool persists across batches"""
+        pool = scorer._pool
+        scorer.predict_proba(np.zeros((10, 13)))
+        scorer.predict_proba(np.zeros((10, 13)))
+
+        assert scorer._pool is pool
+
+    def test_invalid_configuration(self, forest):
+        """Test invalid pool settings are rejected"""
+        with pytest.raises(ValueError):
+            ShardedScorer(forest, n_workers=0, shard_size=10)
@@ -0,0 +1,211 @@
+"""
+Unit tests for tracing spans, exporters and the trace report
+"""
+import json
+import os
+import sys
+import threading
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils.tracing import (
+    FileSpanExporter, MemorySpanExporter, OTLPHttpSpanExporter, Tracer, configure_tracing, current_span,
+    parse_traceparent, to_otlp
+)
+from src.utils.trace_report import from_otlp, load_spans, make_collector, summarize
+
+
+@pytest.fixture
+def tracer():
+    return Tracer('test', MemorySpanExporter())
+
+
+def finished(tracer):
+    tracer.flush()
+    return {s['name']: s for s in tracer.exporter.spans}
+
+
+class TestSpans:
+    """Test span context and attributes"""
+
+    def test_nested_spans_share_trace(self, tracer):
+        """Test children take the trace id and parent id from the enclosing span"""
+        with tracer.span('root', stage='all') as root:
+            with tracer.span('child') as child:
+                assert current_span() is child
+                with tracer.span('grandchild'):
+                    pass
+            assert current_span() is root
+        assert current_span() is None
+
+        spans = finished(tracer)
+        assert spans['root']['parent_id'] is None
+        assert spans['child']['parent_id'] == spans['root']['span_id']
+        assert spans['grandchild']['parent_id'] == spans['child']['span_id']
+        assert {s['trace_id'] for s in spans.values()} == {spans['root']['trace_id']}
+        assert spans['root']['attributes'] == {'stage': 'all'}
+        assert spans['root']['duration_ms'] >= spans['child']['duration_ms']
+
+    def test_exception_marks_span_as_error(self, tracer):
+        """Test an exception leaving a span records its type and re-raises"""
+        with pytest.raises(KeyError):
+            with tracer.span('failing'):
+                raise KeyError('missing')
+
+        span = finished(tracer)['failing']
+        assert span['status'] == 'error'
+        assert span['attributes']['error.type'] == 'KeyError'
+
+    def test_threads_start_separate_traces(self, tracer):
+        """Test span context does not leak into other threads"""
+        seen = []
+        with tracer.span('main'):
+            thread = threading.Thread(target=lambda: seen.append(current_span()))
+            thread.start()
+            thread.join()
+        assert seen == [None]
+
+    def test_sampling_is_decided_per_trace(self):
+        """Test children of unsampled roots are not exported either"""
+        tracer = Tracer('test', MemorySpanExporter(), sample_rate=0.0)
+        with tracer.span('root') as root:
+            with tracer.span('child') as child:
+                pass
+        assert not root.sampled and not child.sampled
+        assert finished(tracer) == {}
+
+    def test_no_exporter_records_nothing(self):
+        """Test a tracer without exporter never samples"""
+        tracer = Tracer('test')
+        with tracer.span('root') as root:
+            pass
+        assert not root.sampled
+        tracer.flush()
+
+    def test_full_queue_drops_spans(self):
+        """Test spans beyond the export queue are counted as dropped"""
+        tracer = Tracer('test', MemorySpanExporter(), max_queue=2, flush_interval=3600)
+        tracer._pid = os.getpid()  # keep the export thread from draining the queue
+        for _ in range(5):
+            with tracer.span('span'):
+                pass
+        assert tracer.dropped == 3
+        tracer.flush()
+        assert len(tracer.exporter.spans) == 2
+
+
+class TestTraceparent:
+    """Test W3C traceparent handling"""
+
+    def test_round_trip(self, tracer):
+        """Test a span's traceparent parses back to its ids"""
+        with tracer.span('root') as root:
+            assert parse_traceparent(root.traceparent) == (root.trace_id, root.span_id, True)
+
+    @pytest.mark.parametrize('header', [None, '', 'garbage', '00-xyz-abc-01', '00-' + 'g' * 32 + '-' + '0' * 16 + '-01'])
+    def test_invalid_headers_are_ignored(self, header):
+        """Test malformed headers start a new trace"""
+        assert parse_traceparent(header) is None
+
+    def test_remote_parent_is_continued(self, tracer):
+        """Test a root span joins the trace of an incoming header"""
+        trace_id, parent_id = '1' * 32, '2' * 16
+        span = tracer.start_span('request', traceparent=f"00-{trace_id}-{parent_id}-01")
+        assert (span.trace_id, span.parent_id, span.sampled) == (trace_id, parent_id, True)
+        unsampled = tracer.start_span('request', traceparent=f"00-{trace_id}-{parent_id}-00")
+        assert not unsampled.sampled
+
+
+class TestExporters:
+    """Test span exporters and configuration"""
+
+    def test_file_exporter_writes_json_lines(self, tmp_path):
+        """Test the file exporter appends one JSON object per span"""
+        path = str(tmp_path / 'traces.jsonl')
+        tracer = Tracer('test', FileSpanExporter(path))
+        with tracer.span('root'):
+            with tracer.span('child', rows=3):
+                pass
+        tracer.flush()
+
+        spans = load_spans(path)
+        assert [s['name'] for s in spans] == ['child', 'root']
+        assert spans[0]['attributes'] == {'rows': 3}
+        assert spans[0]['service'] == 'test'
+
+    def test_otlp_round_trip(self, tracer):
+        """Test OTLP/JSON encoding keeps ids, timing, status and attribute types"""
+        with pytest.raises(ValueError):
+            with tracer.span('root', rows=3, rate=0.5, cached=True, model='rf'):
+                raise ValueError('bad')
+        spans = list(finished(tracer).values())
+
+        body = to_otlp(spans)
+        assert body['resourceSpans'][0]['resource']['attributes'][0]['value'] == {'stringValue': 'test'}
+        decoded = from_otlp(json.loads(json.dumps(body)))
+        assert decoded[0]['attributes'] == spans[0]['attributes']
+        for key in ('service', 'name', 'trace_id', 'span_id', 'parent_id', 'start_ns', 'end_ns', 'status'):
+            assert decoded[0][key] == spans[0][key]
+
+    def test_otlp_exporter_posts_to_collector(self, tmp_path):
+        """Test spans exported over OTLP/HTTP land in the stand-in collector's file"""
+        output = str(tmp_path / 'collected.jsonl')
+        server = make_collector(output, port=0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            endpoint = f"http://127.0.0.1:{server.server_address[1]}/v1/traces"
+            tracer = Tracer('test', OTLPHttpSpanExporter(endpoint))
+            with tracer.span('root'):
+                with tracer.span('child'):
+                    pass
+            tracer.flush()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        spans = {s['name']: s for s in load_spans(output)}
+        assert spans['child']['parent_id'] == spans['root']['span_id']
+        assert tracer.dropped == 0
+
+    def test_configure_from_environment(self, tmp_path, monkeypatch):
+        """Test TRACING_* variables select the exporter and sample rate"""
+        monkeypatch.setenv('TRACING_EXPORTER', 'file')
+        monkeypatch.setenv('TRACING_FILE', str(tmp_path / 'spans.jsonl'))
+        monkeypatch.setenv('TRACING_SAMPLE_RATE', '0.25')
+        from src.utils import tracing
+        monkeypatch.setattr(tracing, '_tracer', tracing._tracer)
+
+        configured = configure_tracing('svc')
+        assert isinstance(configured.exporter, FileSpanExporter)
+        assert configured.sample_rate == 0.25
+        assert tracing.get_tracer() is configured
+
+        monkeypatch.setenv('TRACING_EXPORTER', 'zipkin')
+        with pytest.raises(ValueError):
+            configure_tracing('svc')
+
+
+class TestTraceSummary:
+    """Test the per-span timing report"""
+
+    def test_self_time_excludes_children(self):
+        """Test self time subtracts direct children and counts errors"""
+        def span(name, span_id, parent_id, duration, status='ok'):
+            return {'service': 'svc', 'name': name, 'trace_id': 't', 'span_id': span_id, 'parent_id': parent_id,
+                    'duration_ms': duration, 'status': status}
+
+        spans = [
+            span('train.pipeline', 'a', None, 100.0),
+            span('train.search', 'b', 'a', 70.0),
+            span('train.cv', 'c', 'a', 20.0, status='error'),
+        ]
+        summary = {entry['name']: entry for entry in summarize(spans)}
+        assert summary['train.pipeline']['self_ms'] == pytest.approx(10.0)
+        assert summary['train.search']['self_ms'] == pytest.approx(70.0)
+        assert summary['train.cv']['errors'] == 1
+        assert summarize(spans)[0]['name'] == 'train.search'
+        assert summarize(spans, service='other') == []